@@ -0,0 +1,101 @@
+"""Time a cold import of ceph_api and of a release's command module.
+
+Each import runs in a fresh interpreter, --runs times, and the best time
+of an interpreter that imports nothing is subtracted::
+
+    python benchmarks/bench_import.py --runs 20
+    python benchmarks/bench_import.py --importtime
+
+--importtime instead prints python -X importtime's cumulative time for
+each ceph_api module and the modules that took longest, which needs
+python 3.7 or later.
+"""
+from __future__ import print_function
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+__author__ = 'Chris Holcombe <chris.holcombe@canonical.com>'
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
+
+STATEMENTS = (
+    'pass',
+    'import ceph_api',
+    'import ceph_api.jewel.ceph_command',
+    'from ceph_api.jewel.ceph_command import OsdCommand; '
+    'OsdCommand.osd_dump',
+)
+
+
+def _env():
+    # Import this checkout rather than an installed ceph_api
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(
+        [ROOT] + [path for path in [env.get('PYTHONPATH')] if path])
+    return env
+
+
+def best_time(statement, runs):
+    """The fastest of runs interpreters running statement, in seconds."""
+    best = None
+    for _ in range(runs):
+        start = time.time()
+        subprocess.check_call([sys.executable, '-c', statement], env=_env())
+        took = time.time() - start
+        best = took if best is None else min(best, took)
+    return best
+
+
+def importtime(statement, top):
+    """Print python -X importtime's cumulative microseconds for statement,
+    every ceph_api module first and then the top slowest overall."""
+    process = subprocess.Popen(
+        [sys.executable, '-X', 'importtime', '-c', statement],
+        env=_env(), stderr=subprocess.PIPE)
+    _, err = process.communicate()
+    rows = []
+    for line in err.decode().splitlines():
+        if not line.startswith('import time:') or '|' not in line:
+            continue
+        fields = line[len('import time:'):].split('|')
+        if not fields[1].strip().isdigit():
+            continue
+        rows.append((int(fields[1]), fields[2].rstrip()))
+    print('{:>10}  {}'.format('us', 'module'))
+    for cumulative, module in rows:
+        if module.strip().startswith('ceph_api'):
+            print('{:>10}  {}'.format(cumulative, module))
+    print()
+    for cumulative, module in sorted(rows, reverse=True)[:top]:
+        print('{:>10}  {}'.format(cumulative, module))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--runs', type=int, default=20,
+                        help='Interpreters to start per statement')
+    parser.add_argument('--importtime', action='store_true',
+                        help='Break the import of ceph_api down by module')
+    parser.add_argument('--top', type=int, default=15,
+                        help='Slowest modules to list with --importtime')
+    args = parser.parse_args()
+
+    if args.importtime:
+        importtime(STATEMENTS[-1], args.top)
+        return
+
+    baseline = best_time(STATEMENTS[0], args.runs)
+    print('interpreter start up {:.1f} ms, best of {}'.format(
+        baseline * 1e3, args.runs))
+    print('{:>10}  {}'.format('ms', 'statement'))
+    for statement in STATEMENTS[1:]:
+        took = best_time(statement, args.runs) - baseline
+        print('{:>10.1f}  {}'.format(took * 1e3, statement))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,192 @@
+"""Compare iter_pg_stats() with decoding a whole pg dump at once.
+
+Generates a synthetic JSON pg dump of --pgs PGs, then parses it once per
+method, each in a fresh interpreter so that every peak RSS is its own::
+
+    python benchmarks/bench_pgmap.py --pgs 100000
+
+For each method it prints the peak RSS (ru_maxrss), the RSS before
+parsing started, which is the interpreter plus the outbuf where the
+method reads it into memory first, and the records decoded per second.
+"""
+from __future__ import print_function
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from ceph_api.pgmap import iter_pg_stats  # noqa: E402
+
+__author__ = 'Chris Holcombe <chris.holcombe@canonical.com>'
+
+METHODS = ('json.loads', 'iter_pg_stats', 'iter_pg_stats-file')
+
+
+def pg_stat(pool, ps):
+    """One pg_stats record, with the fields and nesting a jewel monitor
+    dumps."""
+    osds = [(ps * 7 + i * 13) % 600 for i in range(3)]
+    return {
+        'pgid': '{}.{:x}'.format(pool, ps),
+        'version': '{}\'{}'.format(1200 + ps % 50, 90000 + ps),
+        'reported_seq': str(400000 + ps),
+        'reported_epoch': str(1250 + ps % 50),
+        'state': 'active+clean',
+        'last_fresh': '2016-10-14 06:12:31.092371',
+        'last_change': '2016-10-13 19:02:11.812004',
+        'last_active': '2016-10-14 06:12:31.092371',
+        'last_peered': '2016-10-14 06:12:31.092371',
+        'last_clean': '2016-10-14 06:12:31.092371',
+        'last_became_active': '2016-10-11 01:41:07.110271',
+        'last_became_peered': '2016-10-11 01:41:07.110271',
+        'last_unstale': '2016-10-14 06:12:31.092371',
+        'last_undegraded': '2016-10-14 06:12:31.092371',
+        'last_fullsized': '2016-10-14 06:12:31.092371',
+        'mapping_epoch': 1190,
+        'log_start': '1200\'89000',
+        'ondisk_log_start': '1200\'89000',
+        'created': 12,
+        'last_epoch_clean': 1191,
+        'parent': '0.0',
+        'parent_split_bits': 0,
+        'last_scrub': '1199\'88000',
+        'last_scrub_stamp': '2016-10-13 02:11:45.118920',
+        'last_deep_scrub': '1150\'80000',
+        'last_deep_scrub_stamp': '2016-10-08 22:50:01.665170',
+        'last_clean_scrub_stamp': '2016-10-13 02:11:45.118920',
+        'log_size': 3000,
+        'ondisk_log_size': 3000,
+        'stats_invalid': False,
+        'dirty_stats_invalid': False,
+        'omap_stats_invalid': False,
+        'hitset_stats_invalid': False,
+        'hitset_bytes_stats_invalid': False,
+        'pin_stats_invalid': False,
+        'stat_sum': {
+            'num_bytes': 4194304 * (ps % 900),
+            'num_objects': ps % 900,
+            'num_object_clones': 0,
+            'num_object_copies': 3 * (ps % 900),
+            'num_objects_missing_on_primary': 0,
+            'num_objects_degraded': 0,
+            'num_objects_misplaced': 0,
+            'num_objects_unfound': 0,
+            'num_objects_dirty': ps % 900,
+            'num_whiteouts': 0,
+            'num_read': ps * 3,
+            'num_read_kb': ps * 12,
+            'num_write': ps * 2,
+            'num_write_kb': ps * 8,
+            'num_scrub_errors': 0,
+            'num_shallow_scrub_errors': 0,
+            'num_deep_scrub_errors': 0,
+            'num_objects_recovered': 0,
+            'num_bytes_recovered': 0,
+            'num_keys_recovered': 0,
+            'num_objects_omap': 0,
+            'num_objects_hit_set_archive': 0,
+            'num_bytes_hit_set_archive': 0,
+            'num_flush': 0,
+            'num_flush_kb': 0,
+            'num_evict': 0,
+            'num_evict_kb': 0,
+            'num_promote': 0,
+            'num_flush_mode_high': 0,
+            'num_flush_mode_low': 0,
+            'num_evict_mode_some': 0,
+            'num_evict_mode_full': 0,
+            'num_objects_pinned': 0,
+        },
+        'up': osds,
+        'acting': osds,
+        'blocked_by': [],
+        'up_primary': osds[0],
+        'acting_primary': osds[0],
+    }
+
+
+def write_dump(path, pgs):
+    """Write a pg dump of pgs PGs to path, a record at a time so that
+    generating it doesn't take the memory being measured."""
+    with open(path, 'w') as f:
+        f.write('{"version": 1234567, "stamp": "2016-10-14 06:12:32.0", '
+                '"last_osdmap_epoch": 1250, "last_pg_scan": 1190, '
+                '"full_ratio": 0.95, "near_full_ratio": 0.85, '
+                '"pg_stats": [')
+        for ps in range(pgs):
+            if ps:
+                f.write(',')
+            json.dump(pg_stat(1 + ps % 4, ps), f)
+        f.write('], "pool_stats": [], "osd_stats": []}')
+
+
+def max_rss():
+    """Peak RSS of this process in bytes."""
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return rss if sys.platform == 'darwin' else rss * 1024
+
+
+def measure(method, path):
+    """Parse the dump at path with method and return
+    (records, seconds, baseline rss, peak rss)."""
+    if method == 'iter_pg_stats-file':
+        baseline = max_rss()
+        start = time.time()
+        with open(path, 'rb') as f:
+            records = sum(1 for _ in iter_pg_stats(f))
+    else:
+        with open(path, 'rb') as f:
+            outbuf = f.read()
+        baseline = max_rss()
+        start = time.time()
+        if method == 'json.loads':
+            records = len(json.loads(outbuf.decode('utf-8'))['pg_stats'])
+        else:
+            records = sum(1 for _ in iter_pg_stats(outbuf))
+    return records, time.time() - start, baseline, max_rss()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--pgs', type=int, default=100000,
+                        help='PGs in the synthetic dump')
+    parser.add_argument('--dump', help='Parse this pg dump instead of '
+                        'generating one')
+    parser.add_argument('--measure', choices=METHODS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        print(json.dumps(measure(args.measure, args.dump)))
+        return
+
+    path = args.dump
+    if path is None:
+        fd, path = tempfile.mkstemp(suffix='.json')
+        os.close(fd)
+        write_dump(path, args.pgs)
+    try:
+        print('{} ({:.1f} MB)'.format(path, os.path.getsize(path) / 1e6))
+        print('{:<20} {:>12} {:>12} {:>12}'.format(
+            'method', 'peak MB', 'before MB', 'records/s'))
+        for method in METHODS:
+            out = subprocess.check_output([sys.executable, __file__,
+                                           '--measure', method,
+                                           '--dump', path])
+            records, seconds, baseline, peak = json.loads(out.decode())
+            print('{:<20} {:>12.1f} {:>12.1f} {:>12.0f}'.format(
+                method, peak / 1e6, baseline / 1e6, records / seconds))
+    finally:
+        if args.dump is None:
+            os.unlink(path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+"""Time osd pool set's argument validation, memoized and freshly built.
+
+The generated methods used to build a new ceph_argparse validator for
+every argument on every call.  ceph_api.validator now builds each one
+once and shares it.  This times both ways of checking the arguments of a
+typical osd pool set call::
+
+    python benchmarks/bench_validator.py --release jewel --number 100000
+
+ceph_argparse has to be importable, as it is wherever the ceph CLI is
+installed (eg: PYTHONPATH=/usr/lib/python2.7/dist-packages).
+"""
+from __future__ import print_function
+
+import argparse
+import os
+import sys
+import timeit
+
+import six
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from ceph_api import schema  # noqa: E402
+
+__author__ = 'Chris Holcombe <chris.holcombe@canonical.com>'
+
+# The arguments of ceph osd pool set rbd pg_num 128
+VALUES = {'pool': 'rbd', 'var': ['pg_num'], 'val': '128'}
+
+
+def pool_set_args(release):
+    """The argument schema of osd pool set in a release."""
+    for method, prefix, help, args in \
+            schema.release_commands(release)['OsdCommand']:
+        if prefix == 'osd pool set':
+            return [dict(arg) for arg in args]
+    raise ValueError("{} has no osd pool set".format(release))
+
+
+def validate_fresh(ceph_argparse, args, values):
+    """Check values the way the generated methods did before validators
+    were memoized, building every ceph_argparse type on each call."""
+    for arg in args:
+        value = values.get(arg['name'])
+        if value is None:
+            continue
+        kind = arg['type']
+        if kind in ('CephPoolname', 'CephObjectname'):
+            if not isinstance(value, six.string_types):
+                raise TypeError("{} is not a String".format(arg['name']))
+        elif kind == 'CephChoices':
+            choices = ceph_argparse.CephChoices(strings=arg['strings'])
+            for s in value:
+                choices.valid(s)
+        elif kind == 'CephString':
+            ceph_argparse.CephString(
+                goodchars=arg.get('goodchars', '')).valid(value)
+        else:
+            raise ValueError("osd pool set has no {} argument".format(kind))
+
+
+def validate_memoized(args, values):
+    """Check values the way the generated methods do now."""
+    for arg in args:
+        value = values.get(arg['name'])
+        if value is None:
+            continue
+        schema.validate_arg(arg, value)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--release', default='jewel',
+                        choices=schema.RELEASES)
+    parser.add_argument('--number', type=int, default=100000,
+                        help='Validations per timing')
+    parser.add_argument('--repeat', type=int, default=5,
+                        help='Timings to take the best of')
+    args = parser.parse_args()
+
+    try:
+        import ceph_argparse
+    except ImportError:
+        sys.exit("ceph_argparse is not importable, put the ceph CLI's python "
+                 "directory on PYTHONPATH")
+
+    pool_set = pool_set_args(args.release)
+    # Build the shared validators before timing, as the first call would
+    validate_memoized(pool_set, VALUES)
+    timings = (
+        ('freshly built',
+         lambda: validate_fresh(ceph_argparse, pool_set, VALUES)),
+        ('memoized', lambda: validate_memoized(pool_set, VALUES)),
+    )
+    print('osd pool set on {}, best of {} x {}'.format(
+        args.release, args.repeat, args.number))
+    print('{:<16} {:>12}'.format('validators', 'us/call'))
+    for label, check in timings:
+        best = min(timeit.repeat(check, number=args.number,
+                                 repeat=args.repeat))
+        print('{:<16} {:>12.2f}'.format(label, best / args.number * 1e6))
+
+
+if __name__ == '__main__':
+    main()
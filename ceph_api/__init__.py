@@ -1 +1,3 @@
 __author__ = 'Chris Holcombe <chris.holcombe@canonical.com>'
+
+from ceph_api.cluster import Cluster, connect  # noqa: E402,F401
@@ -0,0 +1,105 @@
+"""asyncio versions of the command classes.
+
+Each Async* class is a subclass of its synchronous twin, so arguments are
+validated by exactly the same generated code before anything is sent.
+Only the blocking mon_command round trip is moved onto a bounded thread
+pool, which means every method returns an awaitable::
+
+    osd = AsyncOsdCommand('/etc/ceph/ceph.conf')
+    outbuf, outs = await osd.osd_dump()
+
+Argument errors are raised when the method is called, before it is
+awaited.  The python rados binding has no asynchronous mon_command, so
+the executor's size is what bounds concurrency; keep it no larger than
+the connection pool.
+"""
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from ceph_api import ceph_command
+from ceph_api.connection import DEFAULT_POOL_SIZE
+
+__author__ = 'Chris Holcombe <chris.holcombe@canonical.com>'
+
+_executor = None
+_executor_lock = threading.Lock()
+
+try:
+    _running_loop = asyncio.get_running_loop
+except AttributeError:
+    # Python < 3.7
+    _running_loop = asyncio.get_event_loop
+
+
+def get_executor():
+    """Return the executor shared by every async command instance, creating
+    it on first use with DEFAULT_POOL_SIZE workers.
+
+    :return: concurrent.futures.Executor
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=DEFAULT_POOL_SIZE)
+        return _executor
+
+
+def set_executor(executor):
+    """Replace the shared executor, eg: to match a larger connection pool.
+    The previous executor is shut down once its queued commands finish.
+
+    :param executor: concurrent.futures.Executor
+    """
+    global _executor
+    with _executor_lock:
+        previous, _executor = _executor, executor
+    if previous is not None:
+        previous.shutdown(wait=False)
+
+
+class AsyncCommandMixin(object):
+    """Turns a command class into one whose methods return awaitables.
+
+    :param rados_config_file: The ceph.conf configuration location
+    :param executor: Executor to run commands on.  Defaults to the shared
+        one from get_executor().
+    :param kwargs: Passed on to the command class, eg: name and keyring
+    """
+
+    def __init__(self, rados_config_file, executor=None, **kwargs):
+        super(AsyncCommandMixin, self).__init__(rados_config_file, **kwargs)
+        self.executor = executor
+
+    def _run(self, cmd, inbuf, **kwargs):
+        loop = _running_loop()
+        run = super(AsyncCommandMixin, self)._run
+        return loop.run_in_executor(self.executor or get_executor(),
+                                    functools.partial(run, cmd, inbuf,
+                                                      **kwargs))
+
+
+def async_command_class(command_class):
+    """Build the async twin of a command class, eg: for a release other
+    than the default one.
+
+    Example:
+        from ceph_api.hammer import ceph_command as hammer
+        AsyncHammerOsdCommand = async_command_class(hammer.OsdCommand)
+
+    :param command_class: A generated command class
+    :return: A subclass of command_class mixed with AsyncCommandMixin
+    """
+    return type('Async' + command_class.__name__,
+                (AsyncCommandMixin, command_class),
+                {'__module__': __name__})
+
+
+AsyncPlacementGroupCommand = async_command_class(
+    ceph_command.PlacementGroupCommand)
+AsyncMdsCommand = async_command_class(ceph_command.MdsCommand)
+AsyncOsdCommand = async_command_class(ceph_command.OsdCommand)
+AsyncMonitorCommand = async_command_class(ceph_command.MonitorCommand)
+AsyncAuthCommand = async_command_class(ceph_command.AuthCommand)
+AsyncConfigKeyCommand = async_command_class(ceph_command.ConfigKeyCommand)
@@ -0,0 +1,71 @@
+import functools
+
+from ceph_api import output
+from ceph_api.connection import run_ceph_command
+
+__author__ = 'Chris Holcombe <chris.holcombe@canonical.com>'
+
+
+class CommandBase(object):
+    """State shared by every generated command class.
+
+    Commands are sent over the process wide connection pool for
+    (rados_config_file, name, keyring) so instances pointed at the same
+    cluster share their connections.
+
+    :param rados_config_file: The ceph.conf configuration location
+    :param name: The client name to connect as, eg: client.admin
+    :param keyring: Path to the keyring for ``name``
+    :param direct: Send tells to osd.N and pg scrub/deep-scrub/repair
+        straight to the OSD instead of through the monitors
+    :param output_format: output.OUTPUT_PLAIN for the monitors' plain text,
+        output.OUTPUT_JSON to have read commands return decoded JSON, or
+        output.OUTPUT_JSON_RAW to have them return the JSON outbuf as is
+    :param map_cache: A ceph_api.cache.MapCache to answer map dumps from
+        while their epoch is unchanged
+    :param response_cache: A ceph_api.cache.ResponseCache to answer
+        repeated read commands from
+    """
+
+    def __init__(self, rados_config_file, name=None, keyring=None,
+                 direct=True, output_format=output.OUTPUT_PLAIN,
+                 map_cache=None, response_cache=None):
+        if output_format not in (output.OUTPUT_PLAIN, output.OUTPUT_JSON,
+                                 output.OUTPUT_JSON_RAW):
+            raise ValueError("Unknown output_format {}".format(output_format))
+        self.rados_config_file = rados_config_file
+        self.rados_name = name
+        self.rados_keyring = keyring
+        self.direct = direct
+        self.output_format = output_format
+        self.map_cache = map_cache
+        self.response_cache = response_cache
+
+    def _run(self, cmd, inbuf, outfile=None, infile=None):
+        inbuf = output.read_inbuf(inbuf, infile)
+        as_json = (self.output_format != output.OUTPUT_PLAIN and
+                   cmd['prefix'] in output.JSON_COMMANDS)
+        if as_json:
+            cmd['format'] = 'json'
+        send = self._send
+        if self.map_cache is not None:
+            send = functools.partial(self.map_cache.fetch, send,
+                                     cluster_key=self._cluster_key())
+        if self.response_cache is not None:
+            send = functools.partial(self.response_cache.fetch, send,
+                                     cluster_key=self._cluster_key())
+        outbuf, outs = send(cmd, inbuf)
+        if outfile is not None:
+            return output.write_outbuf(outbuf, outfile), outs
+        if as_json and self.output_format == output.OUTPUT_JSON:
+            outbuf = output.loads(outbuf)
+        return outbuf, outs
+
+    def _cluster_key(self):
+        return self.rados_config_file, self.rados_name, self.rados_keyring
+
+    def _send(self, cmd, inbuf):
+        return run_ceph_command(self.rados_config_file, cmd, inbuf,
+                                name=self.rados_name,
+                                keyring=self.rados_keyring,
+                                direct=self.direct)
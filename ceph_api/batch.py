@@ -0,0 +1,212 @@
+"""Run many prepared commands over a few pooled connections.
+
+Commands are plain command dicts, or the (cmd, inbuf) pairs returned by
+a prepared command class, so the generated validation still applies::
+
+    osd = prepared(OsdCommand)
+    batch = CommandBatch('/etc/ceph/ceph.conf', max_workers=8)
+    for osd_id in range(2000):
+        batch.add(*osd.osd_metadata(id=osd_id))
+    for result in batch.as_completed():
+        if result.error is None:
+            print(result.index, result.outbuf)
+
+Each worker thread holds one connection from the shared pool for the
+whole batch rather than checking one out per command, so the pool is
+grown to max_workers connections if it is smaller.
+"""
+import collections
+import threading
+
+from six.moves import queue
+
+from ceph_api import output
+from ceph_api.connection import DEFAULT_POOL_SIZE, CephError, \
+    get_connection_pool, send_command
+
+__author__ = 'Chris Holcombe <chris.holcombe@canonical.com>'
+
+
+class BatchResult(collections.namedtuple(
+        'BatchResult', ['index', 'cmd', 'outbuf', 'outs', 'error'])):
+    """Outcome of one command in a CommandBatch.
+
+    index is the position the command was added at.  On success error is
+    None, otherwise outbuf and outs are None and error holds the CephError,
+    rados.Error or other exception that was raised.  Commands no worker
+    could get a connection for hold the error connecting failed with.
+    """
+    __slots__ = ()
+
+
+class _PreparedMixin(object):
+    def __init__(self):
+        super(_PreparedMixin, self).__init__(None)
+
+    def _run(self, cmd, inbuf, outfile=None, infile=None):
+        if outfile is not None:
+            raise ValueError("outfile can't be used with a prepared command, "
+                             "write BatchResult.outbuf instead")
+        return cmd, output.read_inbuf(inbuf, infile)
+
+
+def prepared(command_class):
+    """Return an instance of command_class whose methods validate their
+    arguments and return (cmd, inbuf) instead of running the command.
+
+    :param command_class: A generated command class, eg: OsdCommand
+    :return: An instance whose methods return (dict cmd, string inbuf)
+    """
+    cls = type('Prepared' + command_class.__name__,
+               (_PreparedMixin, command_class), {})
+    return cls()
+
+
+class CommandBatch(object):
+    """A list of commands to run with bounded parallelism.
+
+    :param rados_config_file: The ceph.conf configuration location
+    :param name: The client name to connect as, eg: client.admin
+    :param keyring: Path to the keyring for ``name``
+    :param max_workers: The most commands in flight at once.  The shared
+        connection pool is grown to this size if it is smaller.
+    :param direct: Send OSD and PG directed commands straight to the
+        daemon, see ceph_api.connection.send_command()
+    """
+
+    def __init__(self, rados_config_file, name=None, keyring=None,
+                 max_workers=DEFAULT_POOL_SIZE, direct=True):
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1, was given "
+                             "{}".format(max_workers))
+        self.rados_config_file = rados_config_file
+        self.rados_name = name
+        self.rados_keyring = keyring
+        self.max_workers = max_workers
+        self.direct = direct
+        self.commands = []
+
+    def __len__(self):
+        return len(self.commands)
+
+    def add(self, cmd, inbuf=''):
+        """Queue a command.
+
+        :param cmd: The json command to run
+        :param inbuf:
+        :return: The index the command's BatchResult will carry
+        """
+        self.commands.append((cmd, inbuf))
+        return len(self.commands) - 1
+
+    def extend(self, commands):
+        """Queue several commands.
+
+        :param commands: An iterable of command dicts or (cmd, inbuf) pairs
+        """
+        for command in commands:
+            if isinstance(command, dict):
+                self.add(command)
+            else:
+                self.add(*command)
+
+    def _drain(self, cluster, todo, done):
+        # Returns True if the handle raised a rados.Error and should not be
+        # reused
+        import rados
+        while True:
+            try:
+                index, (cmd, inbuf) = todo.get_nowait()
+            except queue.Empty:
+                return False
+            try:
+                outbuf, outs = send_command(cluster, cmd, inbuf,
+                                            direct=self.direct)
+            except CephError as e:
+                done.put(BatchResult(index, cmd, None, None, e))
+            except rados.Error as e:
+                done.put(BatchResult(index, cmd, None, None, e))
+                return True
+            except Exception as e:
+                # eg: a malformed command, which shouldn't cost the worker
+                # or the rest of the batch
+                done.put(BatchResult(index, cmd, None, None, e))
+            else:
+                done.put(BatchResult(index, cmd, outbuf, outs, None))
+
+    def _worker(self, pool, todo, done, failures):
+        import rados
+        while not todo.empty():
+            try:
+                cluster = pool.acquire()
+            except (CephError, rados.Error) as e:
+                # Leave what is left to the other workers, keeping the
+                # reason in case none of them can connect either
+                failures.append(e)
+                return
+            discard = False
+            try:
+                discard = self._drain(cluster, todo, done)
+            finally:
+                pool.release(cluster, discard=discard)
+
+    def as_completed(self):
+        """Run the queued commands, yielding each BatchResult as it
+        finishes.
+
+        :return: A generator of BatchResult, in completion order
+        """
+        pool = get_connection_pool(self.rados_config_file,
+                                   name=self.rados_name,
+                                   keyring=self.rados_keyring)
+        # One connection per worker, or the extra workers only wait
+        pool.grow(self.max_workers)
+        todo = queue.Queue()
+        for item in enumerate(self.commands):
+            todo.put(item)
+        done = queue.Queue()
+        failures = []
+        workers = []
+        for _ in range(min(self.max_workers, len(self.commands))):
+            worker = threading.Thread(target=self._worker,
+                                      args=(pool, todo, done, failures))
+            worker.daemon = True
+            worker.start()
+            workers.append(worker)
+
+        remaining = len(self.commands)
+        while remaining:
+            try:
+                result = done.get(timeout=1)
+            except queue.Empty:
+                if any(worker.is_alive() for worker in workers):
+                    continue
+                if done.empty():
+                    break
+                continue
+            remaining -= 1
+            yield result
+
+        # Every worker gave up, eg: the cluster is unreachable.  Report
+        # the commands nobody got to rather than dropping them, with why
+        # the last worker couldn't connect.
+        while True:
+            try:
+                index, (cmd, inbuf) = todo.get_nowait()
+            except queue.Empty:
+                return
+            if failures:
+                error = failures[-1]
+            else:
+                error = CephError(cmd=cmd, msg="no connection available")
+            yield BatchResult(index, cmd, None, None, error)
+
+    def run(self):
+        """Run the queued commands and wait for all of them.
+
+        :return: A list of BatchResult in the order commands were added
+        """
+        results = [None] * len(self.commands)
+        for result in self.as_completed():
+            results[result.index] = result
+        return results
@@ -0,0 +1,294 @@
+"""Client side caches for command output.
+
+ResponseCache answers repeated read commands from memory for a short,
+per-command time to live, and lets concurrent identical requests share
+one round trip.  MapCache keeps the full OSD, MDS and monitor map dumps
+and only fetches them again once the map's epoch has moved, which it
+learns from the much smaller stat commands::
+
+    maps = MapCache()
+    osd = OsdCommand('/etc/ceph/ceph.conf', map_cache=maps)
+    mds = MdsCommand('/etc/ceph/ceph.conf', map_cache=maps)
+    osd.osd_dump()
+    osd.osd_dump()   # one osd stat round trip, no osd dump
+    print(maps.hits, maps.misses)
+
+Both are opt-in and can be shared by several command instances.
+"""
+import collections
+import json
+import re
+import threading
+import time
+
+from ceph_api import output
+
+__author__ = 'Chris Holcombe <chris.holcombe@canonical.com>'
+
+# Map commands -> the stat command that reports the same map's epoch
+MAP_EPOCH_COMMANDS = {
+    'osd dump': 'osd stat',
+    'osd tree': 'osd stat',
+    'osd ls': 'osd stat',
+    'osd crush dump': 'osd stat',
+    'osd getmap': 'osd stat',
+    'osd getcrushmap': 'osd stat',
+    'mds dump': 'mds stat',
+    'fs dump': 'mds stat',
+    'mds getmap': 'mds stat',
+    'mon dump': 'mon stat',
+    'mon getmap': 'mon stat',
+}
+
+# The plain text stat output leads with the epoch, eg: osdmap e1234: ...
+_TEXT_EPOCH = re.compile(r'\be(\d+)\b')
+
+
+def parse_epoch(outbuf, outs=''):
+    """Pull the map epoch out of osd stat, mds stat or mon stat output.
+
+    :param outbuf: JSON or plain text stat output
+    :param outs: The status string, where some releases print the stat
+    :return: int, or None if no epoch was found
+    """
+    try:
+        stat = output.loads(outbuf)
+    except ValueError:
+        stat = None
+    if isinstance(stat, dict):
+        if 'epoch' in stat:
+            return int(stat['epoch'])
+        for value in stat.values():
+            if isinstance(value, dict) and 'epoch' in value:
+                return int(value['epoch'])
+    for text in (outbuf, outs):
+        if isinstance(text, bytes):
+            text = text.decode('utf-8', 'replace')
+        match = _TEXT_EPOCH.search(text or '')
+        if match is not None:
+            return int(match.group(1))
+    return None
+
+
+class MapCache(object):
+    """Cache of map dumps keyed by the map's epoch.
+
+    Pass the same MapCache to several command instances to share it.
+    Commands that ask for a specific epoch are passed straight through,
+    as are all other commands.
+
+    :ivar hits: Map fetches answered from the cache
+    :ivar misses: Map fetches that went to the cluster
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def current_epoch(self, send, prefix):
+        """Ask the cluster for the current epoch of a map.
+
+        :param send: Callable taking (cmd, inbuf) that runs a command
+        :param prefix: The stat command, eg: osd stat
+        :return: int, or None if the epoch could not be read
+        """
+        outbuf, outs = send({'prefix': prefix, 'format': 'json'}, '')
+        return parse_epoch(outbuf, outs)
+
+    def fetch(self, send, cmd, inbuf, cluster_key=None):
+        """Run cmd through the cache.
+
+        :param send: Callable taking (cmd, inbuf) that runs a command
+        :param cmd: The json command to run
+        :param inbuf:
+        :param cluster_key: Something that tells clusters apart when one
+            cache serves several, eg: (conffile, name, keyring)
+        :return: (string outbuf, string outs)
+        """
+        stat = MAP_EPOCH_COMMANDS.get(cmd.get('prefix'))
+        if stat is None or cmd.get('epoch') is not None:
+            return send(cmd, inbuf)
+        epoch = self.current_epoch(send, stat)
+        key = (cluster_key, json.dumps(cmd, sort_keys=True))
+        with self._lock:
+            entry = self._entries.get(key)
+            if epoch is not None and entry is not None and \
+                    entry[0] == epoch:
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+        result = send(cmd, inbuf)
+        if epoch is not None:
+            with self._lock:
+                self._entries[key] = (epoch, result)
+        return result
+
+    def clear(self):
+        """Drop every cached map and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+# Seconds to keep each read command's output for when ResponseCache is
+# given no ttls of its own
+DEFAULT_TTLS = {
+    'status': 5,
+    'health': 5,
+    'df': 10,
+    'pg stat': 5,
+    'osd stat': 5,
+    'mds stat': 5,
+    'mon stat': 5,
+    'quorum_status': 5,
+    'osd df': 10,
+    'osd pool stats': 5,
+}
+
+# First word of a mutating command -> first words of the read commands
+# whose output it can change.  Mutations not listed drop everything
+# cached for the cluster.
+INVALIDATES = {
+    'osd': ('osd', 'pg', 'df', 'status', 'health', 'report'),
+    'pg': ('pg', 'df', 'status', 'health', 'report'),
+    'mds': ('mds', 'fs', 'status', 'health', 'report'),
+    'fs': ('mds', 'fs', 'status', 'health', 'report'),
+    'mon': ('mon', 'mon_status', 'quorum_status', 'status', 'health',
+            'report'),
+    'auth': ('auth',),
+    'config-key': ('config-key',),
+}
+
+
+class _Flight(object):
+    # A request being answered by another thread
+    def __init__(self):
+        self.done = threading.Event()
+        self.ok = False
+        self.result = None
+        self.error = None
+
+
+class ResponseCache(object):
+    """A TTL cache for read commands with request coalescing.
+
+    Concurrent identical requests share a single in-flight command.  The
+    least recently used entry is evicted once max_entries is reached, and
+    a mutating command drops the cached entries it could make stale, eg:
+    osd out clears osd, pg, df, status and health output.
+
+    :param ttls: dict of command prefix to seconds to cache its output.
+        Only commands listed are cached.  Defaults to DEFAULT_TTLS.
+    :param max_entries: The most responses to hold
+    :ivar hits: Requests answered from the cache
+    :ivar misses: Requests that went to the cluster
+    :ivar coalesced: Requests that waited on an identical in-flight one
+    """
+
+    def __init__(self, ttls=None, max_entries=1024):
+        self.ttls = dict(DEFAULT_TTLS if ttls is None else ttls)
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        # key -> (expires, prefix, result), least recently used first
+        self._entries = collections.OrderedDict()
+        self._flights = {}
+        # cluster_key -> count of mutations seen, so a read that raced a
+        # mutation isn't cached
+        self._generations = collections.defaultdict(int)
+        self._lock = threading.Lock()
+
+    def fetch(self, send, cmd, inbuf, cluster_key=None):
+        """Run cmd through the cache.
+
+        :param send: Callable taking (cmd, inbuf) that runs a command
+        :param cmd: The json command to run
+        :param inbuf:
+        :param cluster_key: Something that tells clusters apart when one
+            cache serves several, eg: (conffile, name, keyring)
+        :return: (string outbuf, string outs)
+        """
+        prefix = cmd.get('prefix')
+        if prefix not in output.READ_COMMANDS:
+            try:
+                return send(cmd, inbuf)
+            finally:
+                self.invalidate(prefix, cluster_key=cluster_key)
+        ttl = self.ttls.get(prefix)
+        if not ttl:
+            return send(cmd, inbuf)
+
+        key = (cluster_key, json.dumps(cmd, sort_keys=True))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.time():
+                self._entries[key] = self._entries.pop(key)
+                self.hits += 1
+                return entry[2]
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+                generation = self._generations[cluster_key]
+                self.misses += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.ok:
+                return flight.result
+            if flight.error is not None:
+                raise flight.error
+            # The leader was interrupted, eg: by KeyboardInterrupt, so
+            # there's nothing to share.  Ask again.
+            return self.fetch(send, cmd, inbuf, cluster_key=cluster_key)
+
+        try:
+            flight.result = send(cmd, inbuf)
+            flight.ok = True
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+                if flight.ok and \
+                        self._generations[cluster_key] == generation:
+                    self._entries.pop(key, None)
+                    self._entries[key] = (time.time() + ttl, prefix,
+                                          flight.result)
+                    while len(self._entries) > self.max_entries:
+                        self._entries.popitem(last=False)
+            flight.done.set()
+        return flight.result
+
+    def invalidate(self, prefix=None, cluster_key=None):
+        """Drop the cached responses a command could have made stale.
+
+        :param prefix: The mutating command's prefix.  None drops every
+            entry for the cluster.
+        :param cluster_key: The cluster the command ran against
+        """
+        affected = INVALIDATES.get(prefix.split(' ', 1)[0]) if prefix \
+            else None
+        with self._lock:
+            self._generations[cluster_key] += 1
+            for key in list(self._entries):
+                if key[0] != cluster_key:
+                    continue
+                if affected is None or \
+                        self._entries[key][1].split(' ', 1)[0] in affected:
+                    del self._entries[key]
+
+    def clear(self):
+        """Drop every cached response and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+            self.coalesced = 0
@@ -0,0 +1,212 @@
+"""Pick the right release's command classes for a cluster.
+
+connect() asks the monitors for their version once, over the pooled
+connection the commands will go on to use, and imports only the release
+module that matches::
+
+    import ceph_api
+
+    cluster = ceph_api.connect('/etc/ceph/ceph.conf')
+    print(cluster.release)       # eg: jewel
+    outbuf, outs = cluster.osd.osd_dump()
+
+The version is remembered per (conffile, name, keyring) for the life of
+the process.
+"""
+import importlib
+import json
+import re
+import threading
+
+from ceph_api.connection import CephError, run_ceph_command
+
+__author__ = 'Chris Holcombe <chris.holcombe@canonical.com>'
+
+# Attribute on Cluster -> the command class it holds
+COMMAND_ATTRIBUTES = {
+    'pg': 'PlacementGroupCommand',
+    'mds': 'MdsCommand',
+    'osd': 'OsdCommand',
+    'mon': 'MonitorCommand',
+    'auth': 'AuthCommand',
+    'config_key': 'ConfigKeyCommand',
+}
+
+_VERSION = re.compile(r'(\d+(?:\.\d+)*)')
+
+_versions = {}
+_versions_lock = threading.Lock()
+
+
+def _version_tuple(version):
+    return tuple(int(part) for part in version.split('.'))
+
+
+def release_for_version(version):
+    """Map a ceph version to the newest bundled release that isn't newer.
+
+    Versions older than firefly get firefly and versions newer than the
+    newest bundled release get that release.
+
+    :param version: A version string, eg: 10.2.11, or None if unknown
+    :return: string release name
+    """
+    # Imported here so that importing ceph_api doesn't load the table
+    from ceph_api import schema
+
+    release = schema.RELEASES[0]
+    if version is None:
+        return release
+    number = _version_tuple(version)
+    for name in schema.RELEASES:
+        if number >= _version_tuple(schema.release_version(name)):
+            release = name
+    return release
+
+
+def release_for_commands(prefixes):
+    """Find the bundled release whose commands best match a monitor's.
+
+    :param prefixes: The command prefixes the monitors offer, eg: from
+        get_command_descriptions
+    :return: string release name, the newest of any equally good matches
+    """
+    from ceph_api import schema
+
+    offered = set(prefixes)
+    best = None
+    for name in schema.RELEASES:
+        table = set(command[1]
+                    for commands in schema.release_commands(name).values()
+                    for command in commands)
+        missed = len(table ^ offered)
+        if best is None or missed <= best[0]:
+            best = (missed, name)
+    return best[1]
+
+
+def _command_prefixes(outbuf):
+    # The prefix of each signature in get_command_descriptions output.
+    # Prefix words are plain strings or CephPrefix arguments.
+    if isinstance(outbuf, bytes):
+        outbuf = outbuf.decode('utf-8', 'replace')
+    prefixes = []
+    for description in json.loads(outbuf).values():
+        words = []
+        for word in description.get('sig', ()):
+            if isinstance(word, dict):
+                if word.get('type') != 'CephPrefix':
+                    break
+                word = word['prefix']
+            words.append(word)
+        prefixes.append(' '.join(words))
+    return prefixes
+
+
+def cluster_version(rados_config_file, name=None, keyring=None):
+    """Ask the monitors for their version, once per cluster identity.
+
+    Monitors older than hammer have no version command.  Their release
+    is told from the commands they describe instead, and the version
+    that release's monitors report is returned, eg: 0.87 for giant.
+
+    :param rados_config_file: The ceph.conf configuration location
+    :param name: The client name to connect as, eg: client.admin
+    :param keyring: Path to the keyring for ``name``
+    :return: string version, eg: 10.2.11, or None if neither the version
+        nor the command descriptions could be read.  None isn't cached.
+    :raise rados.Error: Raises on rados errors
+    """
+    key = (rados_config_file, name, keyring)
+    with _versions_lock:
+        if key in _versions:
+            return _versions[key]
+    version = None
+    try:
+        outbuf, outs = run_ceph_command(rados_config_file,
+                                        {'prefix': 'version'}, '',
+                                        name=name, keyring=keyring)
+    except CephError:
+        outbuf = None
+    if outbuf is not None:
+        if isinstance(outbuf, bytes):
+            outbuf = outbuf.decode('utf-8', 'replace')
+        match = _VERSION.search(outbuf)
+        version = match.group(1) if match else None
+    if version is None:
+        version = _described_version(rados_config_file, name, keyring)
+    if version is None:
+        # Likely a passing failure, so ask again next time
+        return None
+    with _versions_lock:
+        return _versions.setdefault(key, version)
+
+
+def _described_version(rados_config_file, name, keyring):
+    # The version of the release whose commands the monitors describe
+    from ceph_api import schema
+
+    try:
+        outbuf, outs = run_ceph_command(
+            rados_config_file, {'prefix': 'get_command_descriptions'}, '',
+            name=name, keyring=keyring)
+        prefixes = _command_prefixes(outbuf)
+    except (CephError, ValueError, AttributeError):
+        return None
+    if not prefixes:
+        return None
+    return schema.release_version(release_for_commands(prefixes))
+
+
+class Cluster(object):
+    """The command classes of one release, bound to one cluster.
+
+    The pg, mds, osd, mon, auth and config_key attributes are command
+    instances, created on first use.
+
+    :param rados_config_file: The ceph.conf configuration location
+    :param release: The release module to use, eg: jewel
+    :param version: The version the monitors reported, if known
+    :param name: The client name to connect as, eg: client.admin
+    :param keyring: Path to the keyring for ``name``
+    :param kwargs: Passed on to every command class, eg: output_format
+    """
+
+    def __init__(self, rados_config_file, release, version=None, name=None,
+                 keyring=None, **kwargs):
+        self.rados_config_file = rados_config_file
+        self.release = release
+        self.version = version
+        self.module = importlib.import_module(
+            'ceph_api.{}.ceph_command'.format(release))
+        self._kwargs = dict(kwargs, name=name, keyring=keyring)
+
+    def __getattr__(self, attr):
+        class_name = COMMAND_ATTRIBUTES.get(attr)
+        if class_name is None:
+            raise AttributeError(attr)
+        command = getattr(self.module, class_name)(self.rados_config_file,
+                                                   **self._kwargs)
+        setattr(self, attr, command)
+        return command
+
+
+def connect(rados_config_file, name=None, keyring=None, release=None,
+            **kwargs):
+    """Detect the cluster's release and return its command classes.
+
+    :param rados_config_file: The ceph.conf configuration location
+    :param name: The client name to connect as, eg: client.admin
+    :param keyring: Path to the keyring for ``name``
+    :param release: Skip detection and use this release, eg: hammer
+    :param kwargs: Passed on to every command class, eg: output_format
+    :return: Cluster
+    :raise rados.Error: Raises on rados errors
+    """
+    version = None
+    if release is None:
+        version = cluster_version(rados_config_file, name=name,
+                                  keyring=keyring)
+        release = release_for_version(version)
+    return Cluster(rados_config_file, release, version=version, name=name,
+                   keyring=keyring, **kwargs)
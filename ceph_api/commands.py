@@ -0,0 +1,426 @@
+"""The command table every release's command classes are built from.
+
+TABLES maps a release to its commands.  firefly lists every command and
+each later release names the release it is based on and only records
+the commands it adds or changes, and those it removes, so supporting a
+new release is a data change.
+
+Each command is (method, prefix, help, args).  Each argument is a tuple
+of (field, value) pairs using the field names the monitors' own
+get_command_descriptions uses: name, type, and where they apply
+strings, range, goodchars, n and req.  Arguments are listed required
+first, in the order the method takes them.
+
+Everything here is a literal so the table loads straight from the
+compiled module.
+"""
+# flake8: noqa
+
+__author__ = 'Chris Holcombe <chris.holcombe@canonical.com>'
+
+TABLES = {
+    'firefly': {
+        'version': '0.80',
+        'commands': {
+            'PlacementGroupCommand': (
+                ('pg_stat', 'pg stat', 'show placement group status.', ()),
+                ('pg_getmap', 'pg getmap', 'get binary pg map to -o/stdout', ()),
+                ('pg_send_pg_creates', 'pg send_pg_creates', 'trigger pg creates to be issued', ()),
+                ('pg_dump', 'pg dump', "show human-readable versions of pg map (only 'all' valid with plain)", ((('name', 'dumpcontents'), ('type', 'CephChoices'), ('strings', 'all|summary|sum|delta|pools|osds|pgs|pgs_brief'), ('n', 'N'), ('req', False)),)),
+                ('pg_dump_json', 'pg dump_json', 'show human-readable version of pg map in json only', ((('name', 'dumpcontents'), ('type', 'CephChoices'), ('strings', 'all|summary|sum|pools|osds|pgs'), ('n', 'N'), ('req', False)),)),
+                ('pg_dump_pools_json', 'pg dump_pools_json', 'show pg pools info in json only', ()),
+                ('pg_dump_stuck', 'pg dump_stuck', 'show information about stuck pgs', ((('name', 'stuckops'), ('type', 'CephChoices'), ('strings', 'inactive|unclean|stale'), ('n', 'N'), ('req', False)), (('name', 'threshold'), ('type', 'CephInt'), ('range', ''), ('req', False)))),
+                ('pg_map', 'pg map', 'show mapping of pg to osds', ((('name', 'pgid'), ('type', 'CephPgid')),)),
+                ('pg_scrub', 'pg scrub', 'start scrub on <pgid>', ((('name', 'pgid'), ('type', 'CephPgid')),)),
+                ('pg_deep_scrub', 'pg deep-scrub', 'start deep-scrub on <pgid>', ((('name', 'pgid'), ('type', 'CephPgid')),)),
+                ('pg_repair', 'pg repair', 'start repair on <pgid>', ((('name', 'pgid'), ('type', 'CephPgid')),)),
+                ('pg_debug', 'pg debug', 'show debug info about pgs', ((('name', 'debugop'), ('type', 'CephChoices'), ('strings', 'unfound_objects_exist|degraded_pgs_exist')),)),
+                ('pg_force_create_pg', 'pg force_create_pg', 'force creation of pg <pgid>', ((('name', 'pgid'), ('type', 'CephPgid')),)),
+                ('pg_set_full_ratio', 'pg set_full_ratio', 'set ratio at which pgs are considered full', ((('name', 'ratio'), ('type', 'CephFloat'), ('range', '0|1')),)),
+                ('pg_set_nearfull_ratio', 'pg set_nearfull_ratio', 'set ratio at which pgs are considered nearly full', ((('name', 'ratio'), ('type', 'CephFloat'), ('range', '0|1')),)),
+            ),
+            'MdsCommand': (
+                ('mds_stat', 'mds stat', 'show MDS status', ()),
+                ('mds_dump', 'mds dump', 'dump info, optionally from epoch', ((('name', 'epoch'), ('type', 'CephInt'), ('range', ''), ('req', False)),)),
+                ('mds_getmap', 'mds getmap', 'get MDS map, optionally from epoch', ((('name', 'epoch'), ('type', 'CephInt'), ('range', ''), ('req', False)),)),
+                ('mds_tell', 'mds tell', 'send command to particular mds', ((('name', 'args'), ('type', 'CephString'), ('goodchars', ''), ('n', 'N')), (('name', 'who'), ('type', 'CephString'), ('goodchars', '')))),
+                ('mds_compat_show', 'mds compat show', 'show mds compatibility settings', ()),
+                ('mds_stop', 'mds stop', 'stop mds', ((('name', 'who'), ('type', 'CephString'), ('goodchars', '')),)),
+                ('mds_deactivate', 'mds deactivate', 'stop mds', ((('name', 'who'), ('type', 'CephString'), ('goodchars', '')),)),
+                ('mds_set_max_mds', 'mds set_max_mds', 'set max MDS index', ((('name', 'maxmds'), ('type', 'CephInt'), ('range', '0')),)),
+                ('mds_set', 'mds set', 'set mds parameter <var> to <val>', ((('name', 'val'), ('type', 'CephString'), ('goodchars', '')), (('name', 'var'), ('type', 'CephChoices'), ('strings', 'max_mds|max_file_size|allow_new_snaps|inline_data')), (('name', 'confirm'), ('type', 'CephString'), ('goodchars', ''), ('req', False)))),
+                ('mds_setmap', 'mds setmap', 'set mds map; must supply correct epoch number', ((('name', 'epoch'), ('type', 'CephInt'), ('range', '0')),)),
+                ('mds_set_state', 'mds set_state', 'set mds state of <gid> to <numeric-state>', ((('name', 'gid'), ('type', 'CephInt'), ('range', '0')), (('name', 'state'), ('type', 'CephInt'), ('range', '0|20')))),
+                ('mds_fail', 'mds fail', 'force mds to status failed', ((('name', 'who'), ('type', 'CephString'), ('goodchars', '')),)),
+                ('mds_rm', 'mds rm', 'remove nonactive mds', ((('name', 'gid'), ('type', 'CephInt'), ('range', '0')), (('name', 'who'), ('type', 'CephName')))),
+                ('mds_rmfailed', 'mds rmfailed', 'remove failed mds', ((('name', 'who'), ('type', 'CephInt'), ('range', '0')),)),
+                ('mds_cluster_down', 'mds cluster_down', 'take MDS cluster down', ()),
+                ('mds_cluster_up', 'mds cluster_up', 'bring MDS cluster up', ()),
+                ('mds_compat_rm_compat', 'mds compat rm_compat', 'remove compatible feature', ((('name', 'feature'), ('type', 'CephInt'), ('range', '0')),)),
+                ('mds_compat_rm_incompat', 'mds compat rm_incompat', 'remove incompatible feature', ((('name', 'feature'), ('type', 'CephInt'), ('range', '0')),)),
+                ('mds_add_data_pool', 'mds add_data_pool', 'add data pool <pool>', ((('name', 'pool'), ('type', 'CephString'), ('goodchars', '')),)),
+                ('mds_remove_data_pool', 'mds remove_data_pool', 'remove data pool <pool>', ((('name', 'pool'), ('type', 'CephString'), ('goodchars', '')),)),
+                ('mds_newfs', 'mds newfs', 'make new filesystom using pools <metadata> and <data>', ((('name', 'metadata'), ('type', 'CephInt'), ('range', '0')), (('name', 'data'), ('type', 'CephInt'), ('range', '0')), (('name', 'sure'), ('type', 'CephChoices'), ('strings', '--yes-i-really-mean-it'), ('req', False)))),
+            ),
+            'OsdCommand': (
+                ('osd_stat', 'osd stat', 'print summary of OSD map', ()),
+                ('osd_dump', 'osd dump', 'print summary of OSD map', ((('name', 'epoch'), ('type', 'CephInt'), ('range', '0'), ('req', False)),)),
+                ('osd_tree', 'osd tree', 'print OSD tree', ((('name', 'epoch'), ('type', 'CephInt'), ('range', '0'), ('req', False)),)),
+                ('osd_ls', 'osd ls', 'show all OSD ids', ((('name', 'epoch'), ('type', 'CephInt'), ('range', '0'), ('req', False)),)),
+                ('osd_getmap', 'osd getmap', 'get OSD map', ((('name', 'epoch'), ('type', 'CephInt'), ('range', '0'), ('req', False)),)),
+                ('osd_getcrushmap', 'osd getcrushmap', 'get CRUSH map', ((('name', 'epoch'), ('type', 'CephInt'), ('range', '0'), ('req', False)),)),
+                ('osd_perf', 'osd perf', 'print dump of OSD perf summary stats', ()),
+                ('osd_getmaxosd', 'osd getmaxosd', 'show largest OSD id', ()),
+                ('osd_find', 'osd find', 'find osd <id> in the CRUSH map and show its location', ((('name', 'id'), ('type', 'CephInt'), ('range', '0')),)),
+                ('osd_metadata', 'osd metadata', 'fetch metadata for osd <id>', ((('name', 'id'), ('type', 'CephInt'), ('range', '0')),)),
+                ('osd_map', 'osd map', 'find pg for <object> in <pool>', ((('name', 'pool'), ('type', 'CephPoolname')), (('name', 'object'), ('type', 'CephObjectname')))),
+                ('osd_scrub', 'osd scrub', 'initiate scrub on osd <who>', ((('name', 'who'), ('type', 'CephString'), ('goodchars', '')),)),
+                ('osd_deep_scrub', 'osd deep-scrub', 'initiate deep scrub on osd <who>', ((('name', 'who'), ('type', 'CephString'), ('goodchars', '')),)),
+                ('osd_repair', 'osd repair', 'initiate repair on osd <who>', ((('name', 'who'), ('type', 'CephString'), ('goodchars', '')),)),
+                ('osd_lspools', 'osd lspools', 'list pools', ((('name', 'auid'), ('type', 'CephInt'), ('range', ''), ('req', False)),)),
+                ('osd_blacklist_ls', 'osd blacklist ls', 'show blacklisted clients', ()),
+                ('osd_crush_rule_list', 'osd crush rule list', 'list crush rules', ()),
+                ('osd_crush_rule_ls', 'osd crush rule ls', 'list crush rules', ()),
+                ('osd_crush_rule_dump', 'osd crush rule dump', 'dump crush rule <name> (default all)', ((('name', 'name'), ('type', 'CephString'), ('goodchars', 'A-Za-z0-9-_.'), ('req', False)),)),
+                ('osd_crush_dump', 'osd crush dump', 'dump crush map', ()),
+                ('osd_setcrushmap', 'osd setcrushmap', 'set crush map from input file', ()),
+                ('osd_crush_set', 'osd crush set', 'set crush map from input file', ()),
+                ('osd_crush_add_bucket', 'osd crush add-bucket', 'add no-parent (probably root) crush bucket <name> of type <type>', ((('name', 'type'), ('type', 'CephString'), ('goodchars', '')), (('name', 'name'), ('type', 'CephString'), ('goodchars', 'A-Za-z0-9-_.')))),
+                ('osd_crush_set_2', 'osd crush set', 'update crushmap position and weight for <name> to <weight> with location <args>', ((('name', 'id'), ('type', 'CephOsdName')), (('name', 'args'), ('type', 'CephString'), ('goodchars', 'A-Za-z0-9-_.='), ('n', 'N')), (('name', 'weight'), ('type', 'CephFloat'), ('range', '0')))),
+                ('osd_crush_add', 'osd crush add', 'add or update crushmap position and weight for <name> with <weight> and location <args>', ((('name', 'weight'), ('type', 'CephFloat'), ('range', '0')), (('name', 'args'), ('type', 'CephString'), ('goodchars', 'A-Za-z0-9-_.='), ('n', 'N')), (('name', 'id'), ('type', 'CephOsdName')))),
+                ('osd_crush_create_or_move', 'osd crush create-or-move', 'create entry or move existing entry for <name> <weight> at/to location <args>', ((('name', 'id'), ('type', 'CephOsdName')), (('name', 'args'), ('type', 'CephString'), ('goodchars', 'A-Za-z0-9-_.='), ('n', 'N')), (('name', 'weight'), ('type', 'CephFloat'), ('range', '0')))),
+                ('osd_crush_move', 'osd crush move', 'move existing entry for <name> to location <args>', ((('name', 'args'), ('type', 'CephString'), ('goodchars', 'A-Za-z0-9-_.='), ('n', 'N')), (('name', 'name'), ('type', 'CephString'), ('goodchars', 'A-Za-z0-9-_.')))),
+                ('osd_crush_link', 'osd crush link', 'link existing entry for <name> under location <args>', ((('name', 'args'), ('type', 'CephString'), ('goodchars', 'A-Za-z0-9-_.='), ('n', 'N')), (('name', 'name'), ('type', 'CephString'), ('goodchars', '')))),
+                ('osd_crush_rm', 'osd crush rm', 'remove <name> from crush map (everywhere, or just at <ancestor>)', ((('name', 'name'), ('type', 'CephString'), ('goodchars', 'A-Za-z0-9-_.')), (('name', 'ancestor'), ('type', 'CephString'), ('goodchars', ''), ('req', False)))),
+                ('osd_crush_remove', 'osd crush remove', 'remove <name> from crush map (everywhere, or just at <ancestor>)', ((('name', 'name'), ('type', 'CephString'), ('goodchars', 'A-Za-z0-9-_.')), (('name', 'ancestor'), ('type', 'CephString'), ('goodchars', ''), ('req', False)))),
+                ('osd_crush_unlink', 'osd crush unlink', 'unlink <name> from crush map (everywhere, or just at <ancestor>)', ((('name', 'name'), ('type', 'CephString'), ('goodchars', 'A-Za-z0-9-_.')), (('name', 'ancestor'), ('type', 'CephString'), ('goodchars', ''), ('req', False)))),
+                ('osd_crush_reweight_all', 'osd crush reweight-all', 'recalculate the weights for the tree to ensure they sum correctly', ()),
+                ('osd_crush_reweight', 'osd crush reweight', "change <name>'s weight to <weight> in crush map", ((('name', 'name'), ('type', 'CephString'), ('goodchars', 'A-Za-z0-9-_.')), (('name', 'weight'), ('type', 'CephFloat'), ('range', '0')))),
+                ('osd_crush_tunables', 'osd crush tunables', 'set crush tunables values to <profile>', ((('name', 'profile'), ('type', 'CephChoices'), ('strings', 'legacy|argonaut|bobtail|firefly|optimal|default')),)),
+                ('osd_crush_set_tunable', 'osd crush set-tunable', 'set crush tunable <tunable> to <value>', ((('name', 'tunable'), ('type', 'CephChoices'), ('strings', 'straw_calc_version')), (('name', 'value'), ('type', 'CephInt'), ('range', '')))),
+                ('osd_crush_get_tunable', 'osd crush get-tunable', 'get crush tunable <tunable>', ((('name', 'tunable'), ('type', 'CephChoices'), ('strings', 'straw_calc_version')),)),
+                ('osd_crush_show_tunables', 'osd crush show-tunables', 'show current crush tunables', ()),
+                ('osd_crush_rule_create_simple', 'osd crush rule create-simple', 'create crush rule <name> to start from <root>, replicate across buckets of type <type>, using a choose mode of <firstn|indep> (default firstn; indep best for erasure pools)', ((('name', 'name'), ('type', 'CephString'), ('goodchars', 'A-Za-z0-9-_.')), (('name', 'root'), ('type', 'CephString'), ('goodchars', 'A-Za-z0-9-_.')), (('name', 'type'), ('type', 'CephString'), ('goodchars', 'A-Za-z0-9-_.')), (('name', 'mode'), ('type', 'CephChoices'), ('strings', 'firstn|indep'), ('req', False)))),
+                ('osd_crush_rule_create_erasure', 'osd crush rule create-erasure', 'create crush rule <name> for erasure coded pool created with <profile> (default default)', ((('name', 'name'), ('type', 'CephString'), ('goodchars', 'A-Za-z0-9-_.')), (('name', 'profile'), ('type', 'CephString'), ('goodchars', ''), ('req', False)))),
+                ('osd_crush_rule_rm', 'osd crush rule rm', 'remove crush rule <name>', ((('name', 'name'), ('type', 'CephString'), ('goodchars', 'A-Za-z0-9-_.')),)),
+                ('osd_setmaxosd', 'osd setmaxosd', 'set new maximum osd value', ((('name', 'newmax'), ('type', 'CephInt'), ('range', '0')),)),
+                ('osd_pause', 'osd pause', 'pause osd', ()),
+                ('osd_unpause', 'osd unpause', 'unpause osd', ()),
+                ('osd_erasure_code_profile_set', 'osd erasure-code-profile set', 'create erasure code profile <name> with [<key[=value]> ...] pairs. Add a --force at the end to override an existing profile (VERY DANGEROUS)', ((('name', 'name'), ('type', 'CephString'), ('goodchars', 'A-Za-z0-9-_.')), (('name', 'profile'), ('type', 'CephString'), ('goodchars', ''), ('n', 'N'), ('req', False)))),
+                ('osd_erasure_code_profile_get', 'osd erasure-code-profile get', 'get erasure code profile <name>', ((('name', 'name'), ('type', 'CephString'), ('goodchars', 'A-Za-z0-9-_.')),)),
+                ('osd_erasure_code_profile_rm', 'osd erasure-code-profile rm', 'remove erasure code profile <name>', ((('name', 'name'), ('type', 'CephString'), ('goodchars', 'A-Za-z0-9-_.')),)),
+                ('osd_erasure_code_profile_ls', 'osd erasure-code-profile ls', 'list all erasure code profiles', ()),
+                ('osd_set', 'osd set', 'set <key>', ((('name', 'key'), ('type', 'CephChoices'), ('strings', 'pause|noup|nodown|noout|noin|nobackfill|norecover|noscrub|nodeep-scrub|notieragent')),)),
+                ('osd_unset', 'osd unset', 'unset <key>', ((('name', 'key'), ('type', 'CephChoices'), ('strings', 'pause|noup|nodown|noout|noin|nobackfill|norecover|noscrub|nodeep-scrub|notieragent')),)),
+                ('osd_cluster_snap', 'osd cluster_snap', 'take cluster snapshot (disabled)', ()),
+                ('osd_down', 'osd down', 'set osd(s) <id> [<id>...] down', ((('name', 'ids'), ('type', 'CephString'), ('goodchars', ''), ('n', 'N')),)),
+                ('osd_out', 'osd out', 'set osd(s) <id> [<id>...] out', ((('name', 'ids'), ('type', 'CephString'), ('goodchars', ''), ('n', 'N')),)),
+                ('osd_in', 'osd in', 'set osd(s) <id> [<id>...] in', ((('name', 'ids'), ('type', 'CephString'), ('goodchars', ''), ('n', 'N')),)),
+                ('osd_rm', 'osd rm', 'remove osd(s) <id> [<id>...] in', ((('name', 'ids'), ('type', 'CephString'), ('goodchars', ''), ('n', 'N')),)),
+                ('osd_reweight', 'osd reweight', 'reweight osd to 0.0 < <weight> < 1.0', ((('name', 'id'), ('type', 'CephInt'), ('range', '0')), (('name', 'weight'), ('type', 'CephFloat'), ('range', '0|1')))),
+                ('osd_pg_temp', 'osd pg-temp', 'set pg_temp mapping pgid:[<id> [<id>...]] (developers only)', ((('name', 'pgid'), ('type', 'CephPgid')), (('name', 'id'), ('type', 'CephString'), ('goodchars', ''), ('n', 'N'), ('req', False)))),
+                ('osd_primary_temp', 'osd primary-temp', 'set primary_temp mapping pgid:<id>|-1 (developers only)', ((('name', 'id'), ('type', 'CephString'), ('goodchars', '')), (('name', 'pgid'), ('type', 'CephPgid')))),
+                ('osd_primary_affinity', 'osd primary-affinity', 'adjust osd primary-affinity from 0.0 <= <weight> <= 1.0', ((('name', 'weight'), ('type', 'CephFloat'), ('range', '0|1')), (('name', 'id'), ('type', 'CephOsdName')))),
+                ('osd_lost', 'osd lost', 'mark osd as permanently lost. THIS DESTROYS DATA IF NO MORE REPLICAS EXIST, BE CAREFUL', ((('name', 'id'), ('type', 'CephInt'), ('range', '0')), (('name', 'sure'), ('type', 'CephChoices'), ('strings', '--yes-i-really-mean-it'), ('req', False)))),
+                ('osd_create', 'osd create', 'create new osd (with optional UUID)', ((('name', 'uuid'), ('type', 'CephUUID'), ('req', False)),)),
+                ('osd_blacklist', 'osd blacklist', 'add (optionally until <expire> seconds from now) or remove <addr> from blacklist', ((('name', 'blacklistop'), ('type', 'CephChoices'), ('strings', 'add|rm')), (('name', 'addr'), ('type', 'CephEntityAddr')), (('name', 'expire'), ('type', 'CephFloat'), ('range', '0'), ('req', False)))),
+                ('osd_pool_mksnap', 'osd pool mksnap', 'make snapshot <snap> in <pool>', ((('name', 'snap'), ('type', 'CephString'), ('goodchars', '')), (('name', 'pool'), ('type', 'CephPoolname')))),
+                ('osd_pool_rmsnap', 'osd pool rmsnap', 'remove snapshot <snap> from <pool>', ((('name', 'pool'), ('type', 'CephPoolname')), (('name', 'snap'), ('type', 'CephString'), ('goodchars', '')))),
+                ('osd_pool_create', 'osd pool create', 'create pool', ((('name', 'pg_num'), ('type', 'CephInt'), ('range', '0')), (('name', 'pool'), ('type', 'CephPoolname')), (('name', 'erasure_code_profile'), ('type', 'CephString'), ('goodchars', ''), ('req', False)), (('name', 'pool_type'), ('type', 'CephChoices'), ('strings', 'replicated|erasure'), ('req', False)), (('name', 'pgp_num'), ('type', 'CephInt'), ('range', '0'), ('req', False)), (('name', 'ruleset'), ('type', 'CephString'), ('goodchars', ''), ('req', False)))),
+                ('osd_pool_delete', 'osd pool delete', 'delete pool', ((('name', 'pool'), ('type', 'CephPoolname')), (('name', 'sure'), ('type', 'CephChoices'), ('strings', '--yes-i-really-really-mean-it'), ('req', False)), (('name', 'pool2'), ('type', 'CephPoolname'), ('req', False)))),
+                ('osd_pool_rename', 'osd pool rename', 'rename <srcpool> to <destpool>', ((('name', 'destpool'), ('type', 'CephPoolname')), (('name', 'srcpool'), ('type', 'CephPoolname')))),
+                ('osd_pool_get', 'osd pool get', 'get pool parameter <var>', ((('name', 'pool'), ('type', 'CephPoolname')), (('name', 'var'), ('type', 'CephChoices'), ('strings', 'size|min_size|crash_replay_interval|pg_num|pgp_num|crush_ruleset|hit_set_type|hit_set_period|hit_set_count|hit_set_fpp|auid|target_max_objects|target_max_bytes|cache_target_dirty_ratio|cache_target_full_ratio|cache_min_flush_age|cache_min_evict_age|erasure_code_profile|min_read_recency_for_promote')))),
+                ('osd_pool_set', 'osd pool set', 'set pool parameter <var> to <val>', ((('name', 'pool'), ('type', 'CephPoolname')), (('name', 'val'), ('type', 'CephString'), ('goodchars', '')), (('name', 'var'), ('type', 'CephChoices'), ('strings', 'size|min_size|crash_replay_interval|pg_num|pgp_num|crush_ruleset|hashpspool|hit_set_type|hit_set_period|hit_set_count|hit_set_fpp|debug_fake_ec_pool|target_max_bytes|target_max_objects|cache_target_dirty_ratio|cache_target_full_ratio|cache_min_flush_age|cache_min_evict_age|auid|min_read_recency_for_promote')), (('name', 'force'), ('type', 'CephChoices'), ('strings', '--yes-i-really-mean-it'), ('req', False)))),
+                ('osd_pool_set_quota', 'osd pool set-quota', 'set object or byte limit on pool', ((('name', 'val'), ('type', 'CephString'), ('goodchars', '')), (('name', 'pool'), ('type', 'CephPoolname')), (('name', 'field'), ('type', 'CephChoices'), ('strings', 'max_objects|max_bytes')))),
+                ('osd_pool_get_quota', 'osd pool get-quota', 'obtain object or byte limits for pool', ((('name', 'pool'), ('type', 'CephPoolname')),)),
+                ('osd_pool_stats', 'osd pool stats', 'obtain stats from all pools, or from specified pool', ((('name', 'name'), ('type', 'CephString'), ('goodchars', ''), ('req', False)),)),
+                ('osd_reweight_by_utilization', 'osd reweight-by-utilization', 'reweight OSDs by utilization [overload-percentage-for-consideration, default 120]', ((('name', 'oload'), ('type', 'CephInt'), ('range', '100'), ('req', False)),)),
+                ('osd_thrash', 'osd thrash', 'thrash OSDs for <num_epochs>', ((('name', 'num_epochs'), ('type', 'CephInt'), ('range', '0')),)),
+                ('osd_tier_add', 'osd tier add', 'add the tier <tierpool> (the second one) to base pool <pool> (the first one)', ((('name', 'pool'), ('type', 'CephPoolname')), (('name', 'tierpool'), ('type', 'CephPoolname')), (('name', 'force_nonempty'), ('type', 'CephChoices'), ('strings', '--force-nonempty'), ('req', False)))),
+                ('osd_tier_remove', 'osd tier remove', 'remove the tier <tierpool> (the second one) from base pool <pool> (the first one)', ((('name', 'tierpool'), ('type', 'CephPoolname')), (('name', 'pool'), ('type', 'CephPoolname')))),
+                ('osd_tier_cache_mode', 'osd tier cache-mode', 'specify the caching mode for cache tier <pool>', ((('name', 'mode'), ('type', 'CephChoices'), ('strings', 'none|writeback|forward|readonly')), (('name', 'pool'), ('type', 'CephPoolname')))),
+                ('osd_tier_set_overlay', 'osd tier set-overlay', 'set the overlay pool for base pool <pool> to be <overlaypool>', ((('name', 'pool'), ('type', 'CephPoolname')), (('name', 'overlaypool'), ('type', 'CephPoolname')))),
+                ('osd_tier_remove_overlay', 'osd tier remove-overlay', 'remove the overlay pool for base pool <pool>', ((('name', 'pool'), ('type', 'CephPoolname')),)),
+                ('osd_tier_add_cache', 'osd tier add-cache', 'add a cache <tierpool> (the second one) of size <size> to existing pool <pool> (the first one)', ((('name', 'pool'), ('type', 'CephPoolname')), (('name', 'size'), ('type', 'CephInt'), ('range', '0')), (('name', 'tierpool'), ('type', 'CephPoolname')))),
+            ),
+            'MonitorCommand': (
+                ('compact', 'compact', "cause compaction of monitor's leveldb storage", ()),
+                ('scrub', 'scrub', 'scrub the monitor stores', ()),
+                ('fsid', 'fsid', 'show cluster FSID/UUID', ()),
+                ('log', 'log', 'log supplied text to the monitor log', ((('name', 'logtext'), ('type', 'CephString'), ('goodchars', ''), ('n', 'N')),)),
+                ('injectargs', 'injectargs', 'inject config arguments into monitor', ((('name', 'injected_args'), ('type', 'CephString'), ('goodchars', ''), ('n', 'N')),)),
+                ('status', 'status', 'show cluster status', ()),
+                ('health', 'health', 'show cluster health', ((('name', 'detail'), ('type', 'CephChoices'), ('strings', 'detail'), ('req', False)),)),
+                ('df', 'df', 'show cluster free space stats', ((('name', 'detail'), ('type', 'CephChoices'), ('strings', 'detail'), ('req', False)),)),
+                ('report', 'report', 'report full status of cluster, optional title tag strings', ((('name', 'tags'), ('type', 'CephString'), ('goodchars', ''), ('n', 'N'), ('req', False)),)),
+                ('quorum_status', 'quorum_status', 'report status of monitor quorum', ()),
+                ('mon_status', 'mon_status', 'report status of monitors', ()),
+                ('sync_force', 'sync force', 'force sync of and clear monitor store', ((('name', 'validate2'), ('type', 'CephChoices'), ('strings', '--i-know-what-i-am-doing'), ('req', False)), (('name', 'validate1'), ('type', 'CephChoices'), ('strings', '--yes-i-really-mean-it'), ('req', False)))),
+                ('heap', 'heap', 'show heap usage info (available only if compiled with tcmalloc)', ((('name', 'heapcmd'), ('type', 'CephChoices'), ('strings', 'dump|start_profiler|stop_profiler|release|stats')),)),
+                ('quorum', 'quorum', 'enter or exit quorum', ((('name', 'quorumcmd'), ('type', 'CephChoices'), ('strings', 'enter|exit')),)),
+                ('tell', 'tell', 'send a command to a specific daemon', ((('name', 'args'), ('type', 'CephString'), ('goodchars', ''), ('n', 'N')), (('name', 'target'), ('type', 'CephName')))),
+                ('mon_dump', 'mon dump', 'dump formatted monmap (optionally from epoch)', ((('name', 'epoch'), ('type', 'CephInt'), ('range', '0'), ('req', False)),)),
+                ('mon_stat', 'mon stat', 'summarize monitor status', ()),
+                ('mon_getmap', 'mon getmap', 'get monmap', ((('name', 'epoch'), ('type', 'CephInt'), ('range', '0'), ('req', False)),)),
+                ('mon_add', 'mon add', 'add new monitor named <name> at <addr>', ((('name', 'addr'), ('type', 'CephIPAddr')), (('name', 'name'), ('type', 'CephString'), ('goodchars', '')))),
+                ('mon_remove', 'mon remove', 'remove monitor named <name>', ((('name', 'name'), ('type', 'CephString'), ('goodchars', '')),)),
+            ),
+            'AuthCommand': (
+                ('auth_export', 'auth export', 'write keyring for requested entity, or master keyring if none given', ((('name', 'entity'), ('type', 'CephString'), ('goodchars', ''), ('req', False)),)),
+                ('auth_get', 'auth get', 'write keyring file with requested key', ((('name', 'entity'), ('type', 'CephString'), ('goodchars', '')),)),
+                ('auth_get_key', 'auth get-key', 'display requested key', ((('name', 'entity'), ('type', 'CephString'), ('goodchars', '')),)),
+                ('auth_print_key', 'auth print-key', 'display requested key', ((('name', 'entity'), ('type', 'CephString'), ('goodchars', '')),)),
+                ('auth_print_key_2', 'auth print_key', 'display requested key', ((('name', 'entity'), ('type', 'CephString'), ('goodchars', '')),)),
+                ('auth_list', 'auth list', 'list authentication state', ()),
+                ('auth_import', 'auth import', 'auth import: read keyring file from -i <file>', ()),
+                ('auth_add', 'auth add', 'add auth info for <entity> from input file, or random key if no input given, and/or any caps specified in the command', ((('name', 'entity'), ('type', 'CephString'), ('goodchars', '')), (('name', 'caps'), ('type', 'CephString'), ('goodchars', ''), ('n', 'N'), ('req', False)))),
+                ('auth_get_or_create_key', 'auth get-or-create-key', 'get, or add, key for <name> from system/caps pairs specified in the command. If key already exists, any given caps must match the existing caps for that key.', ((('name', 'entity'), ('type', 'CephString'), ('goodchars', '')), (('name', 'caps'), ('type', 'CephString'), ('goodchars', ''), ('n', 'N'), ('req', False)))),
+                ('auth_get_or_create', 'auth get-or-create', 'add auth info for <entity> from input file, or random key if no input given, and/or any caps specified in the command', ((('name', 'entity'), ('type', 'CephString'), ('goodchars', '')), (('name', 'caps'), ('type', 'CephString'), ('goodchars', ''), ('n', 'N'), ('req', False)))),
+                ('auth_caps', 'auth caps', 'update caps for <name> from caps specified in the command', ((('name', 'entity'), ('type', 'CephString'), ('goodchars', '')), (('name', 'caps'), ('type', 'CephString'), ('goodchars', ''), ('n', 'N')))),
+                ('auth_del', 'auth del', 'delete all caps for <name>', ((('name', 'entity'), ('type', 'CephString'), ('goodchars', '')),)),
+            ),
+            'ConfigKeyCommand': (
+                ('config_key_get', 'config-key get', 'get <key>', ((('name', 'key'), ('type', 'CephString'), ('goodchars', '')),)),
+                ('config_key_put', 'config-key put', 'put <key>, value <val>', ((('name', 'key'), ('type', 'CephString'), ('goodchars', '')), (('name', 'val'), ('type', 'CephString'), ('goodchars', ''), ('req', False)))),
+                ('config_key_del', 'config-key del', 'delete <key>', ((('name', 'key'), ('type', 'CephString'), ('goodchars', '')),)),
+                ('config_key_exists', 'config-key exists', "check for <key>'s existence", ((('name', 'key'), ('type', 'CephString'), ('goodchars', '')),)),
+                ('config_key_list', 'config-key list', 'list keys', ()),
+            ),
+        },
+    },
+    'giant': {
+        'version': '0.87',
+        'base': 'firefly',
+        'remove': {
+            'OsdCommand': ('osd_crush_reweight_all', 'osd_crush_set_tunable', 'osd_crush_get_tunable'),
+        },
+        'commands': {
+            'MdsCommand': (
+                ('mds_rm', 'mds rm', 'remove nonactive mds', ((('name', 'who'), ('type', 'CephName')), (('name', 'gid'), ('type', 'CephInt'), ('range', '0')))),
+                ('mds_newfs', 'mds newfs', 'make new filesystem using pools <metadata> and <data>', ((('name', 'metadata'), ('type', 'CephInt'), ('range', '0')), (('name', 'data'), ('type', 'CephInt'), ('range', '0')), (('name', 'sure'), ('type', 'CephChoices'), ('strings', '--yes-i-really-mean-it'), ('req', False)))),
+            ),
+            'OsdCommand': (
+                ('osd_blocked_by', 'osd blocked-by', 'print histogram of which OSDs are blocking their peers', ()),
+                ('osd_crush_add_bucket', 'osd crush add-bucket', 'add no-parent (probably root) crush bucket <name> of type <type>', ((('name', 'name'), ('type', 'CephString'), ('goodchars', 'A-Za-z0-9-_.')), (('name', 'type'), ('type', 'CephString'), ('goodchars', '')))),
+                ('osd_crush_set_2', 'osd crush set', 'update crushmap position and weight for <name> to <weight> with location <args>', ((('name', 'weight'), ('type', 'CephFloat'), ('range', '0')), (('name', 'args'), ('type', 'CephString'), ('goodchars', 'A-Za-z0-9-_.='), ('n', 'N')), (('name', 'id'), ('type', 'CephOsdName')))),
+                ('osd_crush_add', 'osd crush add', 'add or update crushmap position and weight for <name> with <weight> and location <args>', ((('name', 'id'), ('type', 'CephOsdName')), (('name', 'weight'), ('type', 'CephFloat'), ('range', '0')), (('name', 'args'), ('type', 'CephString'), ('goodchars', 'A-Za-z0-9-_.='), ('n', 'N')))),
+                ('osd_crush_create_or_move', 'osd crush create-or-move', 'create entry or move existing entry for <name> <weight> at/to location <args>', ((('name', 'id'), ('type', 'CephOsdName')), (('name', 'weight'), ('type', 'CephFloat'), ('range', '0')), (('name', 'args'), ('type', 'CephString'), ('goodchars', 'A-Za-z0-9-_.='), ('n', 'N')))),
+                ('osd_crush_reweight_subtree', 'osd crush reweight-subtree', 'change all leaf items beneath <name> to <weight> in crush map', ((('name', 'name'), ('type', 'CephString'), ('goodchars', 'A-Za-z0-9-_.')), (('name', 'weight'), ('type', 'CephFloat'), ('range', '0')))),
+                ('osd_crush_rule_create_simple', 'osd crush rule create-simple', 'create crush rule <name> to start from <root>, replicate across buckets of type <type>, using a choose mode of <firstn|indep> (default firstn; indep best for erasure pools)', ((('name', 'root'), ('type', 'CephString'), ('goodchars', 'A-Za-z0-9-_.')), (('name', 'type'), ('type', 'CephString'), ('goodchars', 'A-Za-z0-9-_.')), (('name', 'name'), ('type', 'CephString'), ('goodchars', 'A-Za-z0-9-_.')), (('name', 'mode'), ('type', 'CephChoices'), ('strings', 'firstn|indep'), ('req', False)))),
+                ('osd_reweight', 'osd reweight', 'reweight osd to 0.0 < <weight> < 1.0', ((('name', 'weight'), ('type', 'CephFloat'), ('range', '0|1')), (('name', 'id'), ('type', 'CephInt'), ('range', '0')))),
+                ('osd_primary_temp', 'osd primary-temp', 'set primary_temp mapping pgid:<id>|-1 (developers only)', ((('name', 'pgid'), ('type', 'CephPgid')), (('name', 'id'), ('type', 'CephString'), ('goodchars', '')))),
+                ('osd_primary_affinity', 'osd primary-affinity', 'adjust osd primary-affinity from 0.0 <= <weight> <= 1.0', ((('name', 'id'), ('type', 'CephOsdName')), (('name', 'weight'), ('type', 'CephFloat'), ('range', '0|1')))),
+                ('osd_pool_mksnap', 'osd pool mksnap', 'make snapshot <snap> in <pool>', ((('name', 'pool'), ('type', 'CephPoolname')), (('name', 'snap'), ('type', 'CephString'), ('goodchars', '')))),
+                ('osd_pool_rmsnap', 'osd pool rmsnap', 'remove snapshot <snap> from <pool>', ((('name', 'snap'), ('type', 'CephString'), ('goodchars', '')), (('name', 'pool'), ('type', 'CephPoolname')))),
+                ('osd_pool_create', 'osd pool create', 'create pool', ((('name', 'pg_num'), ('type', 'CephInt'), ('range', '0')), (('name', 'pool'), ('type', 'CephPoolname')), (('name', 'pgp_num'), ('type', 'CephInt'), ('range', '0'), ('req', False)), (('name', 'pool_type'), ('type', 'CephChoices'), ('strings', 'replicated|erasure'), ('req', False)), (('name', 'ruleset'), ('type', 'CephString'), ('goodchars', ''), ('req', False)), (('name', 'expected_num_objects'), ('type', 'CephInt'), ('range', ''), ('req', False)), (('name', 'erasure_code_profile'), ('type', 'CephString'), ('goodchars', ''), ('req', False)))),
+                ('osd_pool_rename', 'osd pool rename', 'rename <srcpool> to <destpool>', ((('name', 'srcpool'), ('type', 'CephPoolname')), (('name', 'destpool'), ('type', 'CephPoolname')))),
+                ('osd_pool_get', 'osd pool get', 'get pool parameter <var>', ((('name', 'var'), ('type', 'CephChoices'), ('strings', 'size|min_size|crash_replay_interval|pg_num|pgp_num|crush_ruleset|hit_set_type|hit_set_period|hit_set_count|hit_set_fpp|auid|target_max_objects|target_max_bytes|cache_target_dirty_ratio|cache_target_full_ratio|cache_min_flush_age|cache_min_evict_age|erasure_code_profile|min_read_recency_for_promote')), (('name', 'pool'), ('type', 'CephPoolname')))),
+                ('osd_pool_set', 'osd pool set', 'set pool parameter <var> to <val>', ((('name', 'var'), ('type', 'CephChoices'), ('strings', 'size|min_size|crash_replay_interval|pg_num|pgp_num|crush_ruleset|hashpspool|hit_set_type|hit_set_period|hit_set_count|hit_set_fpp|debug_fake_ec_pool|target_max_bytes|target_max_objects|cache_target_dirty_ratio|cache_target_full_ratio|cache_min_flush_age|cache_min_evict_age|auid|min_read_recency_for_promote')), (('name', 'pool'), ('type', 'CephPoolname')), (('name', 'val'), ('type', 'CephString'), ('goodchars', '')), (('name', 'force'), ('type', 'CephChoices'), ('strings', '--yes-i-really-mean-it'), ('req', False)))),
+                ('osd_pool_set_quota', 'osd pool set-quota', 'set object or byte limit on pool', ((('name', 'pool'), ('type', 'CephPoolname')), (('name', 'field'), ('type', 'CephChoices'), ('strings', 'max_objects|max_bytes')), (('name', 'val'), ('type', 'CephString'), ('goodchars', '')))),
+                ('osd_reweight_by_pg', 'osd reweight-by-pg', 'reweight OSDs by PG distribution [overload-percentage-for-consideration, default 120]', ((('name', 'oload'), ('type', 'CephInt'), ('range', '100')), (('name', 'pools'), ('type', 'CephPoolname'), ('n', 'N'), ('req', False)))),
+                ('osd_tier_add', 'osd tier add', 'add the tier <tierpool> (the second one) to base pool <pool> (the first one)', ((('name', 'tierpool'), ('type', 'CephPoolname')), (('name', 'pool'), ('type', 'CephPoolname')), (('name', 'force_nonempty'), ('type', 'CephChoices'), ('strings', '--force-nonempty'), ('req', False)))),
+                ('osd_tier_cache_mode', 'osd tier cache-mode', 'specify the caching mode for cache tier <pool>', ((('name', 'mode'), ('type', 'CephChoices'), ('strings', 'none|writeback|forward|readonly|readforward')), (('name', 'pool'), ('type', 'CephPoolname')))),
+                ('osd_tier_set_overlay', 'osd tier set-overlay', 'set the overlay pool for base pool <pool> to be <overlaypool>', ((('name', 'overlaypool'), ('type', 'CephPoolname')), (('name', 'pool'), ('type', 'CephPoolname')))),
+                ('osd_tier_add_cache', 'osd tier add-cache', 'add a cache <tierpool> (the second one) of size <size> to existing pool <pool> (the first one)', ((('name', 'tierpool'), ('type', 'CephPoolname')), (('name', 'size'), ('type', 'CephInt'), ('range', '0')), (('name', 'pool'), ('type', 'CephPoolname')))),
+            ),
+            'AuthCommand': (
+                ('auth_add', 'auth add', 'add auth info for <entity> from input file, or random key if no " \\ "input is given, and/or any caps specified in the command', ((('name', 'entity'), ('type', 'CephString'), ('goodchars', '')), (('name', 'caps'), ('type', 'CephString'), ('goodchars', ''), ('n', 'N'), ('req', False)))),
+                ('auth_caps', 'auth caps', 'update caps for <name> from caps specified in the command', ((('name', 'caps'), ('type', 'CephString'), ('goodchars', ''), ('n', 'N')), (('name', 'entity'), ('type', 'CephString'), ('goodchars', '')))),
+            ),
+        },
+    },
+    'hammer': {
+        'version': '0.94',
+        'base': 'giant',
+        'commands': {
+            'PlacementGroupCommand': (
+                ('pg_dump_stuck', 'pg dump_stuck', 'show information about stuck pgs', ((('name', 'stuckops'), ('type', 'CephChoices'), ('strings', 'inactive|unclean|stale|undersized|degraded'), ('n', 'N'), ('req', False)), (('name', 'threshold'), ('type', 'CephInt'), ('range', ''), ('req', False)))),
+                ('pg_ls_by_pool', 'pg ls-by-pool', 'list pg with pool = [poolname | poolid]', ((('name', 'poolstr'), ('type', 'CephString'), ('goodchars', '')), (('name', 'states'), ('type', 'CephChoices'), ('strings', 'active|clean|down|replay|splitting|scrubbing|scrubq|degraded|inconsistent|peering|repair|recovering|backfill_wait|incomplete|stale|remapped|deep_scrub|backfill|backfill_toofull|recovery_wait|undersized'), ('n', 'N'), ('req', False)))),
+                ('pg_ls_by_primary', 'pg ls-by-primary', 'list pg with primary = [osd]', ((('name', 'osd'), ('type', 'CephOsdName')), (('name', 'states'), ('type', 'CephChoices'), ('strings', 'active|clean|down|replay|splitting|scrubbing|scrubq|degraded|inconsistent|peering|repair|recovering|backfill_wait|incomplete|stale|remapped|deep_scrub|backfill|backfill_toofull|recovery_wait|undersized'), ('n', 'N'), ('req', False)), (('name', 'pool'), ('type', 'CephInt'), ('range', ''), ('req', False)))),
+                ('pg_ls_by_osd', 'pg ls-by-osd', 'list pg on osd [osd]', ((('name', 'osd'), ('type', 'CephOsdName')), (('name', 'states'), ('type', 'CephChoices'), ('strings', 'active|clean|down|replay|splitting|scrubbing|scrubq|degraded|inconsistent|peering|repair|recovering|backfill_wait|incomplete|stale|remapped|deep_scrub|backfill|backfill_toofull|recovery_wait|undersized'), ('n', 'N'), ('req', False)), (('name', 'pool'), ('type', 'CephInt'), ('range', ''), ('req', False)))),
+                ('pg_ls', 'pg ls', 'list pg with specific pool, osd, state', ((('name', 'states'), ('type', 'CephChoices'), ('strings', 'active|clean|down|replay|splitting|scrubbing|scrubq|degraded|inconsistent|peering|repair|recovering|backfill_wait|incomplete|stale|remapped|deep_scrub|backfill|backfill_toofull|recovery_wait|undersized'), ('n', 'N'), ('req', False)), (('name', 'pool'), ('type', 'CephInt'), ('range', ''), ('req', False)))),
+            ),
+            'MdsCommand': (
+                ('mds_tell', 'mds tell', 'send command to particular mds', ((('name', 'who'), ('type', 'CephString'), ('goodchars', '')), (('name', 'args'), ('type', 'CephString'), ('goodchars', ''), ('n', 'N')))),
+                ('mds_set', 'mds set', 'set mds parameter <var> to <val>', ((('name', 'var'), ('type', 'CephChoices'), ('strings', 'max_mds|max_file_size|allow_new_snaps|inline_data')), (('name', 'val'), ('type', 'CephString'), ('goodchars', '')), (('name', 'confirm'), ('type', 'CephString'), ('goodchars', ''), ('req', False)))),
+                ('mds_set_state', 'mds set_state', 'set mds state of <gid> to <numeric-state>', ((('name', 'state'), ('type', 'CephInt'), ('range', '0|20')), (('name', 'gid'), ('type', 'CephInt'), ('range', '0')))),
+                ('mds_newfs', 'mds newfs', 'make new filesystem using pools <metadata> and <data>', ((('name', 'data'), ('type', 'CephInt'), ('range', '0')), (('name', 'metadata'), ('type', 'CephInt'), ('range', '0')), (('name', 'sure'), ('type', 'CephChoices'), ('strings', '--yes-i-really-mean-it'), ('req', False)))),
+            ),
+            'OsdCommand': (
+                ('osd_crush_add_bucket', 'osd crush add-bucket', 'add no-parent (probably root) crush bucket <name> of type <type>', ((('name', 'type'), ('type', 'CephString'), ('goodchars', '')), (('name', 'name'), ('type', 'CephString'), ('goodchars', 'A-Za-z0-9-_.')))),
+                ('osd_crush_rename_bucket', 'osd crush rename-bucket', 'rename bucket <srcname> to <dstname>', ((('name', 'dstname'), ('type', 'CephString'), ('goodchars', 'A-Za-z0-9-_.')), (('name', 'srcname'), ('type', 'CephString'), ('goodchars', 'A-Za-z0-9-_.')))),
+                ('osd_crush_set_2', 'osd crush set', 'update crushmap position and weight for <name> to <weight> with location <args>', ((('name', 'args'), ('type', 'CephString'), ('goodchars', 'A-Za-z0-9-_.='), ('n', 'N')), (('name', 'weight'), ('type', 'CephFloat'), ('range', '0')), (('name', 'id'), ('type', 'CephOsdName')))),
+                ('osd_crush_add', 'osd crush add', 'add or update crushmap position and weight for <name> with <weight> and location <args>', ((('name', 'args'), ('type', 'CephString'), ('goodchars', 'A-Za-z0-9-_.='), ('n', 'N')), (('name', 'weight'), ('type', 'CephFloat'), ('range', '0')), (('name', 'id'), ('type', 'CephOsdName')))),
+                ('osd_crush_create_or_move', 'osd crush create-or-move', 'create entry or move existing entry for <name> <weight> at/to location <args>', ((('name', 'weight'), ('type', 'CephFloat'), ('range', '0')), (('name', 'id'), ('type', 'CephOsdName')), (('name', 'args'), ('type', 'CephString'), ('goodchars', 'A-Za-z0-9-_.='), ('n', 'N')))),
+                ('osd_crush_move', 'osd crush move', 'move existing entry for <name> to location <args>', ((('name', 'name'), ('type', 'CephString'), ('goodchars', 'A-Za-z0-9-_.')), (('name', 'args'), ('type', 'CephString'), ('goodchars', 'A-Za-z0-9-_.='), ('n', 'N')))),
+                ('osd_crush_reweight_all', 'osd crush reweight-all', 'recalculate the weights for the tree to ensure they sum correctly', ()),
+                ('osd_crush_reweight', 'osd crush reweight', "change <name>'s weight to <weight> in crush map", ((('name', 'weight'), ('type', 'CephFloat'), ('range', '0')), (('name', 'name'), ('type', 'CephString'), ('goodchars', 'A-Za-z0-9-_.')))),
+                ('osd_crush_reweight_subtree', 'osd crush reweight-subtree', 'change all leaf items beneath <name> to <weight> in crush map', ((('name', 'weight'), ('type', 'CephFloat'), ('range', '0')), (('name', 'name'), ('type', 'CephString'), ('goodchars', 'A-Za-z0-9-_.')))),
+                ('osd_crush_tunables', 'osd crush tunables', 'set crush tunables values to <profile>', ((('name', 'profile'), ('type', 'CephChoices'), ('strings', 'legacy|argonaut|bobtail|firefly|hammer|optimal|default')),)),
+                ('osd_crush_set_tunable', 'osd crush set-tunable', 'set crush tunable <tunable> to <value>', ((('name', 'tunable'), ('type', 'CephChoices'), ('strings', 'straw_calc_version')), (('name', 'value'), ('type', 'CephInt'), ('range', '')))),
+                ('osd_crush_get_tunable', 'osd crush get-tunable', 'get crush tunable <tunable>', ((('name', 'tunable'), ('type', 'CephChoices'), ('strings', 'straw_calc_version')),)),
+                ('osd_crush_tree', 'osd crush tree', 'dump crush buckets and items in a tree view', ()),
+                ('osd_set', 'osd set', 'set <key>', ((('name', 'key'), ('type', 'CephChoices'), ('strings', 'full|pause|noup|nodown|noout|noin|nobackfill|norebalance|norecover|noscrub|nodeep-scrub|notieragent')),)),
+                ('osd_unset', 'osd unset', 'unset <key>', ((('name', 'key'), ('type', 'CephChoices'), ('strings', 'full|pause|noup|nodown|noout|noin|nobackfill|norebalance|norecover|noscrub|nodeep-scrub|notieragent')),)),
+                ('osd_reweight', 'osd reweight', 'reweight osd to 0.0 < <weight> < 1.0', ((('name', 'id'), ('type', 'CephInt'), ('range', '0')), (('name', 'weight'), ('type', 'CephFloat'), ('range', '0|1')))),
+                ('osd_primary_affinity', 'osd primary-affinity', 'adjust osd primary-affinity from 0.0 <= <weight> <= 1.0', ((('name', 'weight'), ('type', 'CephFloat'), ('range', '0|1')), (('name', 'id'), ('type', 'CephOsdName')))),
+                ('osd_blacklist', 'osd blacklist', 'add (optionally until <expire> seconds from now) or remove <addr> from blacklist', ((('name', 'addr'), ('type', 'CephEntityAddr')), (('name', 'blacklistop'), ('type', 'CephChoices'), ('strings', 'add|rm')), (('name', 'expire'), ('type', 'CephFloat'), ('range', '0'), ('req', False)))),
+                ('osd_pool_mksnap', 'osd pool mksnap', 'make snapshot <snap> in <pool>', ((('name', 'snap'), ('type', 'CephString'), ('goodchars', '')), (('name', 'pool'), ('type', 'CephPoolname')))),
+                ('osd_pool_rmsnap', 'osd pool rmsnap', 'remove snapshot <snap> from <pool>', ((('name', 'pool'), ('type', 'CephPoolname')), (('name', 'snap'), ('type', 'CephString'), ('goodchars', '')))),
+                ('osd_pool_ls', 'osd pool ls', 'list pools', ((('name', 'detail'), ('type', 'CephChoices'), ('strings', 'detail'), ('req', False)),)),
+                ('osd_pool_create', 'osd pool create', 'create pool', ((('name', 'pool'), ('type', 'CephPoolname')), (('name', 'pg_num'), ('type', 'CephInt'), ('range', '0')), (('name', 'ruleset'), ('type', 'CephString'), ('goodchars', ''), ('req', False)), (('name', 'erasure_code_profile'), ('type', 'CephString'), ('goodchars', ''), ('req', False)), (('name', 'pgp_num'), ('type', 'CephInt'), ('range', '0'), ('req', False)), (('name', 'pool_type'), ('type', 'CephChoices'), ('strings', 'replicated|erasure'), ('req', False)), (('name', 'expected_num_objects'), ('type', 'CephInt'), ('range', ''), ('req', False)))),
+                ('osd_pool_rename', 'osd pool rename', 'rename <srcpool> to <destpool>', ((('name', 'destpool'), ('type', 'CephPoolname')), (('name', 'srcpool'), ('type', 'CephPoolname')))),
+                ('osd_pool_get', 'osd pool get', 'get pool parameter <var>', ((('name', 'var'), ('type', 'CephChoices'), ('strings', 'size|min_size|crash_replay_interval|pg_num|pgp_num|crush_ruleset|hit_set_type|hit_set_period|hit_set_count|hit_set_fpp|auid|target_max_objects|target_max_bytes|cache_target_dirty_ratio|cache_target_full_ratio|cache_min_flush_age|cache_min_evict_age|erasure_code_profile|min_read_recency_for_promote|write_fadvise_dontneed')), (('name', 'pool'), ('type', 'CephPoolname')))),
+                ('osd_pool_set', 'osd pool set', 'set pool parameter <var> to <val>', ((('name', 'var'), ('type', 'CephChoices'), ('strings', 'size|min_size|crash_replay_interval|pg_num|pgp_num|crush_ruleset|hashpspool|nodelete|nopgchange|nosizechange|hit_set_type|hit_set_period|hit_set_count|hit_set_fpp|use_gmt_hitset|debug_fake_ec_pool|target_max_bytes|target_max_objects|cache_target_dirty_ratio|cache_target_full_ratio|cache_min_flush_age|cache_min_evict_age|auid|min_read_recency_for_promote|write_fadvise_dontneed')), (('name', 'pool'), ('type', 'CephPoolname')), (('name', 'val'), ('type', 'CephString'), ('goodchars', '')), (('name', 'force'), ('type', 'CephChoices'), ('strings', '--yes-i-really-mean-it'), ('req', False)))),
+                ('osd_pool_set_quota', 'osd pool set-quota', 'set object or byte limit on pool', ((('name', 'field'), ('type', 'CephChoices'), ('strings', 'max_objects|max_bytes')), (('name', 'pool'), ('type', 'CephPoolname')), (('name', 'val'), ('type', 'CephString'), ('goodchars', '')))),
+                ('osd_utilization', 'osd utilization', 'get basic pg distribution stats', ()),
+                ('osd_reweight_by_utilization', 'osd reweight-by-utilization', 'reweight OSDs by utilization [overload-percentage-for-consideration, default 120]', ((('name', 'no_increasing'), ('type', 'CephChoices'), ('strings', '--no-increasing'), ('req', False)), (('name', 'oload'), ('type', 'CephInt'), ('range', ''), ('req', False)), (('name', 'max_change'), ('type', 'CephFloat'), ('range', ''), ('req', False)), (('name', 'max_osds'), ('type', 'CephInt'), ('range', ''), ('req', False)))),
+                ('osd_test_reweight_by_utilization', 'osd test-reweight-by-utilization', 'dry run of reweight OSDs by utilization [overload-percentage-for-consideration, default 120]', ((('name', 'max_osds'), ('type', 'CephInt'), ('range', ''), ('req', False)), (('name', 'oload'), ('type', 'CephInt'), ('range', ''), ('req', False)), (('name', 'no_increasing'), ('type', 'CephChoices'), ('strings', '--no-increasing'), ('req', False)), (('name', 'max_change'), ('type', 'CephFloat'), ('range', ''), ('req', False)))),
+                ('osd_reweight_by_pg', 'osd reweight-by-pg', 'reweight OSDs by PG distribution [overload-percentage-for-consideration, default 120]', ((('name', 'max_osds'), ('type', 'CephInt'), ('range', ''), ('req', False)), (('name', 'pools'), ('type', 'CephPoolname'), ('n', 'N'), ('req', False)), (('name', 'max_change'), ('type', 'CephFloat'), ('range', ''), ('req', False)), (('name', 'oload'), ('type', 'CephInt'), ('range', ''), ('req', False)))),
+                ('osd_test_reweight_by_pg', 'osd test-reweight-by-pg', 'dry run of reweight OSDs by PG distribution [overload-percentage-for-consideration, default 120]', ((('name', 'pools'), ('type', 'CephPoolname'), ('n', 'N'), ('req', False)), (('name', 'max_change'), ('type', 'CephFloat'), ('range', ''), ('req', False)), (('name', 'max_osds'), ('type', 'CephInt'), ('range', ''), ('req', False)), (('name', 'oload'), ('type', 'CephInt'), ('range', ''), ('req', False)))),
+                ('osd_df', 'osd df', 'show OSD utilization', ((('name', 'output_method'), ('type', 'CephChoices'), ('strings', 'plain|tree'), ('req', False)),)),
+                ('osd_tier_cache_mode', 'osd tier cache-mode', 'specify the caching mode for cache tier <pool>', ((('name', 'pool'), ('type', 'CephPoolname')), (('name', 'mode'), ('type', 'CephChoices'), ('strings', 'none|writeback|forward|readonly|readforward|readproxy')))),
+                ('osd_tier_set_overlay', 'osd tier set-overlay', 'set the overlay pool for base pool <pool> to be <overlaypool>', ((('name', 'pool'), ('type', 'CephPoolname')), (('name', 'overlaypool'), ('type', 'CephPoolname')))),
+                ('osd_tier_add_cache', 'osd tier add-cache', 'add a cache <tierpool> (the second one) of size <size> to existing pool <pool> (the first one)', ((('name', 'pool'), ('type', 'CephPoolname')), (('name', 'size'), ('type', 'CephInt'), ('range', '0')), (('name', 'tierpool'), ('type', 'CephPoolname')))),
+            ),
+            'MonitorCommand': (
+                ('sync_force', 'sync force', 'force sync of and clear monitor store', ((('name', 'validate1'), ('type', 'CephChoices'), ('strings', '--yes-i-really-mean-it'), ('req', False)), (('name', 'validate2'), ('type', 'CephChoices'), ('strings', '--i-know-what-i-am-doing'), ('req', False)))),
+                ('version', 'version', 'show mon daemon version', ()),
+            ),
+            'AuthCommand': (
+                ('auth_caps', 'auth caps', 'update caps for <name> from caps specified in the command', ((('name', 'entity'), ('type', 'CephString'), ('goodchars', '')), (('name', 'caps'), ('type', 'CephString'), ('goodchars', ''), ('n', 'N')))),
+            ),
+        },
+    },
+    'infernalis': {
+        'version': '9',
+        'base': 'hammer',
+        'remove': {
+            'OsdCommand': ('osd_utilization', 'osd_test_reweight_by_utilization', 'osd_test_reweight_by_pg'),
+        },
+        'commands': {
+            'PlacementGroupCommand': (
+                ('pg_ls_by_primary', 'pg ls-by-primary', 'list pg with primary = [osd]', ((('name', 'osd'), ('type', 'CephOsdName')), (('name', 'pool'), ('type', 'CephInt'), ('range', ''), ('req', False)), (('name', 'states'), ('type', 'CephChoices'), ('strings', 'active|clean|down|replay|splitting|scrubbing|scrubq|degraded|inconsistent|peering|repair|recovering|backfill_wait|incomplete|stale|remapped|deep_scrub|backfill|backfill_toofull|recovery_wait|undersized'), ('n', 'N'), ('req', False)))),
+                ('pg_ls_by_osd', 'pg ls-by-osd', 'list pg on osd [osd]', ((('name', 'osd'), ('type', 'CephOsdName')), (('name', 'pool'), ('type', 'CephInt'), ('range', ''), ('req', False)), (('name', 'states'), ('type', 'CephChoices'), ('strings', 'active|clean|down|replay|splitting|scrubbing|scrubq|degraded|inconsistent|peering|repair|recovering|backfill_wait|incomplete|stale|remapped|deep_scrub|backfill|backfill_toofull|recovery_wait|undersized'), ('n', 'N'), ('req', False)))),
+                ('pg_ls', 'pg ls', 'list pg with specific pool, osd, state', ((('name', 'pool'), ('type', 'CephInt'), ('range', ''), ('req', False)), (('name', 'states'), ('type', 'CephChoices'), ('strings', 'active|clean|down|replay|splitting|scrubbing|scrubq|degraded|inconsistent|peering|repair|recovering|backfill_wait|incomplete|stale|remapped|deep_scrub|backfill|backfill_toofull|recovery_wait|undersized'), ('n', 'N'), ('req', False)))),
+            ),
+            'MdsCommand': (
+                ('mds_metadata', 'mds metadata', 'fetch metadata for mds <who>', ((('name', 'who'), ('type', 'CephString'), ('goodchars', '')),)),
+                ('mds_tell', 'mds tell', 'send command to particular mds', ((('name', 'args'), ('type', 'CephString'), ('goodchars', ''), ('n', 'N')), (('name', 'who'), ('type', 'CephString'), ('goodchars', '')))),
+                ('mds_set', 'mds set', 'set mds parameter <var> to <val>', ((('name', 'val'), ('type', 'CephString'), ('goodchars', '')), (('name', 'var'), ('type', 'CephChoices'), ('strings', 'max_mds|max_file_size|allow_new_snaps|inline_data')), (('name', 'confirm'), ('type', 'CephString'), ('goodchars', ''), ('req', False)))),
+                ('mds_set_state', 'mds set_state', 'set mds state of <gid> to <numeric-state>', ((('name', 'gid'), ('type', 'CephInt'), ('range', '0')), (('name', 'state'), ('type', 'CephInt'), ('range', '0|20')))),
+                ('mds_repaired', 'mds repaired', 'mark a damaged MDS rank as no longer damaged', ((('name', 'rank'), ('type', 'CephInt'), ('range', '')),)),
+                ('mds_rm', 'mds rm', 'remove nonactive mds', ((('name', 'gid'), ('type', 'CephInt'), ('range', '0')),)),
+            ),
+            'OsdCommand': (
+                ('osd_metadata', 'osd metadata', 'fetch metadata for osd {id} (default all)', ((('name', 'id'), ('type', 'CephInt'), ('range', '0'), ('req', False)),)),
+                ('osd_map', 'osd map', 'find pg for <object> in <pool> with [namespace]', ((('name', 'pool'), ('type', 'CephPoolname')), (('name', 'object'), ('type', 'CephObjectname')), (('name', 'nspace'), ('type', 'CephString'), ('goodchars', ''), ('req', False)))),
+                ('osd_crush_add_bucket', 'osd crush add-bucket', 'add no-parent (probably root) crush bucket <name> of type <type>', ((('name', 'name'), ('type', 'CephString'), ('goodchars', 'A-Za-z0-9-_.')), (('name', 'type'), ('type', 'CephString'), ('goodchars', '')))),
+                ('osd_crush_set_2', 'osd crush set', 'update crushmap position and weight for <name> to <weight> with location <args>', ((('name', 'weight'), ('type', 'CephFloat'), ('range', '0')), (('name', 'id'), ('type', 'CephOsdName')), (('name', 'args'), ('type', 'CephString'), ('goodchars', 'A-Za-z0-9-_.='), ('n', 'N')))),
+                ('osd_crush_add', 'osd crush add', 'add or update crushmap position and weight for <name> with <weight> and location <args>', ((('name', 'id'), ('type', 'CephOsdName')), (('name', 'args'), ('type', 'CephString'), ('goodchars', 'A-Za-z0-9-_.='), ('n', 'N')), (('name', 'weight'), ('type', 'CephFloat'), ('range', '0')))),
+                ('osd_crush_create_or_move', 'osd crush create-or-move', 'create entry or move existing entry for <name> <weight> at/to location <args>', ((('name', 'args'), ('type', 'CephString'), ('goodchars', 'A-Za-z0-9-_.='), ('n', 'N')), (('name', 'id'), ('type', 'CephOsdName')), (('name', 'weight'), ('type', 'CephFloat'), ('range', '0')))),
+                ('osd_crush_move', 'osd crush move', 'move existing entry for <name> to location <args>', ((('name', 'args'), ('type', 'CephString'), ('goodchars', 'A-Za-z0-9-_.='), ('n', 'N')), (('name', 'name'), ('type', 'CephString'), ('goodchars', 'A-Za-z0-9-_.')))),
+                ('osd_crush_reweight', 'osd crush reweight', "change <name>'s weight to <weight> in crush map", ((('name', 'name'), ('type', 'CephString'), ('goodchars', 'A-Za-z0-9-_.')), (('name', 'weight'), ('type', 'CephFloat'), ('range', '0')))),
+                ('osd_crush_rule_create_simple', 'osd crush rule create-simple', 'create crush rule <name> to start from <root>, replicate across buckets of type <type>, using a choose mode of <firstn|indep> (default firstn; indep best for erasure pools)', ((('name', 'name'), ('type', 'CephString'), ('goodchars', 'A-Za-z0-9-_.')), (('name', 'type'), ('type', 'CephString'), ('goodchars', 'A-Za-z0-9-_.')), (('name', 'root'), ('type', 'CephString'), ('goodchars', 'A-Za-z0-9-_.')), (('name', 'mode'), ('type', 'CephChoices'), ('strings', 'firstn|indep'), ('req', False)))),
+                ('osd_set', 'osd set', 'set <key>', ((('name', 'key'), ('type', 'CephChoices'), ('strings', 'full|pause|noup|nodown|noout|noin|nobackfill|norebalance|norecover|noscrub|nodeep-scrub|notieragent|sortbitwise')),)),
+                ('osd_unset', 'osd unset', 'unset <key>', ((('name', 'key'), ('type', 'CephChoices'), ('strings', 'full|pause|noup|nodown|noout|noin|nobackfill|norebalance|norecover|noscrub|nodeep-scrub|notieragent|sortbitwise')),)),
+                ('osd_reweight', 'osd reweight', 'reweight osd to 0.0 < <weight> < 1.0', ((('name', 'weight'), ('type', 'CephFloat'), ('range', '0|1')), (('name', 'id'), ('type', 'CephInt'), ('range', '0')))),
+                ('osd_primary_affinity', 'osd primary-affinity', 'adjust osd primary-affinity from 0.0 <= <weight> <= 1.0', ((('name', 'id'), ('type', 'CephOsdName')), (('name', 'weight'), ('type', 'CephFloat'), ('range', '0|1')))),
+                ('osd_create', 'osd create', 'create new osd (with optional UUID and ID)', ((('name', 'uuid'), ('type', 'CephUUID'), ('req', False)), (('name', 'id'), ('type', 'CephInt'), ('range', '0'), ('req', False)))),
+                ('osd_blacklist', 'osd blacklist', 'add (optionally until <expire> seconds from now) or remove <addr> from blacklist', ((('name', 'blacklistop'), ('type', 'CephChoices'), ('strings', 'add|rm')), (('name', 'addr'), ('type', 'CephEntityAddr')), (('name', 'expire'), ('type', 'CephFloat'), ('range', '0'), ('req', False)))),
+                ('osd_pool_create', 'osd pool create', 'create pool', ((('name', 'pool'), ('type', 'CephPoolname')), (('name', 'pg_num'), ('type', 'CephInt'), ('range', '0')), (('name', 'pool_type'), ('type', 'CephChoices'), ('strings', 'replicated|erasure'), ('req', False)), (('name', 'erasure_code_profile'), ('type', 'CephString'), ('goodchars', ''), ('req', False)), (('name', 'expected_num_objects'), ('type', 'CephInt'), ('range', ''), ('req', False)), (('name', 'ruleset'), ('type', 'CephString'), ('goodchars', ''), ('req', False)), (('name', 'pgp_num'), ('type', 'CephInt'), ('range', '0'), ('req', False)))),
+                ('osd_pool_delete', 'osd pool delete', 'delete pool', ((('name', 'pool'), ('type', 'CephPoolname')), (('name', 'pool2'), ('type', 'CephPoolname'), ('req', False)), (('name', 'sure'), ('type', 'CephChoices'), ('strings', '--yes-i-really-really-mean-it'), ('req', False)))),
+                ('osd_pool_rename', 'osd pool rename', 'rename <srcpool> to <destpool>', ((('name', 'srcpool'), ('type', 'CephPoolname')), (('name', 'destpool'), ('type', 'CephPoolname')))),
+                ('osd_pool_get', 'osd pool get', 'get pool parameter <var>', ((('name', 'pool'), ('type', 'CephPoolname')), (('name', 'var'), ('type', 'CephChoices'), ('strings', 'size|min_size|crash_replay_interval|pg_num|pgp_num|crush_ruleset|hashpspool|nodelete|nopgchange|nosizechange|write_fadvise_dontneed|noscrub|nodeep-scrub|hit_set_type|hit_set_period|hit_set_count|hit_set_fpp|auid|target_max_objects|target_max_bytes|cache_target_dirty_ratio|cache_target_dirty_high_ratio|cache_target_full_ratio|cache_min_flush_age|cache_min_evict_age|erasure_code_profile|min_read_recency_for_promote|all|min_write_recency_for_promote|fast_read')))),
+                ('osd_pool_set', 'osd pool set', 'set pool parameter <var> to <val>', ((('name', 'var'), ('type', 'CephChoices'), ('strings', 'size|min_size|crash_replay_interval|pg_num|pgp_num|crush_ruleset|hashpspool|nodelete|nopgchange|nosizechange|write_fadvise_dontneed|noscrub|nodeep-scrub|hit_set_type|hit_set_period|hit_set_count|hit_set_fpp|use_gmt_hitset|debug_fake_ec_pool|target_max_bytes|target_max_objects|cache_target_dirty_ratio|cache_target_dirty_high_ratio|cache_target_full_ratio|cache_min_flush_age|cache_min_evict_age|auid|min_read_recency_for_promote|min_write_recency_for_promote|fast_read')), (('name', 'val'), ('type', 'CephString'), ('goodchars', '')), (('name', 'pool'), ('type', 'CephPoolname')), (('name', 'force'), ('type', 'CephChoices'), ('strings', '--yes-i-really-mean-it'), ('req', False)))),
+                ('osd_reweight_by_utilization', 'osd reweight-by-utilization', 'reweight OSDs by utilization [overload-percentage-for-consideration, default 120]', ((('name', 'oload'), ('type', 'CephInt'), ('range', '100'), ('req', False)),)),
+                ('osd_reweight_by_pg', 'osd reweight-by-pg', 'reweight OSDs by PG distribution [overload-percentage-for-consideration, default 120]', ((('name', 'oload'), ('type', 'CephInt'), ('range', '100')), (('name', 'pools'), ('type', 'CephPoolname'), ('n', 'N'), ('req', False)))),
+                ('osd_tier_add', 'osd tier add', 'add the tier <tierpool> (the second one) to base pool <pool> (the first one)', ((('name', 'pool'), ('type', 'CephPoolname')), (('name', 'tierpool'), ('type', 'CephPoolname')), (('name', 'force_nonempty'), ('type', 'CephChoices'), ('strings', '--force-nonempty'), ('req', False)))),
+                ('osd_tier_cache_mode', 'osd tier cache-mode', 'specify the caching mode for cache tier <pool>', ((('name', 'mode'), ('type', 'CephChoices'), ('strings', 'none|writeback|forward|readonly|readforward|readproxy')), (('name', 'pool'), ('type', 'CephPoolname')))),
+                ('osd_tier_set_overlay', 'osd tier set-overlay', 'set the overlay pool for base pool <pool> to be <overlaypool>', ((('name', 'overlaypool'), ('type', 'CephPoolname')), (('name', 'pool'), ('type', 'CephPoolname')))),
+                ('osd_tier_add_cache', 'osd tier add-cache', 'add a cache <tierpool> (the second one) of size <size> to existing pool <pool> (the first one)', ((('name', 'size'), ('type', 'CephInt'), ('range', '0')), (('name', 'tierpool'), ('type', 'CephPoolname')), (('name', 'pool'), ('type', 'CephPoolname')))),
+            ),
+            'MonitorCommand': (
+                ('compact', 'compact', "cause compaction of monitor's leveldb storage (DEPRECATED)", ()),
+                ('scrub', 'scrub', 'scrub the monitor stores (DEPRECATED)', ()),
+                ('sync_force', 'sync force', 'force sync of and clear monitor store (DEPRECATED)', ((('name', 'validate2'), ('type', 'CephChoices'), ('strings', '--i-know-what-i-am-doing'), ('req', False)), (('name', 'validate1'), ('type', 'CephChoices'), ('strings', '--yes-i-really-mean-it'), ('req', False)))),
+                ('node_ls', 'node ls', 'list all nodes in cluster [type]', ((('name', 'type'), ('type', 'CephChoices'), ('strings', 'all|osd|mon|mds'), ('req', False)),)),
+                ('mon_compact', 'mon compact', "cause compaction of monitor's leveldb storage", ()),
+                ('mon_scrub', 'mon scrub', 'scrub the monitor stores', ()),
+                ('mon_sync_force', 'mon sync force', 'force sync of and clear monitor store', ((('name', 'validate1'), ('type', 'CephChoices'), ('strings', '--yes-i-really-mean-it'), ('req', False)), (('name', 'validate2'), ('type', 'CephChoices'), ('strings', '--i-know-what-i-am-doing'), ('req', False)))),
+                ('mon_metadata', 'mon metadata', 'fetch metadata for mon <id>', ((('name', 'id'), ('type', 'CephString'), ('goodchars', '')),)),
+            ),
+        },
+    },
+    'jewel': {
+        'version': '10',
+        'base': 'infernalis',
+        'remove': {
+            'MdsCommand': ('mds_set', 'mds_setmap'),
+        },
+        'commands': {
+            'PlacementGroupCommand': (
+                ('pg_ls_by_pool', 'pg ls-by-pool', 'list pg with pool = [poolname | poolid]', ((('name', 'poolstr'), ('type', 'CephString'), ('goodchars', '')), (('name', 'states'), ('type', 'CephChoices'), ('strings', 'active|clean|down|replay|splitting|scrubbing|scrubq|degraded|inconsistent|peering|repair|recovering|backfill_wait|incomplete|stale|remapped|deep_scrub|backfill|backfill_toofull|recovery_wait|undersized|activating|peered'), ('n', 'N'), ('req', False)))),
+                ('pg_ls_by_primary', 'pg ls-by-primary', 'list pg with primary = [osd]', ((('name', 'osd'), ('type', 'CephOsdName')), (('name', 'pool'), ('type', 'CephInt'), ('range', ''), ('req', False)), (('name', 'states'), ('type', 'CephChoices'), ('strings', 'active|clean|down|replay|splitting|scrubbing|scrubq|degraded|inconsistent|peering|repair|recovering|backfill_wait|incomplete|stale|remapped|deep_scrub|backfill|backfill_toofull|recovery_wait|undersized|activating|peered'), ('n', 'N'), ('req', False)))),
+                ('pg_ls_by_osd', 'pg ls-by-osd', 'list pg on osd [osd]', ((('name', 'osd'), ('type', 'CephOsdName')), (('name', 'states'), ('type', 'CephChoices'), ('strings', 'active|clean|down|replay|splitting|scrubbing|scrubq|degraded|inconsistent|peering|repair|recovering|backfill_wait|incomplete|stale|remapped|deep_scrub|backfill|backfill_toofull|recovery_wait|undersized|activating|peered'), ('n', 'N'), ('req', False)), (('name', 'pool'), ('type', 'CephInt'), ('range', ''), ('req', False)))),
+                ('pg_ls', 'pg ls', 'list pg with specific pool, osd, state', ((('name', 'states'), ('type', 'CephChoices'), ('strings', 'active|clean|down|replay|splitting|scrubbing|scrubq|degraded|inconsistent|peering|repair|recovering|backfill_wait|incomplete|stale|remapped|deep_scrub|backfill|backfill_toofull|recovery_wait|undersized|activating|peered'), ('n', 'N'), ('req', False)), (('name', 'pool'), ('type', 'CephInt'), ('range', ''), ('req', False)))),
+            ),
+            'MdsCommand': (
+                ('mds_dump', 'mds dump', 'dump legacy MDS cluster info, optionally from epoch', ((('name', 'epoch'), ('type', 'CephInt'), ('range', ''), ('req', False)),)),
+                ('fs_dump', 'fs dump', 'dump all CephFS status, optionally from epoch', ((('name', 'epoch'), ('type', 'CephInt'), ('range', ''), ('req', False)),)),
+                ('mds_tell', 'mds tell', 'send command to particular mds', ((('name', 'who'), ('type', 'CephString'), ('goodchars', '')), (('name', 'args'), ('type', 'CephString'), ('goodchars', ''), ('n', 'N')))),
+                ('mds_repaired', 'mds repaired', 'mark a damaged MDS rank as no longer damaged', ((('name', 'rank'), ('type', 'CephString'), ('goodchars', '')),)),
+                ('mds_rmfailed', 'mds rmfailed', 'remove failed mds', ((('name', 'who'), ('type', 'CephString'), ('goodchars', '')), (('name', 'confirm'), ('type', 'CephString'), ('goodchars', ''), ('req', False)))),
+                ('mds_rm_data_pool', 'mds rm_data_pool', 'remove data pool <pool>', ((('name', 'pool'), ('type', 'CephString'), ('goodchars', '')),)),
+                ('mds_newfs', 'mds newfs', 'make new filesystem using pools <metadata> and <data>', ((('name', 'metadata'), ('type', 'CephInt'), ('range', '0')), (('name', 'data'), ('type', 'CephInt'), ('range', '0')), (('name', 'sure'), ('type', 'CephChoices'), ('strings', '--yes-i-really-mean-it'), ('req', False)))),
+                ('fs_set', 'fs set', 'set mds parameter <var> to <val>', ((('name', 'var'), ('type', 'CephChoices'), ('strings', 'max_mds|max_file_size|allow_new_snaps|inline_data|cluster_down|allow_multimds|allow_dirfrags')), (('name', 'fs_name'), ('type', 'CephString'), ('goodchars', '')), (('name', 'val'), ('type', 'CephString'), ('goodchars', '')), (('name', 'confirm'), ('type', 'CephString'), ('goodchars', ''), ('req', False)))),
+                ('fs_add_data_pool', 'fs add_data_pool', 'add data pool <pool>', ((('name', 'fs_name'), ('type', 'CephString'), ('goodchars', '')), (('name', 'pool'), ('type', 'CephString'), ('goodchars', '')))),
+                ('fs_rm_data_pool', 'fs rm_data_pool', 'remove data pool <pool>', ((('name', 'fs_name'), ('type', 'CephString'), ('goodchars', '')), (('name', 'pool'), ('type', 'CephString'), ('goodchars', '')))),
+            ),
+            'OsdCommand': (
+                ('osd_map', 'osd map', 'find pg for <object> in <pool> with [namespace]', ((('name', 'object'), ('type', 'CephObjectname')), (('name', 'pool'), ('type', 'CephPoolname')), (('name', 'nspace'), ('type', 'CephString'), ('goodchars', ''), ('req', False)))),
+                ('osd_blacklist_clear', 'osd blacklist clear', 'clear all blacklisted clients', ()),
+                ('osd_crush_add', 'osd crush add', 'add or update crushmap position and weight for <name> with <weight> and location <args>', ((('name', 'id'), ('type', 'CephOsdName')), (('name', 'weight'), ('type', 'CephFloat'), ('range', '0')), (('name', 'args'), ('type', 'CephString'), ('goodchars', 'A-Za-z0-9-_.='), ('n', 'N')))),
+                ('osd_crush_create_or_move', 'osd crush create-or-move', 'create entry or move existing entry for <name> <weight> at/to location <args>', ((('name', 'args'), ('type', 'CephString'), ('goodchars', 'A-Za-z0-9-_.='), ('n', 'N')), (('name', 'weight'), ('type', 'CephFloat'), ('range', '0')), (('name', 'id'), ('type', 'CephOsdName')))),
+                ('osd_crush_reweight', 'osd crush reweight', "change <name>'s weight to <weight> in crush map", ((('name', 'weight'), ('type', 'CephFloat'), ('range', '0')), (('name', 'name'), ('type', 'CephString'), ('goodchars', 'A-Za-z0-9-_.')))),
+                ('osd_crush_tunables', 'osd crush tunables', 'set crush tunables values to <profile>', ((('name', 'profile'), ('type', 'CephChoices'), ('strings', 'legacy|argonaut|bobtail|firefly|hammer|jewel|optimal|default')),)),
+                ('osd_crush_set_tunable', 'osd crush set-tunable', 'set crush tunable <tunable> to <value>', ((('name', 'value'), ('type', 'CephInt'), ('range', '')), (('name', 'tunable'), ('type', 'CephChoices'), ('strings', 'straw_calc_version')))),
+                ('osd_crush_rule_create_simple', 'osd crush rule create-simple', 'create crush rule <name> to start from <root>, replicate across buckets of type <type>, using a choose mode of <firstn|indep> (default firstn; indep best for erasure pools)', ((('name', 'type'), ('type', 'CephString'), ('goodchars', 'A-Za-z0-9-_.')), (('name', 'root'), ('type', 'CephString'), ('goodchars', 'A-Za-z0-9-_.')), (('name', 'name'), ('type', 'CephString'), ('goodchars', 'A-Za-z0-9-_.')), (('name', 'mode'), ('type', 'CephChoices'), ('strings', 'firstn|indep'), ('req', False)))),
+                ('osd_reweight', 'osd reweight', 'reweight osd to 0.0 < <weight> < 1.0', ((('name', 'id'), ('type', 'CephInt'), ('range', '0')), (('name', 'weight'), ('type', 'CephFloat'), ('range', '0|1')))),
+                ('osd_create', 'osd create', 'create new osd (with optional UUID and ID)', ((('name', 'id'), ('type', 'CephInt'), ('range', '0'), ('req', False)), (('name', 'uuid'), ('type', 'CephUUID'), ('req', False)))),
+                ('osd_blacklist', 'osd blacklist', 'add (optionally until <expire> seconds from now) or remove <addr> from blacklist', ((('name', 'addr'), ('type', 'CephEntityAddr')), (('name', 'blacklistop'), ('type', 'CephChoices'), ('strings', 'add|rm')), (('name', 'expire'), ('type', 'CephFloat'), ('range', '0'), ('req', False)))),
+                ('osd_pool_mksnap', 'osd pool mksnap', 'make snapshot <snap> in <pool>', ((('name', 'pool'), ('type', 'CephPoolname')), (('name', 'snap'), ('type', 'CephString'), ('goodchars', '')))),
+                ('osd_pool_rmsnap', 'osd pool rmsnap', 'remove snapshot <snap> from <pool>', ((('name', 'snap'), ('type', 'CephString'), ('goodchars', '')), (('name', 'pool'), ('type', 'CephPoolname')))),
+                ('osd_pool_create', 'osd pool create', 'create pool', ((('name', 'pool'), ('type', 'CephPoolname')), (('name', 'pg_num'), ('type', 'CephInt'), ('range', '0')), (('name', 'ruleset'), ('type', 'CephString'), ('goodchars', ''), ('req', False)), (('name', 'pool_type'), ('type', 'CephChoices'), ('strings', 'replicated|erasure'), ('req', False)), (('name', 'expected_num_objects'), ('type', 'CephInt'), ('range', ''), ('req', False)), (('name', 'erasure_code_profile'), ('type', 'CephString'), ('goodchars', ''), ('req', False)), (('name', 'pgp_num'), ('type', 'CephInt'), ('range', '0'), ('req', False)))),
+                ('osd_pool_delete', 'osd pool delete', 'delete pool', ((('name', 'pool'), ('type', 'CephPoolname')), (('name', 'sure'), ('type', 'CephChoices'), ('strings', '--yes-i-really-really-mean-it'), ('req', False)), (('name', 'pool2'), ('type', 'CephPoolname'), ('req', False)))),
+                ('osd_pool_rm', 'osd pool rm', 'remove pool', ((('name', 'pool'), ('type', 'CephPoolname')), (('name', 'pool2'), ('type', 'CephPoolname'), ('req', False)), (('name', 'sure'), ('type', 'CephChoices'), ('strings', '--yes-i-really-really-mean-it'), ('req', False)))),
+                ('osd_pool_rename', 'osd pool rename', 'rename <srcpool> to <destpool>', ((('name', 'destpool'), ('type', 'CephPoolname')), (('name', 'srcpool'), ('type', 'CephPoolname')))),
+                ('osd_pool_get', 'osd pool get', 'get pool parameter <var>', ((('name', 'var'), ('type', 'CephChoices'), ('strings', 'size|min_size|crash_replay_interval|pg_num|pgp_num|crush_ruleset|hashpspool|nodelete|nopgchange|nosizechange|write_fadvise_dontneed|noscrub|nodeep-scrub|hit_set_type|hit_set_period|hit_set_count|hit_set_fpp|auid|target_max_objects|target_max_bytes|cache_target_dirty_ratio|cache_target_dirty_high_ratio|cache_target_full_ratio|cache_min_flush_age|cache_min_evict_age|erasure_code_profile|min_read_recency_for_promote|all|min_write_recency_for_promote|fast_read|hit_set_grade_decay_rate|hit_set_search_last_n|scrub_min_interval|scrub_max_interval|deep_scrub_interval|recovery_priority|recovery_op_priority|scrub_priority')), (('name', 'pool'), ('type', 'CephPoolname')))),
+                ('osd_pool_set', 'osd pool set', 'set pool parameter <var> to <val>', ((('name', 'val'), ('type', 'CephString'), ('goodchars', '')), (('name', 'pool'), ('type', 'CephPoolname')), (('name', 'var'), ('type', 'CephChoices'), ('strings', 'size|min_size|crash_replay_interval|pg_num|pgp_num|crush_ruleset|hashpspool|nodelete|nopgchange|nosizechange|write_fadvise_dontneed|noscrub|nodeep-scrub|hit_set_type|hit_set_period|hit_set_count|hit_set_fpp|use_gmt_hitset|debug_fake_ec_pool|target_max_bytes|target_max_objects|cache_target_dirty_ratio|cache_target_dirty_high_ratio|cache_target_full_ratio|cache_min_flush_age|cache_min_evict_age|auid|min_read_recency_for_promote|min_write_recency_for_promote|fast_read|hit_set_grade_decay_rate|hit_set_search_last_n|scrub_min_interval|scrub_max_interval|deep_scrub_interval|recovery_priority|recovery_op_priority|scrub_priority')), (('name', 'force'), ('type', 'CephChoices'), ('strings', '--yes-i-really-mean-it'), ('req', False)))),
+                ('osd_pool_set_quota', 'osd pool set-quota', 'set object or byte limit on pool', ((('name', 'pool'), ('type', 'CephPoolname')), (('name', 'val'), ('type', 'CephString'), ('goodchars', '')), (('name', 'field'), ('type', 'CephChoices'), ('strings', 'max_objects|max_bytes')))),
+                ('osd_utilization', 'osd utilization', 'get basic pg distribution stats', ()),
+                ('osd_reweight_by_utilization', 'osd reweight-by-utilization', 'reweight OSDs by utilization [overload-percentage-for-consideration, default 120]', ((('name', 'oload'), ('type', 'CephInt'), ('range', ''), ('req', False)), (('name', 'max_osds'), ('type', 'CephInt'), ('range', ''), ('req', False)), (('name', 'no_increasing'), ('type', 'CephChoices'), ('strings', '--no-increasing'), ('req', False)), (('name', 'max_change'), ('type', 'CephFloat'), ('range', ''), ('req', False)))),
+                ('osd_test_reweight_by_utilization', 'osd test-reweight-by-utilization', 'dry run of reweight OSDs by utilization [overload-percentage-for-consideration, default 120]', ((('name', 'max_osds'), ('type', 'CephInt'), ('range', ''), ('req', False)), (('name', 'max_change'), ('type', 'CephFloat'), ('range', ''), ('req', False)), (('name', 'no_increasing'), ('type', 'CephChoices'), ('strings', '--no-increasing'), ('req', False)), (('name', 'oload'), ('type', 'CephInt'), ('range', ''), ('req', False)))),
+                ('osd_reweight_by_pg', 'osd reweight-by-pg', 'reweight OSDs by PG distribution [overload-percentage-for-consideration, default 120]', ((('name', 'max_osds'), ('type', 'CephInt'), ('range', ''), ('req', False)), (('name', 'max_change'), ('type', 'CephFloat'), ('range', ''), ('req', False)), (('name', 'oload'), ('type', 'CephInt'), ('range', ''), ('req', False)), (('name', 'pools'), ('type', 'CephPoolname'), ('n', 'N'), ('req', False)))),
+                ('osd_test_reweight_by_pg', 'osd test-reweight-by-pg', 'dry run of reweight OSDs by PG distribution [overload-percentage-for-consideration, default 120]', ((('name', 'max_change'), ('type', 'CephFloat'), ('range', ''), ('req', False)), (('name', 'max_osds'), ('type', 'CephInt'), ('range', ''), ('req', False)), (('name', 'pools'), ('type', 'CephPoolname'), ('n', 'N'), ('req', False)), (('name', 'oload'), ('type', 'CephInt'), ('range', ''), ('req', False)))),
+                ('osd_tier_add', 'osd tier add', 'add the tier <tierpool> (the second one) to base pool <pool> (the first one)', ((('name', 'tierpool'), ('type', 'CephPoolname')), (('name', 'pool'), ('type', 'CephPoolname')), (('name', 'force_nonempty'), ('type', 'CephChoices'), ('strings', '--force-nonempty'), ('req', False)))),
+                ('osd_tier_rm', 'osd tier rm', 'remove the tier <tierpool> (the second one) from base pool <pool> (the first one)', ((('name', 'pool'), ('type', 'CephPoolname')), (('name', 'tierpool'), ('type', 'CephPoolname')))),
+                ('osd_tier_cache_mode', 'osd tier cache-mode', 'specify the caching mode for cache tier <pool>', ((('name', 'pool'), ('type', 'CephPoolname')), (('name', 'mode'), ('type', 'CephChoices'), ('strings', 'none|writeback|forward|readonly|readforward|proxy|readproxy')), (('name', 'sure'), ('type', 'CephChoices'), ('strings', '--yes-i-really-mean-it'), ('req', False)))),
+                ('osd_tier_rm_overlay', 'osd tier rm-overlay', 'remove the overlay pool for base pool <pool>', ((('name', 'pool'), ('type', 'CephPoolname')),)),
+                ('osd_tier_add_cache', 'osd tier add-cache', 'add a cache <tierpool> (the second one) of size <size> to existing pool <pool> (the first one)', ((('name', 'size'), ('type', 'CephInt'), ('range', '0')), (('name', 'pool'), ('type', 'CephPoolname')), (('name', 'tierpool'), ('type', 'CephPoolname')))),
+            ),
+            'MonitorCommand': (
+                ('sync_force', 'sync force', 'force sync of and clear monitor store (DEPRECATED)', ((('name', 'validate1'), ('type', 'CephChoices'), ('strings', '--yes-i-really-mean-it'), ('req', False)), (('name', 'validate2'), ('type', 'CephChoices'), ('strings', '--i-know-what-i-am-doing'), ('req', False)))),
+                ('tell', 'tell', 'send a command to a specific daemon', ((('name', 'target'), ('type', 'CephName')), (('name', 'args'), ('type', 'CephString'), ('goodchars', ''), ('n', 'N')))),
+                ('mon_add', 'mon add', 'add new monitor named <name> at <addr>', ((('name', 'name'), ('type', 'CephString'), ('goodchars', '')), (('name', 'addr'), ('type', 'CephIPAddr')))),
+                ('mon_rm', 'mon rm', 'remove monitor named <name>', ((('name', 'name'), ('type', 'CephString'), ('goodchars', '')),)),
+            ),
+            'AuthCommand': (
+                ('auth_rm', 'auth rm', 'remove all caps for <name>', ((('name', 'entity'), ('type', 'CephString'), ('goodchars', '')),)),
+            ),
+            'ConfigKeyCommand': (
+                ('config_key_rm', 'config-key rm', 'rm <key>', ((('name', 'key'), ('type', 'CephString'), ('goodchars', '')),)),
+            ),
+        },
+    },
+}
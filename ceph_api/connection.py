@@ -0,0 +1,399 @@
+import atexit
+import collections
+import contextlib
+import errno
+import json
+import os
+import re
+import threading
+import time
+
+import six
+
+# rados is imported where it is first needed, so importing ceph_api
+# doesn't load librados
+
+__author__ = 'Chris Holcombe <chris.holcombe@canonical.com>'
+
+DEFAULT_POOL_SIZE = 4
+
+
+class CephError(Exception):
+    """Exception raised for errors with running a Ceph command
+
+        :param cmd: cmd in which the error occurred
+        :param msg: explanation of the error
+    """
+
+    def __init__(self, cmd, msg):
+        self.cmd = cmd
+        self.msg = msg
+
+
+class ConnectionPool(object):
+    """A pool of connected rados.Rados handles for one cluster identity.
+
+    Connecting to a cluster means a monitor handshake and a cephx
+    exchange, so handles are kept open and handed out again instead of
+    being rebuilt for every command.
+
+    :param conffile: The ceph.conf configuration location
+    :param name: The client name to connect as, eg: client.admin
+    :param keyring: Path to the keyring for ``name``
+    :param max_size: The most connections this pool will hold open at once
+    :param max_idle: Seconds an unused connection is kept before it is
+        shut down
+    :param health_check_interval: Connections idle for longer than this
+        many seconds are checked with a round trip to the monitors before
+        they are handed out again
+    """
+
+    def __init__(self, conffile, name=None, keyring=None,
+                 max_size=DEFAULT_POOL_SIZE, max_idle=300,
+                 health_check_interval=30):
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1, was given "
+                             "{}".format(max_size))
+        self.conffile = conffile
+        self.name = name
+        self.keyring = keyring
+        self.max_size = max_size
+        self.max_idle = max_idle
+        self.health_check_interval = health_check_interval
+        # (cluster, last_used) pairs, oldest on the left
+        self._idle = collections.deque()
+        # Number of open connections, idle or handed out
+        self._size = 0
+        self._closed = False
+        self._cond = threading.Condition(threading.Lock())
+
+    def _connect(self):
+        import rados
+        conf = None
+        if self.keyring is not None:
+            conf = {'keyring': self.keyring}
+        cluster = rados.Rados(conffile=self.conffile, name=self.name,
+                              conf=conf)
+        cluster.connect()
+        return cluster
+
+    def _healthy(self, cluster, last_used):
+        import rados
+        if cluster.state != 'connected':
+            return False
+        if time.time() - last_used < self.health_check_interval:
+            return True
+        try:
+            result = cluster.mon_command(json.dumps({'prefix': 'fsid'}),
+                                         inbuf='')
+        except rados.Error:
+            return False
+        return result[0] == 0
+
+    @staticmethod
+    def _shutdown(cluster):
+        import rados
+        _pg_relayed.discard(id(cluster))
+        try:
+            cluster.shutdown()
+        except rados.Error:
+            pass
+
+    def _pop_expired(self):
+        # Caller holds self._cond
+        expired = []
+        deadline = time.time() - self.max_idle
+        while self._idle and self._idle[0][1] < deadline:
+            expired.append(self._idle.popleft()[0])
+            self._size -= 1
+        return expired
+
+    def acquire(self, timeout=None):
+        """Take a connected handle out of the pool, connecting a new one if
+        there is room and nothing is idle.
+
+        :param timeout: Seconds to wait for a free connection when the pool
+            is exhausted.  None waits forever.
+        :return: rados.Rados
+        :raise CephError: Raises if the pool is closed or no connection
+            became free within timeout
+        :raise rados.Error: Raises on rados errors
+        """
+        deadline = None if timeout is None else time.time() + timeout
+        while True:
+            cluster = None
+            with self._cond:
+                expired = self._pop_expired()
+                while not self._idle and self._size >= self.max_size:
+                    if self._closed:
+                        break
+                    remaining = None
+                    if deadline is not None:
+                        remaining = deadline - time.time()
+                        if remaining <= 0:
+                            raise CephError(
+                                cmd=None,
+                                msg="timed out waiting for a connection")
+                    self._cond.wait(remaining)
+                    expired.extend(self._pop_expired())
+                if self._closed:
+                    raise CephError(cmd=None, msg="connection pool is closed")
+                if self._idle:
+                    # Most recently used first so the rest can age out
+                    cluster, last_used = self._idle.pop()
+                else:
+                    self._size += 1
+            for stale in expired:
+                self._shutdown(stale)
+            if cluster is None:
+                try:
+                    return self._connect()
+                except Exception:
+                    self._discard()
+                    raise
+            if self._healthy(cluster, last_used):
+                return cluster
+            self._shutdown(cluster)
+            self._discard()
+
+    def _discard(self):
+        with self._cond:
+            self._size -= 1
+            self._cond.notify()
+
+    def release(self, cluster, discard=False):
+        """Hand a connection back to the pool.
+
+        :param cluster: A rados.Rados handle obtained from acquire()
+        :param discard: Shut the connection down instead of keeping it,
+            eg: after it raised a rados.Error
+        """
+        with self._cond:
+            if not (discard or self._closed):
+                self._idle.append((cluster, time.time()))
+                self._cond.notify()
+                return
+        self._shutdown(cluster)
+        self._discard()
+
+    @contextlib.contextmanager
+    def connection(self, timeout=None):
+        """Context manager around acquire() and release().  A connection
+        that raises a rados.Error is shut down rather than reused.
+
+        :param timeout: Seconds to wait for a free connection
+        """
+        import rados
+        cluster = self.acquire(timeout=timeout)
+        try:
+            yield cluster
+        except rados.Error:
+            self.release(cluster, discard=True)
+            raise
+        except BaseException:
+            self.release(cluster)
+            raise
+        else:
+            self.release(cluster)
+
+    def grow(self, max_size):
+        """Raise max_size, eg: for a batch that runs more commands at once
+        than the pool was created for.  A pool is never shrunk.
+
+        :param max_size: The most connections the pool should allow
+        """
+        with self._cond:
+            if max_size > self.max_size:
+                self.max_size = max_size
+                self._cond.notify_all()
+
+    def evict_idle(self):
+        """Shut down connections that have been idle for longer than
+        max_idle.
+
+        :return: The number of connections shut down
+        """
+        with self._cond:
+            expired = self._pop_expired()
+            self._cond.notify_all()
+        for cluster in expired:
+            self._shutdown(cluster)
+        return len(expired)
+
+    def close(self):
+        """Shut down every idle connection and refuse new acquires.
+        Connections still handed out are shut down when released.
+        """
+        with self._cond:
+            self._closed = True
+            idle = [cluster for cluster, _ in self._idle]
+            self._idle.clear()
+            self._size -= len(idle)
+            self._cond.notify_all()
+        for cluster in idle:
+            self._shutdown(cluster)
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_connection_pool(conffile, name=None, keyring=None, **kwargs):
+    """Return the process wide ConnectionPool for a cluster identity,
+    creating it on first use.
+
+    :param conffile: The ceph.conf configuration location
+    :param name: The client name to connect as, eg: client.admin
+    :param keyring: Path to the keyring for ``name``
+    :param kwargs: ConnectionPool options.  Only used when the pool is
+        created.
+    :return: ConnectionPool
+    """
+    key = (conffile, name, keyring)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None or pool._closed:
+            pool = ConnectionPool(conffile, name=name, keyring=keyring,
+                                  **kwargs)
+            _pools[key] = pool
+        return pool
+
+
+def close_connection_pools():
+    """Close every pool created by get_connection_pool()."""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
+
+
+atexit.register(close_connection_pools)
+
+
+def run_ceph_command(conffile, cmd, inbuf, name=None, keyring=None,
+                     direct=True):
+    """Run a ceph command and return the results
+
+    :param conffile: The ceph.conf configuration location
+    :param cmd: The json command to run
+    :param inbuf:
+    :param name: The client name to connect as, eg: client.admin
+    :param keyring: Path to the keyring for ``name``
+    :param direct: Send OSD and PG directed commands straight to the
+        daemon instead of relaying them through the monitors.  See
+        send_command().
+    :return: (string outbuf, string outs)
+    :raise CephError: Raises CephError on command execution errors
+    :raise rados.Error: Raises on rados errors
+    """
+    pool = get_connection_pool(conffile, name=name, keyring=keyring)
+    with pool.connection() as cluster:
+        return send_command(cluster, cmd, inbuf, direct=direct)
+
+
+_OSD_TARGET = re.compile(r'^osd\.(\d+)$')
+
+# Monitor prefix for a pg operation -> the name the primary OSD knows it by
+PG_DIRECT_COMMANDS = {
+    'pg scrub': 'scrub',
+    'pg deep-scrub': 'deep_scrub',
+    'pg repair': 'repair',
+}
+
+# Errors from the primary after which the monitors relay a pg operation
+# instead: OSDs older than the operation reject it as unknown, and one a
+# stale map pointed at may no longer have the PG
+_PG_UNSUPPORTED = (-errno.EINVAL, -errno.EOPNOTSUPP)
+_PG_FALLBACK = _PG_UNSUPPORTED + (-errno.ENOENT,)
+
+# id() of the handles whose OSDs rejected a direct pg operation as
+# unknown, so their later ones go straight to the monitors rather than
+# paying for a failed round trip each time
+_pg_relayed = set()
+
+# OSD commands that take a single list argument, by the name of that
+# argument.  tell args for anything else are only routed directly when
+# they are a bare command without arguments.
+OSD_TELL_LIST_ARGS = {
+    'injectargs': 'injected_args',
+    'heap': 'heapcmd',
+}
+
+
+def osd_tell_command(args):
+    """Translate the args of a tell to an OSD into the command the OSD
+    understands.
+
+    Example:
+        osd_tell_command(['injectargs', '--osd-max-backfills 1'])
+        {'prefix': 'injectargs', 'injected_args': ['--osd-max-backfills 1']}
+
+    :param args: list of strings as given to MonitorCommand.tell()
+    :return: dict, or None if the arguments can't be mapped without the
+        daemon's own command descriptions
+    """
+    if isinstance(args, six.string_types):
+        args = args.split()
+    if not args:
+        return None
+    if len(args) == 1:
+        return {'prefix': args[0]}
+    if args[0] in OSD_TELL_LIST_ARGS:
+        return {'prefix': args[0], OSD_TELL_LIST_ARGS[args[0]]: args[1:]}
+    return None
+
+
+def _send_direct(cluster, cmd, inbuf):
+    # Returns the raw (ret, outbuf, outs) from the daemon, or None if cmd
+    # has to go to the monitors
+    prefix = cmd.get('prefix')
+    if prefix == 'tell':
+        match = _OSD_TARGET.match(cmd.get('target', ''))
+        if match is None:
+            return None
+        osd_cmd = osd_tell_command(cmd.get('args'))
+        if osd_cmd is None:
+            return None
+        return cluster.osd_command(int(match.group(1)), json.dumps(osd_cmd),
+                                   inbuf)
+    if prefix in PG_DIRECT_COMMANDS and id(cluster) not in _pg_relayed:
+        pg_cmd = {'prefix': PG_DIRECT_COMMANDS[prefix], 'pgid': cmd['pgid']}
+        result = cluster.pg_command(cmd['pgid'], json.dumps(pg_cmd), inbuf)
+        if result[0] in _PG_UNSUPPORTED:
+            _pg_relayed.add(id(cluster))
+        if result[0] in _PG_FALLBACK:
+            return None
+        return result
+    return None
+
+
+def send_command(cluster, cmd, inbuf, direct=True):
+    """Send a ceph command over an already connected cluster handle
+
+    A tell to osd.N is sent with Rados.osd_command and pg scrub,
+    deep-scrub and repair with Rados.pg_command, so they go straight to
+    the daemon rather than through the monitor leader.  Everything else,
+    or everything when direct is False, is a mon_command.
+
+    A pg operation the primary doesn't know, or sent to an OSD that no
+    longer has the PG, is retried through the monitors.  Once an OSD has
+    rejected one as unknown, eg: on jewel, every later pg operation on
+    the same handle goes to the monitors first.
+
+    :param cluster: A connected rados.Rados handle
+    :param cmd: The json command to run
+    :param inbuf:
+    :param direct: Allow routing straight to OSDs
+    :return: (string outbuf, string outs)
+    :raise CephError: Raises CephError on command execution errors
+    :raise rados.Error: Raises on rados errors
+    """
+    result = None
+    if direct:
+        result = _send_direct(cluster, cmd, inbuf)
+    if result is None:
+        result = cluster.mon_command(json.dumps(cmd), inbuf=inbuf)
+    if result[0] != 0:
+        raise CephError(cmd=cmd, msg=os.strerror(abs(result[0])))
+    return result[1], result[2]
@@ -0,0 +1,394 @@
+"""Edit the CRUSH map locally and apply every change in one osdmap epoch.
+
+Each osd crush command the monitors run is its own osdmap epoch, and
+every epoch sets off peering.  CrushTransaction fetches the map once,
+applies the same edits the osd crush commands would to a local copy,
+and uploads the result with a single osd setcrushmap::
+
+    osd = OsdCommand('/etc/ceph/ceph.conf')
+    with CrushTransaction(osd) as crush:
+        crush.add_bucket('rack7', 'rack')
+        crush.move('rack7', {'root': 'default'})
+        for osd_id in range(400, 600):
+            crush.add_osd(osd_id, 1.82,
+                          {'host': 'node{}'.format(osd_id // 10),
+                           'rack': 'rack7'})
+
+The map is committed when the with block exits cleanly and discarded if
+it raises.
+"""
+from ceph_api.crushmap import BUCKET_ALGS, HASH_RJENKINS1, \
+    RULE_CHOOSE_FIRSTN, RULE_CHOOSE_INDEP, \
+    RULE_CHOOSELEAF_FIRSTN, RULE_CHOOSELEAF_INDEP, RULE_EMIT, \
+    RULE_SET_CHOOSE_TRIES, RULE_SET_CHOOSELEAF_TRIES, RULE_TAKE, \
+    RULE_TYPE_ERASURE, RULE_TYPE_REPLICATED, Bucket, CrushMap, Rule, \
+    weight_to_fixed
+
+__author__ = 'Chris Holcombe <chris.holcombe@canonical.com>'
+
+
+class CrushConflictError(Exception):
+    """Raised by commit() when the cluster's CRUSH map changed after the
+    transaction fetched it.
+
+    :param msg: explanation of the error
+    """
+
+    def __init__(self, msg):
+        super(CrushConflictError, self).__init__(msg)
+        self.msg = msg
+
+
+class CrushTransaction(object):
+    """A batch of CRUSH edits applied with one osd setcrushmap.
+
+    Names, locations and weights are given as they are to the osd crush
+    commands: a location is a dict of type name to bucket name, eg:
+    {'host': 'node1', 'root': 'default'}, and weights are floats.  Errors
+    the monitors would return are raised as ValueError or KeyError when
+    the edit is made, before anything is sent, and a refused edit leaves
+    the map as it was.
+
+    :param osd_command: An OsdCommand to fetch and upload the map with
+    :param crush: A CrushMap to edit instead of fetching the cluster's,
+        eg: to try edits out locally.  Such a transaction can't commit.
+    """
+
+    def __init__(self, osd_command, crush=None):
+        self.osd_command = osd_command
+        self.crush = crush
+        self._original = None
+
+    def begin(self):
+        """Fetch the current map, dropping any uncommitted edits.
+
+        :return: ceph_api.crushmap.CrushMap, the map edits are made to
+        """
+        self._original = self._fetch()
+        self.crush = CrushMap.decode(self._original)
+        return self.crush
+
+    def _fetch(self):
+        outbuf, outs = self.osd_command.osd_getcrushmap()
+        return bytes(outbuf)
+
+    def __enter__(self):
+        self.begin()
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        if exc_type is None:
+            self.commit()
+        else:
+            self.rollback()
+
+    def _map(self):
+        if self.crush is None:
+            self.begin()
+        return self.crush
+
+    def _default_alg(self):
+        # The monitors prefer straw2, then straw, tree, list and uniform
+        allowed = self._map().tunable('allowed_bucket_algs')
+        for alg in sorted(BUCKET_ALGS.values(), reverse=True):
+            if allowed & (1 << alg):
+                return alg
+        raise ValueError("The map allows no bucket algorithms")
+
+    def _new_bucket(self, type_id, alg=None):
+        crush = self._map()
+        bucket_id = -1
+        while bucket_id in crush.buckets:
+            bucket_id -= 1
+        bucket = Bucket(bucket_id, type_id,
+                        self._default_alg() if alg is None else alg,
+                        HASH_RJENKINS1)
+        crush.buckets[bucket_id] = bucket
+        crush.max_buckets = max(crush.max_buckets, -bucket_id)
+        return bucket
+
+    def _adjust_weight(self, item, weight):
+        # Set item's weight in every bucket holding it and carry each
+        # bucket's new weight up to its own parents
+        changed = 0
+        for bucket in self._map().parents(item):
+            bucket.set_item_weight(item, weight)
+            self._adjust_weight(bucket.id, bucket.weight)
+            changed += 1
+        return changed
+
+    def _check_insert(self, item, name, location, linked=True):
+        # Everything CrushWrapper::insert_item would refuse, checked
+        # before the map is touched: walk the location from the lowest
+        # type up to the first bucket that exists.  Returns the type ids
+        # of the buckets to create and the existing bucket to link under.
+        crush = self._map()
+        if name in crush.names.values() and crush.item_id(name) != item:
+            raise ValueError("{} already exists with another id".format(
+                name))
+        missing = []
+        for type_id in sorted(crush.types):
+            if type_id == 0:
+                continue
+            parent_name = location.get(crush.types[type_id])
+            if parent_name is None:
+                continue
+            if parent_name not in crush.names.values():
+                missing.append(type_id)
+                continue
+            parent = crush.item_id(parent_name)
+            bucket = crush.buckets.get(parent)
+            if bucket is None:
+                raise ValueError("{} is not a bucket".format(parent_name))
+            if crush.subtree_contains(item, parent):
+                raise ValueError("Adding {} under {} would make a "
+                                 "loop".format(name, parent_name))
+            if bucket.type != type_id:
+                raise ValueError("{} is not a {}".format(
+                    parent_name, crush.types[type_id]))
+            if linked and not missing and item in bucket.items:
+                raise ValueError("{} is already in {}".format(
+                    name, parent_name))
+            return missing, bucket
+        return missing, None
+
+    def _insert(self, item, weight, name, location, linked=True):
+        # CrushWrapper::insert_item: create the missing buckets from the
+        # lowest type up, link the chain under the first bucket that
+        # exists, then set the weight all the way up
+        crush = self._map()
+        missing, parent = self._check_insert(item, name, location, linked)
+        if missing:
+            # Fails on a map that allows no algorithms, so before any edit
+            alg = self._default_alg()
+        crush.names[item] = name
+        current = item
+        for type_id in missing:
+            bucket = self._new_bucket(type_id, alg)
+            bucket.add_item(current, 0)
+            crush.names[bucket.id] = location[crush.types[type_id]]
+            current = bucket.id
+        if parent is not None:
+            parent.add_item(current, 0)
+        self._adjust_weight(item, weight)
+
+    def _unlink(self, bucket, item):
+        # Zero the item's weight so the ancestors lose it, then remove it
+        bucket.set_item_weight(item, 0)
+        self._adjust_weight(bucket.id, bucket.weight)
+        bucket.remove_item(item)
+
+    def _detach(self, item):
+        for bucket in self._map().parents(item):
+            self._unlink(bucket, item)
+
+    def _bucket_id(self, name):
+        item = self._map().item_id(name)
+        if item >= 0:
+            raise ValueError("{} is a device, not a bucket".format(name))
+        return item
+
+    def add_bucket(self, name, bucket_type, alg=None):
+        """osd crush add-bucket: create an empty, unlinked bucket.
+
+        :param name: The bucket's name
+        :param bucket_type: The type name, eg: rack
+        :param alg: The bucket algorithm name, eg: straw2.  Defaults to the
+            one the monitors would pick.
+        :return: int, the new bucket's id
+        :raise ValueError: Raises if the name is taken
+        """
+        crush = self._map()
+        if name in crush.names.values():
+            raise ValueError("{} already exists".format(name))
+        bucket = self._new_bucket(
+            crush.type_id(bucket_type),
+            None if alg is None else BUCKET_ALGS[alg])
+        crush.names[bucket.id] = name
+        return bucket.id
+
+    def add_osd(self, osd_id, weight, location):
+        """osd crush add: link osd.N with a weight at a location, creating
+        any buckets in the location that don't exist yet.
+
+        :param osd_id: The OSD's id
+        :param weight: The CRUSH weight, eg: 1.82
+        :param location: dict of type name to bucket name
+        """
+        crush = self._map()
+        self._insert(osd_id, weight_to_fixed(weight),
+                     'osd.{}'.format(osd_id), location)
+        crush.max_devices = max(crush.max_devices, osd_id + 1)
+
+    def move(self, name, location):
+        """osd crush move: unlink a bucket from wherever it is and link it
+        at a new location, keeping its weight.
+
+        :param name: The bucket's name
+        :param location: dict of type name to bucket name
+        """
+        crush = self._map()
+        item = self._bucket_id(name)
+        weight = crush.buckets[item].weight
+        # Check before detaching, so a refused move leaves the map as is.
+        # Once detached the bucket is in no parent, so relinking it where
+        # it already was is allowed.
+        self._check_insert(item, name, location, linked=False)
+        self._detach(item)
+        self._insert(item, weight, name, location, linked=False)
+
+    def link(self, name, location):
+        """osd crush link: link a bucket at an additional location.
+
+        :param name: The bucket's name
+        :param location: dict of type name to bucket name
+        """
+        item = self._bucket_id(name)
+        self._insert(item, self._map().buckets[item].weight, name, location)
+
+    def unlink(self, name, ancestor=None):
+        """osd crush unlink: remove an item from its parent buckets,
+        leaving it in the map.
+
+        :param name: The item's name
+        :param ancestor: Only unlink it from this bucket
+        """
+        crush = self._map()
+        item = crush.item_id(name)
+        parents = crush.parents(item)
+        if ancestor is not None:
+            parent = self._bucket_id(ancestor)
+            parents = [bucket for bucket in parents if bucket.id == parent]
+            if not parents:
+                raise ValueError("{} is not in {}".format(name, ancestor))
+        for bucket in parents:
+            self._unlink(bucket, item)
+
+    def remove(self, name):
+        """osd crush remove: unlink an item and drop it from the map.
+        Buckets must be empty.
+
+        :param name: The item's name
+        """
+        crush = self._map()
+        item = crush.item_id(name)
+        if item < 0 and crush.buckets[item].items:
+            raise ValueError("{} is not empty".format(name))
+        self._detach(item)
+        del crush.names[item]
+        if item < 0:
+            del crush.buckets[item]
+
+    def reweight(self, name, weight):
+        """osd crush reweight: change an item's CRUSH weight everywhere it
+        is linked.
+
+        :param name: The item's name, eg: osd.12
+        :param weight: The new weight, eg: 1.82
+        """
+        crush = self._map()
+        item = crush.item_id(name)
+        if not self._adjust_weight(item, weight_to_fixed(weight)):
+            raise ValueError("{} is not linked anywhere".format(name))
+
+    def rename_bucket(self, name, new_name):
+        """osd crush rename-bucket.
+
+        :param name: The bucket's current name
+        :param new_name: The name to give it
+        """
+        crush = self._map()
+        if new_name in crush.names.values():
+            raise ValueError("{} already exists".format(new_name))
+        crush.names[self._bucket_id(name)] = new_name
+
+    def create_simple_rule(self, name, root, failure_domain, mode='firstn',
+                           rule_type=RULE_TYPE_REPLICATED):
+        """osd crush rule create-simple: take root and choose leaves in
+        distinct failure domains.
+
+        :param name: The rule's name
+        :param root: The bucket to start from, eg: default
+        :param failure_domain: The type to spread replicas across, eg: host
+        :param mode: firstn or indep
+        :param rule_type: RULE_TYPE_REPLICATED or RULE_TYPE_ERASURE
+        :return: int, the new rule's id, which is also its ruleset
+        """
+        crush = self._map()
+        if name in crush.rule_names.values():
+            raise ValueError("Rule {} already exists".format(name))
+        if mode not in ('firstn', 'indep'):
+            raise ValueError("Unknown mode {}".format(mode))
+        take = crush.item_id(root)
+        domain = crush.type_id(failure_domain)
+        steps = []
+        if mode == 'indep':
+            steps.append((RULE_SET_CHOOSELEAF_TRIES, 5, 0))
+            steps.append((RULE_SET_CHOOSE_TRIES, 100, 0))
+        steps.append((RULE_TAKE, take, 0))
+        if domain:
+            op = RULE_CHOOSELEAF_FIRSTN if mode == 'firstn' \
+                else RULE_CHOOSELEAF_INDEP
+        else:
+            op = RULE_CHOOSE_FIRSTN if mode == 'firstn' \
+                else RULE_CHOOSE_INDEP
+        steps.append((op, 0, domain))
+        steps.append((RULE_EMIT, 0, 0))
+        rulesets = set(rule.ruleset for rule in crush.rules.values())
+        rule_id = 0
+        while rule_id in crush.rules or rule_id in rulesets:
+            rule_id += 1
+        if mode == 'firstn':
+            min_size, max_size = 1, 10
+        else:
+            min_size, max_size = 3, 20
+        crush.rules[rule_id] = Rule(rule_id, rule_type, min_size, max_size,
+                                    steps)
+        crush.rule_names[rule_id] = name
+        crush.max_rules = max(crush.max_rules, rule_id + 1)
+        return rule_id
+
+    def create_erasure_rule(self, name, root, failure_domain):
+        """A create-simple rule in indep mode for erasure coded pools.
+
+        :return: int, the new rule's id
+        """
+        return self.create_simple_rule(name, root, failure_domain,
+                                       mode='indep',
+                                       rule_type=RULE_TYPE_ERASURE)
+
+    def remove_rule(self, name):
+        """osd crush rule rm.
+
+        :param name: The rule's name
+        """
+        crush = self._map()
+        rule_id = crush.rule_id(name)
+        del crush.rules[rule_id]
+        del crush.rule_names[rule_id]
+
+    def commit(self, check=True):
+        """Upload the edited map with one osd setcrushmap.
+
+        :param check: Fetch the map again first and refuse to overwrite
+            changes someone else made since begin()
+        :return: (string outbuf, string outs)
+        :raise CrushConflictError: Raises if check finds the map changed
+        :raise CephError: Raises CephError on command execution errors
+        """
+        if self.crush is None:
+            raise ValueError("Nothing to commit, call begin() first")
+        if self._original is None:
+            raise ValueError("The map wasn't fetched from the cluster")
+        if check and self._fetch() != self._original:
+            raise CrushConflictError(
+                "The CRUSH map changed since this transaction began")
+        result = self.osd_command.osd_setcrushmap(inbuf=self.crush.encode())
+        self.crush = None
+        self._original = None
+        return result
+
+    def rollback(self):
+        """Discard every edit made since begin()."""
+        self.crush = None
+        self._original = None
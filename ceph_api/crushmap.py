@@ -0,0 +1,534 @@
+"""A CRUSH map decoded from osd getcrushmap, that can be edited and encoded
+again for osd setcrushmap.
+
+The binary map is used rather than osd crush dump because it carries the
+straw lengths of straw buckets, which depend on the straw_calc_version
+in force when each bucket was last changed and so can't be recomputed
+from the dump without moving data.  Only buckets that are edited get
+new straws::
+
+    osd = OsdCommand('/etc/ceph/ceph.conf')
+    outbuf, outs = osd.osd_getcrushmap()
+    crush = CrushMap.decode(outbuf)
+    print(crush.names[crush.rules[0].steps[0][1]])
+
+The encoding follows CrushWrapper::encode() up to and including the
+jewel tunables.  Anything a newer monitor appends after them, eg: device
+classes, is kept as opaque bytes and written back unchanged.
+"""
+import math
+import struct
+
+import six
+
+__author__ = 'Chris Holcombe <chris.holcombe@canonical.com>'
+
+CRUSH_MAGIC = 0x00010000
+
+# Bucket algorithms
+BUCKET_UNIFORM = 1
+BUCKET_LIST = 2
+BUCKET_TREE = 3
+BUCKET_STRAW = 4
+BUCKET_STRAW2 = 5
+
+BUCKET_ALGS = {
+    'uniform': BUCKET_UNIFORM,
+    'list': BUCKET_LIST,
+    'tree': BUCKET_TREE,
+    'straw': BUCKET_STRAW,
+    'straw2': BUCKET_STRAW2,
+}
+
+HASH_RJENKINS1 = 0
+
+# Rule step ops
+RULE_NOOP = 0
+RULE_TAKE = 1
+RULE_CHOOSE_FIRSTN = 2
+RULE_CHOOSE_INDEP = 3
+RULE_EMIT = 4
+RULE_CHOOSELEAF_FIRSTN = 6
+RULE_CHOOSELEAF_INDEP = 7
+RULE_SET_CHOOSE_TRIES = 8
+RULE_SET_CHOOSELEAF_TRIES = 9
+RULE_SET_CHOOSE_LOCAL_TRIES = 10
+RULE_SET_CHOOSE_LOCAL_FALLBACK_TRIES = 11
+RULE_SET_CHOOSELEAF_VARY_R = 12
+RULE_SET_CHOOSELEAF_STABLE = 13
+
+# Rule types, as pools use them
+RULE_TYPE_REPLICATED = 1
+RULE_TYPE_ERASURE = 3
+
+# Weights are 16.16 fixed point
+WEIGHT_ONE = 0x10000
+
+# (name, struct format, value before the field was added), in encoding
+# order.  A map from an older monitor stops partway through.
+TUNABLES = (
+    ('choose_local_tries', 'I', 2),
+    ('choose_local_fallback_tries', 'I', 5),
+    ('choose_total_tries', 'I', 19),
+    ('chooseleaf_descend_once', 'I', 0),
+    ('chooseleaf_vary_r', 'B', 0),
+    ('straw_calc_version', 'B', 0),
+    ('allowed_bucket_algs', 'I', (1 << BUCKET_UNIFORM) |
+     (1 << BUCKET_LIST) | (1 << BUCKET_STRAW)),
+    ('chooseleaf_stable', 'B', 0),
+)
+
+
+def weight_to_fixed(weight):
+    """Convert a weight such as 1.82 into the map's 16.16 fixed point."""
+    return int(weight * WEIGHT_ONE)
+
+
+class Bucket(object):
+    """One bucket of a CRUSH map.
+
+    :param id: The bucket's id, always negative
+    :param type: The type id, a key of CrushMap.types
+    :param alg: One of the BUCKET_* algorithms
+    :param hash: The hash function, always HASH_RJENKINS1
+    :param items: list of the item ids in the bucket
+    :param weights: list of the items' 16.16 fixed point weights
+    :param straws: For straw buckets, the decoded straw lengths, or None
+        to compute them when the map is encoded
+    """
+
+    def __init__(self, id, type, alg=BUCKET_STRAW2, hash=HASH_RJENKINS1,
+                 items=(), weights=(), straws=None):
+        self.id = id
+        self.type = type
+        self.alg = alg
+        self.hash = hash
+        self.items = list(items)
+        self.weights = list(weights)
+        self.straws = straws
+        self.weight = sum(self.weights)
+
+    def __repr__(self):
+        return 'Bucket(id={}, type={}, alg={}, items={})'.format(
+            self.id, self.type, self.alg, self.items)
+
+    def _changed(self):
+        self.weight = sum(self.weights)
+        # Recomputed with the map's straw_calc_version on encode, which is
+        # what the monitors do to a bucket they change
+        self.straws = None
+
+    def weight_of(self, item):
+        """The 16.16 weight of an item in this bucket."""
+        return self.weights[self.items.index(item)]
+
+    def add_item(self, item, weight):
+        """Append an item with a 16.16 weight.
+
+        :raise ValueError: Raises if the item is already in the bucket, or
+            its weight differs from the rest of a uniform bucket
+        """
+        if item in self.items:
+            raise ValueError("Item {} is already in bucket {}".format(
+                item, self.id))
+        if self.alg == BUCKET_UNIFORM and self.weights and \
+                weight != self.weights[0]:
+            raise ValueError("Uniform bucket {} only holds items of weight "
+                             "{}".format(self.id, self.weights[0]))
+        self.items.append(item)
+        self.weights.append(weight)
+        self._changed()
+
+    def remove_item(self, item):
+        """Remove an item.
+
+        :raise ValueError: Raises if the item isn't in the bucket
+        """
+        index = self.items.index(item)
+        del self.items[index]
+        del self.weights[index]
+        self._changed()
+
+    def set_item_weight(self, item, weight):
+        """Set an item's 16.16 weight.
+
+        :return: int, the change in the bucket's weight
+        """
+        index = self.items.index(item)
+        if self.alg == BUCKET_UNIFORM:
+            # Every item of a uniform bucket shares one weight
+            self.weights = [weight] * len(self.items)
+        else:
+            self.weights[index] = weight
+        before = self.weight
+        self._changed()
+        return self.weight - before
+
+
+class Rule(object):
+    """One rule of a CRUSH map.
+
+    :param ruleset: The ruleset pools refer to it by
+    :param type: RULE_TYPE_REPLICATED or RULE_TYPE_ERASURE
+    :param min_size: Smallest pool size the rule applies to
+    :param max_size: Largest pool size the rule applies to
+    :param steps: list of (op, arg1, arg2) tuples
+    """
+
+    def __init__(self, ruleset, type, min_size, max_size, steps=()):
+        self.ruleset = ruleset
+        self.type = type
+        self.min_size = min_size
+        self.max_size = max_size
+        self.steps = list(steps)
+
+    def __repr__(self):
+        return 'Rule(ruleset={}, steps={})'.format(self.ruleset, self.steps)
+
+
+class _Decoder(object):
+    def __init__(self, data):
+        self.data = memoryview(data)
+        self.pos = 0
+
+    def end(self):
+        return self.pos >= len(self.data)
+
+    def take(self, fmt):
+        value = struct.unpack_from('<' + fmt, self.data, self.pos)
+        self.pos += struct.calcsize('<' + fmt)
+        return value if len(value) > 1 else value[0]
+
+    def array(self, fmt, count):
+        fmt = '<{}{}'.format(count, fmt)
+        values = struct.unpack_from(fmt, self.data, self.pos)
+        self.pos += struct.calcsize(fmt)
+        return list(values)
+
+    def string(self):
+        length = self.take('I')
+        value = self.data[self.pos:self.pos + length].tobytes()
+        self.pos += length
+        return value.decode('utf-8')
+
+    def string_map(self):
+        return dict((self.take('i'), self.string())
+                    for _ in range(self.take('I')))
+
+
+def _pack_string_map(names):
+    parts = [struct.pack('<I', len(names))]
+    for key in sorted(names):
+        value = names[key]
+        if isinstance(value, six.text_type):
+            value = value.encode('utf-8')
+        parts.append(struct.pack('<iI', key, len(value)))
+        parts.append(value)
+    return b''.join(parts)
+
+
+def calc_straws(weights, straw_calc_version):
+    """Straw lengths for a straw bucket, as crush_calc_straw() computes
+    them.
+
+    :param weights: list of 16.16 item weights
+    :param straw_calc_version: The map's straw_calc_version tunable
+    :return: list of int straw lengths
+    """
+    size = len(weights)
+    straws = [0] * size
+    # Indexes in ascending order of weight, ties kept in item order
+    reverse = sorted(range(size), key=lambda i: weights[i])
+    numleft = size
+    straw = 1.0
+    wbelow = 0.0
+    lastw = 0.0
+    i = 0
+    while i < size:
+        if weights[reverse[i]] == 0:
+            straws[reverse[i]] = 0
+            i += 1
+            if straw_calc_version >= 1:
+                numleft -= 1
+            continue
+        straws[reverse[i]] = int(straw * 0x10000)
+        i += 1
+        if i == size:
+            break
+        if straw_calc_version == 0:
+            if weights[reverse[i]] == weights[reverse[i - 1]]:
+                continue
+            wbelow += (float(weights[reverse[i - 1]]) - lastw) * numleft
+            for j in range(i, size):
+                if weights[reverse[j]] == weights[reverse[i]]:
+                    numleft -= 1
+                else:
+                    break
+        else:
+            wbelow += (float(weights[reverse[i - 1]]) - lastw) * numleft
+            numleft -= 1
+        # Unsigned 32 bit arithmetic in the C original
+        wnext = numleft * (weights[reverse[i]] - weights[reverse[i - 1]]) \
+            & 0xffffffff
+        pbelow = wbelow / (wbelow + wnext)
+        straw *= math.pow(1.0 / pbelow, 1.0 / numleft)
+        lastw = weights[reverse[i - 1]]
+    return straws
+
+
+def _tree_depth(size):
+    if size == 0:
+        return 0
+    depth = 1
+    t = size - 1
+    while t:
+        t >>= 1
+        depth += 1
+    return depth
+
+
+def _tree_height(node):
+    height = 0
+    while node & 1 == 0:
+        height += 1
+        node >>= 1
+    return height
+
+
+def _tree_parent(node):
+    height = _tree_height(node)
+    if node & (1 << (height + 1)):
+        return node - (1 << height)
+    return node + (1 << height)
+
+
+def tree_node(index):
+    """The node of a tree bucket that holds its index'th item."""
+    return ((index + 1) << 1) - 1
+
+
+def tree_node_weights(weights):
+    """The node weights of a tree bucket, as crush_make_tree_bucket()
+    computes them.
+
+    :param weights: list of 16.16 item weights
+    :return: list of int node weights
+    """
+    depth = _tree_depth(len(weights))
+    if depth == 0:
+        return []
+    nodes = [0] * (1 << depth)
+    for index, weight in enumerate(weights):
+        node = tree_node(index)
+        nodes[node] = weight
+        for _ in range(1, depth):
+            node = _tree_parent(node)
+            nodes[node] += weight
+    return nodes
+
+
+class CrushMap(object):
+    """A decoded CRUSH map.
+
+    :ivar buckets: dict of bucket id to Bucket
+    :ivar rules: dict of rule id to Rule
+    :ivar max_devices: One more than the highest device id
+    :ivar types: dict of type id to name, eg: {0: 'osd', 1: 'host'}
+    :ivar names: dict of device and bucket id to name
+    :ivar rule_names: dict of rule id to name
+    :ivar tunables: dict of the TUNABLES the map carries to their value
+    """
+
+    def __init__(self):
+        self.buckets = {}
+        self.rules = {}
+        self.max_buckets = 0
+        self.max_rules = 0
+        self.max_devices = 0
+        self.types = {}
+        self.names = {}
+        self.rule_names = {}
+        self.tunables = {}
+        self._tail = b''
+
+    def tunable(self, name):
+        """A tunable's value, or its legacy value if the map predates it."""
+        for field, fmt, legacy in TUNABLES:
+            if field == name:
+                return self.tunables.get(name, legacy)
+        raise KeyError(name)
+
+    @classmethod
+    def decode(cls, data):
+        """Decode the outbuf of osd getcrushmap.
+
+        :param data: bytes or a buffer holding the encoded map
+        :return: CrushMap
+        :raise ValueError: Raises if data isn't an encoded CRUSH map
+        """
+        crush = cls()
+        d = _Decoder(data)
+        try:
+            if d.take('I') != CRUSH_MAGIC:
+                raise ValueError("Not a CRUSH map, the magic is wrong")
+            crush.max_buckets, crush.max_rules, crush.max_devices = \
+                d.take('iIi')
+            for _ in range(crush.max_buckets):
+                bucket = cls._decode_bucket(d)
+                if bucket is not None:
+                    crush.buckets[bucket.id] = bucket
+            for rule_id in range(crush.max_rules):
+                if not d.take('I'):
+                    continue
+                length, ruleset, rule_type, min_size, max_size = \
+                    d.take('I4B')
+                steps = [d.take('Iii') for _ in range(length)]
+                crush.rules[rule_id] = Rule(ruleset, rule_type, min_size,
+                                            max_size, steps)
+            crush.types = d.string_map()
+            crush.names = d.string_map()
+            crush.rule_names = d.string_map()
+            # Each tunable was appended in a later release, so a map from
+            # an older monitor simply ends early.  The first three always
+            # come together.
+            for name, fmt, legacy in TUNABLES:
+                if d.end():
+                    break
+                crush.tunables[name] = d.take(fmt)
+        except struct.error:
+            raise ValueError("Truncated CRUSH map")
+        crush._tail = d.data[d.pos:].tobytes()
+        return crush
+
+    @staticmethod
+    def _decode_bucket(d):
+        if not d.take('I'):
+            return None
+        bucket_id, bucket_type, alg, hash_, weight, size = d.take('iHBBII')
+        items = d.array('i', size)
+        straws = None
+        if alg == BUCKET_UNIFORM:
+            weights = [d.take('I')] * size
+        elif alg in (BUCKET_LIST, BUCKET_STRAW):
+            pairs = d.array('I', size * 2)
+            weights = pairs[0::2]
+            if alg == BUCKET_STRAW:
+                straws = pairs[1::2]
+        elif alg == BUCKET_TREE:
+            nodes = d.array('I', d.take('B'))
+            weights = [nodes[tree_node(i)] for i in range(size)]
+        elif alg == BUCKET_STRAW2:
+            weights = d.array('I', size)
+        else:
+            raise ValueError("Unknown bucket algorithm {}".format(alg))
+        bucket = Bucket(bucket_id, bucket_type, alg, hash_, items, weights,
+                        straws)
+        bucket.weight = weight
+        return bucket
+
+    def encode(self):
+        """Encode the map for osd setcrushmap.
+
+        :return: bytes
+        """
+        straw_calc_version = self.tunable('straw_calc_version')
+        parts = [struct.pack('<IiIi', CRUSH_MAGIC, self.max_buckets,
+                             self.max_rules, self.max_devices)]
+        for index in range(self.max_buckets):
+            bucket = self.buckets.get(-1 - index)
+            if bucket is None:
+                parts.append(struct.pack('<I', 0))
+                continue
+            size = len(bucket.items)
+            parts.append(struct.pack(
+                '<IiHBBII{}i'.format(size), bucket.alg, bucket.id,
+                bucket.type, bucket.alg, bucket.hash, bucket.weight, size,
+                *bucket.items))
+            if bucket.alg == BUCKET_UNIFORM:
+                parts.append(struct.pack(
+                    '<I', bucket.weights[0] if size else 0))
+            elif bucket.alg == BUCKET_LIST:
+                total = 0
+                for weight in bucket.weights:
+                    total += weight
+                    parts.append(struct.pack('<II', weight, total))
+            elif bucket.alg == BUCKET_TREE:
+                nodes = tree_node_weights(bucket.weights)
+                parts.append(struct.pack('<B{}I'.format(len(nodes)),
+                                         len(nodes), *nodes))
+            elif bucket.alg == BUCKET_STRAW:
+                if bucket.straws is None:
+                    bucket.straws = calc_straws(bucket.weights,
+                                                straw_calc_version)
+                for weight, straw in zip(bucket.weights, bucket.straws):
+                    parts.append(struct.pack('<II', weight, straw))
+            else:
+                parts.append(struct.pack('<{}I'.format(size),
+                                         *bucket.weights))
+        for index in range(self.max_rules):
+            rule = self.rules.get(index)
+            if rule is None:
+                parts.append(struct.pack('<I', 0))
+                continue
+            parts.append(struct.pack('<II4B', 1, len(rule.steps),
+                                     rule.ruleset, rule.type,
+                                     rule.min_size, rule.max_size))
+            for step in rule.steps:
+                parts.append(struct.pack('<Iii', *step))
+        parts.append(_pack_string_map(self.types))
+        parts.append(_pack_string_map(self.names))
+        parts.append(_pack_string_map(self.rule_names))
+        for name, fmt, legacy in TUNABLES:
+            if name not in self.tunables:
+                break
+            parts.append(struct.pack('<' + fmt, self.tunables[name]))
+        parts.append(self._tail)
+        return b''.join(parts)
+
+    def item_id(self, name):
+        """The id of the device or bucket with the given name.
+
+        :raise KeyError: Raises if there is no such item
+        """
+        for item, item_name in self.names.items():
+            if item_name == name:
+                return item
+        raise KeyError(name)
+
+    def type_id(self, name):
+        """The id of the bucket type with the given name.
+
+        :raise KeyError: Raises if there is no such type
+        """
+        for type_id, type_name in self.types.items():
+            if type_name == name:
+                return type_id
+        raise KeyError(name)
+
+    def rule_id(self, name):
+        """The id of the rule with the given name.
+
+        :raise KeyError: Raises if there is no such rule
+        """
+        for rule_id, rule_name in self.rule_names.items():
+            if rule_name == name:
+                return rule_id
+        raise KeyError(name)
+
+    def parents(self, item):
+        """The buckets an item is directly in.
+
+        :return: list of Bucket
+        """
+        return [bucket for bucket in self.buckets.values()
+                if item in bucket.items]
+
+    def subtree_contains(self, root, item):
+        """Whether item is root or anywhere beneath it."""
+        if root == item:
+            return True
+        bucket = self.buckets.get(root)
+        if bucket is None:
+            return False
+        return any(self.subtree_contains(child, item)
+                   for child in bucket.items)
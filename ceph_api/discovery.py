@@ -0,0 +1,227 @@
+"""Command classes built from the commands a cluster says it supports.
+
+Rather than picking one of the bundled releases, discover_classes() asks
+the monitors for get_command_descriptions and builds the command classes
+from the answer, validated the same way as the bundled ones::
+
+    classes = discover_classes('/etc/ceph/ceph.conf')
+    osd = classes['OsdCommand']('/etc/ceph/ceph.conf')
+    outbuf, outs = osd.osd_dump()
+
+The descriptions are saved under cache_dir keyed by the cluster's fsid
+and version, so later processes only pay for the fsid and version round
+trips until the monitors are upgraded.
+"""
+import errno
+import json
+import os
+import re
+import tempfile
+
+from ceph_api import output
+from ceph_api.connection import CephError, run_ceph_command
+from ceph_api.schema import COMMAND_CLASSES, command_class
+
+__author__ = 'Chris Holcombe <chris.holcombe@canonical.com>'
+
+DEFAULT_CACHE_DIR = os.path.join(
+    os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache'),
+    'ceph_api')
+
+# Bumped when the layout of the cache files changes
+CACHE_FORMAT = 1
+
+# First word of a prefix -> the class its command goes on.  Anything not
+# listed goes on MonitorCommand.
+PREFIX_CLASSES = {
+    'pg': 'PlacementGroupCommand',
+    'mds': 'MdsCommand',
+    'fs': 'MdsCommand',
+    'osd': 'OsdCommand',
+    'auth': 'AuthCommand',
+    'config-key': 'ConfigKeyCommand',
+}
+
+# The command description flags for obsolete and hidden commands
+_FLAG_OBSOLETE = 2
+_FLAG_HIDDEN = 32
+
+# The argument fields the command table keeps
+_ARG_FIELDS = ('name', 'type', 'strings', 'range', 'goodchars', 'n')
+
+_VERSION = re.compile(r'(\d+(?:\.\d+)*)')
+
+
+def parse_command_descriptions(outbuf):
+    """Turn get_command_descriptions output into a command table.
+
+    Method names follow the bundled classes: the prefix with spaces and
+    dashes made underscores, and _2, _3 and so on added when two
+    signatures share a prefix.  Required arguments are put before
+    optional ones.
+
+    :param outbuf: The JSON outbuf of get_command_descriptions
+    :return: dict of command class name to a list of
+        (method, prefix, help, args) tuples
+    """
+    descriptions = output.loads(outbuf)
+    table = dict((name, []) for name in COMMAND_CLASSES)
+    seen = {}
+    # The keys are cmd1 .. cmdN in the order the monitors list them,
+    # which decides the _2 suffixes, so sort by the number
+    for key in sorted(descriptions, key=lambda key: int(key[3:])):
+        description = descriptions[key]
+        flags = int(description.get('flags', 0))
+        if flags & (_FLAG_OBSOLETE | _FLAG_HIDDEN):
+            continue
+        words = []
+        required = []
+        optional = []
+        for item in description['sig']:
+            if not isinstance(item, dict):
+                words.append(item)
+                continue
+            if item.get('type') == 'CephPrefix':
+                words.append(item['prefix'])
+                continue
+            arg = tuple((field, item[field]) for field in _ARG_FIELDS
+                        if field in item)
+            if item.get('n', 'N') != 'N':
+                arg = tuple(pair for pair in arg if pair[0] != 'n')
+            if item.get('req') in ('false', False):
+                optional.append(arg + (('req', False),))
+            else:
+                required.append(arg)
+        prefix = ' '.join(words)
+        method = re.sub(r'[ -]', '_', prefix)
+        seen[method] = seen.get(method, 0) + 1
+        if seen[method] > 1:
+            method = '{}_{}'.format(method, seen[method])
+        name = PREFIX_CLASSES.get(words[0], 'MonitorCommand')
+        table[name].append((method, prefix, description.get('help', ''),
+                            tuple(required + optional)))
+    return table
+
+
+def cluster_identity(rados_config_file, name=None, keyring=None):
+    """Ask the monitors for the cluster's fsid and version.
+
+    :param rados_config_file: The ceph.conf configuration location
+    :param name: The client name to connect as, eg: client.admin
+    :param keyring: Path to the keyring for ``name``
+    :return: (string fsid, string version), eg: ('8ae0...', '10.2.11').
+        version is None for monitors older than hammer, which have no
+        version command.
+    """
+    def ask(prefix):
+        outbuf, outs = run_ceph_command(
+            rados_config_file, {'prefix': prefix, 'format': 'json'}, '',
+            name=name, keyring=keyring)
+        return output.loads(outbuf)[prefix]
+
+    try:
+        match = _VERSION.search(ask('version'))
+    except CephError:
+        match = None
+    return ask('fsid'), match.group(1) if match else None
+
+
+def _cache_path(cache_dir, fsid, version):
+    return os.path.join(cache_dir, '{}-{}.json'.format(fsid, version))
+
+
+def _read_cache(path):
+    try:
+        with open(path) as f:
+            cached = json.load(f)
+    except (IOError, OSError, ValueError):
+        return None
+    if cached.get('format') != CACHE_FORMAT:
+        return None
+    # JSON has no tuples, so turn the lists back into the table's shape
+    table = {}
+    for name, commands in cached['commands'].items():
+        table[name] = [
+            (method, prefix, help,
+             tuple(tuple(tuple(field) for field in arg) for arg in args))
+            for method, prefix, help, args in commands]
+    return table
+
+
+def _write_cache(path, table):
+    directory = os.path.dirname(path)
+    try:
+        os.makedirs(directory)
+    except OSError as e:
+        if e.errno != errno.EEXIST:
+            raise
+    # Written to a temporary file and renamed so a concurrent reader
+    # never sees half a file
+    fd, tmp = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump({'format': CACHE_FORMAT, 'commands': table}, f)
+        os.rename(tmp, path)
+    except Exception:
+        os.unlink(tmp)
+        raise
+
+
+def load_commands(rados_config_file, name=None, keyring=None,
+                  cache_dir=DEFAULT_CACHE_DIR, refresh=False):
+    """The command table of a running cluster.
+
+    :param rados_config_file: The ceph.conf configuration location
+    :param name: The client name to connect as, eg: client.admin
+    :param keyring: Path to the keyring for ``name``
+    :param cache_dir: Where to keep the descriptions between processes,
+        or None to always ask the cluster.  Nothing is cached for a
+        cluster that can't report its version.
+    :param refresh: Ignore any cached descriptions and ask the cluster
+    :return: dict of command class name to a list of
+        (method, prefix, help, args) tuples
+    :raise CephError: Raises CephError on command execution errors
+    :raise rados.Error: Raises on rados errors
+    """
+    path = None
+    if cache_dir is not None:
+        fsid, version = cluster_identity(rados_config_file, name=name,
+                                         keyring=keyring)
+        if version is not None:
+            path = _cache_path(cache_dir, fsid, version)
+    if path is not None and not refresh:
+        table = _read_cache(path)
+        if table is not None:
+            return table
+    outbuf, outs = run_ceph_command(
+        rados_config_file, {'prefix': 'get_command_descriptions'}, '',
+        name=name, keyring=keyring)
+    table = parse_command_descriptions(outbuf)
+    if path is not None:
+        try:
+            _write_cache(path, table)
+        except (IOError, OSError):
+            # Not being able to cache only costs the next process time
+            pass
+    return table
+
+
+def discover_classes(rados_config_file, name=None, keyring=None,
+                     cache_dir=DEFAULT_CACHE_DIR, refresh=False,
+                     module=__name__):
+    """Build command classes for exactly what a cluster supports.
+
+    :param rados_config_file: The ceph.conf configuration location
+    :param name: The client name to connect as, eg: client.admin
+    :param keyring: Path to the keyring for ``name``
+    :param cache_dir: Where to keep the descriptions between processes,
+        or None to always ask the cluster
+    :param refresh: Ignore any cached descriptions and ask the cluster
+    :param module: The __module__ to give the classes
+    :return: dict of class name to class, with the same names as the
+        release modules export
+    """
+    table = load_commands(rados_config_file, name=name, keyring=keyring,
+                          cache_dir=cache_dir, refresh=refresh)
+    return dict((class_name, command_class(class_name, commands, module))
+                for class_name, commands in table.items())
@@ -0,0 +1,1005 @@
+"""CRUSH placement computed in-process, as crush_do_rule() computes it.
+
+CrushMapper runs a CrushMap's rules for many inputs at once.  Every
+input follows the same steps, retries and collisions as the C mapper,
+but the bucket choices of all the inputs waiting on one are made
+together, so the hashing for straw and straw2 buckets is a handful of
+NumPy operations per round instead of a Python loop per item::
+
+    crush = CrushMap.decode(osd.osd_getcrushmap()[0])
+    mapper = CrushMapper(crush)
+    rule = mapper.find_rule(ruleset=0, type=1, size=3)
+    osd_sets = mapper.do_rule(rule, range(1024), 3, weights)
+
+ceph_api.placement builds PG and object placement on top of this.
+
+Requires numpy, available as the 'numpy' extra.
+"""
+import numpy as np
+
+from ceph_api import crushln
+from ceph_api.crushmap import BUCKET_LIST, BUCKET_STRAW, BUCKET_STRAW2, \
+    BUCKET_TREE, BUCKET_UNIFORM, RULE_CHOOSE_FIRSTN, RULE_CHOOSE_INDEP, \
+    RULE_CHOOSELEAF_FIRSTN, RULE_CHOOSELEAF_INDEP, RULE_EMIT, \
+    RULE_SET_CHOOSE_LOCAL_FALLBACK_TRIES, RULE_SET_CHOOSE_LOCAL_TRIES, \
+    RULE_SET_CHOOSE_TRIES, RULE_SET_CHOOSELEAF_STABLE, \
+    RULE_SET_CHOOSELEAF_TRIES, RULE_SET_CHOOSELEAF_VARY_R, RULE_TAKE, \
+    WEIGHT_ONE, _tree_height, calc_straws, tree_node_weights
+
+__author__ = 'Chris Holcombe <chris.holcombe@canonical.com>'
+
+# An empty slot in an erasure coded rule's result
+CRUSH_ITEM_NONE = 0x7fffffff
+_ITEM_UNDEF = 0x7ffffffe
+# What a tree bucket gives when its draw walks past its last item, as one
+# whose items all weigh 0 does.  The C reads past the end of the items;
+# here the draw is rejected like one from an empty bucket.
+_NO_ITEM = -(1 << 32)
+
+_HASH_SEED = 1315423911
+_MASK = 0xffffffff
+_S64_MIN = -(1 << 63)
+# Bucket draws hashed in one go
+_BLOCK = 1 << 15
+
+# What a rule generator asks the driver for
+_CHOOSE = 0
+_PERM = 1
+_DONE = 2
+
+# How a descent through the buckets ended, when not with an item
+_EMPTY = 1
+_BAD = 2
+
+
+def _mix(a, b, c):
+    # crush_hashmix(), on Python ints or numpy uint32 arrays.  Arrays are
+    # mixed in place and must all have the same shape.
+    if isinstance(a, np.ndarray):
+        return _mix_arrays(a, b, c)
+    a = (a - b - c) & _MASK
+    a ^= c >> 13
+    b = (b - c - a) & _MASK
+    b ^= (a << 8) & _MASK
+    c = (c - a - b) & _MASK
+    c ^= b >> 13
+    a = (a - b - c) & _MASK
+    a ^= c >> 12
+    b = (b - c - a) & _MASK
+    b ^= (a << 16) & _MASK
+    c = (c - a - b) & _MASK
+    c ^= b >> 5
+    a = (a - b - c) & _MASK
+    a ^= c >> 3
+    b = (b - c - a) & _MASK
+    b ^= (a << 10) & _MASK
+    c = (c - a - b) & _MASK
+    c ^= b >> 15
+    return a, b, c
+
+
+def _mix_arrays(a, b, c):
+    # uint32 arithmetic wraps as the C does, so there is nothing to mask
+    # and no temporaries beyond the one shifted operand
+    t = np.empty_like(a)
+    for shift, left in ((13, False), (8, True), (13, False), (12, False),
+                        (16, True), (5, False), (3, False), (10, True),
+                        (15, False)):
+        a -= b
+        a -= c
+        if left:
+            a ^= np.left_shift(c, shift, out=t)
+        else:
+            a ^= np.right_shift(c, shift, out=t)
+        a, b, c = b, c, a
+    return a, b, c
+
+
+def _arrays(*values):
+    # Separate same shaped uint32 copies of the values to mix in place,
+    # or the values themselves if they are all ints
+    if not any(isinstance(value, np.ndarray) for value in values):
+        return values
+    shaped = np.broadcast_arrays(*[np.asarray(value, dtype=np.uint32)
+                                   for value in values])
+    return [np.array(value, dtype=np.uint32) for value in shaped]
+
+
+def hash32_2(a, b):
+    """crush_hash32_rjenkins1_2() of two unsigned 32 bit values.
+
+    Works elementwise on numpy uint32 arrays as well as on ints.
+    """
+    a, b, x, y = _arrays(a, b, 231232, 1232)
+    h = _HASH_SEED ^ a ^ b
+    a, b, h = _mix(a, b, h)
+    x, a, h = _mix(x, a, h)
+    b, y, h = _mix(b, y, h)
+    return h
+
+
+def hash32_3(a, b, c):
+    """crush_hash32_rjenkins1_3() of three unsigned 32 bit values."""
+    a, b, c, x, y = _arrays(a, b, c, 231232, 1232)
+    h = _HASH_SEED ^ a ^ b ^ c
+    a, b, h = _mix(a, b, h)
+    c, x, h = _mix(c, x, h)
+    y, a, h = _mix(y, a, h)
+    b, x, h = _mix(b, x, h)
+    y, c, h = _mix(y, c, h)
+    return h
+
+
+def hash32_4(a, b, c, d):
+    """crush_hash32_rjenkins1_4() of four unsigned 32 bit values."""
+    a, b, c, d, x, y = _arrays(a, b, c, d, 231232, 1232)
+    h = _HASH_SEED ^ a ^ b ^ c ^ d
+    a, b, h = _mix(a, b, h)
+    c, d, h = _mix(c, d, h)
+    a, x, h = _mix(a, x, h)
+    y, b, h = _mix(y, b, h)
+    c, x, h = _mix(c, x, h)
+    y, d, h = _mix(y, d, h)
+    return h
+
+
+def crush_ln(xin):
+    """2^44 * log2(xin + 1), in the fixed point straw2 draws are made in.
+
+    :param xin: int from 0 to 0xffff
+    :return: int
+    """
+    x = xin + 1
+    iexpon = 15
+    while not x & 0x18000:
+        x <<= 1
+        iexpon -= 1
+    index1 = (x >> 8) << 1
+    rh = crushln.RH_LH[index1 - 256]
+    lh = crushln.RH_LH[index1 + 1 - 256]
+    xl64 = (x * rh) >> 48
+    lh += crushln.LL[xl64 & 0xff]
+    return (iexpon << 44) + (lh >> 4)
+
+
+_ln_table = []
+
+
+def _ln():
+    # crush_ln() of every 16 bit hash, less 2^48 so that it is <= 0
+    if not _ln_table:
+        _ln_table.append(np.array([crush_ln(u) - (1 << 48)
+                                   for u in range(0x10000)], dtype=np.int64))
+    return _ln_table[0]
+
+
+def _u32(values):
+    return (np.asarray(values, dtype=np.int64) & _MASK).astype(np.uint32)
+
+
+class _Bucket(object):
+    # A bucket laid out the way the choose functions want it
+    def __init__(self, bucket):
+        self.id = bucket.id
+        self.type = bucket.type
+        self.alg = bucket.alg
+        self.items = list(bucket.items)
+        self.weights = list(bucket.weights)
+        self.size = len(self.items)
+        self.straws = bucket.straws
+        if self.alg == BUCKET_LIST:
+            self.sum_weights = []
+            total = 0
+            for weight in self.weights:
+                total += weight
+                self.sum_weights.append(total)
+        elif self.alg == BUCKET_TREE:
+            self.nodes = tree_node_weights(self.weights)
+
+
+class CrushMapper(object):
+    """Maps inputs through a CRUSH map's rules.
+
+    :param crush: ceph_api.crushmap.CrushMap.  Straw buckets edited since
+        the map was decoded get the straws encode() would give them.
+    """
+
+    def __init__(self, crush):
+        self.crush = crush
+        self.max_devices = crush.max_devices
+        self.buckets = dict((bucket_id, _Bucket(bucket))
+                            for bucket_id, bucket in crush.buckets.items())
+        self.tunables = dict((name, crush.tunable(name)) for name in (
+            'choose_local_tries', 'choose_local_fallback_tries',
+            'choose_total_tries', 'chooseleaf_descend_once',
+            'chooseleaf_vary_r', 'chooseleaf_stable', 'straw_calc_version'))
+        # Straw and straw2 buckets of the same size share one table, so
+        # a round of choices costs the same however many buckets there
+        # are
+        self._tables = {}
+        self._rows = {}
+        groups = {}
+        for bucket in self.buckets.values():
+            if bucket.alg in (BUCKET_STRAW, BUCKET_STRAW2) and bucket.size:
+                key = (bucket.alg, bucket.size)
+                groups.setdefault(key, []).append(bucket)
+        for key, members in groups.items():
+            alg, width = key
+            items = np.zeros((len(members), width), dtype=np.int64)
+            values = np.zeros((len(members), width), dtype=np.int64)
+            for row, bucket in enumerate(members):
+                items[row, :bucket.size] = bucket.items
+                if alg == BUCKET_STRAW2:
+                    values[row, :bucket.size] = bucket.weights
+                elif bucket.straws is not None:
+                    values[row, :bucket.size] = bucket.straws
+                else:
+                    values[row, :bucket.size] = calc_straws(
+                        bucket.weights, self.tunables['straw_calc_version'])
+                self._rows[bucket.id] = (key, row)
+            self._tables[key] = (items, _u32(items), values)
+        # Per bucket lookups for rules run on whole arrays of inputs,
+        # indexed by -1 - bucket id
+        slots = max([-bucket_id for bucket_id in self.buckets] + [0])
+        self._types = np.full(slots, -1, dtype=np.int64)
+        self._algs = np.zeros(slots, dtype=np.int64)
+        self._sizes = np.zeros(slots, dtype=np.int64)
+        self._table_keys = sorted(self._tables)
+        self._keys = np.full(slots, -1, dtype=np.int64)
+        self._table_rows = np.zeros(slots, dtype=np.int64)
+        for bucket in self.buckets.values():
+            slot = -1 - bucket.id
+            self._types[slot] = bucket.type
+            self._algs[slot] = bucket.alg
+            self._sizes[slot] = bucket.size
+            if bucket.id in self._rows:
+                key, row = self._rows[bucket.id]
+                self._keys[slot] = self._table_keys.index(key)
+                self._table_rows[slot] = row
+
+    def find_rule(self, ruleset, type, size):
+        """The rule a pool uses, as crush_find_rule() picks it.
+
+        :param ruleset: The pool's crush_ruleset
+        :param type: The pool's type, eg: 1 for replicated
+        :param size: The pool's size
+        :return: int rule id, or -1 if no rule matches
+        """
+        for rule_id in sorted(self.crush.rules):
+            rule = self.crush.rules[rule_id]
+            if rule.ruleset == ruleset and rule.type == type and \
+                    rule.min_size <= size <= rule.max_size:
+                return rule_id
+        return -1
+
+    def do_rule(self, rule_id, xs, result_max, weights):
+        """Run a rule for many inputs.
+
+        :param rule_id: The rule to run
+        :param xs: The inputs, eg: the placement seeds of a pool's PGs
+        :param result_max: The most items to return for each input,
+            normally the pool size
+        :param weights: 16.16 fixed point weight of each OSD, indexed by
+            OSD id, 0 for OSDs that are out.  OSDs past the end are out.
+        :return: list with a list of items for each input.  Erasure
+            coded rules leave CRUSH_ITEM_NONE where they found nothing.
+        """
+        items, lengths = self.do_rule_array(rule_id, xs, result_max, weights)
+        return [row[:length] for row, length in zip(items.tolist(),
+                                                    lengths.tolist())]
+
+    def do_rule_array(self, rule_id, xs, result_max, weights):
+        """do_rule() with the results as arrays.
+
+        Rules made of take, choose, chooseleaf and emit steps, with the
+        local retry tunables at 0 as they are from bobtail on, run every
+        input in lockstep on whole arrays.  Anything else runs through
+        the same per input steps as do_rule().
+
+        :return: (items, lengths) numpy int64 arrays.  items has a row per
+            input, result_max wide and padded with CRUSH_ITEM_NONE.
+        """
+        xs = np.asarray(xs, dtype=np.int64).ravel() & _MASK
+        items = np.full((len(xs), result_max), CRUSH_ITEM_NONE,
+                        dtype=np.int64)
+        lengths = np.zeros(len(xs), dtype=np.int64)
+        rule = self.crush.rules.get(rule_id)
+        if rule is None:
+            return items, lengths
+        if self._lockstep(rule):
+            return self._rule_arrays(rule, xs, result_max,
+                                     np.asarray(weights, dtype=np.int64))
+        results = self._rule_rounds(rule, xs.tolist(), result_max,
+                                    [int(weight) for weight in weights])
+        for row, result in enumerate(results):
+            items[row, :len(result)] = result
+            lengths[row] = len(result)
+        return items, lengths
+
+    def _rule_rounds(self, rule, xs, result_max, weights):
+        results = [None] * len(xs)
+        waiting = []
+        for index, x in enumerate(xs):
+            generator = self._rule(rule, x, result_max, weights)
+            request = next(generator)
+            if request[0] == _DONE:
+                results[index] = request[1]
+            else:
+                waiting.append((index, x, generator, request))
+        # Each round answers every input's next bucket choice together
+        while waiting:
+            answers = self._choose_all(waiting)
+            still_waiting = []
+            for (index, x, generator, request), item in zip(waiting,
+                                                            answers):
+                request = generator.send(item)
+                if request[0] == _DONE:
+                    results[index] = request[1]
+                else:
+                    still_waiting.append((index, x, generator, request))
+            waiting = still_waiting
+        return results
+
+    def _choose_all(self, waiting):
+        answers = [None] * len(waiting)
+        grouped = {}
+        for position, (index, x, generator, request) in enumerate(waiting):
+            kind, bucket_id, r = request
+            if kind == _CHOOSE and bucket_id in self._rows:
+                key, row = self._rows[bucket_id]
+                grouped.setdefault(key, []).append((position, row, x, r))
+            else:
+                answers[position] = self._choose_one(
+                    self.buckets[bucket_id], x, r, kind)
+        for key, requests in grouped.items():
+            positions, rows, xs, rs = zip(*requests)
+            chosen = self._choose_table(key, np.array(rows), _u32(xs),
+                                        _u32(rs))
+            for position, item in zip(positions, chosen.tolist()):
+                answers[position] = item
+        return answers
+
+    def _choose_table(self, key, rows, xs, rs):
+        # bucket_straw_choose() and bucket_straw2_choose() for one table,
+        # one row per request.  argmax() keeps the first of equal draws as
+        # the C loop does.
+        alg, width = key
+        items, hash_items, values = self._tables[key]
+        out = np.empty(len(rows), dtype=np.int64)
+        # A block at a time, so the hashing stays in cache
+        block = max(1, _BLOCK // width)
+        for start in range(0, len(rows), block):
+            end = start + block
+            chunk = rows[start:end]
+            u = hash32_3(xs[start:end, None], hash_items[chunk],
+                         rs[start:end, None]) & 0xffff
+            weights = values[chunk]
+            if alg == BUCKET_STRAW2:
+                ln = _ln()[u]
+                divisor = np.where(weights > 0, weights, 1)
+                # C division truncates towards zero and ln is never
+                # positive
+                draw = np.where(weights > 0, -((-ln) // divisor), _S64_MIN)
+            else:
+                draw = u.astype(np.int64) * weights
+            out[start:end] = items[chunk, draw.argmax(axis=1)]
+        return out
+
+    def _choose_one(self, bucket, x, r, kind):
+        if kind == _PERM or bucket.alg == BUCKET_UNIFORM:
+            return self._perm_choose(bucket, x, r)
+        if bucket.alg == BUCKET_LIST:
+            for i in range(bucket.size - 1, -1, -1):
+                w = hash32_4(x, bucket.items[i] & _MASK, r,
+                             bucket.id & _MASK) & 0xffff
+                if (w * bucket.sum_weights[i]) >> 16 < bucket.weights[i]:
+                    return bucket.items[i]
+            return bucket.items[0]
+        if bucket.alg == BUCKET_TREE:
+            nodes = bucket.nodes
+            n = len(nodes) >> 1
+            while not n & 1:
+                t = (hash32_4(x, n, r, bucket.id & _MASK) * nodes[n]) >> 32
+                step = 1 << (_tree_height(n) - 1)
+                n = n - step if t < nodes[n - step] else n + step
+            if n >> 1 >= bucket.size:
+                return _NO_ITEM
+            return bucket.items[n >> 1]
+        return bucket.items[0]
+
+    def _perm_choose(self, bucket, x, r):
+        # bucket_perm_choose().  The C version keeps the permutation
+        # between calls for the same x, but it is a pure function of x
+        # and the bucket, so it is simply rebuilt.
+        size = bucket.size
+        pr = r % size
+        perm = list(range(size))
+        for p in range(min(pr + 1, size - 1)):
+            i = hash32_3(x, bucket.id & _MASK, p) % (size - p)
+            if i:
+                perm[p], perm[p + i] = perm[p + i], perm[p]
+        return bucket.items[perm[pr]]
+
+    @staticmethod
+    def _is_out(weights, item, x):
+        if item >= len(weights):
+            return True
+        weight = weights[item]
+        if weight >= WEIGHT_ONE:
+            return False
+        if weight == 0:
+            return True
+        return (hash32_2(x, item) & 0xffff) >= weight
+
+    def _rule(self, rule, x, result_max, weights):
+        # crush_do_rule() as a generator that yields each bucket choice
+        # it needs and is sent the chosen item
+        tunables = self.tunables
+        choose_tries = tunables['choose_total_tries'] + 1
+        choose_leaf_tries = 0
+        local_retries = tunables['choose_local_tries']
+        local_fallback_retries = tunables['choose_local_fallback_tries']
+        vary_r = tunables['chooseleaf_vary_r']
+        stable = tunables['chooseleaf_stable']
+        result = []
+        w = []
+        for op, arg1, arg2 in rule.steps:
+            if op == RULE_TAKE:
+                if 0 <= arg1 < self.max_devices or arg1 in self.buckets:
+                    w = [arg1]
+            elif op == RULE_SET_CHOOSE_TRIES:
+                if arg1 > 0:
+                    choose_tries = arg1
+            elif op == RULE_SET_CHOOSELEAF_TRIES:
+                if arg1 > 0:
+                    choose_leaf_tries = arg1
+            elif op == RULE_SET_CHOOSE_LOCAL_TRIES:
+                if arg1 >= 0:
+                    local_retries = arg1
+            elif op == RULE_SET_CHOOSE_LOCAL_FALLBACK_TRIES:
+                if arg1 >= 0:
+                    local_fallback_retries = arg1
+            elif op == RULE_SET_CHOOSELEAF_VARY_R:
+                if arg1 >= 0:
+                    vary_r = arg1
+            elif op == RULE_SET_CHOOSELEAF_STABLE:
+                if arg1 >= 0:
+                    stable = arg1
+            elif op in (RULE_CHOOSE_FIRSTN, RULE_CHOOSELEAF_FIRSTN,
+                        RULE_CHOOSE_INDEP, RULE_CHOOSELEAF_INDEP):
+                if not w:
+                    continue
+                firstn = op in (RULE_CHOOSE_FIRSTN, RULE_CHOOSELEAF_FIRSTN)
+                recurse_to_leaf = op in (RULE_CHOOSELEAF_FIRSTN,
+                                         RULE_CHOOSELEAF_INDEP)
+                o = []
+                c = []
+                for item in w:
+                    numrep = arg1
+                    if numrep <= 0:
+                        numrep += result_max
+                        if numrep <= 0:
+                            continue
+                    bucket = self.buckets.get(item)
+                    if bucket is None:
+                        continue
+                    out = [0] * result_max
+                    out2 = [0] * result_max
+                    if firstn:
+                        if choose_leaf_tries:
+                            recurse_tries = choose_leaf_tries
+                        elif tunables['chooseleaf_descend_once']:
+                            recurse_tries = 1
+                        else:
+                            recurse_tries = choose_tries
+                        sub = self._choose_firstn(
+                            bucket, weights, x, numrep, arg2, out, 0,
+                            result_max - len(o), choose_tries,
+                            recurse_tries, local_retries,
+                            local_fallback_retries, recurse_to_leaf, vary_r,
+                            stable, out2, 0)
+                    else:
+                        count = min(numrep, result_max - len(o))
+                        sub = self._choose_indep(
+                            bucket, weights, x, count, numrep, arg2, out, 0,
+                            choose_tries, choose_leaf_tries or 1,
+                            recurse_to_leaf, out2, 0)
+                    request = next(sub)
+                    while request[0] != _DONE:
+                        request = sub.send((yield request))
+                    count = request[1]
+                    o.extend(out[:count])
+                    c.extend(out2[:count])
+                w = c if recurse_to_leaf else o
+            elif op == RULE_EMIT:
+                result.extend(w[:result_max - len(result)])
+                w = []
+        yield _DONE, result
+
+    def _choose_firstn(self, bucket, weights, x, numrep, type, out, outpos,
+                       out_size, tries, recurse_tries, local_retries,
+                       local_fallback_retries, recurse_to_leaf, vary_r,
+                       stable, out2, parent_r):
+        # crush_choose_firstn(), finishing with (_DONE, outpos)
+        buckets = self.buckets
+        count = out_size
+        rep = 0 if stable else outpos
+        item = None
+        while rep < numrep and count > 0:
+            ftotal = 0
+            skip_rep = False
+            retry_descent = True
+            while retry_descent:
+                retry_descent = False
+                in_bucket = bucket
+                flocal = 0
+                retry_bucket = True
+                while retry_bucket:
+                    collide = False
+                    retry_bucket = False
+                    r = rep + parent_r + ftotal
+                    if in_bucket.size:
+                        if local_fallback_retries > 0 and \
+                                flocal >= in_bucket.size >> 1 and \
+                                flocal > local_fallback_retries:
+                            item = yield _PERM, in_bucket.id, r
+                        else:
+                            item = yield _CHOOSE, in_bucket.id, r
+                    if in_bucket.size == 0 or item == _NO_ITEM:
+                        reject = True
+                    else:
+                        if item >= self.max_devices:
+                            skip_rep = True
+                            break
+                        itemtype = buckets[item].type if item < 0 else 0
+                        if itemtype != type:
+                            if item >= 0 or item not in buckets:
+                                skip_rep = True
+                                break
+                            in_bucket = buckets[item]
+                            retry_bucket = True
+                            continue
+                        collide = item in out[:outpos]
+                        reject = False
+                        if not collide and recurse_to_leaf:
+                            if item < 0:
+                                sub_r = r >> (vary_r - 1) if vary_r else 0
+                                sub = self._choose_firstn(
+                                    buckets[item], weights, x,
+                                    1 if stable else outpos + 1, 0, out2,
+                                    outpos, count, recurse_tries, 0,
+                                    local_retries, local_fallback_retries,
+                                    False, vary_r, stable, None, sub_r)
+                                request = next(sub)
+                                while request[0] != _DONE:
+                                    request = sub.send((yield request))
+                                if request[1] <= outpos:
+                                    # Didn't get a leaf
+                                    reject = True
+                            else:
+                                out2[outpos] = item
+                        if not reject and not collide and itemtype == 0:
+                            reject = self._is_out(weights, item, x)
+                    if reject or collide:
+                        ftotal += 1
+                        flocal += 1
+                        if collide and flocal <= local_retries:
+                            retry_bucket = True
+                        elif local_fallback_retries > 0 and \
+                                flocal <= in_bucket.size + \
+                                local_fallback_retries:
+                            retry_bucket = True
+                        elif ftotal < tries:
+                            retry_descent = True
+                        else:
+                            skip_rep = True
+            if not skip_rep:
+                out[outpos] = item
+                outpos += 1
+                count -= 1
+            rep += 1
+        yield _DONE, outpos
+
+    def _choose_indep(self, bucket, weights, x, left, numrep, type, out,
+                      outpos, tries, recurse_tries, recurse_to_leaf, out2,
+                      parent_r):
+        # crush_choose_indep(), finishing with (_DONE, outpos + left)
+        buckets = self.buckets
+        endpos = outpos + left
+        for rep in range(outpos, endpos):
+            out[rep] = _ITEM_UNDEF
+            if out2 is not None:
+                out2[rep] = _ITEM_UNDEF
+        ftotal = 0
+        while left > 0 and ftotal < tries:
+            for rep in range(outpos, endpos):
+                if out[rep] != _ITEM_UNDEF:
+                    continue
+                in_bucket = bucket
+                while True:
+                    r = rep + parent_r
+                    if in_bucket.alg == BUCKET_UNIFORM and \
+                            in_bucket.size % numrep == 0:
+                        r += (numrep + 1) * ftotal
+                    else:
+                        r += numrep * ftotal
+                    if in_bucket.size == 0:
+                        break
+                    item = yield _CHOOSE, in_bucket.id, r
+                    if item == _NO_ITEM:
+                        break
+                    itemtype = 0
+                    if item < 0 and item in buckets:
+                        itemtype = buckets[item].type
+                    if item >= self.max_devices or (
+                            itemtype != type and
+                            (item >= 0 or item not in buckets)):
+                        out[rep] = CRUSH_ITEM_NONE
+                        if out2 is not None:
+                            out2[rep] = CRUSH_ITEM_NONE
+                        left -= 1
+                        break
+                    if itemtype != type:
+                        in_bucket = buckets[item]
+                        continue
+                    if item in out[outpos:endpos]:
+                        break
+                    if recurse_to_leaf:
+                        if item < 0:
+                            sub = self._choose_indep(
+                                buckets[item], weights, x, 1, numrep, 0,
+                                out2, rep, recurse_tries, 0, False, None, r)
+                            request = next(sub)
+                            while request[0] != _DONE:
+                                request = sub.send((yield request))
+                            if out2[rep] == CRUSH_ITEM_NONE:
+                                break
+                        else:
+                            out2[rep] = item
+                    if itemtype == 0 and self._is_out(weights, item, x):
+                        break
+                    out[rep] = item
+                    left -= 1
+                    break
+            ftotal += 1
+        for rep in range(outpos, endpos):
+            if out[rep] == _ITEM_UNDEF:
+                out[rep] = CRUSH_ITEM_NONE
+            if out2 is not None and out2[rep] == _ITEM_UNDEF:
+                out2[rep] = CRUSH_ITEM_NONE
+        yield _DONE, endpos
+
+    # The same rules run in lockstep on arrays of inputs.  Each retry of
+    # crush_choose_firstn() and crush_choose_indep() becomes a pass over
+    # the inputs still waiting on it, in the order the C loops make them.
+
+    def _lockstep(self, rule):
+        local_retries = self.tunables['choose_local_tries']
+        local_fallback_retries = self.tunables['choose_local_fallback_tries']
+        for op, arg1, arg2 in rule.steps:
+            if op == RULE_SET_CHOOSE_LOCAL_TRIES and arg1 >= 0:
+                local_retries = arg1
+            elif op == RULE_SET_CHOOSE_LOCAL_FALLBACK_TRIES and arg1 >= 0:
+                local_fallback_retries = arg1
+            elif op in (RULE_CHOOSE_FIRSTN, RULE_CHOOSELEAF_FIRSTN):
+                if local_retries or local_fallback_retries:
+                    return False
+            elif op not in (RULE_TAKE, RULE_EMIT, RULE_CHOOSE_INDEP,
+                            RULE_CHOOSELEAF_INDEP, RULE_SET_CHOOSE_TRIES,
+                            RULE_SET_CHOOSELEAF_TRIES,
+                            RULE_SET_CHOOSELEAF_VARY_R,
+                            RULE_SET_CHOOSELEAF_STABLE):
+                return False
+        return True
+
+    def _rule_arrays(self, rule, xs, result_max, weights):
+        tunables = self.tunables
+        choose_tries = tunables['choose_total_tries'] + 1
+        choose_leaf_tries = 0
+        vary_r = tunables['chooseleaf_vary_r']
+        stable = tunables['chooseleaf_stable']
+        n = len(xs)
+        result = np.full((n, result_max), CRUSH_ITEM_NONE, dtype=np.int64)
+        result_len = np.zeros(n, dtype=np.int64)
+        w = np.zeros((n, 0), dtype=np.int64)
+        wsize = np.zeros(n, dtype=np.int64)
+        for op, arg1, arg2 in rule.steps:
+            if op == RULE_TAKE:
+                if 0 <= arg1 < self.max_devices or arg1 in self.buckets:
+                    w = np.full((n, 1), arg1, dtype=np.int64)
+                    wsize = np.ones(n, dtype=np.int64)
+            elif op == RULE_SET_CHOOSE_TRIES:
+                if arg1 > 0:
+                    choose_tries = arg1
+            elif op == RULE_SET_CHOOSELEAF_TRIES:
+                if arg1 > 0:
+                    choose_leaf_tries = arg1
+            elif op == RULE_SET_CHOOSELEAF_VARY_R:
+                if arg1 >= 0:
+                    vary_r = arg1
+            elif op == RULE_SET_CHOOSELEAF_STABLE:
+                if arg1 >= 0:
+                    stable = arg1
+            elif op in (RULE_CHOOSE_FIRSTN, RULE_CHOOSELEAF_FIRSTN,
+                        RULE_CHOOSE_INDEP, RULE_CHOOSELEAF_INDEP):
+                firstn = op in (RULE_CHOOSE_FIRSTN, RULE_CHOOSELEAF_FIRSTN)
+                recurse_to_leaf = op in (RULE_CHOOSELEAF_FIRSTN,
+                                         RULE_CHOOSELEAF_INDEP)
+                numrep = arg1 if arg1 > 0 else arg1 + result_max
+                o = np.full((n, result_max), CRUSH_ITEM_NONE, dtype=np.int64)
+                c = o.copy()
+                osize = np.zeros(n, dtype=np.int64)
+                for i in range(w.shape[1] if numrep > 0 else 0):
+                    rows = np.flatnonzero((wsize > i) &
+                                          self._is_bucket(w[:, i]))
+                    if not rows.size:
+                        continue
+                    if firstn:
+                        if choose_leaf_tries:
+                            recurse_tries = choose_leaf_tries
+                        elif tunables['chooseleaf_descend_once']:
+                            recurse_tries = 1
+                        else:
+                            recurse_tries = choose_tries
+                        out, out2, count = self._firstn_arrays(
+                            w[rows, i], xs[rows], weights, numrep, arg2,
+                            result_max - osize[rows], choose_tries,
+                            recurse_tries, recurse_to_leaf, vary_r, stable)
+                    else:
+                        count = np.minimum(numrep, result_max - osize[rows])
+                        out, out2 = self._indep_arrays(
+                            w[rows, i], xs[rows], weights, count, numrep,
+                            arg2, choose_tries, choose_leaf_tries or 1,
+                            recurse_to_leaf)
+                    for column in range(numrep):
+                        got = np.flatnonzero(count > column)
+                        at = rows[got], osize[rows[got]] + column
+                        o[at] = out[got, column]
+                        c[at] = out2[got, column]
+                    osize[rows] += count
+                w = c if recurse_to_leaf else o
+                wsize = osize
+                w = w[:, :int(wsize.max()) if n else 0]
+            elif op == RULE_EMIT:
+                for column in range(w.shape[1]):
+                    got = np.flatnonzero((wsize > column) &
+                                         (result_len < result_max))
+                    result[got, result_len[got]] = w[got, column]
+                    result_len[got] += 1
+                w = np.zeros((n, 0), dtype=np.int64)
+                wsize = np.zeros(n, dtype=np.int64)
+        return result, result_len
+
+    def _is_bucket(self, items):
+        slots = -1 - items
+        found = (items < 0) & (slots < len(self._types))
+        found[found] = self._types[slots[found]] >= 0
+        return found
+
+    def _item_types(self, items):
+        # 0 for devices, -1 for bucket ids with no bucket
+        types = np.zeros(len(items), dtype=np.int64)
+        slots = -1 - items
+        inside = (items < 0) & (slots < len(self._types))
+        types[items < 0] = -1
+        types[inside] = self._types[slots[inside]]
+        return types
+
+    def _choose_arrays(self, bucket_ids, xs, rs):
+        # One choice for each (bucket, x, r), none of the buckets empty
+        out = np.empty(len(bucket_ids), dtype=np.int64)
+        slots = -1 - bucket_ids
+        keys = self._keys[slots]
+        for key in np.unique(keys).tolist():
+            sel = np.flatnonzero(keys == key)
+            if key < 0:
+                for i in sel.tolist():
+                    out[i] = self._choose_one(
+                        self.buckets[int(bucket_ids[i])], int(xs[i]),
+                        int(rs[i]), _CHOOSE)
+            else:
+                out[sel] = self._choose_table(
+                    self._table_keys[key], self._table_rows[slots[sel]],
+                    _u32(xs[sel]), _u32(rs[sel]))
+        return out
+
+    @staticmethod
+    def _is_out_arrays(weights, items, xs):
+        weight = np.zeros(len(items), dtype=np.int64)
+        inside = items < len(weights)
+        weight[inside] = weights[items[inside]]
+        out = weight == 0
+        partial = np.flatnonzero((weight > 0) & (weight < WEIGHT_ONE))
+        if partial.size:
+            draw = hash32_2(_u32(xs[partial]), _u32(items[partial])) & 0xffff
+            out[partial] = draw.astype(np.int64) >= weight[partial]
+        return out
+
+    def _descend(self, start, xs, base, ftotal, type, numrep=None):
+        # From each start bucket down to an item of the wanted type.
+        # r is base + ftotal for firstn, and scaled by numrep for indep
+        # (numrep given) as each bucket on the way dictates.  Returns the
+        # items, the r each was chosen with and a status: _EMPTY where a
+        # bucket on the way had no items or no item to give, and _BAD
+        # where the descent hit an item that can't be used.
+        n = len(start)
+        items = np.zeros(n, dtype=np.int64)
+        rs = np.zeros(n, dtype=np.int64)
+        status = np.zeros(n, dtype=np.int8)
+        current = start.copy()
+        todo = np.arange(n)
+        while todo.size:
+            slots = -1 - current[todo]
+            if numrep is None:
+                r = base[todo] + ftotal[todo]
+            else:
+                uniform = (self._algs[slots] == BUCKET_UNIFORM) & \
+                    (self._sizes[slots] % numrep == 0)
+                r = base[todo] + np.where(uniform, numrep + 1,
+                                          numrep) * ftotal[todo]
+            empty = self._sizes[slots] == 0
+            status[todo[empty]] = _EMPTY
+            todo = todo[~empty]
+            r = r[~empty]
+            item = self._choose_arrays(current[todo], xs[todo], r)
+            missed = item == _NO_ITEM
+            status[todo[missed]] = _EMPTY
+            todo = todo[~missed]
+            item = item[~missed]
+            r = r[~missed]
+            items[todo] = item
+            rs[todo] = r
+            types = self._item_types(item)
+            bad = item >= self.max_devices
+            deeper = ~bad & (types != type)
+            bad |= deeper & ((item >= 0) | (types < 0))
+            deeper &= ~bad
+            status[todo[bad]] = _BAD
+            current[todo[deeper]] = item[deeper]
+            todo = todo[deeper]
+        return items, rs, status
+
+    def _firstn_arrays(self, roots, xs, weights, numrep, type, out_size,
+                       tries, recurse_tries, recurse_to_leaf, vary_r,
+                       stable):
+        # crush_choose_firstn() from outpos 0 with no parent r and no
+        # local retries.  Returns out, out2 and the count of each row.
+        n = len(xs)
+        out = np.full((n, numrep), _ITEM_UNDEF, dtype=np.int64)
+        out2 = out.copy()
+        outpos = np.zeros(n, dtype=np.int64)
+        columns = np.arange(numrep)
+        ftotal = np.zeros(n, dtype=np.int64)
+        for rep in range(numrep):
+            waiting = np.flatnonzero(outpos < out_size)
+            ftotal[:] = 0
+            while waiting.size:
+                x = xs[waiting]
+                pos = outpos[waiting]
+                item, r, status = self._descend(
+                    roots[waiting], x, np.full(len(waiting), rep,
+                                               dtype=np.int64),
+                    ftotal[waiting], type)
+                ok = status == 0
+                earlier = columns < pos[:, None]
+                collide = ok & ((out[waiting] == item[:, None]) &
+                                earlier).any(axis=1)
+                check = ok & ~collide
+                reject = status == _EMPTY
+                if recurse_to_leaf:
+                    sub = np.flatnonzero(check & (item < 0))
+                    if sub.size:
+                        sub_r = r[sub] >> (vary_r - 1) if vary_r else \
+                            np.zeros(sub.size, dtype=np.int64)
+                        reject[sub] = ~self._leaf_firstn(
+                            item[sub], x[sub], weights, sub_r,
+                            waiting[sub], pos[sub], out2, recurse_tries,
+                            stable)
+                    leaf = np.flatnonzero(check & (item >= 0))
+                    out2[waiting[leaf], pos[leaf]] = item[leaf]
+                if type == 0:
+                    device = np.flatnonzero(check & ~reject)
+                    reject[device] = self._is_out_arrays(
+                        weights, item[device], x[device])
+                placed = np.flatnonzero(check & ~reject)
+                out[waiting[placed], pos[placed]] = item[placed]
+                outpos[waiting[placed]] += 1
+                failed = waiting[collide | reject]
+                ftotal[failed] += 1
+                waiting = failed[ftotal[failed] < tries]
+        return out, out2, outpos
+
+    def _leaf_firstn(self, buckets, xs, weights, parent_r, rows, outpos,
+                     out2, tries, stable):
+        # The chooseleaf recursion of crush_choose_firstn(): one rep into
+        # out2[rows, outpos].  Returns whether each found a leaf.
+        m = len(buckets)
+        got = np.zeros(m, dtype=bool)
+        base = parent_r + (0 if stable else outpos)
+        ftotal = np.zeros(m, dtype=np.int64)
+        columns = np.arange(out2.shape[1])
+        waiting = np.arange(m)
+        while waiting.size:
+            item, r, status = self._descend(buckets[waiting], xs[waiting],
+                                            base[waiting], ftotal[waiting],
+                                            0)
+            pos = outpos[waiting]
+            ok = status == 0
+            earlier = columns < pos[:, None]
+            collide = ok & ((out2[rows[waiting]] == item[:, None]) &
+                            earlier).any(axis=1)
+            check = np.flatnonzero(ok & ~collide)
+            reject = status == _EMPTY
+            reject[check] = self._is_out_arrays(weights, item[check],
+                                                xs[waiting[check]])
+            placed = np.flatnonzero(ok & ~collide & ~reject)
+            out2[rows[waiting[placed]], pos[placed]] = item[placed]
+            got[waiting[placed]] = True
+            failed = waiting[collide | reject]
+            ftotal[failed] += 1
+            waiting = failed[ftotal[failed] < tries]
+        return got
+
+    def _indep_arrays(self, roots, xs, weights, left, numrep, type, tries,
+                      recurse_tries, recurse_to_leaf):
+        # crush_choose_indep() from outpos 0 with no parent r, filling
+        # the first left[i] slots of each row
+        unused = np.arange(numrep) >= left[:, None]
+        out = np.where(unused, CRUSH_ITEM_NONE, _ITEM_UNDEF)
+        out2 = out.copy()
+        for ftotal in range(tries):
+            if not (out == _ITEM_UNDEF).any():
+                break
+            for rep in range(numrep):
+                waiting = np.flatnonzero(out[:, rep] == _ITEM_UNDEF)
+                if not waiting.size:
+                    continue
+                x = xs[waiting]
+                item, r, status = self._descend(
+                    roots[waiting], x, np.full(len(waiting), rep,
+                                               dtype=np.int64),
+                    np.full(len(waiting), ftotal, dtype=np.int64), type,
+                    numrep)
+                bad = waiting[status == _BAD]
+                out[bad, rep] = CRUSH_ITEM_NONE
+                out2[bad, rep] = CRUSH_ITEM_NONE
+                ok = status == 0
+                collide = ok & (out[waiting] == item[:, None]).any(axis=1)
+                keep = ok & ~collide
+                if recurse_to_leaf:
+                    sub = np.flatnonzero(keep & (item < 0))
+                    if sub.size:
+                        leaf = self._leaf_indep(item[sub], x[sub], weights,
+                                                rep + r[sub], numrep,
+                                                recurse_tries)
+                        out2[waiting[sub], rep] = leaf
+                        keep[sub] = leaf != CRUSH_ITEM_NONE
+                    leaf = np.flatnonzero(keep & (item >= 0))
+                    out2[waiting[leaf], rep] = item[leaf]
+                if type == 0:
+                    device = np.flatnonzero(keep)
+                    keep[device] = ~self._is_out_arrays(
+                        weights, item[device], x[device])
+                out[waiting[keep], rep] = item[keep]
+        out[out == _ITEM_UNDEF] = CRUSH_ITEM_NONE
+        out2[out2 == _ITEM_UNDEF] = CRUSH_ITEM_NONE
+        return out, out2
+
+    def _leaf_indep(self, buckets, xs, weights, base, numrep, tries):
+        # The chooseleaf recursion of crush_choose_indep() for one rep
+        m = len(buckets)
+        leaf = np.full(m, _ITEM_UNDEF, dtype=np.int64)
+        for ftotal in range(tries):
+            waiting = np.flatnonzero(leaf == _ITEM_UNDEF)
+            if not waiting.size:
+                break
+            item, r, status = self._descend(
+                buckets[waiting], xs[waiting], base[waiting],
+                np.full(len(waiting), ftotal, dtype=np.int64), 0, numrep)
+            leaf[waiting[status == _BAD]] = CRUSH_ITEM_NONE
+            ok = np.flatnonzero(status == 0)
+            ok = ok[~self._is_out_arrays(weights, item[ok],
+                                         xs[waiting[ok]])]
+            leaf[waiting[ok]] = item[ok]
+        leaf[leaf == _ITEM_UNDEF] = CRUSH_ITEM_NONE
+        return leaf
@@ -0,0 +1,241 @@
+"""Follow the osdmap epoch by epoch and report what each one changed.
+
+OSDMapTracker keeps the decoded osd dump of the epoch it has reached.
+Each poll() asks osd stat for the current epoch and, when it has moved,
+steps through the epochs in between, turning the difference between
+one and the next into events::
+
+    osd = OsdCommand('/etc/ceph/ceph.conf', output_format='json-raw')
+    tracker = OSDMapTracker(osd)
+    tracker.subscribe(print)
+    while True:
+        tracker.poll()
+        time.sleep(5)
+
+An unchanged epoch costs one osd stat.  Otherwise a poll fetches the
+current osd dump once and reports the changes since the last map it
+had, all tagged with the epoch it lands on.
+
+To see which epoch made each change, give max_gap: gaps of up to that
+many epochs are then read one epoch at a time.  The monitors only answer
+for incremental maps through the binary osd getmap, so that costs a full
+osd dump per epoch.  Longer gaps, and epochs the monitors have trimmed,
+still go straight to the current map.
+"""
+import collections
+
+import six
+
+from ceph_api import output
+from ceph_api.connection import CephError
+
+__author__ = 'Chris Holcombe <chris.holcombe@canonical.com>'
+
+# Most epochs to step through one at a time before jumping to the current
+# map instead.  Each one is a full osd dump, so by default none are.
+DEFAULT_MAX_GAP = 0
+
+# Pool fields that change with every pool edit and say nothing on their own
+_POOL_BOOKKEEPING = frozenset(['last_change', 'last_force_op_resend'])
+
+
+class OSDMapEvent(collections.namedtuple('OSDMapEvent', [
+        'epoch', 'kind', 'target', 'old', 'new'])):
+    """One change made by an osdmap epoch.
+
+    kind is one of:
+      osd_added, osd_removed: target is the OSD id
+      osd_up, osd_down, osd_in, osd_out: target is the OSD id
+      osd_weight, osd_primary_affinity: target is the OSD id, old and new
+      the weights
+      pool_created, pool_deleted: target is the pool id, old or new the
+      pool's osd dump entry
+      pool_changed: target is the pool id, old and new dicts of just the
+      fields that changed
+      pg_temp, primary_temp: target is the pgid, old and new the OSDs, or
+      None where there was no mapping
+      flags: old and new are the osdmap flags
+    """
+    __slots__ = ()
+
+
+def _document(outbuf):
+    # Commands return decoded JSON with output_format json, and the outbuf
+    # itself with json-raw
+    if isinstance(outbuf, (bytes, six.text_type)):
+        return output.loads(outbuf)
+    return outbuf
+
+
+def _by(entries, key):
+    return dict((entry[key], entry) for entry in entries)
+
+
+def _temps(osdmap, name, value):
+    return dict((entry['pgid'], entry[value])
+                for entry in osdmap.get(name, []))
+
+
+def diff_osdmaps(old, new):
+    """The events that take one osd dump to another.
+
+    :param old: The decoded JSON of osd dump
+    :param new: The decoded JSON of osd dump at a later epoch
+    :return: list of OSDMapEvent, tagged with new's epoch
+    """
+    epoch = new['epoch']
+    events = []
+
+    def event(kind, target, before=None, after=None):
+        events.append(OSDMapEvent(epoch, kind, target, before, after))
+
+    if old.get('flags') != new.get('flags'):
+        event('flags', None, old.get('flags'), new.get('flags'))
+
+    old_osds = _by(old.get('osds', []), 'osd')
+    new_osds = _by(new.get('osds', []), 'osd')
+    for osd_id in sorted(set(old_osds) | set(new_osds)):
+        before = old_osds.get(osd_id)
+        after = new_osds.get(osd_id)
+        if after is None:
+            event('osd_removed', osd_id, before, None)
+            continue
+        if before is None:
+            event('osd_added', osd_id, None, after)
+            before = {'up': 0, 'in': 0, 'weight': 0.0,
+                      'primary_affinity': after.get('primary_affinity')}
+        if before['up'] != after['up']:
+            event('osd_up' if after['up'] else 'osd_down', osd_id)
+        if before['in'] != after['in']:
+            event('osd_in' if after['in'] else 'osd_out', osd_id)
+        if before['weight'] != after['weight']:
+            event('osd_weight', osd_id, before['weight'], after['weight'])
+        if before.get('primary_affinity') != after.get('primary_affinity'):
+            event('osd_primary_affinity', osd_id,
+                  before.get('primary_affinity'),
+                  after.get('primary_affinity'))
+
+    old_pools = _by(old.get('pools', []), 'pool')
+    new_pools = _by(new.get('pools', []), 'pool')
+    for pool_id in sorted(set(old_pools) | set(new_pools)):
+        before = old_pools.get(pool_id)
+        after = new_pools.get(pool_id)
+        if after is None:
+            event('pool_deleted', pool_id, before, None)
+        elif before is None:
+            event('pool_created', pool_id, None, after)
+        else:
+            fields = [name for name in set(before) | set(after)
+                      if name not in _POOL_BOOKKEEPING and
+                      before.get(name) != after.get(name)]
+            if fields:
+                event('pool_changed', pool_id,
+                      dict((name, before.get(name)) for name in fields),
+                      dict((name, after.get(name)) for name in fields))
+
+    for name, value in (('pg_temp', 'osds'), ('primary_temp', 'osd')):
+        before = _temps(old, name, value)
+        after = _temps(new, name, value)
+        for pgid in sorted(set(before) | set(after)):
+            if before.get(pgid) != after.get(pgid):
+                event(name, pgid, before.get(pgid), after.get(pgid))
+    return events
+
+
+class OSDMapTracker(object):
+    """An osdmap kept current by reading the epochs it missed.
+
+    Incrementals are never applied: the monitors only hand them out
+    encoded, so every epoch change costs a full osd dump, and with
+    max_gap one per epoch of the gap.  On a large cluster that changes
+    often, poll less and keep max_gap small.
+
+    :param osd_command: An OsdCommand with output_format json or json-raw
+    :param osdmap: The decoded JSON of osd dump to start from.  Fetched by
+        the first poll() when not given.
+    :param max_gap: Most epochs to read one at a time, each with its own
+        full osd dump, so events carry the epoch that made them.  0, the
+        default, reads only the current map.
+    :ivar osdmap: The decoded JSON of osd dump at the tracked epoch
+    :ivar epoch_fetches: osd dump calls made for a single epoch
+    :ivar full_fetches: osd dump calls made for the current map
+    """
+
+    def __init__(self, osd_command, osdmap=None, max_gap=DEFAULT_MAX_GAP):
+        if osd_command.output_format == output.OUTPUT_PLAIN:
+            raise ValueError("OSDMapTracker needs an OsdCommand with JSON "
+                             "output")
+        self.osd_command = osd_command
+        self.osdmap = osdmap
+        self.max_gap = max_gap
+        self.epoch_fetches = 0
+        self.full_fetches = 0
+        self._callbacks = []
+
+    @property
+    def epoch(self):
+        """The epoch of osdmap, or None before the first poll()."""
+        return self.osdmap['epoch'] if self.osdmap is not None else None
+
+    def subscribe(self, callback):
+        """Call callback with each OSDMapEvent poll() finds.
+
+        :param callback: Callable taking an OSDMapEvent
+        """
+        self._callbacks.append(callback)
+
+    def current_epoch(self):
+        """Ask osd stat for the cluster's osdmap epoch.
+
+        :return: int
+        """
+        outbuf, outs = self.osd_command.osd_stat()
+        stat = _document(outbuf)
+        return int(stat.get('osdmap', stat)['epoch'])
+
+    def _dump(self, epoch=None):
+        if epoch is None:
+            self.full_fetches += 1
+            outbuf, outs = self.osd_command.osd_dump()
+        else:
+            self.epoch_fetches += 1
+            outbuf, outs = self.osd_command.osd_dump(epoch)
+        return _document(outbuf)
+
+    def _advance(self, osdmap):
+        events = diff_osdmaps(self.osdmap, osdmap)
+        self.osdmap = osdmap
+        return events
+
+    def poll(self):
+        """Catch up with the cluster's osdmap.
+
+        The first poll() without a starting map only fetches it, and
+        reports nothing.  Later ones fetch the current map once, or with
+        max_gap, each epoch of a gap no longer than max_gap.
+
+        :return: list of OSDMapEvent, oldest first
+        :raise CephError: Raises on command errors
+        """
+        if self.osdmap is None:
+            self.osdmap = self._dump()
+            return []
+        epoch = self.current_epoch()
+        if epoch == self.epoch:
+            return []
+        events = []
+        if not 0 < epoch - self.epoch <= self.max_gap:
+            events = self._advance(self._dump())
+        else:
+            for next_epoch in range(self.epoch + 1, epoch + 1):
+                try:
+                    osdmap = self._dump(next_epoch)
+                except CephError:
+                    # Trimmed by the monitors, so go straight to the end
+                    events.extend(self._advance(self._dump()))
+                    break
+                events.extend(self._advance(osdmap))
+        for event in events:
+            for callback in self._callbacks:
+                callback(event)
+        return events
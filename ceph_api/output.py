@@ -0,0 +1,149 @@
+"""Decoding of formatted command output.
+
+loads() uses the fastest JSON decoder that is installed: orjson, then
+ujson, then simplejson, falling back to the standard library.
+write_outbuf() saves the binary maps the getmap commands return and
+read_inbuf() prepares the maps and keyrings the upload commands send.
+"""
+import io
+import mmap
+
+import six
+
+try:
+    import orjson as _json
+    JSON_DECODER = 'orjson'
+except ImportError:
+    try:
+        import ujson as _json
+        JSON_DECODER = 'ujson'
+    except ImportError:
+        try:
+            import simplejson as _json
+            JSON_DECODER = 'simplejson'
+        except ImportError:
+            import json as _json
+            JSON_DECODER = 'json'
+
+__author__ = 'Chris Holcombe <chris.holcombe@canonical.com>'
+
+# Plain text output, the default
+OUTPUT_PLAIN = 'plain'
+# Ask for JSON and decode it
+OUTPUT_JSON = 'json'
+# Ask for JSON but return the undecoded outbuf for passthrough
+OUTPUT_JSON_RAW = 'json-raw'
+
+# Commands that only read cluster state
+READ_COMMANDS = frozenset([
+    'auth export', 'auth get', 'auth get-key', 'auth list',
+    'auth print-key', 'auth print_key',
+    'config-key exists', 'config-key get', 'config-key list',
+    'df', 'fs dump', 'fsid', 'health',
+    'mds compat show', 'mds dump', 'mds getmap', 'mds metadata', 'mds stat',
+    'mon dump', 'mon getmap', 'mon metadata', 'mon stat', 'mon_status',
+    'node ls',
+    'osd blacklist ls', 'osd blocked-by', 'osd crush dump',
+    'osd crush get-tunable', 'osd crush rule dump', 'osd crush rule list',
+    'osd crush rule ls', 'osd crush show-tunables', 'osd crush tree',
+    'osd df', 'osd dump', 'osd erasure-code-profile get',
+    'osd erasure-code-profile ls', 'osd find', 'osd getcrushmap',
+    'osd getmap', 'osd getmaxosd', 'osd ls', 'osd lspools', 'osd map',
+    'osd metadata', 'osd perf', 'osd pool get', 'osd pool get-quota',
+    'osd pool ls', 'osd pool stats', 'osd stat',
+    'osd test-reweight-by-pg', 'osd test-reweight-by-utilization',
+    'osd tree', 'osd utilization',
+    'pg debug', 'pg dump', 'pg dump_json', 'pg dump_pools_json',
+    'pg dump_stuck', 'pg getmap', 'pg ls', 'pg ls-by-osd', 'pg ls-by-pool',
+    'pg ls-by-primary', 'pg map', 'pg stat',
+    'quorum_status', 'report', 'status', 'version',
+])
+
+# Read commands whose outbuf is an encoded map rather than text
+BINARY_COMMANDS = frozenset([
+    'mds getmap', 'mon getmap', 'osd getcrushmap', 'osd getmap', 'pg getmap',
+])
+
+# Read commands that ignore the requested format
+UNFORMATTED_COMMANDS = frozenset([
+    'config-key exists', 'config-key get', 'pg debug',
+])
+
+JSON_COMMANDS = READ_COMMANDS - BINARY_COMMANDS - UNFORMATTED_COMMANDS
+
+# Commands that send the CLI's -i file as their inbuf, as (prefix,
+# argument names).  osd crush set with no arguments uploads a map, the
+# overload that places one item by id, weight and location doesn't.
+INPUT_COMMANDS = frozenset([
+    ('auth add', frozenset(['entity', 'caps'])),
+    ('auth import', frozenset()),
+    ('osd crush set', frozenset()),
+    ('osd setcrushmap', frozenset()),
+])
+
+
+def loads(outbuf):
+    """Decode a JSON outbuf.
+
+    :param outbuf: bytes or string holding a JSON document
+    :return: The decoded document, or None for an empty outbuf
+    """
+    if not outbuf:
+        return None
+    if JSON_DECODER == 'json' and isinstance(outbuf, bytes):
+        outbuf = outbuf.decode('utf-8')
+    return _json.loads(outbuf)
+
+
+def write_outbuf(outbuf, target):
+    """Write an outbuf to a file or buffer without copying it first.
+
+    Example, archiving the osdmap of every epoch:
+        osd.osd_getmap(epoch, outfile='/srv/osdmaps/{}'.format(epoch))
+
+    :param outbuf: bytes, as returned by a getmap command
+    :param target: A path to write to, a file like object with a write()
+        method, or a writable buffer such as a bytearray or an mmap that
+        is at least len(outbuf) bytes long
+    :return: int, the number of bytes written
+    :raise ValueError: Raises if a buffer is too small for the outbuf
+    """
+    data = memoryview(outbuf)
+    if isinstance(target, six.string_types):
+        with io.open(target, 'wb') as f:
+            f.write(data)
+    elif isinstance(target, mmap.mmap) or not hasattr(target, 'write'):
+        view = memoryview(target)
+        if view.format != 'B':
+            view = view.cast('B')
+        if len(view) < len(data):
+            raise ValueError("Buffer of {} bytes can't hold {} bytes".format(
+                len(view), len(data)))
+        view[:len(data)] = data
+    else:
+        target.write(data)
+    return len(data)
+
+
+def read_inbuf(inbuf='', infile=None):
+    """Turn an inbuf or infile into the bytes mon_command sends.
+
+    The rados binding only takes bytes, so a buffer is copied exactly
+    once and a file is read with a single read().
+
+    :param inbuf: bytes, or a buffer such as a bytearray, memoryview or
+        mmap
+    :param infile: A path, or a file like object with a read() method.
+        Used in place of inbuf when given.
+    :return: bytes, or inbuf unchanged if it already is bytes or a string
+    """
+    if inbuf is None:
+        inbuf = ''
+    if infile is not None:
+        if isinstance(infile, six.string_types):
+            with io.open(infile, 'rb') as f:
+                return f.read()
+        return infile.read()
+    if isinstance(inbuf, (bytearray, memoryview, mmap.mmap)):
+        return memoryview(inbuf).tobytes()
+    return inbuf
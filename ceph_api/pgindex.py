@@ -0,0 +1,290 @@
+"""Answer pg ls queries from a local index of one pg dump.
+
+pg ls, pg ls-by-pool, pg ls-by-osd and pg ls-by-primary each make the
+monitor walk the whole PG map.  PGIndex walks it once, indexing the PGs
+by pool, state, the OSDs in their up and acting sets and their
+primaries, and then answers the same queries without a round trip::
+
+    pg = PlacementGroupCommand('/etc/ceph/ceph.conf',
+                               output_format='json-raw')
+    index = PGIndex.from_outbuf(pg.pg_dump_json(['all'])[0])
+    for osd_id in draining:
+        degraded = index.pg_ls_by_osd(osd_id, states=['degraded'])
+        print(osd_id, degraded.pgid)
+
+    # Later, only fetch the PGs again once the PG map has moved on
+    version = pg_map_version(pg.pg_stat()[0])
+    if version != index.version:
+        index.refresh(PGStatsTable.from_outbuf(
+            pg.pg_dump_json(['pgs'])[0]), version)
+
+refresh() keeps the index of every PG whose state, sets and primaries
+are unchanged, so a new pg dump only costs the PGs that moved.
+
+Requires numpy, available as the 'numpy' extra.
+"""
+import numpy as np
+import six
+
+from ceph_api.pgmap import pg_map_version, state_names_mask
+from ceph_api.pgtable import NO_OSD, PGStatsTable
+
+__author__ = 'Chris Holcombe <chris.holcombe@canonical.com>'
+
+# Past this fraction of changed PGs refresh() rebuilds the index whole
+REBUILD_FRACTION = 0.25
+
+_EMPTY = np.zeros(0, dtype=np.int64)
+
+
+def _group(keys, rows):
+    # dict of each distinct key to the ascending rows holding it
+    if not len(keys):
+        return {}
+    order = np.argsort(keys, kind='mergesort')
+    keys = keys[order]
+    distinct, starts = np.unique(keys, return_index=True)
+    return dict(zip(distinct.tolist(), np.split(rows[order], starts[1:])))
+
+
+def _set_pairs(sets, rows):
+    # (OSD, row) for every OSD in the given rows of an up or acting array
+    members = sets[rows]
+    placed = members != NO_OSD
+    return members[placed], np.repeat(rows, placed.sum(axis=1))
+
+
+def _osd_id(osd):
+    # CephOsdName takes osd.N as well as N
+    if isinstance(osd, six.string_types) and osd.startswith('osd.'):
+        osd = osd[4:]
+    return int(osd)
+
+
+class PGIndex(object):
+    """PGs of one pg dump indexed the ways pg ls can select them.
+
+    The query methods take the arguments of the commands they stand in
+    for and return the matching PGs as a PGStatsTable, in the order the
+    PGs were first indexed.  A states filter matches PGs in any of the
+    given states, as it does on the monitor.
+
+    :param pgs: ceph_api.pgtable.PGStatsTable from pg dump
+    :param version: The PG map version the dump was taken at, see
+        ceph_api.pgmap.pg_map_version()
+    :param pool_names: dict of pool name to pool id, for looking pools
+        up by name in pg_ls_by_pool()
+    """
+
+    def __init__(self, pgs, version=None, pool_names=None):
+        self.version = version
+        self.pool_names = dict(pool_names or {})
+        self._build(pgs)
+
+    @classmethod
+    def from_outbuf(cls, outbuf, version=None, pool_names=None):
+        """Build from JSON pg dump, pg dump_json or pg ls output.
+
+        :param outbuf: The JSON outbuf
+        :param version: The PG map version.  Read from the outbuf when
+            not given, which only a pg dump of all or summary has.
+        :param pool_names: dict of pool name to pool id
+        :return: PGIndex
+        """
+        if version is None:
+            version = pg_map_version(outbuf)
+        return cls(PGStatsTable.from_outbuf(outbuf), version, pool_names)
+
+    def __len__(self):
+        return len(self.pgs)
+
+    def _build(self, pgs):
+        self.pgs = pgs
+        rows = np.arange(len(pgs), dtype=np.int64)
+        self._by_pgid = None
+        self._pools = _group(pgs.pool, rows)
+        self._states = _group(pgs.state, rows)
+        self._up = _group(*_set_pairs(pgs.up, rows))
+        self._acting = _group(*_set_pairs(pgs.acting, rows))
+        self._up_primary = _group(pgs.up_primary, rows)
+        self._acting_primary = _group(pgs.acting_primary, rows)
+
+    def _align(self, pgs):
+        # Reorder pgs to the rows of the same PGs in the index, or None if
+        # the two hold different PGs
+        if len(pgs) != len(self.pgs):
+            return None
+        if np.array_equal(pgs.pgid, self.pgs.pgid):
+            return pgs
+        if self._by_pgid is None:
+            self._by_pgid = np.argsort(self.pgs.pgid)
+        order = np.argsort(pgs.pgid)
+        if not np.array_equal(pgs.pgid[order],
+                              self.pgs.pgid[self._by_pgid]):
+            return None
+        rows = np.empty(len(pgs), dtype=np.int64)
+        rows[self._by_pgid] = order
+        return pgs[rows]
+
+    def refresh(self, pgs, version=None):
+        """Bring the index up to a newer pg dump.
+
+        Nothing is done if version is the one already indexed.  When the
+        dump holds the same PGs, only those whose state, up or acting set
+        or primaries changed are indexed again, otherwise the index is
+        rebuilt.
+
+        :param pgs: ceph_api.pgtable.PGStatsTable from pg dump
+        :param version: The PG map version of the new dump
+        :return: The number of PGs indexed again
+        """
+        if version is not None and version == self.version:
+            return 0
+        self.version = version
+        aligned = self._align(pgs)
+        old = self.pgs
+        if aligned is None or aligned.up.shape != old.up.shape or \
+                aligned.acting.shape != old.acting.shape:
+            self._build(pgs)
+            return len(pgs)
+        state = np.flatnonzero(aligned.state != old.state)
+        up = np.flatnonzero((aligned.up != old.up).any(axis=1))
+        acting = np.flatnonzero((aligned.acting != old.acting).any(axis=1))
+        up_primary = np.flatnonzero(aligned.up_primary != old.up_primary)
+        acting_primary = np.flatnonzero(
+            aligned.acting_primary != old.acting_primary)
+        changed = np.union1d(np.union1d(state, up), acting)
+        changed = np.union1d(np.union1d(changed, up_primary), acting_primary)
+        if len(changed) > REBUILD_FRACTION * len(aligned):
+            self._build(aligned)
+            return len(changed)
+        self.pgs = aligned
+        _move(self._states, (old.state[state], state),
+              (aligned.state[state], state))
+        _move(self._up, _set_pairs(old.up, up), _set_pairs(aligned.up, up))
+        _move(self._acting, _set_pairs(old.acting, acting),
+              _set_pairs(aligned.acting, acting))
+        _move(self._up_primary, (old.up_primary[up_primary], up_primary),
+              (aligned.up_primary[up_primary], up_primary))
+        _move(self._acting_primary,
+              (old.acting_primary[acting_primary], acting_primary),
+              (aligned.acting_primary[acting_primary], acting_primary))
+        return len(changed)
+
+    def _pool_id(self, pool):
+        if isinstance(pool, six.string_types) and not pool.isdigit():
+            try:
+                return self.pool_names[pool]
+            except KeyError:
+                raise KeyError("No pool {}".format(pool))
+        return int(pool)
+
+    def rows(self, pool=None, states=None, osd=None, primary=None,
+             acting=True):
+        """The rows of pgs matching every given condition.
+
+        :param pool: Pool id or name
+        :param states: PGs in any of these states
+        :param osd: PGs with this OSD in their set
+        :param primary: PGs whose primary is this OSD
+        :param acting: Use the acting set and primary rather than up
+        :return: numpy int array of ascending row numbers
+        :raise ValueError: Raises on an unknown state name
+        """
+        # Start from the most selective index and check the rest of the
+        # conditions against the columns of those rows alone
+        if osd is not None:
+            osd = _osd_id(osd)
+        if primary is not None:
+            primary = _osd_id(primary)
+        if pool is not None:
+            pool = self._pool_id(pool)
+        candidates = []
+        if osd is not None:
+            sets = self._acting if acting else self._up
+            candidates.append((sets.get(osd, _EMPTY), 'osd'))
+        if primary is not None:
+            primaries = self._acting_primary if acting else self._up_primary
+            candidates.append((primaries.get(primary, _EMPTY), 'primary'))
+        if pool is not None:
+            candidates.append((self._pools.get(pool, _EMPTY), 'pool'))
+        mask = None
+        if states is not None:
+            mask = state_names_mask(states)
+            if not candidates:
+                matched = [rows for state, rows in self._states.items()
+                           if state & mask]
+                if not matched:
+                    return _EMPTY
+                return np.sort(np.concatenate(matched))
+        if not candidates:
+            return np.arange(len(self.pgs), dtype=np.int64)
+        rows, chosen = min(candidates, key=lambda candidate: len(candidate[0]))
+        keep = np.ones(len(rows), dtype=bool)
+        if osd is not None and chosen != 'osd':
+            sets = self.pgs.acting if acting else self.pgs.up
+            keep &= (sets[rows] == osd).any(axis=1)
+        if primary is not None and chosen != 'primary':
+            primaries = self.pgs.acting_primary if acting \
+                else self.pgs.up_primary
+            keep &= primaries[rows] == primary
+        if pool is not None and chosen != 'pool':
+            keep &= self.pgs.pool[rows] == pool
+        if mask is not None:
+            keep &= (self.pgs.state[rows] & np.uint64(mask)) != 0
+        return rows[keep]
+
+    def pg_ls(self, states=None, pool=None):
+        """pg ls: the PGs of a pool, or of every pool.
+
+        :param states: PGs in any of these states
+        :param pool: The pool id
+        :return: PGStatsTable
+        """
+        return self.pgs[self.rows(pool=pool, states=states)]
+
+    def pg_ls_by_pool(self, poolstr, states=None):
+        """pg ls-by-pool: the PGs of a pool.
+
+        :param poolstr: The pool name, or id
+        :param states: PGs in any of these states
+        :return: PGStatsTable
+        :raise KeyError: Raises on a pool name not in pool_names
+        """
+        return self.pgs[self.rows(pool=poolstr, states=states)]
+
+    def pg_ls_by_osd(self, osd, states=None, pool=None):
+        """pg ls-by-osd: the PGs with an OSD in their acting set.
+
+        :param osd: The OSD, eg: osd.12 or 12
+        :param states: PGs in any of these states
+        :param pool: The pool id
+        :return: PGStatsTable
+        """
+        return self.pgs[self.rows(pool=pool, states=states, osd=osd)]
+
+    def pg_ls_by_primary(self, osd, states=None, pool=None):
+        """pg ls-by-primary: the PGs an OSD is the acting primary of.
+
+        :param osd: The OSD, eg: osd.12 or 12
+        :param states: PGs in any of these states
+        :param pool: The pool id
+        :return: PGStatsTable
+        """
+        return self.pgs[self.rows(pool=pool, states=states, primary=osd)]
+
+
+def _move(index, old, new):
+    # Take the old (key, row) pairs out of an index and put the new ones in
+    removed = _group(*old)
+    added = _group(*new)
+    for key in set(removed) | set(added):
+        rows = index.get(key, _EMPTY)
+        if key in removed:
+            rows = np.setdiff1d(rows, removed[key], assume_unique=True)
+        if key in added:
+            rows = np.union1d(rows, added[key])
+        if len(rows):
+            index[key] = rows
+        else:
+            index.pop(key, None)
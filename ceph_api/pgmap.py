@@ -0,0 +1,307 @@
+"""Parsing of pg dump output.
+
+A full ``pg dump`` of a large cluster is hundreds of MB of JSON, and
+decoding it with a single json.loads() builds every PG record at once.
+iter_pg_stats() walks the document a chunk at a time and yields one PG
+record at a time instead, so peak memory is the outbuf itself plus one
+record::
+
+    pg = PlacementGroupCommand('/etc/ceph/ceph.conf',
+                               output_format='json-raw')
+    outbuf, outs = pg.pg_dump_json(['pgs'])
+    for pg_stat in iter_pg_stats(outbuf):
+        print(pg_stat['pgid'], pg_stat['state'])
+
+PG states are handled as bitmasks of PG_STATE_BITS, matching the state
+filters pg ls and pg dump_stuck accept.
+"""
+import codecs
+import json
+import mmap
+
+import six
+
+__author__ = 'Chris Holcombe <chris.holcombe@canonical.com>'
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+_WHITESPACE = ' \t\n\r'
+_NUMBER_CHARS = '0123456789.eE+-'
+_decoder = json.JSONDecoder()
+
+
+class _Reader(object):
+    """A window over a JSON document that is refilled a chunk at a time."""
+
+    def __init__(self, source, chunk_size):
+        self.chunk_size = chunk_size
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+        self._utf8 = codecs.getincrementaldecoder('utf-8')()
+        if isinstance(source, (bytes, bytearray, memoryview, mmap.mmap)):
+            self._chunks = self._slices(memoryview(source))
+        elif isinstance(source, six.text_type):
+            self._chunks = self._slices(source)
+        else:
+            self._chunks = iter(lambda: source.read(chunk_size),
+                                source.read(0))
+
+    def _slices(self, data):
+        for start in range(0, len(data), self.chunk_size):
+            yield data[start:start + self.chunk_size]
+
+    def fill(self, chunks=1):
+        """Append the next chunks to the window, dropping what has been
+        consumed.  Returns False once the source is exhausted."""
+        if self.eof:
+            return False
+        parts = [self.buf[self.pos:]]
+        for _ in range(chunks):
+            try:
+                chunk = next(self._chunks)
+            except StopIteration:
+                self.eof = True
+                parts.append(self._utf8.decode(b'', final=True))
+                break
+            if not isinstance(chunk, six.text_type):
+                chunk = self._utf8.decode(bytes(chunk))
+            parts.append(chunk)
+        self.buf = ''.join(parts)
+        self.pos = 0
+        return any(parts[1:])
+
+    def peek(self):
+        """Skip whitespace and return the next character, or '' at the end
+        of the document."""
+        while True:
+            while self.pos < len(self.buf) and \
+                    self.buf[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self.fill():
+                return ''
+
+    def expect(self, chars):
+        ch = self.peek()
+        if ch == '' or ch not in chars:
+            raise ValueError("Expected one of {!r} at offset {} but found "
+                             "{!r}".format(chars, self.pos, ch))
+        self.pos += 1
+        return ch
+
+    def value(self):
+        """Decode the JSON value at the current position."""
+        self.peek()
+        chunks = 1
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buf, self.pos)
+            except ValueError:
+                if self.eof:
+                    raise
+                # Grow geometrically so a large value isn't re-parsed once
+                # per chunk
+                self.fill(chunks)
+                chunks *= 2
+                continue
+            # A number running to the end of the window may continue in
+            # the next chunk, even when the window ends in a decimal point
+            # or an exponent the decoder stopped short of
+            if not self.eof and \
+                    not self.buf[end:].strip(_NUMBER_CHARS):
+                self.fill()
+                continue
+            self.pos = end
+            return value
+
+    def skip(self):
+        """Step over the value at the current position.  Arrays are
+        skipped an item at a time so they never need decoding whole."""
+        if self.peek() == '[':
+            for _ in _iter_array(self):
+                pass
+        else:
+            self.value()
+
+
+def _iter_array(reader):
+    reader.expect('[')
+    if reader.peek() == ']':
+        reader.pos += 1
+        return
+    while True:
+        yield reader.value()
+        if reader.expect(',]') == ']':
+            return
+
+
+def _iter_object(reader, key, containers):
+    # Stream the array stored under key, descending into the objects named
+    # in containers to find it
+    reader.expect('{')
+    if reader.peek() == '}':
+        reader.pos += 1
+        return
+    while True:
+        name = reader.value()
+        reader.expect(':')
+        if name == key:
+            for item in _iter_array(reader):
+                yield item
+        elif name in containers and reader.peek() == '{':
+            for item in _iter_object(reader, key, containers):
+                yield item
+        else:
+            reader.skip()
+        if reader.expect(',}') == '}':
+            return
+
+
+def iter_json_array(source, key, containers=(),
+                    chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield the items of a JSON array one at a time without decoding the
+    whole document.
+
+    The array is either the document itself or the value stored under
+    key, found at the top level or inside one of the objects named in
+    containers.
+
+    :param source: bytes, string, memoryview, mmap or a file like object
+        with a read() method
+    :param key: Name of the array in the top level object
+    :param containers: Names of nested objects to search for key
+    :param chunk_size: How much of the source to decode at a time
+    :return: A generator of the decoded array items
+    :raise ValueError: Raises on malformed JSON
+    """
+    reader = _Reader(source, chunk_size)
+    ch = reader.peek()
+    if ch == '[':
+        items = _iter_array(reader)
+    elif ch == '{':
+        items = _iter_object(reader, key, frozenset(containers))
+    else:
+        raise ValueError("Expected a JSON array or object but found "
+                         "{!r}".format(ch))
+    for item in items:
+        yield item
+
+
+def _find_value(reader, key, containers):
+    # Decode the value stored under key, descending into the objects named
+    # in containers to find it
+    reader.expect('{')
+    if reader.peek() == '}':
+        reader.pos += 1
+        return None
+    while True:
+        name = reader.value()
+        reader.expect(':')
+        if name == key:
+            return reader.value()
+        elif name in containers and reader.peek() == '{':
+            value = _find_value(reader, key, containers)
+            if value is not None:
+                return value
+        else:
+            reader.skip()
+        if reader.expect(',}') == '}':
+            return None
+
+
+def pg_map_version(outbuf, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Read the PG map version out of JSON pg stat or pg dump output.
+
+    The version leads the document, so only its first chunk is usually
+    decoded.  The bare list printed by ``pg dump pgs`` and pg ls has no
+    version.
+
+    :param outbuf: The JSON outbuf, or a file like object to read it from
+    :param chunk_size: How much of the outbuf to decode at a time
+    :return: int, or None if the output has no version
+    :raise ValueError: Raises on malformed JSON
+    """
+    reader = _Reader(outbuf, chunk_size)
+    if reader.peek() != '{':
+        return None
+    version = _find_value(reader, 'version', frozenset(['pg_map']))
+    return int(version) if version is not None else None
+
+
+def iter_pg_stats(outbuf, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield the PG records in JSON pg dump, pg dump_json or pg ls output
+    one at a time.
+
+    Accepts the output of ``pg dump`` for any dumpcontents that includes
+    pgs, where the records are the pg_stats array, as well as the bare
+    list printed for ``pgs`` alone and by ``pg ls``.
+
+    :param outbuf: The JSON outbuf, or a file like object to read it from
+    :param chunk_size: How much of the outbuf to decode at a time
+    :return: A generator of dict, one per PG
+    :raise ValueError: Raises on malformed JSON
+    """
+    return iter_json_array(outbuf, 'pg_stats', containers=('pg_map',),
+                           chunk_size=chunk_size)
+
+
+# PG state names, in the spelling pg ls and pg dump_stuck take them
+PG_STATES = (
+    'creating', 'active', 'clean', 'down', 'replay', 'splitting',
+    'scrubbing', 'scrubq', 'degraded', 'inconsistent', 'peering', 'repair',
+    'recovering', 'backfill_wait', 'incomplete', 'stale', 'remapped',
+    'deep_scrub', 'backfill', 'backfill_toofull', 'recovery_wait',
+    'undersized', 'activating', 'peered', 'unknown',
+)
+
+# One bit per state, in PG_STATES order
+PG_STATE_BITS = dict((name, 1 << i) for i, name in enumerate(PG_STATES))
+
+# Tokens that appear in a PG's state string under another name
+_STATE_ALIASES = {
+    'deep': 'deep_scrub',
+    'wait_backfill': 'backfill_wait',
+    'backfilling': 'backfill',
+}
+
+
+def pg_state_mask(state):
+    """Convert a PG state string, eg: active+clean+scrubbing+deep, into a
+    bitmask of PG_STATE_BITS.  Unrecognised tokens are ignored.
+
+    :param state: The state field of a PG record
+    :return: int
+    """
+    mask = 0
+    for token in state.split('+'):
+        mask |= PG_STATE_BITS.get(_STATE_ALIASES.get(token, token), 0)
+    return mask
+
+
+def state_names_mask(names):
+    """Convert a list of state names, as passed to pg ls, into a bitmask.
+
+    :param names: list of names from PG_STATES
+    :return: int
+    :raise ValueError: Raises on an unknown state name
+    """
+    mask = 0
+    for name in names:
+        bit = PG_STATE_BITS.get(_STATE_ALIASES.get(name, name))
+        if bit is None:
+            raise ValueError("Unknown PG state {}".format(name))
+        mask |= bit
+    return mask
+
+
+def pg_state_string(mask):
+    """Convert a bitmask of PG_STATE_BITS back into a state string, eg:
+    active+clean.
+
+    :param mask: int bitmask
+    :return: string, the names joined with + in PG_STATES order
+    """
+    mask = int(mask)
+    return '+'.join(name for name in PG_STATES if mask & PG_STATE_BITS[name])
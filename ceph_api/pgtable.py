@@ -0,0 +1,288 @@
+"""Columnar PG statistics backed by NumPy arrays.
+
+PGStatsTable holds one array per field instead of one dict per PG, so
+questions about hundreds of thousands of PGs become vectorized masks
+and reductions::
+
+    pg = PlacementGroupCommand('/etc/ceph/ceph.conf',
+                               output_format='json-raw')
+    outbuf, outs = pg.pg_dump_json(['pgs'])
+    table = PGStatsTable.from_outbuf(outbuf)
+    degraded = table.filter(pool=7, states=['degraded'],
+                            primary=host_osd_ids)
+    pools, nbytes = table.group_by('pool', 'num_bytes')
+
+Requires numpy, available as the 'numpy' extra.
+"""
+import time
+
+import numpy as np
+import six
+
+from ceph_api.pgmap import iter_pg_stats, pg_state_mask, state_names_mask
+
+__author__ = 'Chris Holcombe <chris.holcombe@canonical.com>'
+
+# Filler for empty slots in the up and acting arrays
+NO_OSD = -1
+# CRUSH_ITEM_NONE, a hole in an erasure coded PG's up or acting set
+_CRUSH_ITEM_NONE = 0x7fffffff
+
+COLUMNS = (
+    'pgid', 'pool', 'state', 'up', 'acting', 'up_primary', 'acting_primary',
+    'num_objects', 'num_bytes', 'num_objects_degraded',
+    'num_objects_misplaced', 'num_objects_unfound', 'num_objects_recovered',
+    'num_bytes_recovered', 'num_read', 'num_read_kb', 'num_write',
+    'num_write_kb', 'log_size', 'last_scrub_stamp', 'last_deep_scrub_stamp',
+)
+
+# Columns holding one value per PG, which group_by() can key on
+_KEY_COLUMNS = ('pool', 'state', 'up_primary', 'acting_primary')
+
+_AGGREGATIONS = ('count', 'sum', 'mean', 'min', 'max')
+
+_STAT_SUM_COLUMNS = ('num_objects', 'num_bytes', 'num_objects_degraded',
+                     'num_objects_misplaced', 'num_objects_unfound',
+                     'num_objects_recovered', 'num_bytes_recovered',
+                     'num_read', 'num_read_kb', 'num_write', 'num_write_kb')
+
+
+def parse_stamps(stamps):
+    """Convert utime stamps from pg dump into seconds since the epoch.
+
+    Stamps without a UTC offset, as older monitors print them, are read as
+    local time.  A zero stamp, for a PG that was never scrubbed, becomes
+    0.0.
+
+    :param stamps: list of stamp strings
+    :return: numpy float64 array
+    """
+    local_offset = time.localtime().tm_gmtoff
+    normalized = []
+    offsets = np.zeros(len(stamps), dtype=np.int64)
+    zero = np.zeros(len(stamps), dtype=bool)
+    for i, stamp in enumerate(stamps):
+        if '-' not in stamp[1:10]:
+            zero[i] = True
+            normalized.append('1970-01-01T00:00:00')
+            continue
+        stamp = stamp.replace(' ', 'T')
+        if stamp.endswith('Z'):
+            stamp = stamp[:-1]
+        elif len(stamp) > 19 and stamp[-5] in '+-' and stamp[-4:].isdigit():
+            sign = -1 if stamp[-5] == '-' else 1
+            offsets[i] = sign * (int(stamp[-4:-2]) * 3600 +
+                                 int(stamp[-2:]) * 60)
+            stamp = stamp[:-5]
+        else:
+            offsets[i] = local_offset
+        normalized.append(stamp)
+    micros = np.array(normalized, dtype='datetime64[us]').astype(np.int64)
+    seconds = micros / 1e6 - offsets
+    seconds[zero] = 0.0
+    return seconds
+
+
+def _osd_sets(sets):
+    width = max([len(s) for s in sets] or [0])
+    out = np.full((len(sets), width), NO_OSD, dtype=np.int32)
+    for i, osds in enumerate(sets):
+        out[i, :len(osds)] = osds
+    out[out == _CRUSH_ITEM_NONE] = NO_OSD
+    return out
+
+
+class PGStatsTable(object):
+    """PG statistics stored column-wise.
+
+    Every attribute named in COLUMNS is a numpy array with one row per PG.
+    up and acting are 2-D, padded with NO_OSD, and the stamps are seconds
+    since the epoch.  state is a bitmask of ceph_api.pgmap.PG_STATE_BITS.
+
+    :param columns: dict of column name to array
+    """
+
+    def __init__(self, columns):
+        for name in COLUMNS:
+            setattr(self, name, columns[name])
+
+    @classmethod
+    def from_pg_stats(cls, pg_stats):
+        """Build a table from PG records, eg: from
+        ceph_api.pgmap.iter_pg_stats() or a decoded pg dump.
+
+        :param pg_stats: An iterable of PG record dicts
+        :return: PGStatsTable
+        """
+        values = dict((name, []) for name in COLUMNS)
+        for pg_stat in pg_stats:
+            pgid = pg_stat['pgid']
+            values['pgid'].append(pgid)
+            values['pool'].append(int(pgid.split('.', 1)[0]))
+            values['state'].append(pg_state_mask(pg_stat['state']))
+            up = pg_stat.get('up', [])
+            acting = pg_stat.get('acting', [])
+            values['up'].append(up)
+            values['acting'].append(acting)
+            values['up_primary'].append(
+                pg_stat.get('up_primary', up[0] if up else NO_OSD))
+            values['acting_primary'].append(
+                pg_stat.get('acting_primary', acting[0] if acting else NO_OSD))
+            stat_sum = pg_stat.get('stat_sum', {})
+            for name in _STAT_SUM_COLUMNS:
+                values[name].append(stat_sum.get(name, 0))
+            values['log_size'].append(pg_stat.get('log_size', 0))
+            values['last_scrub_stamp'].append(
+                pg_stat.get('last_scrub_stamp', '0.000000'))
+            values['last_deep_scrub_stamp'].append(
+                pg_stat.get('last_deep_scrub_stamp', '0.000000'))
+
+        columns = {
+            'pgid': np.array(values['pgid'], dtype=six.text_type),
+            'pool': np.array(values['pool'], dtype=np.int64),
+            'state': np.array(values['state'], dtype=np.uint64),
+            'up': _osd_sets(values['up']),
+            'acting': _osd_sets(values['acting']),
+            'up_primary': np.array(values['up_primary'], dtype=np.int32),
+            'acting_primary': np.array(values['acting_primary'],
+                                       dtype=np.int32),
+            'log_size': np.array(values['log_size'], dtype=np.int64),
+            'last_scrub_stamp': parse_stamps(values['last_scrub_stamp']),
+            'last_deep_scrub_stamp': parse_stamps(
+                values['last_deep_scrub_stamp']),
+        }
+        for name in _STAT_SUM_COLUMNS:
+            columns[name] = np.array(values[name], dtype=np.int64)
+        return cls(columns)
+
+    @classmethod
+    def from_outbuf(cls, outbuf):
+        """Build a table from JSON pg dump, pg dump_json or pg ls output.
+
+        :param outbuf: The JSON outbuf, or a file like object to read it from
+        :return: PGStatsTable
+        """
+        return cls.from_pg_stats(iter_pg_stats(outbuf))
+
+    def __len__(self):
+        return len(self.pgid)
+
+    def __getitem__(self, index):
+        """Select rows with a boolean mask, an index array or a slice.
+
+        :return: PGStatsTable
+        """
+        return PGStatsTable(dict((name, getattr(self, name)[index])
+                                 for name in COLUMNS))
+
+    def in_states(self, states):
+        """Mask of PGs in any of the given states, the way pg ls filters.
+
+        :param states: list of names from ceph_api.pgmap.PG_STATES
+        :return: numpy bool array
+        """
+        return (self.state & np.uint64(state_names_mask(states))) != 0
+
+    def in_all_states(self, states):
+        """Mask of PGs in every one of the given states.
+
+        :param states: list of names from ceph_api.pgmap.PG_STATES
+        :return: numpy bool array
+        """
+        mask = np.uint64(state_names_mask(states))
+        return (self.state & mask) == mask
+
+    def on_osds(self, osds, acting=True):
+        """Mask of PGs with any of the given OSDs in their acting (or up)
+        set.
+
+        :param osds: list of OSD ids
+        :param acting: Look at the acting set rather than the up set
+        :return: numpy bool array
+        """
+        sets = self.acting if acting else self.up
+        # NO_OSD fills the padding and holes, it never names an OSD
+        return (np.isin(sets, osds) & (sets != NO_OSD)).any(axis=1)
+
+    def filter(self, pool=None, states=None, primary=None, osds=None,
+               acting=True):
+        """Select the PGs matching every given condition.
+
+        Example, degraded PGs in pool 7 whose primary is on one host:
+            table.filter(pool=7, states=['degraded'], primary=host_osds)
+
+        :param pool: Pool id, or list of pool ids
+        :param states: PGs in any of these states
+        :param primary: PGs whose primary is one of these OSD ids
+        :param osds: PGs with any of these OSD ids in their set
+        :param acting: Use the acting set and primary rather than up
+        :return: PGStatsTable
+        """
+        mask = np.ones(len(self), dtype=bool)
+        if pool is not None:
+            mask &= np.isin(self.pool, pool)
+        if states is not None:
+            mask &= self.in_states(states)
+        if primary is not None:
+            primaries = self.acting_primary if acting else self.up_primary
+            mask &= np.isin(primaries, primary)
+        if osds is not None:
+            mask &= self.on_osds(osds, acting=acting)
+        return self[mask]
+
+    def group_by(self, key, column=None, how='sum'):
+        """Aggregate a column per distinct value of a key column.
+
+        :param key: One of pool, state, up_primary or acting_primary
+        :param column: The column to aggregate, eg: num_bytes.  Required
+            for every aggregation but count.
+        :param how: count, sum, mean, min or max
+        :return: (keys, values) numpy arrays, keys sorted ascending
+        :raise ValueError: Raises on an unknown key, aggregation or column
+        """
+        if key not in _KEY_COLUMNS:
+            raise ValueError("Can't group by {}, choose one of {}".format(
+                key, _KEY_COLUMNS))
+        if how not in _AGGREGATIONS:
+            raise ValueError("Unknown aggregation {}, choose one of "
+                             "{}".format(how, _AGGREGATIONS))
+        if how != 'count':
+            if column is None:
+                raise ValueError("{} needs a column to aggregate".format(
+                    how))
+            if column not in COLUMNS or column in ('pgid', 'up', 'acting'):
+                raise ValueError("Can't aggregate {}".format(column))
+        keys, inverse = np.unique(getattr(self, key), return_inverse=True)
+        counts = np.bincount(inverse, minlength=len(keys))
+        if how == 'count':
+            return keys, counts
+        values = getattr(self, column)
+        if how in ('sum', 'mean'):
+            totals = np.zeros(len(keys), dtype=values.dtype)
+            np.add.at(totals, inverse, values)
+            if how == 'mean':
+                return keys, totals / counts
+            return keys, totals
+        if values.dtype.kind == 'f':
+            limits = np.finfo(values.dtype)
+        else:
+            limits = np.iinfo(values.dtype)
+        if how == 'min':
+            out = np.full(len(keys), limits.max, dtype=values.dtype)
+            np.minimum.at(out, inverse, values)
+        else:
+            out = np.full(len(keys), limits.min, dtype=values.dtype)
+            np.maximum.at(out, inverse, values)
+        return keys, out
+
+    def count_by_osd(self, acting=True):
+        """Count the PGs each OSD is part of.
+
+        :param acting: Count acting sets rather than up sets
+        :return: (osd ids, PG counts) numpy arrays
+        """
+        sets = self.acting if acting else self.up
+        members = sets[sets != NO_OSD]
+        counts = np.bincount(members)
+        osds = np.nonzero(counts)[0]
+        return osds, counts[osds]
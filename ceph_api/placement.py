@@ -0,0 +1,430 @@
+"""Object and PG placement computed locally from the osd and CRUSH maps.
+
+osd map and pg map cost a monitor round trip per object or PG.
+Placement takes one osd dump and osd getcrushmap of the same epoch and
+answers the same questions in-process, for millions of objects at a
+time::
+
+    osd = OsdCommand('/etc/ceph/ceph.conf', output_format='json-raw')
+    placement = Placement.from_outbufs(osd.osd_dump()[0],
+                                       osd.osd_getcrushmap()[0])
+    pgs, up, up_primary = placement.map_objects('rbd', names)
+
+Object names are hashed with NumPy, and every PG of a pool is mapped
+through CRUSH once, so mapping objects is a lookup per object.  pg-upmap
+and the other luminous additions to the osdmap are not applied.
+
+Requires numpy, available as the 'numpy' extra.
+"""
+import numpy as np
+import six
+
+from ceph_api import output
+from ceph_api.crushmap import CrushMap, WEIGHT_ONE
+from ceph_api.mapper import CRUSH_ITEM_NONE, CrushMapper, _mix, hash32_2
+from ceph_api.pgtable import NO_OSD
+
+__author__ = 'Chris Holcombe <chris.holcombe@canonical.com>'
+
+# pg_pool_t flags and types
+FLAG_HASHPSPOOL = 1
+POOL_TYPE_REPLICATED = 1
+POOL_TYPE_ERASURE = 3
+
+# pg_pool_t object_hash values
+OBJECT_HASH_LINUX = 1
+OBJECT_HASH_RJENKINS = 2
+
+# Names are hashed this many at a time, to bound the padded buffer
+_CHUNK = 65536
+
+
+def _to_bytes(name):
+    if isinstance(name, six.text_type):
+        return name.encode('utf-8')
+    return name
+
+
+def _padded(keys, multiple):
+    # The keys as a zero padded uint8 matrix, and their lengths
+    lengths = np.array([len(key) for key in keys], dtype=np.int64)
+    longest = int(lengths.max()) if len(keys) else 0
+    width = (longest // multiple + 1) * multiple
+    matrix = np.array(keys, dtype='S{}'.format(width)).view(np.uint8)
+    return matrix.reshape(len(keys), width), lengths
+
+
+def _rjenkins_chunk(keys):
+    matrix, lengths = _padded(keys, 12)
+    words = matrix.view('<u4').astype(np.uint32)
+    rows = len(keys)
+    a = np.full(rows, 0x9e3779b9, dtype=np.uint32)
+    b = a.copy()
+    c = np.zeros(rows, dtype=np.uint32)
+    blocks = lengths // 12
+    for block in range(int(blocks.max()) if rows else 0):
+        active = np.flatnonzero(blocks > block)
+        column = block * 3
+        a[active], b[active], c[active] = _mix(
+            a[active] + words[active, column],
+            b[active] + words[active, column + 1],
+            c[active] + words[active, column + 2])
+    # The last 0 to 11 bytes.  The padding is zero, so adding whole words
+    # matches the C switch, and c's low byte holds the length.
+    index = np.arange(rows)
+    column = blocks * 3
+    a = a + words[index, column]
+    b = b + words[index, column + 1]
+    c = c + lengths.astype(np.uint32) + (words[index, column + 2] << 8)
+    return _mix(a, b, c)[2]
+
+
+def _linux_chunk(keys):
+    matrix, lengths = _padded(keys, 1)
+    h = np.zeros(len(keys), dtype=np.uint32)
+    for column in range(matrix.shape[1] - 1):
+        char = matrix[:, column].astype(np.uint32)
+        h = np.where(lengths > column, (h + (char << 4) + (char >> 4)) * 11,
+                     h)
+    return h
+
+
+def str_hash(keys, object_hash=OBJECT_HASH_RJENKINS):
+    """ceph_str_hash() of many keys.
+
+    :param keys: list of bytes
+    :param object_hash: OBJECT_HASH_RJENKINS or OBJECT_HASH_LINUX
+    :return: numpy uint32 array
+    :raise ValueError: Raises on an unknown object_hash
+    """
+    if object_hash == OBJECT_HASH_RJENKINS:
+        chunk_hash = _rjenkins_chunk
+    elif object_hash == OBJECT_HASH_LINUX:
+        chunk_hash = _linux_chunk
+    else:
+        raise ValueError("Unknown object hash {}".format(object_hash))
+    out = np.empty(len(keys), dtype=np.uint32)
+    for start in range(0, len(keys), _CHUNK):
+        chunk = keys[start:start + _CHUNK]
+        out[start:start + len(chunk)] = chunk_hash(chunk)
+    return out
+
+
+def stable_mod(x, b, bmask):
+    """ceph_stable_mod(): x mod b, stable as b grows to the next power of
+    two.  Works elementwise on numpy arrays.
+
+    :param x: The hash
+    :param b: The number of bins, eg: pg_num
+    :param bmask: The next power of two at or above b, less one
+    """
+    if isinstance(x, np.ndarray):
+        return np.where((x & bmask) < b, x & bmask, x & (bmask >> 1))
+    return x & bmask if (x & bmask) < b else x & (bmask >> 1)
+
+
+def _mask(count):
+    return (1 << (count - 1).bit_length()) - 1
+
+
+def _pgid(pool_id, ps):
+    return '{}.{:x}'.format(pool_id, ps)
+
+
+def _parse_pgid(pgid):
+    pool, ps = pgid.split('.', 1)
+    return int(pool), int(ps, 16)
+
+
+class Placement(object):
+    """Where the PGs and objects of an osdmap epoch live.
+
+    :param osdmap: The decoded JSON of osd dump
+    :param crush: ceph_api.crushmap.CrushMap of the same epoch
+    """
+
+    def __init__(self, osdmap, crush):
+        self.osdmap = osdmap
+        self.epoch = osdmap.get('epoch')
+        self.crush = crush
+        self.mapper = CrushMapper(crush)
+        self.pools = dict((pool['pool'], pool) for pool in osdmap['pools'])
+        self._pool_ids = dict((pool['pool_name'], pool['pool'])
+                              for pool in osdmap['pools'])
+        max_osd = osdmap['max_osd']
+        self.weights = [0] * max_osd
+        self.primary_affinity = [WEIGHT_ONE] * max_osd
+        self._exists = set()
+        self._up = set()
+        for osd in osdmap['osds']:
+            osd_id = osd['osd']
+            self._exists.add(osd_id)
+            if osd.get('up'):
+                self._up.add(osd_id)
+            self.weights[osd_id] = int(round(osd['weight'] * WEIGHT_ONE))
+            self.primary_affinity[osd_id] = int(round(
+                osd.get('primary_affinity', 1.0) * WEIGHT_ONE))
+        self.pg_temp = dict((_parse_pgid(temp['pgid']), temp['osds'])
+                            for temp in osdmap.get('pg_temp', []))
+        self.primary_temp = dict((_parse_pgid(temp['pgid']), temp['osd'])
+                                 for temp in osdmap.get('primary_temp', []))
+        self._alive_osds = np.zeros(max_osd, dtype=bool)
+        self._alive_osds[[osd for osd in self._up & self._exists
+                          if osd < max_osd]] = True
+        self._sets = {}
+
+    @classmethod
+    def from_outbufs(cls, osd_dump, crushmap):
+        """Build from the outbufs of osd dump and osd getcrushmap.
+
+        :param osd_dump: The JSON outbuf of osd dump
+        :param crushmap: The binary outbuf of osd getcrushmap
+        :return: Placement
+        """
+        return cls(output.loads(osd_dump), CrushMap.decode(crushmap))
+
+    def pool_id(self, pool):
+        """The id of a pool given by name or id.
+
+        :raise KeyError: Raises if there is no such pool
+        """
+        if pool in self.pools:
+            return pool
+        if pool in self._pool_ids:
+            return self._pool_ids[pool]
+        raise KeyError("No pool {}".format(pool))
+
+    def _alive(self, osd):
+        return osd in self._up and osd in self._exists
+
+    def _alive_array(self, osds):
+        # _alive() of each element, False for CRUSH_ITEM_NONE and padding
+        alive = self._alive_osds
+        found = (osds >= 0) & (osds < len(alive))
+        found[found] = alive[osds[found]]
+        return found
+
+    def object_hashes(self, pool, names, namespace=''):
+        """The raw placement hash of objects, the full hash osd map shows
+        in raw_pgid.
+
+        :param pool: The pool name or id
+        :param names: An iterable of object names
+        :param namespace: The objects' namespace
+        :return: numpy uint32 array
+        """
+        spec = self.pools[self.pool_id(pool)]
+        prefix = _to_bytes(namespace) + b'\x1f' if namespace else b''
+        keys = [prefix + _to_bytes(name) for name in names]
+        return str_hash(keys, spec.get('object_hash', OBJECT_HASH_RJENKINS))
+
+    def object_pgs(self, pool, names, namespace=''):
+        """The PG each object is in.
+
+        :param pool: The pool name or id
+        :param names: An iterable of object names
+        :param namespace: The objects' namespace
+        :return: numpy int64 array of placement seeds, the part of the pgid
+            after the dot
+        """
+        spec = self.pools[self.pool_id(pool)]
+        hashes = self.object_hashes(pool, names, namespace)
+        return stable_mod(hashes, spec['pg_num'],
+                          _mask(spec['pg_num'])).astype(np.int64)
+
+    def pool_seeds(self, pool):
+        """The placement seed CRUSH maps each PG of a pool with.
+
+        :param pool: The pool name or id
+        :return: numpy uint32 array indexed by the PG's placement seed
+        """
+        pool_id = self.pool_id(pool)
+        spec = self.pools[pool_id]
+        pgp_num = spec.get('pg_placement_num', spec['pg_num'])
+        seeds = stable_mod(np.arange(spec['pg_num'], dtype=np.uint32),
+                           pgp_num, _mask(pgp_num))
+        if spec.get('flags', 0) & FLAG_HASHPSPOOL:
+            return hash32_2(seeds, np.uint32(pool_id))
+        return seeds + np.uint32(pool_id)
+
+    def _pool_sets(self, pool_id):
+        # up, up_primary, acting and acting_primary for every PG of a
+        # pool, the way OSDMap::_pg_to_up_acting_osds() builds them.  The
+        # sets are rows padded with NO_OSD, and erasure coded pools keep
+        # CRUSH_ITEM_NONE in their holes.
+        found = self._sets.get(pool_id)
+        if found is not None:
+            return found
+        spec = self.pools[pool_id]
+        size = spec['size']
+        shift = spec['type'] != POOL_TYPE_ERASURE
+        pps = self.pool_seeds(pool_id)
+        ruleset = spec.get('crush_ruleset', spec.get('crush_rule'))
+        rule = self.mapper.find_rule(ruleset, spec['type'], size)
+        raw, lengths = self.mapper.do_rule_array(rule, pps, size,
+                                                 self.weights)
+        rows = np.arange(len(raw))
+        valid = np.arange(size) < lengths[:, None]
+        alive = valid & self._alive_array(raw)
+        if shift:
+            # Down OSDs drop out and the rest move up
+            order = np.argsort(~alive, axis=1, kind='mergesort')
+            up = np.take_along_axis(raw, order, axis=1)
+            up[~np.take_along_axis(alive, order, axis=1)] = NO_OSD
+        else:
+            up = np.where(alive, raw, CRUSH_ITEM_NONE)
+            up[~valid] = NO_OSD
+        live = (up != NO_OSD) & (up != CRUSH_ITEM_NONE)
+        up_primary = np.where(live.any(axis=1),
+                              up[rows, live.argmax(axis=1)], NO_OSD)
+        # Primary affinity only matters for PGs with an OSD that has less
+        # than the default
+        affinity = np.full(len(self.primary_affinity) + 1, WEIGHT_ONE)
+        affinity[:-1] = self.primary_affinity
+        lowered = (live & (affinity[np.where(live, up, -1)] <
+                           WEIGHT_ONE)).any(axis=1)
+        seeds = pps.tolist()
+        for ps in np.flatnonzero(lowered).tolist():
+            osds = [osd for osd in up[ps].tolist() if osd != NO_OSD]
+            up_primary[ps] = self._apply_primary_affinity(
+                seeds[ps], osds, int(up_primary[ps]), shift)
+            up[ps, :len(osds)] = osds
+        acting = up
+        acting_primary = up_primary
+        temps = [ps for (pool, ps) in set(self.pg_temp) |
+                 set(self.primary_temp)
+                 if pool == pool_id and ps < len(up)]
+        if temps:
+            width = max([size] + [len(self.pg_temp.get((pool_id, ps), ()))
+                                  for ps in temps])
+            acting = np.full((len(up), width), NO_OSD, dtype=np.int64)
+            acting[:, :size] = up
+            acting_primary = up_primary.copy()
+        for ps in temps:
+            temp, primary = self._temp(pool_id, ps, shift)
+            if temp:
+                acting[ps] = NO_OSD
+                acting[ps, :len(temp)] = temp
+            if primary != NO_OSD:
+                acting_primary[ps] = primary
+        sets = (up, up_primary, acting, acting_primary)
+        self._sets[pool_id] = sets
+        return sets
+
+    def _apply_primary_affinity(self, seed, up, primary, shift):
+        affinity = self.primary_affinity
+        if all(osd == CRUSH_ITEM_NONE or affinity[osd] == WEIGHT_ONE
+               for osd in up):
+            return primary
+        position = -1
+        for i, osd in enumerate(up):
+            if osd == CRUSH_ITEM_NONE:
+                continue
+            if affinity[osd] < WEIGHT_ONE and \
+                    hash32_2(seed, osd) >> 16 >= affinity[osd]:
+                # Passed over, but kept in case nothing else will do
+                if position < 0:
+                    position = i
+            else:
+                position = i
+                break
+        if position < 0:
+            return primary
+        primary = up[position]
+        if shift and position > 0:
+            up.insert(0, up.pop(position))
+        return primary
+
+    def _temp(self, pool_id, ps, shift):
+        temp = []
+        for osd in self.pg_temp.get((pool_id, ps), []):
+            if self._alive(osd):
+                temp.append(osd)
+            elif not shift:
+                temp.append(CRUSH_ITEM_NONE)
+        primary = self.primary_temp.get((pool_id, ps), NO_OSD)
+        if primary == NO_OSD:
+            live = [osd for osd in temp if osd != CRUSH_ITEM_NONE]
+            primary = live[0] if live else NO_OSD
+        return temp, primary
+
+    @staticmethod
+    def _matrix(osd_sets):
+        return np.where(osd_sets == CRUSH_ITEM_NONE, NO_OSD,
+                        osd_sets).astype(np.int32)
+
+    def pg_up(self, pool):
+        """The up set and up primary of every PG of a pool.
+
+        :param pool: The pool name or id
+        :return: (up, up_primary) numpy int32 arrays indexed by placement
+            seed.  up is 2-D and padded, and erasure coded holes filled,
+            with NO_OSD.
+        """
+        sets = self._pool_sets(self.pool_id(pool))
+        return self._matrix(sets[0]), sets[1].astype(np.int32)
+
+    def pg_acting(self, pool):
+        """The acting set and acting primary of every PG of a pool, which
+        differ from up where the osdmap has a pg_temp or primary_temp.
+
+        :param pool: The pool name or id
+        :return: (acting, acting_primary) numpy int32 arrays indexed by
+            placement seed, as for pg_up()
+        """
+        sets = self._pool_sets(self.pool_id(pool))
+        return self._matrix(sets[2]), sets[3].astype(np.int32)
+
+    def map_objects(self, pool, names, namespace=''):
+        """The PG, up set and up primary of many objects.
+
+        :param pool: The pool name or id
+        :param names: An iterable of object names
+        :param namespace: The objects' namespace
+        :return: (pgs, up, up_primary) numpy arrays with a row per object
+        """
+        pgs = self.object_pgs(pool, names, namespace)
+        up, up_primary = self.pg_up(pool)
+        return pgs, up[pgs], up_primary[pgs]
+
+    def map_object(self, pool, name, namespace=''):
+        """One object's placement, in the shape of osd map's JSON output.
+
+        :param pool: The pool name or id
+        :param name: The object name
+        :param namespace: The object's namespace
+        :return: dict with pool_id, raw_pgid, pgid, up, up_primary, acting
+            and acting_primary
+        """
+        pool_id = self.pool_id(pool)
+        raw = int(self.object_hashes(pool_id, [name], namespace)[0])
+        spec = self.pools[pool_id]
+        ps = stable_mod(raw, spec['pg_num'], _mask(spec['pg_num']))
+        up, up_primary, acting, acting_primary = (
+            column[ps].tolist() for column in self._pool_sets(pool_id))
+        return {
+            'pool_id': pool_id,
+            'raw_pgid': _pgid(pool_id, raw),
+            'pgid': _pgid(pool_id, ps),
+            'up': [osd for osd in up if osd != NO_OSD],
+            'up_primary': up_primary,
+            'acting': [osd for osd in acting if osd != NO_OSD],
+            'acting_primary': acting_primary,
+        }
+
+    def compare_osd_map(self, outbuf, namespace=''):
+        """Check a recorded osd map response against the local mapping.
+
+        :param outbuf: The JSON outbuf of osd map, from the same epoch
+        :param namespace: The namespace the object was mapped in.  osd
+            map prints it in front of objname, separated by a slash.
+        :return: list of the fields that differ, empty if none do
+        """
+        recorded = output.loads(outbuf)
+        name = recorded['objname']
+        namespace = recorded.get('nspace', namespace)
+        if namespace and name.startswith(namespace + '/'):
+            name = name[len(namespace) + 1:]
+        local = self.map_object(recorded['pool_id'], name, namespace)
+        return sorted(key for key, value in local.items()
+                      if key in recorded and recorded[key] != value)
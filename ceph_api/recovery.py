@@ -0,0 +1,268 @@
+"""Follow recovery and backfill, with rates, ETAs and stalled PGs.
+
+RecoveryTracker samples the degraded and misplaced object counts of the
+cluster and of each pool into a ring buffer, smooths the rate they fall
+at, and works out how long what is left will take::
+
+    pg = PlacementGroupCommand('/etc/ceph/ceph.conf',
+                               output_format='json-raw')
+    tracker = RecoveryTracker(pg)
+    while True:
+        sample = tracker.sample()
+        print(sample.degraded, sample.misplaced, tracker.eta())
+        for pool_id, eta in tracker.pool_etas().items():
+            print(pool_id, eta)
+        print(tracker.stalled)
+        time.sleep(1)
+
+A sample is pg stat, the same summary status prints under pgmap, and
+pg dump pools, so sampling every second stays cheap.  pg dump_stuck is
+only run every stuck_interval seconds to find the stuck PGs whose
+recovery counters have stopped moving.
+"""
+import collections
+import math
+import time
+
+import six
+
+from ceph_api import output
+from ceph_api.pgmap import iter_json_array
+
+__author__ = 'Chris Holcombe <chris.holcombe@canonical.com>'
+
+DEFAULT_SAMPLES = 600
+# Seconds for a change in rate to carry half its weight in the smoothed
+# rate
+DEFAULT_HALFLIFE = 30.0
+DEFAULT_STUCK_INTERVAL = 60.0
+# How long a stuck PG's counters must stand still before it is stalled
+DEFAULT_STALL_SECONDS = 300.0
+DEFAULT_STUCK_OPS = ('unclean', 'degraded')
+
+# Counters of a stuck PG that move while it recovers
+_PROGRESS_COUNTERS = ('num_objects_recovered', 'num_bytes_recovered',
+                      'num_objects_degraded', 'num_objects_misplaced',
+                      'num_objects_unfound')
+
+
+class RecoverySample(collections.namedtuple('RecoverySample', [
+        'stamp', 'degraded', 'misplaced', 'unfound', 'pools'])):
+    """The recovery work left at one moment.
+
+    degraded, misplaced and unfound are the cluster's object copy counts
+    and pools maps each pool id to its own (degraded, misplaced,
+    unfound).
+    """
+    __slots__ = ()
+
+
+def _document(outbuf):
+    if isinstance(outbuf, (bytes, six.text_type)):
+        return output.loads(outbuf)
+    return outbuf
+
+
+def _items(outbuf, key):
+    # The records of a JSON array, bare or stored under key
+    if isinstance(outbuf, (bytes, six.text_type)):
+        if not outbuf.strip():
+            return []
+        return iter_json_array(outbuf, key, containers=('pg_map',))
+    if isinstance(outbuf, dict):
+        return outbuf.get(key, [])
+    return outbuf or []
+
+
+def _remaining(degraded, misplaced, unfound=0):
+    # Unfound objects have nowhere to recover from
+    return degraded + misplaced
+
+
+class _Rate(object):
+    """An exponentially weighted rate at which a count falls."""
+
+    def __init__(self, halflife):
+        self.halflife = halflife
+        self.rate = None
+
+    def update(self, before, after, seconds):
+        if seconds <= 0:
+            return
+        rate = (before - after) / float(seconds)
+        if self.rate is None:
+            self.rate = rate
+        else:
+            weight = 1.0 - math.pow(0.5, seconds / self.halflife)
+            self.rate += weight * (rate - self.rate)
+
+
+class RecoveryTracker(object):
+    """Samples recovery progress and estimates when it will finish.
+
+    :param pg_command: A PlacementGroupCommand with output_format json or
+        json-raw
+    :param samples: How many samples the ring buffer keeps
+    :param halflife: Seconds over which the smoothed rate halves the
+        weight of older samples
+    :param stuck_interval: Seconds between pg dump_stuck checks.  None
+        never checks.
+    :param stall_seconds: Seconds a stuck PG's counters must stay the same
+        for it to count as stalled
+    :param stuck_ops: The stuck states to ask pg dump_stuck for
+    :ivar samples: collections.deque of the latest RecoverySamples
+    :ivar stalled: dict of stalled pgid to the time its counters last
+        moved
+    """
+
+    def __init__(self, pg_command, samples=DEFAULT_SAMPLES,
+                 halflife=DEFAULT_HALFLIFE,
+                 stuck_interval=DEFAULT_STUCK_INTERVAL,
+                 stall_seconds=DEFAULT_STALL_SECONDS,
+                 stuck_ops=DEFAULT_STUCK_OPS):
+        if pg_command.output_format == output.OUTPUT_PLAIN:
+            raise ValueError("RecoveryTracker needs a PlacementGroupCommand "
+                             "with JSON output")
+        self.pg_command = pg_command
+        self.samples = collections.deque(maxlen=samples)
+        self.halflife = halflife
+        self.stuck_interval = stuck_interval
+        self.stall_seconds = stall_seconds
+        self.stuck_ops = list(stuck_ops)
+        self.stalled = {}
+        self._rate = _Rate(halflife)
+        self._pool_rates = {}
+        self._progress = {}
+        self._last_stuck_check = None
+
+    def _pool_counts(self):
+        outbuf, outs = self.pg_command.pg_dump(['pools'])
+        pools = {}
+        for pool in _items(outbuf, 'pool_stats'):
+            stat_sum = pool.get('stat_sum', {})
+            pools[pool['poolid']] = (stat_sum.get('num_objects_degraded', 0),
+                                     stat_sum.get('num_objects_misplaced', 0),
+                                     stat_sum.get('num_objects_unfound', 0))
+        return pools
+
+    def sample(self, now=None):
+        """Take a sample and fold it into the rates.
+
+        :param now: The time of the sample, defaults to now
+        :return: RecoverySample
+        :raise CephError: Raises on command errors
+        """
+        if now is None:
+            now = time.time()
+        outbuf, outs = self.pg_command.pg_stat()
+        summary = _document(outbuf)
+        # status nests the same summary under pgmap
+        summary = summary.get('pgmap', summary)
+        pools = self._pool_counts()
+        sample = RecoverySample(
+            stamp=now,
+            degraded=summary.get('degraded_objects', 0),
+            misplaced=summary.get('misplaced_objects', 0),
+            unfound=summary.get('unfound_objects', 0),
+            pools=pools)
+        if self.samples:
+            previous = self.samples[-1]
+            seconds = now - previous.stamp
+            self._rate.update(
+                _remaining(previous.degraded, previous.misplaced),
+                _remaining(sample.degraded, sample.misplaced), seconds)
+            for pool_id, counts in pools.items():
+                if pool_id not in previous.pools:
+                    continue
+                rate = self._pool_rates.setdefault(pool_id,
+                                                   _Rate(self.halflife))
+                rate.update(_remaining(*previous.pools[pool_id]),
+                            _remaining(*counts), seconds)
+            for pool_id in set(self._pool_rates) - set(pools):
+                del self._pool_rates[pool_id]
+        self.samples.append(sample)
+        if self.stuck_interval is not None and (
+                self._last_stuck_check is None or
+                now - self._last_stuck_check >= self.stuck_interval):
+            self.check_stuck(now)
+        return sample
+
+    def rate(self):
+        """The smoothed rate degraded and misplaced copies fall at.
+
+        :return: float objects per second, or None before two samples
+        """
+        return self._rate.rate
+
+    def pool_rates(self):
+        """The smoothed rate of each pool.
+
+        :return: dict of pool id to float objects per second
+        """
+        return dict((pool_id, rate.rate)
+                    for pool_id, rate in self._pool_rates.items()
+                    if rate.rate is not None)
+
+    def eta(self):
+        """Seconds until the cluster's recovery finishes at the current
+        rate.
+
+        :return: float, 0.0 once nothing is left, or None while nothing is
+            being recovered
+        """
+        if not self.samples:
+            return None
+        sample = self.samples[-1]
+        return _eta(_remaining(sample.degraded, sample.misplaced),
+                    self._rate.rate)
+
+    def pool_etas(self):
+        """Seconds until each pool's recovery finishes at its current
+        rate.
+
+        :return: dict of pool id to float, or None while the pool isn't
+            recovering
+        """
+        if not self.samples:
+            return {}
+        pools = self.samples[-1].pools
+        rates = self.pool_rates()
+        return dict((pool_id, _eta(_remaining(*counts), rates.get(pool_id)))
+                    for pool_id, counts in pools.items())
+
+    def check_stuck(self, now=None):
+        """Ask pg dump_stuck for stuck PGs and mark the ones whose
+        recovery counters haven't moved for stall_seconds as stalled.
+
+        :param now: The time of the check, defaults to now
+        :return: dict of stalled pgid to the time its counters last moved
+        :raise CephError: Raises on command errors
+        """
+        if now is None:
+            now = time.time()
+        self._last_stuck_check = now
+        outbuf, outs = self.pg_command.pg_dump_stuck(self.stuck_ops)
+        progress = {}
+        for pg_stat in _items(outbuf, 'stuck_pg_stats'):
+            stat_sum = pg_stat.get('stat_sum', {})
+            counters = (pg_stat.get('state'),) + tuple(
+                stat_sum.get(name, 0) for name in _PROGRESS_COUNTERS)
+            since = now
+            last = self._progress.get(pg_stat['pgid'])
+            if last is not None and last[0] == counters:
+                since = last[1]
+            progress[pg_stat['pgid']] = (counters, since)
+        # PGs no longer stuck are forgotten
+        self._progress = progress
+        self.stalled = dict(
+            (pgid, since) for pgid, (counters, since) in progress.items()
+            if now - since >= self.stall_seconds)
+        return self.stalled
+
+
+def _eta(remaining, rate):
+    if remaining <= 0:
+        return 0.0
+    if rate is None or rate <= 0:
+        return None
+    return remaining / rate
@@ -0,0 +1,174 @@
+"""Repair inconsistent PGs a few at a time per OSD.
+
+RepairQueue finds the inconsistent PGs, queues a pg repair for each and
+starts them as an OsdThrottle allows, so no OSD takes part in more than
+max_per_osd repairs at once.  Each step() polls the PGs that are still
+inconsistent or repairing to see which repairs have finished::
+
+    pg = PlacementGroupCommand('/etc/ceph/ceph.conf',
+                               output_format='json-raw')
+    queue = RepairQueue(pg, max_per_osd=1)
+    queue.discover()
+    while not queue.done():
+        queue.step()
+        time.sleep(10)
+    print(queue.repaired, queue.failed)
+
+Pass the ScrubScheduler's throttle as throttle to have repairs and
+scrubs share the same per-OSD slots.
+
+Requires numpy, available as the 'numpy' extra.
+"""
+import collections
+import time
+
+import numpy as np
+
+from ceph_api.pgmap import PG_STATE_BITS
+from ceph_api.pgtable import PGStatsTable
+from ceph_api.throttle import OsdThrottle
+
+__author__ = 'Chris Holcombe <chris.holcombe@canonical.com>'
+
+DEFAULT_MAX_PER_OSD = 1
+DEFAULT_TIMEOUT = 6 * 3600.0
+
+_INCONSISTENT = PG_STATE_BITS['inconsistent']
+_REPAIRING = PG_STATE_BITS['repair']
+
+
+def _table(outbuf):
+    # pg ls output, decoded or not
+    if isinstance(outbuf, dict):
+        outbuf = outbuf.get('pg_stats', [])
+    if isinstance(outbuf, list) or not outbuf:
+        return PGStatsTable.from_pg_stats(outbuf or [])
+    return PGStatsTable.from_outbuf(outbuf)
+
+
+class RepairQueue(object):
+    """pg repair for every inconsistent PG, throttled per OSD.
+
+    A repair has finished when its PG is no longer inconsistent, or when
+    the deep scrub it runs has moved last_deep_scrub_stamp on and the PG
+    is still inconsistent, in which case it failed.
+
+    :param pg_command: A PlacementGroupCommand with output_format json or
+        json-raw
+    :param max_per_osd: Most repairs any OSD of an acting set takes part
+        in
+    :param rate: Most repairs started per second.  None for no limit.
+    :param burst: How many repairs the rate limit lets start at once
+    :param timeout: Seconds after which a repair that hasn't finished is
+        counted as failed and its slots freed
+    :param throttle: An OsdThrottle to use instead of one made from
+        max_per_osd, rate and burst
+    :ivar pending: OrderedDict of the queued pgids
+    :ivar running: dict of pgid to (started, last_deep_scrub_stamp it
+        started from)
+    :ivar repaired: list of the pgids repaired
+    :ivar failed: dict of pgid to why its repair failed
+    """
+
+    def __init__(self, pg_command, max_per_osd=DEFAULT_MAX_PER_OSD,
+                 rate=None, burst=None, timeout=DEFAULT_TIMEOUT,
+                 throttle=None):
+        self.pg_command = pg_command
+        self.timeout = timeout
+        self.throttle = throttle if throttle is not None else \
+            OsdThrottle(max_per_osd, rate, burst)
+        self.pending = collections.OrderedDict()
+        self.running = {}
+        self.repaired = []
+        self.failed = {}
+
+    def _poll(self):
+        outbuf, outs = self.pg_command.pg_ls(states=['inconsistent',
+                                                     'repair'])
+        return _table(outbuf)
+
+    def discover(self, pgs=None):
+        """Queue the inconsistent PGs not already queued or running.
+
+        :param pgs: ceph_api.pgtable.PGStatsTable to look in, eg: from a
+            pg dump.  Asks pg ls for the inconsistent PGs when not given.
+        :return: list of the pgids queued
+        :raise CephError: Raises on command errors
+        """
+        if pgs is None:
+            pgs = self._poll()
+        inconsistent = pgs.pgid[(pgs.state & np.uint64(_INCONSISTENT)) != 0]
+        added = []
+        for pgid in inconsistent.tolist():
+            if pgid not in self.pending and pgid not in self.running:
+                self.pending[pgid] = None
+                added.append(pgid)
+        return added
+
+    def done(self):
+        """Whether nothing is queued or running.
+
+        :return: bool
+        """
+        return not self.pending and not self.running
+
+    def _finish(self, pgs, rows, now):
+        for pgid, (started, stamp) in list(self.running.items()):
+            row = rows.get(pgid)
+            state = int(pgs.state[row]) if row is not None else 0
+            if not state & _INCONSISTENT:
+                self.repaired.append(pgid)
+            elif state & _REPAIRING:
+                if now - started < self.timeout:
+                    continue
+                self.failed[pgid] = 'timed out'
+            elif pgs.last_deep_scrub_stamp[row] > stamp:
+                self.failed[pgid] = 'still inconsistent'
+            elif now - started >= self.timeout:
+                self.failed[pgid] = 'timed out'
+            else:
+                continue
+            del self.running[pgid]
+            self.throttle.release(pgid)
+        # Queued PGs that have stopped being inconsistent need nothing
+        for pgid in list(self.pending):
+            row = rows.get(pgid)
+            if row is None or not int(pgs.state[row]) & _INCONSISTENT:
+                del self.pending[pgid]
+
+    def step(self, pgs=None, now=None, exclude_osds=None):
+        """Mark finished repairs and start as many queued ones as the
+        throttle allows.
+
+        :param pgs: ceph_api.pgtable.PGStatsTable holding at least every
+            inconsistent or repairing PG, eg: from a pg dump.  Asks pg ls
+            for them when not given.
+        :param now: Seconds since the epoch, defaults to now
+        :param exclude_osds: OSD ids not to start any repair on this step
+        :return: list of the pgids whose repair started
+        :raise CephError: Raises on command errors
+        """
+        if now is None:
+            now = time.time()
+        if pgs is None:
+            pgs = self._poll()
+        row_of = dict(zip(pgs.pgid.tolist(), range(len(pgs))))
+        self._finish(pgs, row_of, now)
+        if not self.pending:
+            return []
+        pgids = list(self.pending)
+        rows = np.array([row_of[pgid] for pgid in pgids], dtype=np.int64)
+        started = []
+        for position in self.throttle.admit(pgids, pgs.acting[rows], now,
+                                            exclude_osds):
+            pgid = pgids[position]
+            try:
+                self.pg_command.pg_repair(pgid)
+            except Exception:
+                self.throttle.release(pgid)
+                raise
+            del self.pending[pgid]
+            self.running[pgid] = (
+                now, float(pgs.last_deep_scrub_stamp[rows[position]]))
+            started.append(pgid)
+        return started
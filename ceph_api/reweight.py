@@ -0,0 +1,329 @@
+"""Plan osd reweight changes locally, the way reweight-by-utilization does.
+
+osd test-reweight-by-utilization and osd test-reweight-by-pg make the
+monitors work out one round of changes and answer in text.
+ReweightPlanner runs the same selection on osd df and pg dump data,
+projects the utilization each round would leave behind and plans the
+next round from that, then hands back osd reweight commands for a
+CommandBatch::
+
+    osd = OsdCommand('/etc/ceph/ceph.conf', output_format='json-raw')
+    planner = ReweightPlanner.from_outbufs(osd.osd_df()[0])
+    plan = planner.plan(oload=110, max_osds=8, steps=3)
+    batch = CommandBatch('/etc/ceph/ceph.conf')
+    batch.extend(planner.commands(plan, prepared(OsdCommand)))
+    batch.run()
+
+Like the monitors, planning refuses to go on with fewer than
+mon_reweight_min_pgs_per_osd PG copies or mon_reweight_min_bytes_per_osd
+bytes per OSD, and by PG leaves out copies on OSDs with no CRUSH weight.
+An OSD with CRUSH weight but no PGs counts as empty.
+
+Projections spread the data an OSD gives up over the others in
+proportion to their weight.  Given a Placement and pg dump they map the
+PGs through CRUSH instead, see ceph_api.simulate.
+
+Requires numpy, available as the 'numpy' extra.
+"""
+import collections
+
+import numpy as np
+
+from ceph_api import output
+from ceph_api.crushmap import WEIGHT_ONE
+from ceph_api.pgtable import NO_OSD, PGStatsTable
+from ceph_api.placement import Placement
+from ceph_api.simulate import Simulation
+
+__author__ = 'Chris Holcombe <chris.holcombe@canonical.com>'
+
+# The monitors' defaults for the reweight-by-* arguments
+DEFAULT_OLOAD = 120
+DEFAULT_MAX_CHANGE = 0.05
+DEFAULT_MAX_OSDS = 4
+# mon_reweight_min_pgs_per_osd and mon_reweight_min_bytes_per_osd
+MIN_PGS_PER_OSD = 10
+MIN_BYTES_PER_OSD = 100 * 1024 * 1024
+
+
+class ReweightStep(collections.namedtuple('ReweightStep', [
+        'weights', 'average_util', 'overload_util', 'utilization'])):
+    """One round of a reweight plan.
+
+    weights maps each OSD id changed in the round to its new reweight.
+    average_util and overload_util are the thresholds the round was
+    chosen with, and utilization is the projected utilization of every
+    OSD in ReweightPlanner.osds after it.
+    """
+    __slots__ = ()
+
+
+def reweight_round(util, weights, average_util, oload=DEFAULT_OLOAD,
+                   max_change=DEFAULT_MAX_CHANGE, max_osds=DEFAULT_MAX_OSDS,
+                   no_increasing=False):
+    """One round of OSDMonitor::reweight_by_utilization().
+
+    OSDs are taken in order of how far their utilization is from the
+    average.  Those at or over the overload get a lower weight and,
+    unless no_increasing, those at or under the average a higher one,
+    each by at most max_change, until max_osds have changed.
+
+    :param util: numpy float array of each OSD's utilization, by bytes
+        or PGs per unit of CRUSH weight
+    :param weights: numpy int array of each OSD's 16.16 reweight
+    :param average_util: The utilization of the cluster as a whole
+    :param oload: Percentage of average_util at which an OSD is overloaded
+    :param max_change: The most one reweight may change, eg: 0.05
+    :param max_osds: The most OSDs to change
+    :param no_increasing: Never raise a weight
+    :return: dict of position in util to new 16.16 weight
+    """
+    overload_util = average_util * oload / 100.0
+    step = int(max_change * WEIGHT_ONE)
+    order = np.argsort(-np.abs(util - average_util), kind='mergesort')
+    util = util[order]
+    weights = weights[order].astype(np.int64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        scaled = np.where(util > 0, average_util / util * weights,
+                          float(WEIGHT_ONE))
+    scaled = np.minimum(scaled, float(1 << 32)).astype(np.int64)
+    over = util >= overload_util
+    lowered = np.where(weights > step, np.maximum(scaled, weights - step),
+                       scaled)
+    raised = np.minimum(np.minimum(scaled, weights + step), WEIGHT_ONE)
+    under = ~over & (util <= average_util) & (raised > weights)
+    if no_increasing:
+        under[:] = False
+    changed = np.flatnonzero(over | under)[:max_osds]
+    new_weights = np.where(over, lowered, raised)
+    return dict(zip(order[changed].tolist(),
+                    new_weights[changed].tolist()))
+
+
+class ReweightPlanner(object):
+    """Plans reweight-by-utilization and reweight-by-pg rounds locally.
+
+    :param osd_df: The decoded JSON of osd df
+    :param pgs: ceph_api.pgtable.PGStatsTable from pg dump.  Needed to
+        plan by PG with a list of pools, and for CRUSH projections.
+    :param placement: ceph_api.placement.Placement of the same epoch, to
+        project each round by mapping every PG through CRUSH
+    """
+
+    def __init__(self, osd_df, pgs=None, placement=None):
+        nodes = [node for node in osd_df.get('nodes', [])
+                 if node.get('type', 'osd') == 'osd' and node['id'] >= 0]
+        nodes.sort(key=lambda node: node['id'])
+        self.osds = np.array([node['id'] for node in nodes], dtype=np.int64)
+        self.kb = np.array([node.get('kb', 0) for node in nodes],
+                           dtype=np.float64)
+        self.kb_used = np.array([node.get('kb_used', 0) for node in nodes],
+                                dtype=np.float64)
+        self.crush_weight = np.array(
+            [node.get('crush_weight', 0.0) for node in nodes],
+            dtype=np.float64)
+        self.weights = np.array(
+            [int(round(node.get('reweight', 1.0) * WEIGHT_ONE))
+             for node in nodes], dtype=np.int64)
+        self.pg_counts = np.array([node.get('pgs', 0) for node in nodes],
+                                  dtype=np.float64)
+        self.pgs = pgs
+        self.placement = placement
+        if placement is not None and pgs is None:
+            raise ValueError("CRUSH projections need the pg dump as well")
+
+    @classmethod
+    def from_outbufs(cls, osd_df, pg_dump=None, osd_dump=None,
+                     crushmap=None):
+        """Build from the outbufs of osd df and, optionally, pg dump, osd
+        dump and osd getcrushmap.
+
+        :param osd_df: The JSON outbuf of osd df
+        :param pg_dump: The JSON outbuf of pg dump, pg dump_json or pg ls
+        :param osd_dump: The JSON outbuf of osd dump, with crushmap for
+            CRUSH projections
+        :param crushmap: The binary outbuf of osd getcrushmap
+        :return: ReweightPlanner
+        """
+        pgs = PGStatsTable.from_outbuf(pg_dump) if pg_dump is not None \
+            else None
+        placement = None
+        if osd_dump is not None and crushmap is not None:
+            placement = Placement.from_outbufs(osd_dump, crushmap)
+        return cls(output.loads(osd_df), pgs, placement)
+
+    def _pg_counts(self, pools):
+        # PG copies on each OSD, from the acting sets like the monitors
+        if pools is None and self.pgs is None:
+            return self.pg_counts.copy()
+        if self.pgs is None:
+            raise ValueError("Planning by PG for some pools needs pg dump")
+        table = self.pgs
+        if pools is not None:
+            ids = [self._pool_id(pool) for pool in pools]
+            table = table[np.isin(table.pool, ids)]
+        members = table.acting[table.acting != NO_OSD]
+        counts = np.bincount(members[members >= 0],
+                             minlength=int(self.osds.max()) + 1
+                             if len(self.osds) else 0)
+        return counts[self.osds].astype(np.float64)
+
+    def _pool_id(self, pool):
+        if self.placement is not None:
+            return self.placement.pool_id(pool)
+        try:
+            return int(pool)
+        except ValueError:
+            raise KeyError("Pool {} must be given by id without an osd "
+                           "dump".format(pool))
+
+    def _thresholds(self, by_pg, used, pg_counts):
+        # Each OSD's utilization and the average, refusing as the
+        # monitors do when there is too little data to go on
+        if by_pg:
+            # Copies on OSDs CRUSH gives no weight are left out entirely
+            weighted = self.crush_weight > 0
+            counts = np.where(weighted, pg_counts, 0)
+            holding = counts > 0
+            copies = int(counts.sum())
+            if not holding.any() or copies // int(holding.sum()) < \
+                    MIN_PGS_PER_OSD:
+                raise ValueError(
+                    "Refusing to reweight: we only have {} PGs across {} "
+                    "osds!".format(copies, int(holding.sum())))
+            average = copies / self.crush_weight[holding].sum()
+            with np.errstate(divide='ignore', invalid='ignore'):
+                util = np.where(weighted, counts / self.crush_weight,
+                                np.nan)
+            return util, average
+        kb = self.kb.sum()
+        osds = max(1, len(self.osds))
+        if kb * 1024 / osds < MIN_BYTES_PER_OSD:
+            raise ValueError("Refusing to reweight: we only have {} kb "
+                             "across all osds!".format(int(kb)))
+        if used.sum() * 1024 / osds < MIN_BYTES_PER_OSD:
+            raise ValueError("Refusing to reweight: we only have {} kb "
+                             "used across all osds!".format(int(used.sum())))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            util = np.where(self.kb > 0, used / self.kb, np.nan)
+        return util, used.sum() / kb
+
+    def plan(self, oload=DEFAULT_OLOAD, max_change=DEFAULT_MAX_CHANGE,
+             max_osds=DEFAULT_MAX_OSDS, no_increasing=False, by_pg=False,
+             pools=None, steps=1):
+        """Plan rounds of reweights, each chosen from the utilization the
+        rounds before it are projected to leave.
+
+        :param oload: Percentage of the average utilization at which an
+            OSD is overloaded, over 100
+        :param max_change: The most one round may change a reweight
+        :param max_osds: The most OSDs one round may change
+        :param no_increasing: Never raise a reweight
+        :param by_pg: Balance PG counts, as reweight-by-pg, rather than
+            bytes used
+        :param pools: With by_pg, only count the PGs of these pools
+        :param steps: The most rounds to plan.  Planning stops early once
+            a round changes nothing.
+        :return: list of ReweightStep
+        :raise ValueError: Raises on a bad oload, and where the monitors
+            would refuse to reweight
+        """
+        if oload <= 100:
+            raise ValueError("You must give a percentage higher than 100.")
+        weights = self.weights.copy()
+        previous = weights.copy()
+        used = self.kb_used.copy()
+        pg_counts = self._pg_counts(pools if by_pg else None)
+        simulation = None
+        if self.placement is not None:
+            simulation = Simulation(self.placement, self.pgs)
+        plan = []
+        for _ in range(steps):
+            util, average = self._thresholds(by_pg, used, pg_counts)
+            # OSDs without usable numbers, and those out, are left be
+            usable = np.flatnonzero(~np.isnan(util) & (weights > 0))
+            changes = reweight_round(util[usable], weights[usable], average,
+                                     oload, max_change, max_osds,
+                                     no_increasing)
+            if not changes:
+                break
+            for position, weight in changes.items():
+                weights[usable[position]] = weight
+                if simulation is not None:
+                    simulation.osd_reweight(int(self.osds[usable[position]]),
+                                            float(weight) / WEIGHT_ONE)
+            if simulation is not None:
+                used, pg_counts = self._simulate(simulation, pools)
+            else:
+                used, pg_counts = self._spread(previous, weights, used,
+                                               pg_counts)
+            previous = weights.copy()
+            util, _ = self._thresholds(by_pg, used, pg_counts)
+            plan.append(ReweightStep(
+                weights=dict((int(self.osds[usable[position]]),
+                              float(weight) / WEIGHT_ONE)
+                             for position, weight in changes.items()),
+                average_util=average, overload_util=average * oload / 100.0,
+                utilization=util))
+        return plan
+
+    def _spread(self, previous, weights, used, pg_counts):
+        # Each OSD keeps data in proportion to its reweight.  What the
+        # changed OSDs give up, or take on, comes from the others in
+        # proportion to their CRUSH weight times reweight.
+        changed = weights != previous
+        factor = np.ones(len(weights))
+        moving = changed & (previous > 0)
+        factor[moving] = weights[moving] / previous[moving].astype(float)
+        share = self.crush_weight * weights * ~changed
+        total = share.sum()
+        projected = []
+        for values in (used, pg_counts):
+            kept = values * factor
+            freed = (values - kept).sum()
+            if total > 0:
+                kept = kept + freed * share / total
+            projected.append(kept)
+        return projected
+
+    def _simulate(self, simulation, pools):
+        # Bytes from the PGs that move, and PG counts from the up sets
+        # CRUSH gives with the new weights
+        movement = simulation.run()
+        inside = self.osds < len(movement.osds)
+        ids = self.osds[inside]
+        used = self.kb_used.copy()
+        used[inside] += (movement.bytes_after[ids] -
+                         movement.bytes_before[ids]) / 1024.0
+        proposed = simulation.proposed
+        if pools is None:
+            pool_ids = sorted(proposed.pools)
+        else:
+            pool_ids = [self._pool_id(pool) for pool in pools]
+        counts = np.zeros(len(movement.osds), dtype=np.float64)
+        for pool_id in pool_ids:
+            up = proposed.pg_up(pool_id)[0]
+            counts += np.bincount(up[up != NO_OSD],
+                                  minlength=len(counts))[:len(counts)]
+        pg_counts = np.zeros(len(self.osds), dtype=np.float64)
+        pg_counts[inside] = counts[ids]
+        return used, pg_counts
+
+    @staticmethod
+    def commands(plan, osd_command):
+        """The osd reweight commands that apply a plan, one per OSD with
+        its weight after the last round.
+
+        :param plan: list of ReweightStep from plan(), or one of them to
+            apply a single round
+        :param osd_command: A prepared OsdCommand, see
+            ceph_api.batch.prepared()
+        :return: list of (cmd, inbuf) for CommandBatch.extend()
+        """
+        if isinstance(plan, ReweightStep):
+            plan = [plan]
+        final = {}
+        for step in plan:
+            final.update(step.weights)
+        return [osd_command.osd_reweight(id=osd, weight=weight)
+                for osd, weight in sorted(final.items())]
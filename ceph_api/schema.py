@@ -0,0 +1,252 @@
+"""Builds every release's command classes from ceph_api.commands.
+
+The command table describes each command once, as (method, prefix, help,
+args), with the arguments in the same terms as the monitors'
+get_command_descriptions.  release_classes() turns a release into the
+PlacementGroupCommand, MdsCommand, OsdCommand, MonitorCommand,
+AuthCommand and ConfigKeyCommand classes the release modules export::
+
+    for method, prefix, help, args in release_commands('jewel')['OsdCommand']:
+        print(prefix)
+
+A method is only built the first time it is looked up, so importing a
+release costs little more than loading the table.
+"""
+import threading
+
+import six
+
+from ceph_api import commands, output, validator
+from ceph_api.base import CommandBase
+
+__author__ = 'Chris Holcombe <chris.holcombe@canonical.com>'
+
+# Oldest first, each one a delta against the one before
+RELEASES = ('firefly', 'giant', 'hammer', 'infernalis', 'jewel')
+
+COMMAND_CLASSES = ('PlacementGroupCommand', 'MdsCommand', 'OsdCommand',
+                   'MonitorCommand', 'AuthCommand', 'ConfigKeyCommand')
+
+# Argument types that are checked with isinstance rather than a
+# ceph_argparse validator
+_STRING_TYPES = frozenset(['CephPoolname', 'CephObjectname'])
+
+_releases = {}
+_lock = threading.Lock()
+
+
+def release_commands(release):
+    """The full command table of a release, with its deltas applied.
+
+    :param release: One of RELEASES
+    :return: dict of command class name to a list of
+        (method, prefix, help, args) tuples
+    :raise ValueError: Raises on an unknown release
+    """
+    found = _releases.get(release)
+    if found is not None:
+        return found
+    spec = commands.TABLES.get(release)
+    if spec is None:
+        raise ValueError("Unknown release {}, choose one of {}".format(
+            release, ', '.join(RELEASES)))
+    base = release_commands(spec['base']) if 'base' in spec else {}
+    found = {}
+    for name in COMMAND_CLASSES:
+        removed = set(spec.get('remove', {}).get(name, ()))
+        changed = spec['commands'].get(name, ())
+        replaced = dict((command[0], command) for command in changed)
+        table = [replaced.pop(command[0], command)
+                 for command in base.get(name, ())
+                 if command[0] not in removed]
+        table.extend(command for command in changed
+                     if command[0] in replaced)
+        found[name] = table
+    with _lock:
+        return _releases.setdefault(release, found)
+
+
+def release_version(release):
+    """The version the monitors of a release report, eg: 10 for jewel.
+
+    :param release: One of RELEASES
+    :return: string
+    """
+    return commands.TABLES[release]['version']
+
+
+def validate_arg(arg, value):
+    """Check a value against one argument's schema.
+
+    :param arg: The argument's entry from the command table
+    :param value: The value the caller passed
+    :raise TypeError: Raises if a pool or object name isn't a string
+    :raise ArgumentValid: Raises if ceph_argparse would reject the value.
+        A rejected choice or number raises ValueError instead where
+        ceph_argparse isn't installed.
+    """
+    kind = arg['type']
+    if kind in _STRING_TYPES:
+        if not isinstance(value, six.string_types):
+            raise TypeError("{} is not a String".format(arg['name']))
+    elif kind == 'CephChoices':
+        choices = validator.choices(arg['strings'])
+        for s in value:
+            choices.valid(s)
+    elif kind == 'CephInt':
+        validator.integer(arg.get('range', '')).valid(value)
+    elif kind == 'CephFloat':
+        validator.floating(arg.get('range', '')).valid(value)
+    elif kind == 'CephString':
+        validator.string(arg.get('goodchars', '')).valid(value)
+    else:
+        validator.argtype(kind).valid(value)
+
+
+def _describe(arg):
+    # The :param: text for an argument
+    kind = arg['type']
+    if kind == 'CephChoices':
+        text = 'list valid_range=[{}]'.format(
+            ','.join('"{}"'.format(s) for s in arg['strings'].split('|')))
+    elif kind in ('CephInt', 'CephFloat'):
+        text = 'int' if kind == 'CephInt' else 'float'
+        bounds = arg.get('range', '').split('|') if arg.get('range') else []
+        for label, bound in zip(('min', 'max'), bounds):
+            text += ' {}={}'.format(label, bound)
+    else:
+        text = 'six.string_types'
+        if arg.get('goodchars'):
+            text += ' valid_characters={}'.format(arg['goodchars'])
+    if arg.get('n') == 'N':
+        text += ' allowed repeats=many'
+    return text
+
+
+def _docstring(method, help, args, signature, binary, upload):
+    lines = ['{}({})'.format(method, ', '.join(signature)), '', help, '']
+    for arg in args:
+        lines.append(':param {}: {}'.format(arg['name'], _describe(arg)))
+    if binary:
+        lines.extend([
+            ':param outfile: A path, file like object or writable buffer to',
+            '    write the map to, see ceph_api.output.write_outbuf().  The',
+            '    byte count written is returned in place of the outbuf.',
+        ])
+    if upload:
+        lines.extend([
+            ':param inbuf: The input as bytes or a buffer, eg: an mmap',
+            ':param infile: A path or file like object to read the input',
+            '    from, in place of inbuf',
+        ])
+    lines.extend([
+        ':return: (string outbuf, string outs)',
+        ':raise CephError: Raises CephError on command execution errors',
+        ':raise rados.Error: Raises on rados errors',
+    ])
+    return '\n'.join(lines)
+
+
+def _bind(method, names, required, args, kwargs):
+    # Match call arguments to names the way a def with defaults would
+    if len(args) > len(names):
+        raise TypeError("{}() takes at most {} arguments ({} given)".format(
+            method, len(names) + 1, len(args) + 1))
+    values = dict(zip(names, args))
+    for name, value in kwargs.items():
+        if name not in names:
+            raise TypeError("{}() got an unexpected keyword argument "
+                            "'{}'".format(method, name))
+        if name in values:
+            raise TypeError("{}() got multiple values for argument "
+                            "'{}'".format(method, name))
+        values[name] = value
+    missing = [name for name in names[:required] if name not in values]
+    if missing:
+        raise TypeError("{}() missing required arguments: {}".format(
+            method, ', '.join(missing)))
+    return values
+
+
+def make_method(command):
+    """Build the method that sends one command.
+
+    Required arguments come first and are positional, optional arguments
+    default to None and are left out of the command when None.  Commands
+    that return a binary map also take an outfile keyword argument and
+    commands that read an input file take inbuf and infile.
+
+    :param command: A (method, prefix, help, args) tuple from the table
+    :return: function taking (self, *args, **kwargs)
+    """
+    name, prefix, help, args = command
+    args = [dict(arg) for arg in args]
+    names = [arg['name'] for arg in args]
+    required = len([arg for arg in args if arg.get('req', True)])
+    binary = prefix in output.BINARY_COMMANDS
+    upload = (prefix, frozenset(names)) in output.INPUT_COMMANDS
+    extra = (('outfile',) if binary else ()) + \
+        (('inbuf', 'infile') if upload else ())
+
+    def method(self, *call_args, **call_kwargs):
+        run_kwargs = {'inbuf': ''}
+        for key in extra:
+            if key in call_kwargs:
+                run_kwargs[key] = call_kwargs.pop(key)
+        values = _bind(name, names, required, call_args, call_kwargs)
+        cmd = {'prefix': prefix}
+        for arg in args:
+            value = values.get(arg['name'])
+            if value is None and not arg.get('req', True):
+                continue
+            validate_arg(arg, value)
+            cmd[arg['name']] = value
+        return self._run(cmd, **run_kwargs)
+
+    signature = names[:required] + ['{}=None'.format(optional)
+                                    for optional in names[required:]]
+    signature.extend('{}=None'.format(key) for key in extra)
+    method.__name__ = str(name)
+    method.__doc__ = _docstring(name, help, args, signature, binary,
+                                upload)
+    return method
+
+
+class _LazyMethod(object):
+    # Stands in for a command method until it is first looked up, then
+    # replaces itself on the class with the real one
+    def __init__(self, command):
+        self.command = command
+        self.owner = None
+
+    def __get__(self, obj, objtype=None):
+        method = make_method(self.command)
+        setattr(self.owner, self.command[0], method)
+        return method.__get__(obj, objtype)
+
+
+def command_class(name, table, module=__name__):
+    """Build one command class from a list of commands.
+
+    :param name: The class name, eg: OsdCommand
+    :param table: list of (method, prefix, help, args) tuples
+    :param module: The __module__ to give the class
+    :return: A CommandBase subclass with one method per command
+    """
+    methods = dict((command[0], _LazyMethod(command)) for command in table)
+    attrs = dict(methods, __module__=module)
+    cls = type(str(name), (CommandBase,), attrs)
+    for method in methods.values():
+        method.owner = cls
+    return cls
+
+
+def release_classes(release, module=__name__):
+    """Build the command classes of a release.
+
+    :param release: One of RELEASES
+    :param module: The __module__ to give the classes
+    :return: dict of class name to class
+    """
+    return dict((name, command_class(name, table, module))
+                for name, table in release_commands(release).items())
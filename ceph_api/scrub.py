@@ -0,0 +1,180 @@
+"""Catch up on overdue scrubs without piling them onto a few OSDs.
+
+ScrubScheduler finds the PGs whose last scrub or deep scrub is older
+than the interval, most overdue first, and starts as many as an
+OsdThrottle allows: at most max_per_osd scrubs on any OSD of an acting
+set, no faster than rate, and only inside the allowed hours::
+
+    pg = PlacementGroupCommand('/etc/ceph/ceph.conf',
+                               output_format='json-raw')
+    scheduler = ScrubScheduler(pg, rate=0.2, windows=[(22, 6)])
+    while True:
+        pgs = PGStatsTable.from_outbuf(pg.pg_dump_json(['pgs'])[0])
+        for pgid, deep in scheduler.step(pgs):
+            print('started', pgid, 'deep' if deep else '')
+        time.sleep(60)
+
+A scrub counts as finished once its stamp moves past the one it
+started from, or after timeout seconds.  OSDs whose client latency is
+too high can be left out of a step with exclude_osds, eg: from osd
+perf.
+
+Requires numpy, available as the 'numpy' extra.
+"""
+import time
+
+import numpy as np
+
+from ceph_api.pgmap import PG_STATE_BITS
+from ceph_api.throttle import OsdThrottle
+
+__author__ = 'Chris Holcombe <chris.holcombe@canonical.com>'
+
+# The osd_scrub_max_interval and osd_deep_scrub_interval defaults
+DEFAULT_SCRUB_INTERVAL = 7 * 24 * 3600.0
+DEFAULT_DEEP_SCRUB_INTERVAL = 7 * 24 * 3600.0
+# osd_max_scrubs
+DEFAULT_MAX_PER_OSD = 1
+DEFAULT_TIMEOUT = 6 * 3600.0
+
+_SCRUBBING = PG_STATE_BITS['scrubbing'] | PG_STATE_BITS['deep_scrub'] | \
+    PG_STATE_BITS['repair']
+_READY = PG_STATE_BITS['active'] | PG_STATE_BITS['clean']
+
+
+def in_windows(windows, now=None):
+    """Whether the local hour is inside any of the windows.
+
+    :param windows: list of (begin_hour, end_hour), read the way
+        osd_scrub_begin_hour and osd_scrub_end_hour are: a window whose
+        begin is after its end runs past midnight, and one whose begin
+        equals its end is always open.  None is always open.
+    :param now: Seconds since the epoch, defaults to now
+    :return: bool
+    """
+    if windows is None:
+        return True
+    hour = time.localtime(now).tm_hour
+    for begin, end in windows:
+        if begin == end:
+            return True
+        if begin < end and begin <= hour < end:
+            return True
+        if begin > end and (hour >= begin or hour < end):
+            return True
+    return False
+
+
+def overdue(pgs, now=None, scrub_interval=DEFAULT_SCRUB_INTERVAL,
+            deep_interval=DEFAULT_DEEP_SCRUB_INTERVAL):
+    """Find the active+clean PGs that are due a scrub and not scrubbing.
+
+    :param pgs: ceph_api.pgtable.PGStatsTable
+    :param now: Seconds since the epoch, defaults to now
+    :param scrub_interval: Seconds after which a scrub is due
+    :param deep_interval: Seconds after which a deep scrub is due
+    :return: (rows, deep) numpy arrays, most overdue first with deep
+        scrubs ahead of plain ones.  deep is True where the row is due a
+        deep scrub.
+    """
+    if now is None:
+        now = time.time()
+    ready = ((pgs.state & np.uint64(_READY)) == _READY) & \
+        ((pgs.state & np.uint64(_SCRUBBING)) == 0)
+    deep_late = now - pgs.last_deep_scrub_stamp - deep_interval
+    late = now - pgs.last_scrub_stamp - scrub_interval
+    deep = ready & (deep_late >= 0)
+    due = deep | (ready & (late >= 0))
+    rows = np.flatnonzero(due)
+    lateness = np.where(deep, deep_late, late)[rows]
+    order = np.lexsort((-lateness, ~deep[rows]))
+    rows = rows[order]
+    return rows, deep[rows]
+
+
+class ScrubScheduler(object):
+    """Starts overdue scrubs under per-OSD, rate and time limits.
+
+    :param pg_command: The PlacementGroupCommand to scrub with
+    :param scrub_interval: Seconds after which a scrub is due
+    :param deep_interval: Seconds after which a deep scrub is due
+    :param max_per_osd: Most scrubs any OSD of an acting set takes part in
+    :param rate: Most scrubs started per second.  None for no limit.
+    :param burst: How many scrubs the rate limit lets start at once
+    :param windows: list of (begin_hour, end_hour) scrubs may start in,
+        see in_windows()
+    :param timeout: Seconds after which a scrub whose stamp hasn't moved
+        is given up on and its slots freed
+    :param throttle: An OsdThrottle to use instead of one made from
+        max_per_osd, rate and burst, eg: one shared with a
+        ceph_api.repair.RepairQueue
+    :ivar running: dict of pgid to (started, deep, stamp it started from)
+    """
+
+    def __init__(self, pg_command, scrub_interval=DEFAULT_SCRUB_INTERVAL,
+                 deep_interval=DEFAULT_DEEP_SCRUB_INTERVAL,
+                 max_per_osd=DEFAULT_MAX_PER_OSD, rate=None, burst=None,
+                 windows=None, timeout=DEFAULT_TIMEOUT, throttle=None):
+        self.pg_command = pg_command
+        self.scrub_interval = scrub_interval
+        self.deep_interval = deep_interval
+        self.windows = windows
+        self.timeout = timeout
+        self.throttle = throttle if throttle is not None else \
+            OsdThrottle(max_per_osd, rate, burst)
+        self.running = {}
+
+    def _finish(self, pgs, now):
+        # Free the slots of the scrubs whose stamp has moved on
+        if not self.running:
+            return
+        rows = np.flatnonzero(np.isin(pgs.pgid, list(self.running)))
+        stamps = dict(zip(pgs.pgid[rows].tolist(),
+                          zip(pgs.last_scrub_stamp[rows].tolist(),
+                              pgs.last_deep_scrub_stamp[rows].tolist())))
+        for pgid, (started, deep, stamp) in list(self.running.items()):
+            current = stamps.get(pgid)
+            done = current is None or now - started >= self.timeout or \
+                current[1 if deep else 0] > stamp
+            if done:
+                del self.running[pgid]
+                self.throttle.release(pgid)
+
+    def step(self, pgs, now=None, exclude_osds=None):
+        """Mark finished scrubs and start as many overdue ones as the
+        limits allow.
+
+        :param pgs: ceph_api.pgtable.PGStatsTable from a recent pg dump
+        :param now: Seconds since the epoch, defaults to now
+        :param exclude_osds: OSD ids not to start any scrub on this step
+        :return: list of (pgid, deep) started
+        :raise CephError: Raises on command errors
+        """
+        if now is None:
+            now = time.time()
+        self._finish(pgs, now)
+        if not in_windows(self.windows, now) or \
+                self.throttle.tokens(now) < 1:
+            return []
+        rows, deep = overdue(pgs, now, self.scrub_interval,
+                             self.deep_interval)
+        pgids = pgs.pgid[rows].tolist()
+        started = []
+        for position in self.throttle.admit(pgids, pgs.acting[rows], now,
+                                            exclude_osds):
+            pgid = pgids[position]
+            row = rows[position]
+            is_deep = bool(deep[position])
+            stamp = pgs.last_deep_scrub_stamp[row] if is_deep \
+                else pgs.last_scrub_stamp[row]
+            try:
+                if is_deep:
+                    self.pg_command.pg_deep_scrub(pgid)
+                else:
+                    self.pg_command.pg_scrub(pgid)
+            except Exception:
+                self.throttle.release(pgid)
+                raise
+            self.running[pgid] = (now, is_deep, float(stamp))
+            started.append((pgid, is_deep))
+        return started
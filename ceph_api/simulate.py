@@ -0,0 +1,342 @@
+"""Predict the data movement of an osdmap change before making it.
+
+Simulation applies osd out, osd reweight, osd crush reweight and osd pool
+set to local copies of the osd and CRUSH maps, maps every PG through
+both, and weighs each PG that moves by its size in pg dump::
+
+    osd = OsdCommand('/etc/ceph/ceph.conf', output_format='json-raw')
+    pg = PlacementGroupCommand('/etc/ceph/ceph.conf',
+                               output_format='json-raw')
+    sim = Simulation.from_outbufs(osd.osd_dump()[0],
+                                  osd.osd_getcrushmap()[0],
+                                  pg.pg_dump_json(['pgs'])[0],
+                                  osd.osd_df()[0])
+    sim.osd_out([12, 13])
+    sim.osd_pool_set('rbd', 'pgp_num', 2048)
+    movement = sim.run()
+    print(movement.pgs_moved, movement.bytes_moved, movement.full)
+
+Every PG is mapped with ceph_api.placement, so a few hundred thousand
+PGs take seconds.
+
+Requires numpy, available as the 'numpy' extra.
+"""
+import collections
+import copy
+
+import numpy as np
+
+from ceph_api import output
+from ceph_api.crushedit import CrushTransaction
+from ceph_api.crushmap import CrushMap
+from ceph_api.mapper import CRUSH_ITEM_NONE
+from ceph_api.pgtable import NO_OSD, PGStatsTable
+from ceph_api.placement import POOL_TYPE_ERASURE, Placement, _mask, \
+    _parse_pgid, stable_mod
+
+__author__ = 'Chris Holcombe <chris.holcombe@canonical.com>'
+
+# mon_osd_full_ratio and mon_osd_nearfull_ratio defaults
+FULL_RATIO = 0.95
+NEARFULL_RATIO = 0.85
+
+# osd pool set variables a simulation can change, and the osd dump key
+# each is kept under
+POOL_VARS = {
+    'pg_num': 'pg_num',
+    'pgp_num': 'pg_placement_num',
+    'size': 'size',
+    'crush_ruleset': 'crush_ruleset',
+}
+
+
+class Movement(collections.namedtuple('Movement', [
+        'pgs', 'pgs_moved', 'bytes_moved', 'pools', 'osds', 'bytes_before',
+        'bytes_after', 'pgs_before', 'pgs_after', 'utilization', 'full',
+        'nearfull'])):
+    """What a Simulation's changes would do.
+
+    pgs_moved counts the PGs with at least one copy or shard landing on a
+    new OSD and bytes_moved is the data those copies hold.  pools maps
+    each pool id to its own (pgs_moved, bytes_moved).  osds holds every
+    OSD id, and bytes_before, bytes_after, pgs_before and pgs_after are
+    arrays of the PG data and PG count on each of them.  utilization is
+    the projected fraction of each OSD in use, or None without osd df
+    data, and full and nearfull list the OSDs it puts at or over the
+    ratios.
+    """
+    __slots__ = ()
+
+
+def hash_share(ps, pg_num):
+    """The fraction of the object hash space each PG of a pool holds.
+
+    ceph_stable_mod() gives the PGs past the last power of two below
+    pg_num half the share of the rest, so their parents keep the other
+    half until they split.
+
+    :param ps: numpy array of placement seeds
+    :param pg_num: The pool's pg_num
+    :return: numpy float array
+    """
+    span = _mask(pg_num) + 1
+    half = span >> 1
+    doubled = (ps < half) & (ps + half >= pg_num)
+    return np.where(doubled, 2.0, 1.0) / span
+
+
+def _osd_df_capacity(osd_df, size):
+    # Bytes used and total of each OSD from the decoded osd df
+    used = np.zeros(size, dtype=np.float64)
+    total = np.zeros(size, dtype=np.float64)
+    for node in osd_df.get('nodes', []):
+        if node.get('type', 'osd') != 'osd' or not 0 <= node['id'] < size:
+            continue
+        used[node['id']] = node.get('kb_used', 0) * 1024.0
+        total[node['id']] = node.get('kb', 0) * 1024.0
+    return used, total
+
+
+class Simulation(object):
+    """Proposed changes to an osdmap, and the movement they'd cause.
+
+    The change methods are named after, and take the arguments of, the
+    commands they stand in for.  Changes add up until run() is called,
+    and run() can be called again after making more.
+
+    :param placement: ceph_api.placement.Placement of the current epoch
+    :param pgs: ceph_api.pgtable.PGStatsTable from pg dump, for PG sizes
+    :param osd_df: The decoded JSON of osd df, for OSD capacities.
+        Without it no OSD is reported full.
+    :param full_ratio: Usage at which an OSD is full
+    :param nearfull_ratio: Usage at which an OSD is nearfull
+
+    After run(), proposed is the Placement the changes were mapped with.
+    """
+
+    def __init__(self, placement, pgs, osd_df=None, full_ratio=FULL_RATIO,
+                 nearfull_ratio=NEARFULL_RATIO):
+        self.placement = placement
+        self.pgs = pgs
+        self.osd_df = osd_df
+        self.full_ratio = full_ratio
+        self.nearfull_ratio = nearfull_ratio
+        self.proposed = None
+        self.osdmap = copy.deepcopy(placement.osdmap)
+        # osd crush commands are tried out on a local transaction, which
+        # can also be used directly for any other CRUSH edit
+        self.crush = CrushTransaction(
+            None, CrushMap.decode(placement.crush.encode()))
+        self._pg_bytes = {}
+        for pgid, num_bytes in zip(pgs.pgid.tolist(),
+                                   pgs.num_bytes.tolist()):
+            pool_id, ps = _parse_pgid(pgid)
+            self._pg_bytes.setdefault(pool_id, {})[ps] = num_bytes
+
+    @classmethod
+    def from_outbufs(cls, osd_dump, crushmap, pg_dump, osd_df=None,
+                     **kwargs):
+        """Build from the outbufs of osd dump, osd getcrushmap, pg dump
+        and, optionally, osd df.
+
+        :param osd_dump: The JSON outbuf of osd dump
+        :param crushmap: The binary outbuf of osd getcrushmap
+        :param pg_dump: The JSON outbuf of pg dump, pg dump_json or pg ls
+        :param osd_df: The JSON outbuf of osd df
+        :return: Simulation
+        """
+        return cls(Placement.from_outbufs(osd_dump, crushmap),
+                   PGStatsTable.from_outbuf(pg_dump),
+                   output.loads(osd_df) if osd_df is not None else None,
+                   **kwargs)
+
+    def _osd(self, osd_id):
+        for osd in self.osdmap['osds']:
+            if osd['osd'] == osd_id:
+                return osd
+        raise KeyError("osd.{} does not exist".format(osd_id))
+
+    def osd_out(self, ids):
+        """osd out: set the OSDs' reweight to 0.
+
+        :param ids: list of OSD ids
+        """
+        for osd_id in ids:
+            osd = self._osd(osd_id)
+            osd['weight'] = 0.0
+            osd['in'] = 0
+
+    def osd_in(self, ids):
+        """osd in: set the OSDs' reweight back to 1.
+
+        :param ids: list of OSD ids
+        """
+        for osd_id in ids:
+            osd = self._osd(osd_id)
+            if not osd['weight']:
+                osd['weight'] = 1.0
+            osd['in'] = 1
+
+    def osd_reweight(self, id, weight):
+        """osd reweight: set an OSD's reweight.
+
+        :param id: The OSD id
+        :param weight: float from 0 to 1
+        """
+        if not 0.0 <= weight <= 1.0:
+            raise ValueError("weight must be in the range [0, 1]")
+        osd = self._osd(id)
+        osd['weight'] = float(weight)
+        osd['in'] = 1 if weight else 0
+
+    def osd_crush_reweight(self, name, weight):
+        """osd crush reweight: change an item's CRUSH weight.
+
+        :param name: The item's name, eg: osd.12
+        :param weight: The new weight, eg: 1.82
+        """
+        self.crush.reweight(name, weight)
+
+    def osd_pool_set(self, pool, var, val):
+        """osd pool set for the variables that move data: pg_num,
+        pgp_num, size and crush_ruleset.
+
+        :param pool: The pool name
+        :param var: One of POOL_VARS
+        :param val: The new value
+        :raise ValueError: Raises on other variables, and on lowering
+            pg_num, which jewel can't do
+        """
+        if var not in POOL_VARS:
+            raise ValueError("Can't simulate setting {}, choose one of "
+                             "{}".format(var, ', '.join(sorted(POOL_VARS))))
+        spec = self._pool(pool)
+        val = int(val)
+        if var == 'pg_num':
+            if val < spec['pg_num']:
+                raise ValueError("pg_num can't be decreased")
+        elif var == 'pgp_num' and val > spec['pg_num']:
+            raise ValueError("pgp_num can't exceed pg_num")
+        spec[POOL_VARS[var]] = val
+
+    def _pool(self, pool):
+        for spec in self.osdmap['pools']:
+            if pool in (spec['pool'], spec['pool_name']):
+                return spec
+        raise KeyError("No pool {}".format(pool))
+
+    def _shards(self, spec):
+        # How many pieces each copy of a PG's data is cut into
+        if spec['type'] != POOL_TYPE_ERASURE:
+            return 1
+        profile = self.osdmap.get('erasure_code_profiles', {}).get(
+            spec.get('erasure_code_profile'), {})
+        # Without the profile the PG is taken as split evenly over all
+        # of its shards
+        return int(profile.get('k', spec['size']))
+
+    def _pool_bytes(self, pool_id, pg_num):
+        found = self._pg_bytes.get(pool_id, {})
+        nbytes = np.zeros(pg_num, dtype=np.float64)
+        if found:
+            ps = np.fromiter(found.keys(), dtype=np.int64, count=len(found))
+            values = np.fromiter(found.values(), dtype=np.float64,
+                                 count=len(found))
+            inside = ps < pg_num
+            nbytes[ps[inside]] = values[inside]
+        return nbytes
+
+    def run(self):
+        """Map every PG before and after the changes made so far.
+
+        PGs that split because pg_num grew start on their parent's OSDs
+        and with the part of its data their share of the hash space
+        gives them.
+
+        :return: Movement
+        """
+        before = self.placement
+        after = Placement(self.osdmap, self.crush.crush)
+        self.proposed = after
+        size = max(len(before.weights), len(after.weights))
+        bytes_before = np.zeros(size, dtype=np.float64)
+        bytes_after = np.zeros(size, dtype=np.float64)
+        pgs_before = np.zeros(size, dtype=np.int64)
+        pgs_after = np.zeros(size, dtype=np.int64)
+        pools = {}
+        total_pgs = 0
+        for pool_id, old_spec in sorted(before.pools.items()):
+            spec = after.pools[pool_id]
+            old_num = old_spec['pg_num']
+            new_num = spec['pg_num']
+            old_up = before._pool_sets(pool_id)[0]
+            new_up = after._pool_sets(pool_id)[0]
+            old_bytes = self._pool_bytes(pool_id, old_num)
+            ps = np.arange(new_num)
+            parent = stable_mod(ps, old_num, _mask(old_num))
+            pg_bytes = old_bytes[parent] * (hash_share(ps, new_num) /
+                                            hash_share(parent, old_num))
+            # Split PGs start out where their parent is
+            old_rows = old_up[parent]
+            width = max(old_rows.shape[1], new_up.shape[1])
+            old_rows = _widen(old_rows, width)
+            new_rows = _widen(new_up, width)
+            shift = spec['type'] != POOL_TYPE_ERASURE
+            old_copy = old_bytes / self._shards(old_spec)
+            new_copy = pg_bytes / self._shards(spec)
+            if shift:
+                landed = _placed(new_rows) & ~_member(new_rows, old_rows)
+            else:
+                landed = _placed(new_rows) & (new_rows != old_rows)
+            moved = landed.any(axis=1)
+            moved_bytes = (landed.sum(axis=1) * new_copy).sum()
+            pools[pool_id] = (int(moved.sum()), float(moved_bytes))
+            total_pgs += new_num
+            for rows, copy_bytes, osd_bytes, osd_pgs in (
+                    (old_up, old_copy, bytes_before, pgs_before),
+                    (new_up, new_copy, bytes_after, pgs_after)):
+                placed = _placed(rows)
+                osds = rows[placed]
+                osd_bytes += np.bincount(
+                    osds, weights=np.broadcast_to(
+                        copy_bytes[:, None], rows.shape)[placed],
+                    minlength=size)[:size]
+                osd_pgs += np.bincount(osds, minlength=size)[:size]
+        utilization = None
+        full = []
+        nearfull = []
+        if self.osd_df is not None:
+            used, total = _osd_df_capacity(self.osd_df, size)
+            projected = used + bytes_after - bytes_before
+            utilization = np.divide(projected, total,
+                                    out=np.zeros(size), where=total > 0)
+            full = np.flatnonzero(utilization >= self.full_ratio).tolist()
+            nearfull = np.flatnonzero(
+                (utilization >= self.nearfull_ratio) &
+                (utilization < self.full_ratio)).tolist()
+        return Movement(
+            pgs=total_pgs,
+            pgs_moved=sum(moved for moved, _ in pools.values()),
+            bytes_moved=sum(moved for _, moved in pools.values()),
+            pools=pools, osds=np.arange(size), bytes_before=bytes_before,
+            bytes_after=bytes_after, pgs_before=pgs_before,
+            pgs_after=pgs_after, utilization=utilization, full=full,
+            nearfull=nearfull)
+
+
+def _widen(rows, width):
+    if rows.shape[1] >= width:
+        return rows
+    out = np.full((len(rows), width), NO_OSD, dtype=rows.dtype)
+    out[:, :rows.shape[1]] = rows
+    return out
+
+
+def _placed(rows):
+    # Slots holding an OSD, rather than padding or an erasure coded hole
+    return (rows != NO_OSD) & (rows != CRUSH_ITEM_NONE)
+
+
+def _member(rows, others):
+    # Whether each slot's OSD is anywhere in the same row of others
+    return (rows[:, :, None] == others[:, None, :]).any(axis=2)
@@ -0,0 +1,162 @@
+"""Limits on how much background PG work runs at once.
+
+A scrub or repair keeps every OSD in the PG's acting set busy until it
+finishes.  OsdThrottle hands out a slot on each of those OSDs and lets
+work start only while every one of them has a slot free, optionally
+under an overall rate limit::
+
+    throttle = OsdThrottle(max_per_osd=1, rate=0.5, burst=4)
+    if throttle.acquire('3.1f', [12, 40, 77]):
+        pg.pg_repair('3.1f')
+    ...
+    throttle.release('3.1f')
+
+Schedulers that share one throttle count their work against the same
+limits.
+
+Requires numpy, available as the 'numpy' extra.
+"""
+import collections
+import time
+
+import numpy as np
+
+from ceph_api.pgtable import NO_OSD
+
+__author__ = 'Chris Holcombe <chris.holcombe@canonical.com>'
+
+# Candidates admit() walks one at a time before dropping the ones that
+# touch a newly full OSD all at once
+_CHUNK = 256
+
+
+class OsdThrottle(object):
+    """Per-OSD concurrency slots and a token bucket rate limit.
+
+    :param max_per_osd: Most pieces of work any one OSD takes part in
+    :param rate: Most new pieces of work started per second, on average.
+        None doesn't limit the rate.
+    :param burst: How many starts the rate limit lets through at once,
+        defaults to one
+    :ivar active: dict of each running key to its OSDs
+    """
+
+    def __init__(self, max_per_osd=1, rate=None, burst=None):
+        if max_per_osd < 1:
+            raise ValueError("max_per_osd must be at least 1")
+        self.max_per_osd = max_per_osd
+        self.rate = rate
+        self.burst = float(burst if burst is not None else 1)
+        self.active = {}
+        self._load = collections.Counter()
+        self._tokens = self.burst
+        self._refilled = None
+
+    def load(self, osd):
+        """How many running pieces of work an OSD is in.
+
+        :param osd: The OSD id
+        :return: int
+        """
+        return self._load[osd]
+
+    def busy_osds(self):
+        """The OSDs with no slot free.
+
+        :return: list of OSD ids
+        """
+        return [osd for osd, count in self._load.items()
+                if count >= self.max_per_osd]
+
+    def tokens(self, now=None):
+        """How many starts the rate limit allows right now.
+
+        :param now: The current time, defaults to now
+        :return: float, or inf without a rate limit
+        """
+        if self.rate is None:
+            return float('inf')
+        if now is None:
+            now = time.time()
+        if self._refilled is not None:
+            self._tokens = min(self.burst, self._tokens +
+                               (now - self._refilled) * self.rate)
+        self._refilled = now
+        return self._tokens
+
+    def fits(self, osds):
+        """Whether every OSD has a slot free.
+
+        :param osds: list of OSD ids
+        :return: bool
+        """
+        return all(self._load[osd] < self.max_per_osd for osd in osds)
+
+    def acquire(self, key, osds, now=None):
+        """Take a slot on every OSD, and a token, if all are free.
+
+        :param key: What the work is known by, eg: the pgid
+        :param osds: The OSDs it keeps busy
+        :param now: The current time, defaults to now
+        :return: bool, whether the work may start
+        :raise ValueError: Raises if key is already running
+        """
+        if key in self.active:
+            raise ValueError("{} is already running".format(key))
+        if self.tokens(now) < 1 or not self.fits(osds):
+            return False
+        if self.rate is not None:
+            self._tokens -= 1
+        osds = list(osds)
+        self.active[key] = osds
+        self._load.update(osds)
+        return True
+
+    def release(self, key):
+        """Give back the slots of a finished piece of work.  Unknown keys
+        are ignored.
+
+        :param key: The key it was acquired with
+        """
+        osds = self.active.pop(key, None)
+        if osds is None:
+            return
+        self._load.subtract(osds)
+        for osd in osds:
+            if self._load[osd] <= 0:
+                del self._load[osd]
+
+    def admit(self, keys, sets, now=None, exclude_osds=None):
+        """Acquire slots for as many candidates as fit, in order.
+
+        :param keys: list of candidate keys, eg: pgids, in order of
+            priority
+        :param sets: numpy int array of each candidate's OSDs, one row
+            each padded with NO_OSD, eg: PGStatsTable.acting
+        :param now: The current time, defaults to now
+        :param exclude_osds: OSD ids to start nothing on
+        :return: list of the positions in keys that were acquired
+        """
+        if now is None:
+            now = time.time()
+        exclude = list(exclude_osds or [])
+        positions = np.arange(len(keys))
+        admitted = []
+        while len(positions) and self.tokens(now) >= 1:
+            blocked = self.busy_osds() + exclude
+            if blocked:
+                positions = positions[
+                    ~np.isin(sets[positions], blocked).any(axis=1)]
+            chunk = positions[:_CHUNK]
+            positions = positions[_CHUNK:]
+            for position, osds in zip(chunk.tolist(),
+                                      sets[chunk].tolist()):
+                key = keys[position]
+                if key in self.active:
+                    continue
+                if self.tokens(now) < 1:
+                    break
+                if self.acquire(key, [osd for osd in osds
+                                      if osd != NO_OSD], now):
+                    admitted.append(position)
+        return admitted
@@ -1,5 +1,10 @@
+import threading
+
 import six
 
+# ceph_argparse is imported where it is first needed, so importing
+# ceph_api doesn't pull it in
+
 __author__ = 'Chris Holcombe <chris.holcombe@canonical.com>'
 
 
@@ -39,3 +44,122 @@ def validator(value, valid_type, valid_range=None):
             assert value <= valid_range[1], \
                 "{} is greater than maximum allowed value of {}".format(
                     value, valid_range[1])
+
+
+# Validators for the generated command methods.  Building a
+# ceph_argparse type splits choice strings and, for CephString, runs a
+# regex over every printable character, so each distinct validator is
+# built once on first use and reused for every later call.
+_validators = {}
+_validators_lock = threading.Lock()
+
+
+def _memoize(key, build):
+    found = _validators.get(key)
+    if found is None:
+        with _validators_lock:
+            found = _validators.get(key)
+            if found is None:
+                found = _validators[key] = build()
+    return found
+
+
+def _argparse_type(name, **kwargs):
+    import ceph_argparse
+    return getattr(ceph_argparse, name)(**kwargs)
+
+
+def _invalid(msg):
+    # ceph_argparse's ArgumentValid, or ValueError where it isn't
+    # installed, so choices and ranges can be checked without it
+    try:
+        import ceph_argparse
+    except ImportError:
+        return ValueError(msg)
+    return ceph_argparse.ArgumentValid(msg)
+
+
+class ChoicesValidator(object):
+    """CephChoices with set membership in place of a list scan.
+
+    :param strings: The allowed values separated by |
+    """
+
+    def __init__(self, strings):
+        self.strings = strings.split('|')
+        self._allowed = frozenset(self.strings)
+
+    def valid(self, s, partial=False):
+        if s not in self._allowed:
+            raise _invalid("{0} not in {1}".format(s, '|'.join(self.strings)))
+
+
+class RangeValidator(object):
+    """CephInt and CephFloat with their bounds parsed once.
+
+    :param convert: int or float
+    :param range: The bounds as min or min|max, or '' for none
+    """
+
+    def __init__(self, convert, range):
+        self.convert = convert
+        self.range = [convert(x) for x in range.split('|')] if range else []
+        self._min = self.range[0] if self.range else None
+        self._max = self.range[1] if len(self.range) == 2 else None
+
+    def valid(self, s, partial=False):
+        try:
+            val = self.convert(s)
+        except ValueError:
+            raise _invalid("{0} doesn't represent {1}".format(
+                s, 'an int' if self.convert is int else 'a float'))
+        if (self._min is not None and val < self._min) or \
+                (self._max is not None and val > self._max):
+            raise _invalid("{0} not in range {1}".format(val, self.range))
+
+
+def choices(strings):
+    """Shared validator for a CephChoices argument.
+
+    :param strings: The allowed values separated by |
+    :return: ChoicesValidator
+    """
+    return _memoize(('choices', strings), lambda: ChoicesValidator(strings))
+
+
+def integer(range=''):
+    """Shared validator for a CephInt argument.
+
+    :param range: The bounds as min or min|max, or '' for none
+    :return: RangeValidator
+    """
+    return _memoize(('int', range), lambda: RangeValidator(int, range))
+
+
+def floating(range=''):
+    """Shared validator for a CephFloat argument.
+
+    :param range: The bounds as min or min|max, or '' for none
+    :return: RangeValidator
+    """
+    return _memoize(('float', range), lambda: RangeValidator(float, range))
+
+
+def string(goodchars=''):
+    """Shared validator for a CephString argument.
+
+    :param goodchars: The goodchars regex given to CephString
+    :return: ceph_argparse.CephString
+    """
+    return _memoize(('CephString', goodchars),
+                    lambda: _argparse_type('CephString', goodchars=goodchars))
+
+
+def argtype(name):
+    """Shared instance of an argument-less ceph_argparse type, eg:
+    CephOsdName or CephPgid.
+
+    :param name: The ceph_argparse class name
+    :return: An instance of that class
+    """
+    return _memoize((name,), lambda: _argparse_type(name))
@@ -77,5 +77,7 @@ setup(
     install_requires=['six'],
     extras_require={
         'dev': [''],
+        'json': ['orjson'],
+        'numpy': ['numpy'],
     },
 )
@@ -0,0 +1,27 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+import fakerados  # noqa: E402
+
+# The commands only import rados when they connect, so the fake stands in
+# for it everywhere
+sys.modules['rados'] = fakerados
+
+from ceph_api import connection  # noqa: E402
+
+__author__ = 'Chris Holcombe <chris.holcombe@canonical.com>'
+
+
+@pytest.fixture
+def rados():
+    """The fake rados module, reset, with fresh connection pools.  Set
+    rados.Rados.handler to answer commands."""
+    fakerados.Rados.reset()
+    connection.close_connection_pools()
+    yield fakerados
+    connection.close_connection_pools()
+    fakerados.Rados.reset()
@@ -0,0 +1,65 @@
+"""A stand-in for the python rados binding.
+
+Only what ceph_api uses is here: Rados with connect(), shutdown(),
+state, mon_command(), osd_command() and pg_command(), and Error.  Every
+command goes to Rados.handler, which tests set to a callable taking
+(target, cmd, inbuf) and returning (ret, outbuf, outs).  target is
+'mon', ('osd', id) or ('pg', pgid) and cmd is the decoded JSON.
+"""
+import json
+import threading
+
+__author__ = 'Chris Holcombe <chris.holcombe@canonical.com>'
+
+
+class Error(Exception):
+    """rados.Error"""
+
+
+def _unhandled(target, cmd, inbuf):
+    raise AssertionError("Unexpected command {} to {}".format(cmd, target))
+
+
+class Rados(object):
+    handler = staticmethod(_unhandled)
+    # Every handle created, and every command sent, in order
+    created = []
+    sent = []
+    _lock = threading.Lock()
+
+    def __init__(self, conffile=None, name=None, conf=None):
+        self.conffile = conffile
+        self.name = name
+        self.conf = conf
+        self.state = 'configuring'
+        with Rados._lock:
+            Rados.created.append(self)
+
+    def connect(self):
+        self.state = 'connected'
+
+    def shutdown(self):
+        self.state = 'shutdown'
+
+    def _send(self, target, cmd, inbuf):
+        if self.state != 'connected':
+            raise Error("not connected")
+        cmd = json.loads(cmd)
+        with Rados._lock:
+            Rados.sent.append((target, cmd))
+        return Rados.handler(target, cmd, inbuf)
+
+    def mon_command(self, cmd, inbuf, timeout=0, target=None):
+        return self._send('mon', cmd, inbuf)
+
+    def osd_command(self, osdid, cmd, inbuf, timeout=0):
+        return self._send(('osd', osdid), cmd, inbuf)
+
+    def pg_command(self, pgid, cmd, inbuf, timeout=0):
+        return self._send(('pg', pgid), cmd, inbuf)
+
+    @classmethod
+    def reset(cls):
+        cls.handler = staticmethod(_unhandled)
+        cls.created = []
+        cls.sent = []
@@ -0,0 +1,113 @@
+import asyncio
+import errno
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from ceph_api.aio import AsyncOsdCommand
+from ceph_api.connection import CephError
+
+__author__ = 'Chris Holcombe <chris.holcombe@canonical.com>'
+
+
+def test_runs_commands_concurrently_up_to_executor_size(rados):
+    lock = threading.Lock()
+    state = {'running': 0, 'most': 0}
+    release = threading.Event()
+
+    def handler(target, cmd, inbuf):
+        with lock:
+            state['running'] += 1
+            state['most'] = max(state['most'], state['running'])
+        release.wait(5)
+        with lock:
+            state['running'] -= 1
+        return 0, b'{"epoch": 7}', ''
+
+    rados.Rados.handler = staticmethod(handler)
+    executor = ThreadPoolExecutor(max_workers=3)
+    osd = AsyncOsdCommand('/etc/ceph/ceph.conf', executor=executor)
+
+    async def main():
+        calls = [asyncio.ensure_future(osd.osd_stat()) for _ in range(8)]
+        # Let the executor fill up before letting the commands finish
+        while state['running'] < 3:
+            await asyncio.sleep(0.01)
+        await asyncio.sleep(0.05)
+        release.set()
+        return await asyncio.gather(*calls)
+
+    try:
+        results = asyncio.run(main())
+    finally:
+        executor.shutdown()
+    assert results == [(b'{"epoch": 7}', '')] * 8
+    assert state['most'] == 3
+
+
+def test_command_errors_are_raised_when_awaited(rados):
+    rados.Rados.handler = staticmethod(
+        lambda target, cmd, inbuf: (-errno.ENOENT, b'', 'no such pool'))
+    osd = AsyncOsdCommand('/etc/ceph/ceph.conf')
+
+    async def main():
+        await osd.osd_stat()
+
+    with pytest.raises(CephError) as raised:
+        asyncio.run(main())
+    assert raised.value.cmd['prefix'] == 'osd stat'
+
+
+def test_rados_errors_propagate_and_drop_the_connection(rados):
+    def handler(target, cmd, inbuf):
+        raise rados.Error("connection reset")
+
+    rados.Rados.handler = staticmethod(handler)
+    osd = AsyncOsdCommand('/etc/ceph/ceph.conf')
+
+    async def main():
+        await osd.osd_stat()
+
+    with pytest.raises(rados.Error):
+        asyncio.run(main())
+    assert [cluster.state for cluster in rados.Rados.created] == \
+        ['shutdown']
+
+
+def test_cancelled_command_returns_its_connection(rados):
+    started = threading.Event()
+    release = threading.Event()
+
+    def handler(target, cmd, inbuf):
+        started.set()
+        release.wait(5)
+        return 0, b'{"epoch": 7}', ''
+
+    rados.Rados.handler = staticmethod(handler)
+    executor = ThreadPoolExecutor(max_workers=1)
+    osd = AsyncOsdCommand('/etc/ceph/ceph.conf', executor=executor)
+
+    async def main():
+        task = asyncio.ensure_future(osd.osd_stat())
+        while not started.is_set():
+            await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        release.set()
+        # The next command gets the same, released, connection
+        return await osd.osd_stat()
+
+    try:
+        assert asyncio.run(main()) == (b'{"epoch": 7}', '')
+    finally:
+        executor.shutdown()
+    assert len(rados.Rados.created) == 1
+    assert rados.Rados.created[0].state == 'connected'
+
+
+def test_needs_a_running_loop(rados):
+    osd = AsyncOsdCommand('/etc/ceph/ceph.conf')
+    with pytest.raises(RuntimeError):
+        osd.osd_stat()
@@ -0,0 +1,101 @@
+import errno
+import threading
+
+from ceph_api.batch import BatchResult, CommandBatch
+from ceph_api.connection import DEFAULT_POOL_SIZE, CephError, \
+    get_connection_pool
+
+__author__ = 'Chris Holcombe <chris.holcombe@canonical.com>'
+
+
+def _answer(target, cmd, inbuf):
+    if cmd['prefix'] == 'osd metadata' and cmd['id'] == 3:
+        return -errno.ENOENT, b'', 'osd.3 does not exist'
+    return 0, str(cmd.get('id')).encode(), ''
+
+
+def test_runs_every_command(rados):
+    rados.Rados.handler = staticmethod(_answer)
+    batch = CommandBatch('/etc/ceph/ceph.conf', max_workers=3)
+    for osd_id in range(10):
+        batch.add({'prefix': 'osd metadata', 'id': osd_id})
+    results = batch.run()
+    assert [result.index for result in results] == list(range(10))
+    assert results[0].outbuf == b'0'
+    assert isinstance(results[3].error, CephError)
+    assert all(result.error is None for i, result in enumerate(results)
+               if i != 3)
+    assert isinstance(results[0], BatchResult)
+    assert results[0]._replace(outbuf=b'x').outbuf == b'x'
+
+
+def test_unexpected_errors_are_reported_per_command(rados):
+    def handler(target, cmd, inbuf):
+        if cmd.get('id') == 2:
+            raise KeyError('pgid')
+        return 0, str(cmd['id']).encode(), ''
+
+    rados.Rados.handler = staticmethod(handler)
+    batch = CommandBatch('/etc/ceph/ceph.conf', max_workers=1)
+    for osd_id in range(5):
+        batch.add({'prefix': 'osd metadata', 'id': osd_id})
+    results = batch.run()
+    assert isinstance(results[2].error, KeyError)
+    assert [result.outbuf for result in results] == \
+        [b'0', b'1', None, b'3', b'4']
+
+
+def test_commands_nobody_ran_are_reported(rados, monkeypatch):
+    def refuse(self):
+        raise rados.Error("connection refused")
+
+    monkeypatch.setattr(rados.Rados, 'connect', refuse)
+    batch = CommandBatch('/etc/ceph/ceph.conf', max_workers=2)
+    for osd_id in range(4):
+        batch.add({'prefix': 'osd metadata', 'id': osd_id})
+    results = batch.run()
+    assert [result.index for result in results] == list(range(4))
+    # Why connecting failed, not just that it did
+    assert all(isinstance(result.error, rados.Error) for result in results)
+    assert str(results[0].error) == 'connection refused'
+
+
+def test_pool_errors_are_reported(rados, monkeypatch):
+    def closed(self, *args, **kwargs):
+        raise CephError(cmd=None, msg="connection pool is closed")
+
+    batch = CommandBatch('/etc/ceph/ceph.conf', max_workers=2)
+    monkeypatch.setattr(type(get_connection_pool('/etc/ceph/ceph.conf')),
+                        'acquire', closed)
+    batch.add({'prefix': 'osd metadata', 'id': 0})
+    results = batch.run()
+    assert results[0].error.msg == "connection pool is closed"
+
+
+def test_grows_the_pool_to_max_workers(rados):
+    lock = threading.Lock()
+    state = {'running': 0, 'most': 0}
+    release = threading.Event()
+
+    def handler(target, cmd, inbuf):
+        with lock:
+            state['running'] += 1
+            state['most'] = max(state['most'], state['running'])
+            if state['running'] == 6:
+                release.set()
+        release.wait(5)
+        with lock:
+            state['running'] -= 1
+        return 0, b'', ''
+
+    rados.Rados.handler = staticmethod(handler)
+    pool = get_connection_pool('/etc/ceph/ceph.conf')
+    assert pool.max_size == DEFAULT_POOL_SIZE < 6
+    batch = CommandBatch('/etc/ceph/ceph.conf', max_workers=6)
+    for osd_id in range(12):
+        batch.add({'prefix': 'osd metadata', 'id': osd_id})
+    results = batch.run()
+    assert all(result.error is None for result in results)
+    assert state['most'] == 6
+    assert pool.max_size == 6
+    assert len(rados.Rados.created) == 6
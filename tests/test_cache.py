@@ -0,0 +1,281 @@
+import json
+import threading
+
+import pytest
+
+from ceph_api import cache
+from ceph_api.base import CommandBase
+from ceph_api.cache import MapCache, ResponseCache, parse_epoch
+from ceph_api.jewel.ceph_command import OsdCommand
+from ceph_api.output import OUTPUT_JSON_RAW
+
+__author__ = 'Chris Holcombe <chris.holcombe@canonical.com>'
+
+
+class Cluster(object):
+    """Answers osd stat and osd dump for an osdmap at self.epoch."""
+
+    def __init__(self, epoch=10):
+        self.epoch = epoch
+
+    def __call__(self, target, cmd, inbuf):
+        if cmd['prefix'] == 'osd stat':
+            return 0, json.dumps({'epoch': self.epoch, 'num_osds': 3,
+                                  'num_up_osds': 3}).encode(), ''
+        if cmd['prefix'] == 'osd dump':
+            epoch = cmd.get('epoch', self.epoch)
+            return 0, json.dumps({'epoch': epoch}).encode(), ''
+        raise AssertionError(cmd)
+
+
+def _prefixes(rados):
+    return [cmd['prefix'] for _, cmd in rados.Rados.sent]
+
+
+@pytest.fixture
+def cluster(rados):
+    cluster = Cluster()
+    rados.Rados.handler = staticmethod(cluster)
+    return cluster
+
+
+def test_dump_is_served_while_the_epoch_holds(rados, cluster):
+    maps = MapCache()
+    osd = OsdCommand('/etc/ceph/ceph.conf', output_format=OUTPUT_JSON_RAW,
+                     map_cache=maps)
+    first = osd.osd_dump()
+    assert osd.osd_dump() == first
+    assert _prefixes(rados) == ['osd stat', 'osd dump', 'osd stat']
+    assert (maps.hits, maps.misses) == (1, 1)
+
+
+def test_dump_is_refetched_when_the_epoch_moves(rados, cluster):
+    maps = MapCache()
+    osd = OsdCommand('/etc/ceph/ceph.conf', output_format=OUTPUT_JSON_RAW,
+                     map_cache=maps)
+    osd.osd_dump()
+    cluster.epoch = 11
+    outbuf, _ = osd.osd_dump()
+    assert json.loads(outbuf.decode()) == {'epoch': 11}
+    assert _prefixes(rados) == ['osd stat', 'osd dump'] * 2
+    assert (maps.hits, maps.misses) == (0, 2)
+    # The new epoch's dump replaced the old one
+    osd.osd_dump()
+    assert maps.hits == 1
+
+
+def test_explicit_epoch_passes_through(rados, cluster):
+    maps = MapCache()
+    command = CommandBase('/etc/ceph/ceph.conf', map_cache=maps)
+    for _ in range(2):
+        outbuf, _ = command._run({'prefix': 'osd dump', 'epoch': 5}, '')
+        assert json.loads(outbuf.decode()) == {'epoch': 5}
+    assert _prefixes(rados) == ['osd dump', 'osd dump']
+    assert (maps.hits, maps.misses) == (0, 0)
+
+
+def test_clusters_are_cached_apart(rados, cluster):
+    maps = MapCache()
+    for conffile in ('/etc/ceph/ceph.conf', '/etc/ceph/other.conf'):
+        OsdCommand(conffile, map_cache=maps).osd_dump()
+    assert (maps.hits, maps.misses) == (0, 2)
+
+
+def test_unreadable_epoch_is_not_cached(rados):
+    def handler(target, cmd, inbuf):
+        if cmd['prefix'] == 'osd stat':
+            return 0, b'{}', ''
+        return 0, b'{"epoch": 10}', ''
+
+    rados.Rados.handler = staticmethod(handler)
+    maps = MapCache()
+    osd = OsdCommand('/etc/ceph/ceph.conf', map_cache=maps)
+    osd.osd_dump()
+    osd.osd_dump()
+    assert _prefixes(rados) == ['osd stat', 'osd dump'] * 2
+    assert maps.hits == 0
+
+
+@pytest.mark.parametrize('outbuf,outs,epoch', [
+    (b'{"epoch": 42, "num_osds": 3}', '', 42),
+    # mds stat nests the epoch in the fsmap
+    (b'{"fsmap": {"epoch": 7}, "mdsmap_first_committed": 1}', '', 7),
+    (b'     osdmap e1234: 12 osds: 12 up, 12 in\n', '', 1234),
+    (b'e3: 1 mons at {a=10.0.0.1:6789/0}, election epoch 4', '', 3),
+    (b'e6: 1/1/1 up {0=a=up:active}', '', 6),
+    # Older releases print the stat to the status string
+    (b'', 'osdmap e88: 3 osds: 2 up, 3 in', 88),
+    (u'osdmap e9: 3 osds: 3 up, 3 in', '', 9),
+    (b'no epoch here, eg: mee5', '', None),
+    (b'', '', None),
+])
+def test_parse_epoch(outbuf, outs, epoch):
+    assert parse_epoch(outbuf, outs) == epoch
+
+
+class Clock(object):
+    """Stands in for the time module in ceph_api.cache."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache, 'time', clock)
+    return clock
+
+
+class Sender(object):
+    """A send callable counting the commands it ran."""
+
+    def __init__(self):
+        self.sent = []
+
+    def __call__(self, cmd, inbuf):
+        self.sent.append(cmd['prefix'])
+        return '{} {}'.format(cmd['prefix'], len(self.sent)), ''
+
+
+def test_responses_expire_after_their_ttl(clock):
+    responses = ResponseCache(ttls={'status': 5, 'df': 10})
+    send = Sender()
+    first = responses.fetch(send, {'prefix': 'status'}, '')
+    clock.now += 4
+    assert responses.fetch(send, {'prefix': 'status'}, '') == first
+    clock.now += 1
+    assert responses.fetch(send, {'prefix': 'status'}, '') != first
+    # Read commands without a ttl aren't cached
+    responses.fetch(send, {'prefix': 'osd tree'}, '')
+    responses.fetch(send, {'prefix': 'osd tree'}, '')
+    assert send.sent == ['status', 'status', 'osd tree', 'osd tree']
+    assert (responses.hits, responses.misses) == (1, 2)
+
+
+def test_concurrent_requests_share_one_send():
+    responses = ResponseCache()
+    started = threading.Event()
+    release = threading.Event()
+    sent = []
+
+    def send(cmd, inbuf):
+        sent.append(cmd)
+        started.set()
+        release.wait(5)
+        return 'HEALTH_OK', ''
+
+    results = []
+
+    def fetch():
+        results.append(responses.fetch(send, {'prefix': 'health'}, ''))
+
+    threads = [threading.Thread(target=fetch) for _ in range(8)]
+    threads[0].start()
+    started.wait(5)
+    for thread in threads[1:]:
+        thread.start()
+    # Every follower is waiting on the leader's flight
+    while responses.coalesced < 7:
+        threading.Event().wait(0.01)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+    assert len(sent) == 1
+    assert results == [('HEALTH_OK', '')] * 8
+    assert (responses.misses, responses.coalesced) == (1, 7)
+
+
+def test_least_recently_used_is_evicted():
+    responses = ResponseCache(ttls={'osd stat': 5, 'pg stat': 5, 'df': 5},
+                              max_entries=2)
+    send = Sender()
+    for prefix in ('osd stat', 'pg stat', 'osd stat', 'df'):
+        responses.fetch(send, {'prefix': prefix}, '')
+    # pg stat was the least recently used when df came in
+    responses.fetch(send, {'prefix': 'osd stat'}, '')
+    responses.fetch(send, {'prefix': 'pg stat'}, '')
+    assert send.sent == ['osd stat', 'pg stat', 'df', 'pg stat']
+    assert len(responses._entries) == 2
+
+
+def test_mutations_invalidate_what_they_change():
+    responses = ResponseCache(ttls={'osd stat': 60, 'pg stat': 60,
+                                    'mon stat': 60, 'auth list': 60})
+    send = Sender()
+    reads = ('osd stat', 'pg stat', 'mon stat', 'auth list')
+    for prefix in reads:
+        responses.fetch(send, {'prefix': prefix}, '')
+        responses.fetch(send, {'prefix': prefix}, '', cluster_key='other')
+    del send.sent[:]
+    responses.fetch(send, {'prefix': 'osd out', 'ids': ['1']}, '')
+    for prefix in reads:
+        responses.fetch(send, {'prefix': prefix}, '')
+        responses.fetch(send, {'prefix': prefix}, '', cluster_key='other')
+    assert send.sent == ['osd out', 'osd stat', 'pg stat']
+    # A mutation INVALIDATES doesn't know drops the cluster's every entry
+    del send.sent[:]
+    responses.fetch(send, {'prefix': 'log', 'logtext': ['hi']}, '')
+    for prefix in reads:
+        responses.fetch(send, {'prefix': prefix}, '')
+    assert send.sent == ['log'] + list(reads)
+
+
+def test_failures_are_not_cached():
+    responses = ResponseCache()
+    calls = []
+
+    def send(cmd, inbuf):
+        calls.append(cmd)
+        if len(calls) == 1:
+            raise KeyboardInterrupt
+        if len(calls) == 2:
+            raise ValueError('bad json')
+        return 'HEALTH_OK', ''
+
+    with pytest.raises(KeyboardInterrupt):
+        responses.fetch(send, {'prefix': 'health'}, '')
+    with pytest.raises(ValueError):
+        responses.fetch(send, {'prefix': 'health'}, '')
+    assert responses.fetch(send, {'prefix': 'health'}, '') == \
+        ('HEALTH_OK', '')
+    assert len(calls) == 3
+
+
+def test_waiters_ask_again_when_the_leader_is_interrupted():
+    responses = ResponseCache()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def send(cmd, inbuf):
+        calls.append(cmd)
+        if len(calls) == 1:
+            started.set()
+            release.wait(5)
+            raise KeyboardInterrupt
+        return 'HEALTH_OK', ''
+
+    def lead():
+        try:
+            responses.fetch(send, {'prefix': 'health'}, '')
+        except KeyboardInterrupt:
+            pass
+
+    leader = threading.Thread(target=lead)
+    leader.start()
+    started.wait(5)
+    results = []
+    waiter = threading.Thread(target=lambda: results.append(
+        responses.fetch(send, {'prefix': 'health'}, '')))
+    waiter.start()
+    while responses.coalesced < 1:
+        threading.Event().wait(0.01)
+    release.set()
+    leader.join(5)
+    waiter.join(5)
+    assert results == [('HEALTH_OK', '')]
+    assert len(calls) == 2
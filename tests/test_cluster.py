@@ -0,0 +1,111 @@
+import errno
+import json
+
+import pytest
+
+from ceph_api import cluster, schema
+from ceph_api.cluster import cluster_version, connect, \
+    release_for_commands, release_for_version
+
+__author__ = 'Chris Holcombe <chris.holcombe@canonical.com>'
+
+
+@pytest.fixture(autouse=True)
+def versions(monkeypatch):
+    monkeypatch.setattr(cluster, '_versions', {})
+
+
+def descriptions(release):
+    """get_command_descriptions output for a release's monitors, with
+    prefix words as CephPrefix arguments the way the monitors send
+    them."""
+    found = {}
+    for commands in schema.release_commands(release).values():
+        for method, prefix, help, args in commands:
+            sig = [{'type': 'CephPrefix', 'name': 'prefix', 'n': 1,
+                    'req': 'true', 'prefix': word}
+                   for word in prefix.split()]
+            sig.extend(dict(arg) for arg in args)
+            found['cmd{:03}'.format(len(found))] = {
+                'sig': sig, 'help': help, 'module': prefix.split()[0],
+                'perm': 'r', 'avail': 'cli,rest'}
+    return json.dumps(found).encode()
+
+
+def monitors(release, version=None):
+    """A handler for monitors of a release, with a version command only
+    when given a version."""
+    def handler(target, cmd, inbuf):
+        if cmd['prefix'] == 'version':
+            if version is None:
+                return -errno.EINVAL, b'', 'unrecognized command'
+            return 0, 'ceph version {} (abc)'.format(version).encode(), ''
+        if cmd['prefix'] == 'get_command_descriptions':
+            return 0, descriptions(release), ''
+        raise AssertionError(cmd)
+    return handler
+
+
+@pytest.mark.parametrize('version,release', [
+    (None, 'firefly'),
+    ('0.72.2', 'firefly'),
+    ('0.80.11', 'firefly'),
+    ('0.87.2', 'giant'),
+    ('0.94.10', 'hammer'),
+    ('9.2.1', 'infernalis'),
+    ('10.2.11', 'jewel'),
+    ('12.2.0', 'jewel'),
+])
+def test_release_for_version(version, release):
+    assert release_for_version(version) == release
+
+
+def test_version_command(rados):
+    rados.Rados.handler = staticmethod(monitors('jewel', '10.2.11'))
+    assert cluster_version('/etc/ceph/ceph.conf') == '10.2.11'
+    # Asked once per cluster
+    assert cluster_version('/etc/ceph/ceph.conf') == '10.2.11'
+    assert [cmd['prefix'] for _, cmd in rados.Rados.sent] == ['version']
+
+
+@pytest.mark.parametrize('release', ['firefly', 'giant'])
+def test_releases_without_a_version_command(rados, release):
+    rados.Rados.handler = staticmethod(monitors(release))
+    version = cluster_version('/etc/ceph/ceph.conf')
+    assert version == schema.release_version(release)
+    assert connect('/etc/ceph/ceph.conf').release == release
+    assert [cmd['prefix'] for _, cmd in rados.Rados.sent] == \
+        ['version', 'get_command_descriptions']
+
+
+def test_unknown_version_defaults_to_the_oldest_release(rados):
+    def handler(target, cmd, inbuf):
+        return -errno.EACCES, b'', 'access denied'
+
+    rados.Rados.handler = staticmethod(handler)
+    assert cluster_version('/etc/ceph/ceph.conf') is None
+    assert connect('/etc/ceph/ceph.conf').release == 'firefly'
+
+
+def test_release_for_commands():
+    for release in schema.RELEASES:
+        prefixes = [prefix
+                    for commands in schema.release_commands(release).values()
+                    for method, prefix, help, args in commands]
+        assert release_for_commands(prefixes) == release
+        # Commands this package doesn't know about don't change the match
+        assert release_for_commands(prefixes + ['osd new-thing']) == release
+
+
+def test_failures_are_not_cached(rados):
+    def handler(target, cmd, inbuf):
+        return -errno.ETIMEDOUT, b'', 'timed out'
+
+    rados.Rados.handler = staticmethod(handler)
+    assert cluster_version('/etc/ceph/ceph.conf') is None
+    # Once the monitors answer, the real version is found and kept
+    rados.Rados.handler = staticmethod(monitors('jewel', '10.2.11'))
+    rados.Rados.sent[:] = []
+    assert connect('/etc/ceph/ceph.conf').release == 'jewel'
+    assert cluster_version('/etc/ceph/ceph.conf') == '10.2.11'
+    assert [cmd['prefix'] for _, cmd in rados.Rados.sent] == ['version']
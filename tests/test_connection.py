@@ -0,0 +1,323 @@
+import errno
+import threading
+
+import pytest
+
+from ceph_api import connection
+from ceph_api.base import CommandBase
+from ceph_api.connection import CephError, ConnectionPool, \
+    get_connection_pool, osd_tell_command, run_ceph_command, send_command
+
+__author__ = 'Chris Holcombe <chris.holcombe@canonical.com>'
+
+
+class Clock(object):
+    """Stands in for the time module in ceph_api.connection."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(connection, 'time', clock)
+    return clock
+
+
+def _fsid(target, cmd, inbuf):
+    return 0, b'e1a5c4f0', ''
+
+
+def test_pools_are_keyed_by_cluster_identity(rados):
+    pool = get_connection_pool('/etc/ceph/ceph.conf', name='client.admin')
+    assert get_connection_pool('/etc/ceph/ceph.conf',
+                               name='client.admin') is pool
+    others = [
+        get_connection_pool('/etc/ceph/other.conf', name='client.admin'),
+        get_connection_pool('/etc/ceph/ceph.conf', name='client.rgw'),
+        get_connection_pool('/etc/ceph/ceph.conf', name='client.admin',
+                            keyring='/etc/ceph/admin.keyring'),
+    ]
+    assert len(set(map(id, others + [pool]))) == 4
+    cluster = others[2].acquire()
+    assert (cluster.conffile, cluster.name, cluster.conf) == \
+        ('/etc/ceph/ceph.conf', 'client.admin',
+         {'keyring': '/etc/ceph/admin.keyring'})
+    # A closed pool is replaced
+    pool.close()
+    assert get_connection_pool('/etc/ceph/ceph.conf',
+                               name='client.admin') is not pool
+
+
+def test_pool_options_only_apply_when_created(rados):
+    pool = get_connection_pool('/etc/ceph/ceph.conf', max_size=2)
+    assert get_connection_pool('/etc/ceph/ceph.conf', max_size=9) is pool
+    assert pool.max_size == 2
+    with pytest.raises(ValueError):
+        ConnectionPool('/etc/ceph/ceph.conf', max_size=0)
+
+
+def test_connections_are_reused(rados):
+    pool = ConnectionPool('/etc/ceph/ceph.conf')
+    with pool.connection() as first:
+        pass
+    with pool.connection() as second:
+        pass
+    assert first is second
+    assert len(rados.Rados.created) == 1
+
+
+def test_acquire_blocks_at_max_size(rados):
+    pool = ConnectionPool('/etc/ceph/ceph.conf', max_size=2)
+    held = [pool.acquire(), pool.acquire()]
+    with pytest.raises(CephError):
+        pool.acquire(timeout=0.05)
+    got = []
+    waiter = threading.Thread(target=lambda: got.append(pool.acquire()))
+    waiter.start()
+    waiter.join(0.1)
+    assert waiter.is_alive()
+    pool.release(held[0])
+    waiter.join(5)
+    assert got == [held[0]]
+    assert len(rados.Rados.created) == 2
+
+
+def test_evict_idle(rados, clock):
+    pool = ConnectionPool('/etc/ceph/ceph.conf', max_idle=60)
+    old, new = pool.acquire(), pool.acquire()
+    pool.release(old)
+    clock.now += 50
+    pool.release(new)
+    clock.now += 20
+    assert pool.evict_idle() == 1
+    assert old.state == 'shutdown'
+    assert new.state == 'connected'
+    assert pool.acquire() is new
+    # Eviction frees room for a new connection
+    assert pool._size == 1
+
+
+def test_stale_connections_are_health_checked(rados, clock):
+    rados.Rados.handler = staticmethod(_fsid)
+    pool = ConnectionPool('/etc/ceph/ceph.conf', health_check_interval=30)
+    cluster = pool.acquire()
+    pool.release(cluster)
+    clock.now += 10
+    assert pool.acquire() is cluster
+    assert rados.Rados.sent == []
+    pool.release(cluster)
+    clock.now += 40
+    assert pool.acquire() is cluster
+    assert rados.Rados.sent == [('mon', {'prefix': 'fsid'})]
+
+
+def test_dead_connections_are_replaced(rados, clock):
+    pool = ConnectionPool('/etc/ceph/ceph.conf', health_check_interval=30)
+    dead = pool.acquire()
+    pool.release(dead)
+    clock.now += 40
+
+    def handler(target, cmd, inbuf):
+        raise rados.Error("connection reset")
+
+    rados.Rados.handler = staticmethod(handler)
+    cluster = pool.acquire()
+    assert cluster is not dead
+    assert dead.state == 'shutdown'
+    assert cluster.state == 'connected'
+    assert pool._size == 1
+    # A handle that isn't connected any more is replaced without a check
+    pool.release(cluster)
+    cluster.state = 'shutdown'
+    assert pool.acquire() is not cluster
+
+
+def test_release_with_discard(rados):
+    pool = ConnectionPool('/etc/ceph/ceph.conf', max_size=1)
+    cluster = pool.acquire()
+    pool.release(cluster, discard=True)
+    assert cluster.state == 'shutdown'
+    assert pool._size == 0
+    fresh = pool.acquire(timeout=1)
+    assert fresh is not cluster
+
+
+def test_rados_errors_discard_the_connection(rados):
+    def handler(target, cmd, inbuf):
+        raise rados.Error("connection reset")
+
+    rados.Rados.handler = staticmethod(handler)
+    pool = ConnectionPool('/etc/ceph/ceph.conf')
+    with pytest.raises(rados.Error):
+        with pool.connection() as cluster:
+            cluster.mon_command('{"prefix": "fsid"}', '')
+    assert cluster.state == 'shutdown'
+    with pytest.raises(KeyError):
+        with pool.connection() as other:
+            raise KeyError('pgid')
+    assert other.state == 'connected'
+    assert pool.acquire() is other
+
+
+def test_close(rados):
+    pool = ConnectionPool('/etc/ceph/ceph.conf')
+    idle, busy = pool.acquire(), pool.acquire()
+    pool.release(idle)
+    pool.close()
+    assert idle.state == 'shutdown'
+    assert busy.state == 'connected'
+    with pytest.raises(CephError):
+        pool.acquire()
+    # Handed out connections are shut down when they come back
+    pool.release(busy)
+    assert busy.state == 'shutdown'
+    assert pool._size == 0
+
+
+def test_close_wakes_waiters(rados):
+    pool = ConnectionPool('/etc/ceph/ceph.conf', max_size=1)
+    pool.acquire()
+    errors = []
+
+    def wait():
+        try:
+            pool.acquire()
+        except CephError as e:
+            errors.append(e)
+
+    waiter = threading.Thread(target=wait)
+    waiter.start()
+    waiter.join(0.1)
+    pool.close()
+    waiter.join(5)
+    assert len(errors) == 1
+
+
+def _record(answers=None):
+    # A handler answering every command with 0, or with the code given
+    # for its target
+    answers = answers or {}
+
+    def handler(target, cmd, inbuf):
+        kind = target if target == 'mon' else target[0]
+        return answers.get(kind, 0), b'done', ''
+    return handler
+
+
+def _tell(target, args):
+    return {'prefix': 'tell', 'target': target, 'args': args}
+
+
+@pytest.mark.parametrize('args,expected', [
+    (['version'], {'prefix': 'version'}),
+    ('dump_ops_in_flight', {'prefix': 'dump_ops_in_flight'}),
+    (['injectargs', '--osd-max-backfills 1', '--osd-recovery-max-active 1'],
+     {'prefix': 'injectargs',
+      'injected_args': ['--osd-max-backfills 1',
+                        '--osd-recovery-max-active 1']}),
+    ('heap stats', {'prefix': 'heap', 'heapcmd': ['stats']}),
+])
+def test_osd_tells_go_to_the_osd(rados, args, expected):
+    rados.Rados.handler = staticmethod(_record())
+    assert run_ceph_command('/etc/ceph/ceph.conf', _tell('osd.12', args),
+                            '') == (b'done', '')
+    assert rados.Rados.sent == [(('osd', 12), expected)]
+
+
+@pytest.mark.parametrize('target,args', [
+    # Arguments that need the OSD's own command descriptions
+    ('osd.3', ['bench', '1024', '4096']),
+    ('osd.3', []),
+    ('mon.a', ['version']),
+    ('mds.0', ['session', 'ls']),
+    ('osd.*', ['version']),
+])
+def test_other_tells_go_to_the_monitors(rados, target, args):
+    rados.Rados.handler = staticmethod(_record())
+    run_ceph_command('/etc/ceph/ceph.conf', _tell(target, args), '')
+    assert rados.Rados.sent == [('mon', _tell(target, args))]
+
+
+@pytest.mark.parametrize('prefix,osd_prefix', [
+    ('pg scrub', 'scrub'),
+    ('pg deep-scrub', 'deep_scrub'),
+    ('pg repair', 'repair'),
+])
+def test_pg_operations_go_to_the_primary(rados, prefix, osd_prefix):
+    rados.Rados.handler = staticmethod(_record())
+    run_ceph_command('/etc/ceph/ceph.conf',
+                     {'prefix': prefix, 'pgid': '2.1f'}, '')
+    assert rados.Rados.sent == [(('pg', '2.1f'),
+                                 {'prefix': osd_prefix, 'pgid': '2.1f'})]
+
+
+@pytest.mark.parametrize('code', [-errno.EINVAL, -errno.EOPNOTSUPP,
+                                  -errno.ENOENT])
+def test_pg_operations_fall_back_to_the_monitors(rados, code):
+    rados.Rados.handler = staticmethod(_record({'pg': code}))
+    cmd = {'prefix': 'pg deep-scrub', 'pgid': '2.1f'}
+    assert run_ceph_command('/etc/ceph/ceph.conf', cmd, '') == \
+        (b'done', '')
+    assert rados.Rados.sent == [
+        (('pg', '2.1f'), {'prefix': 'deep_scrub', 'pgid': '2.1f'}),
+        ('mon', cmd),
+    ]
+
+
+@pytest.mark.parametrize('code,remembered', [
+    (-errno.EINVAL, True),
+    (-errno.EOPNOTSUPP, True),
+    # A stale primary says nothing about what the OSDs support
+    (-errno.ENOENT, False),
+])
+def test_unknown_pg_operations_are_remembered(rados, code, remembered):
+    rados.Rados.handler = staticmethod(_record({'pg': code}))
+    pool = get_connection_pool('/etc/ceph/ceph.conf')
+    cmds = [{'prefix': 'pg scrub', 'pgid': '2.1f'},
+            {'prefix': 'pg repair', 'pgid': '2.3'}]
+    with pool.connection() as cluster:
+        for cmd in cmds:
+            send_command(cluster, cmd, '')
+    first = [('pg', '2.1f'), 'mon']
+    then = ['mon'] if remembered else [('pg', '2.3'), 'mon']
+    assert [sent[0] for sent in rados.Rados.sent] == first + then
+    # A handle that is shut down is forgotten
+    pool.release(cluster, discard=True)
+    assert id(cluster) not in connection._pg_relayed
+
+
+def test_other_direct_errors_are_raised(rados):
+    rados.Rados.handler = staticmethod(_record({'pg': -errno.EPERM,
+                                                'osd': -errno.EINVAL}))
+    with pytest.raises(CephError):
+        run_ceph_command('/etc/ceph/ceph.conf',
+                         {'prefix': 'pg repair', 'pgid': '2.1f'}, '')
+    # Only pg operations fall back, an OSD's answer to a tell is final
+    with pytest.raises(CephError):
+        run_ceph_command('/etc/ceph/ceph.conf',
+                         _tell('osd.1', ['version']), '')
+    assert [sent[0] for sent in rados.Rados.sent] == \
+        [('pg', '2.1f'), ('osd', 1)]
+
+
+def test_direct_false_sends_everything_to_the_monitors(rados):
+    rados.Rados.handler = staticmethod(_record())
+    cmds = [_tell('osd.12', ['version']),
+            {'prefix': 'pg scrub', 'pgid': '2.1f'}]
+    run_ceph_command('/etc/ceph/ceph.conf', cmds[0], '', direct=False)
+    command = CommandBase('/etc/ceph/ceph.conf', direct=False)
+    command._run(dict(cmds[1]), '')
+    assert rados.Rados.sent == [('mon', cmd) for cmd in cmds]
+
+
+def test_osd_tell_command():
+    assert osd_tell_command([]) is None
+    assert osd_tell_command('') is None
+    assert osd_tell_command(['config', 'set', 'debug_osd', '20']) is None
+    assert osd_tell_command('injectargs --debug-osd=20') == \
+        {'prefix': 'injectargs', 'injected_args': ['--debug-osd=20']}
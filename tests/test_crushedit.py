@@ -0,0 +1,230 @@
+import pytest
+
+from ceph_api.crushedit import CrushConflictError, CrushTransaction
+from ceph_api.crushmap import BUCKET_STRAW2, RULE_CHOOSE_FIRSTN, \
+    RULE_CHOOSELEAF_FIRSTN, RULE_CHOOSELEAF_INDEP, RULE_EMIT, \
+    RULE_SET_CHOOSE_TRIES, RULE_SET_CHOOSELEAF_TRIES, RULE_TAKE, \
+    RULE_TYPE_ERASURE, WEIGHT_ONE, CrushMap
+from ceph_api.jewel.ceph_command import OsdCommand
+
+from test_crushmap import crush_map
+
+__author__ = 'Chris Holcombe <chris.holcombe@canonical.com>'
+
+
+class Monitors(object):
+    """Serves osd getcrushmap and takes osd setcrushmap."""
+
+    def __init__(self, crush):
+        self.encoded = crush.encode()
+        self.uploads = []
+
+    def __call__(self, target, cmd, inbuf):
+        if cmd['prefix'] == 'osd getcrushmap':
+            return 0, self.encoded, ''
+        if cmd['prefix'] == 'osd setcrushmap':
+            self.uploads.append(bytes(inbuf))
+            self.encoded = bytes(inbuf)
+            return 0, b'', 'set crush map'
+        raise AssertionError(cmd)
+
+
+@pytest.fixture
+def monitors(rados):
+    monitors = Monitors(crush_map(BUCKET_STRAW2))
+    rados.Rados.handler = staticmethod(monitors)
+    return monitors
+
+
+def osd():
+    return OsdCommand('/etc/ceph/ceph.conf')
+
+
+def weight_in(crush, parent, child):
+    return crush.buckets[crush.item_id(parent)].weight_of(
+        crush.item_id(child))
+
+
+def test_commit_uploads_once(rados, monitors):
+    with CrushTransaction(osd()) as txn:
+        txn.add_osd(9, 2.0, {'host': 'host3', 'root': 'default'})
+        txn.add_osd(10, 2.0, {'host': 'host3', 'root': 'default'})
+        txn.reweight('osd.0', 0.25)
+    assert [cmd['prefix'] for _, cmd in rados.Rados.sent] == \
+        ['osd getcrushmap', 'osd getcrushmap', 'osd setcrushmap']
+    crush = CrushMap.decode(monitors.uploads[0])
+    host = crush.buckets[crush.item_id('host3')]
+    assert host.items == [9, 10]
+    assert host.weight == 4 * WEIGHT_ONE
+    assert weight_in(crush, 'default', 'host3') == 4 * WEIGHT_ONE
+    assert crush.max_devices == 11
+
+
+def test_errors_roll_back(rados, monitors):
+    with pytest.raises(KeyError):
+        with CrushTransaction(osd()) as txn:
+            txn.add_bucket('rack1', 'rack')
+    assert monitors.uploads == []
+
+
+def test_commit_refuses_a_changed_map(rados, monitors):
+    txn = CrushTransaction(osd())
+    txn.begin()
+    txn.reweight('osd.1', 3.0)
+    monitors.encoded = crush_map(BUCKET_STRAW2, tunables=3).encode()
+    with pytest.raises(CrushConflictError):
+        txn.commit()
+    assert monitors.uploads == []
+    txn.begin()
+    txn.reweight('osd.1', 3.0)
+    txn.commit()
+    assert len(monitors.uploads) == 1
+
+
+def test_local_maps_cant_commit():
+    txn = CrushTransaction(None, crush=crush_map(BUCKET_STRAW2))
+    txn.reweight('osd.1', 3.0)
+    with pytest.raises(ValueError):
+        txn.commit()
+
+
+def test_reweight_propagates_up_the_tree():
+    crush = crush_map(BUCKET_STRAW2)
+    txn = CrushTransaction(None, crush=crush)
+    root_before = crush.buckets[-1].weight
+    host_before = crush.buckets[-2].weight
+    txn.reweight('osd.1', 5.0)
+    delta = 5 * WEIGHT_ONE - WEIGHT_ONE
+    assert crush.buckets[-2].weight == host_before + delta
+    assert weight_in(crush, 'default', 'host0') == host_before + delta
+    assert crush.buckets[-1].weight == root_before + delta
+    txn.add_bucket('loose', 'host')
+    with pytest.raises(ValueError):
+        txn.reweight('loose', 1.0)
+
+
+def test_add_osd_creates_missing_buckets():
+    crush = crush_map(BUCKET_STRAW2)
+    crush.types[2] = 'rack'
+    crush.types[3] = 'root'
+    crush.buckets[-1].type = 3
+    txn = CrushTransaction(None, crush=crush)
+    txn.add_osd(20, 1.5, {'host': 'node20', 'rack': 'rack2',
+                          'root': 'default'})
+    rack = crush.buckets[crush.item_id('rack2')]
+    node = crush.buckets[crush.item_id('node20')]
+    assert (rack.type, node.type) == (2, 1)
+    assert rack.items == [node.id]
+    assert node.items == [20]
+    assert rack.weight == node.weight == int(1.5 * WEIGHT_ONE)
+    assert crush.item_id('rack2') in crush.buckets[-1].items
+    with pytest.raises(ValueError):
+        txn.add_osd(21, 1.0, {'host': 'osd.3'})
+    with pytest.raises(ValueError):
+        txn.add_osd(20, 1.0, {'host': 'node20'})
+
+
+def test_move_carries_the_weight():
+    crush = crush_map(BUCKET_STRAW2)
+    txn = CrushTransaction(None, crush=crush)
+    total = crush.buckets[-1].weight
+    moved = crush.buckets[-3].weight
+    txn.add_bucket('other', 'root')
+    txn.move('host1', {'root': 'other'})
+    assert crush.buckets[-1].weight == total - moved
+    assert crush.buckets[crush.item_id('other')].weight == moved
+    assert -3 not in crush.buckets[-1].items
+    assert [bucket.id for bucket in crush.parents(-3)] == \
+        [crush.item_id('other')]
+
+
+def test_no_loops():
+    crush = crush_map(BUCKET_STRAW2)
+    crush.types[3] = 'region'
+    txn = CrushTransaction(None, crush=crush)
+    txn.add_bucket('region1', 'region')
+    txn.move('default', {'region': 'region1'})
+    assert [bucket.id for bucket in crush.parents(-1)] == \
+        [crush.item_id('region1')]
+    before = crush.encode()
+    # Under itself, under its own descendant, and above its own parent
+    for name, location in (('default', {'root': 'default'}),
+                           ('default', {'host': 'host0'}),
+                           ('region1', {'root': 'default'})):
+        with pytest.raises(ValueError):
+            txn.move(name, location)
+        with pytest.raises(ValueError):
+            txn.link(name, location)
+    # A refused move leaves the map as it was
+    assert crush.encode() == before
+
+
+@pytest.mark.parametrize('edit,args', [
+    # A new host under a bucket that isn't a root
+    ('add_osd', (20, 1.0, {'host': 'newhost', 'root': 'host0'})),
+    ('add_osd', (0, 1.0, {'host': 'host0'})),
+    ('add_osd', (20, 1.0, {'host': 'osd.3'})),
+    ('move', ('host1', {'root': 'host0'})),
+    ('move', ('host1', {'rack': 'rack1', 'root': 'host0'})),
+    ('link', ('host1', {'root': 'default'})),
+    ('link', ('host1', {'root': 'host0'})),
+])
+def test_refused_edits_leave_the_map_unchanged(edit, args):
+    txn = CrushTransaction(None, crush=crush_map(BUCKET_STRAW2))
+    txn.crush.types[3] = 'rack'
+    before = txn.crush.encode()
+    with pytest.raises(ValueError):
+        getattr(txn, edit)(*args)
+    assert txn.crush.encode() == before
+
+
+def test_refused_bucket_creation_leaves_the_map_unchanged():
+    txn = CrushTransaction(None, crush=crush_map(BUCKET_STRAW2))
+    txn.crush.tunables['allowed_bucket_algs'] = 0
+    before = txn.crush.encode()
+    with pytest.raises(ValueError):
+        txn.add_osd(20, 1.0, {'host': 'newhost', 'root': 'default'})
+    assert txn.crush.encode() == before
+    # Linking under a bucket that exists needs no algorithm
+    txn.add_osd(20, 1.0, {'host': 'host0'})
+    assert 20 in txn.crush.buckets[-2].items
+
+
+def test_move_to_where_it_already_is():
+    crush = crush_map(BUCKET_STRAW2)
+    txn = CrushTransaction(None, crush=crush)
+    weight = weight_in(crush, 'default', 'host1')
+    txn.move('host1', {'root': 'default'})
+    assert [bucket.id for bucket in crush.parents(-3)] == [-1]
+    assert weight_in(crush, 'default', 'host1') == weight
+
+
+def test_create_simple_rule():
+    crush = crush_map(BUCKET_STRAW2)
+    txn = CrushTransaction(None, crush=crush)
+    rule_id = txn.create_simple_rule('hosts', 'default', 'host')
+    assert rule_id == 1
+    rule = crush.rules[rule_id]
+    assert rule.steps == [(RULE_TAKE, -1, 0), (RULE_CHOOSELEAF_FIRSTN, 0, 1),
+                          (RULE_EMIT, 0, 0)]
+    assert (rule.ruleset, rule.min_size, rule.max_size) == (1, 1, 10)
+    assert crush.rule_names[rule_id] == 'hosts'
+    assert crush.max_rules == 2
+    rule_id = txn.create_simple_rule('osds', 'host1', 'osd')
+    assert crush.rules[rule_id].steps == [
+        (RULE_TAKE, -3, 0), (RULE_CHOOSE_FIRSTN, 0, 0), (RULE_EMIT, 0, 0)]
+    rule_id = txn.create_erasure_rule('ec', 'default', 'host')
+    rule = crush.rules[rule_id]
+    assert rule.type == RULE_TYPE_ERASURE
+    assert rule.steps == [
+        (RULE_SET_CHOOSELEAF_TRIES, 5, 0), (RULE_SET_CHOOSE_TRIES, 100, 0),
+        (RULE_TAKE, -1, 0), (RULE_CHOOSELEAF_INDEP, 0, 1), (RULE_EMIT, 0, 0)]
+    with pytest.raises(ValueError):
+        txn.create_simple_rule('hosts', 'default', 'host')
+    with pytest.raises(ValueError):
+        txn.create_simple_rule('spread', 'default', 'host', mode='random')
+    txn.remove_rule('osds')
+    assert sorted(crush.rules) == [0, 1, 3]
+    # The rule round trips through the binary map
+    decoded = CrushMap.decode(crush.encode())
+    assert [tuple(step) for step in decoded.rules[3].steps] == rule.steps
@@ -0,0 +1,96 @@
+import pytest
+
+from ceph_api.crushmap import BUCKET_ALGS, BUCKET_UNIFORM, RULE_EMIT, \
+    RULE_CHOOSELEAF_FIRSTN, RULE_TAKE, RULE_TYPE_REPLICATED, TUNABLES, \
+    WEIGHT_ONE, Bucket, CrushMap, Rule
+
+__author__ = 'Chris Holcombe <chris.holcombe@canonical.com>'
+
+
+def crush_map(alg, tunables=len(TUNABLES)):
+    """A root over three hosts of three OSDs, every bucket using alg,
+    carrying the first tunables TUNABLES."""
+    crush = CrushMap()
+    crush.types = {0: 'osd', 1: 'host', 2: 'root'}
+    crush.tunables = dict((name, legacy + 1) for name, fmt, legacy
+                          in TUNABLES[:tunables])
+    root = Bucket(-1, 2, alg)
+    for h in range(3):
+        host = Bucket(-2 - h, 1, alg)
+        for osd_id in range(h * 3, h * 3 + 3):
+            weight = WEIGHT_ONE if alg == BUCKET_UNIFORM \
+                else WEIGHT_ONE * (osd_id + 1) // 2
+            host.add_item(osd_id, weight)
+            crush.names[osd_id] = 'osd.{}'.format(osd_id)
+        root.add_item(host.id, WEIGHT_ONE * 3 if alg == BUCKET_UNIFORM
+                      else host.weight)
+        crush.buckets[host.id] = host
+        crush.names[host.id] = 'host{}'.format(h)
+    crush.buckets[root.id] = root
+    crush.names[root.id] = 'default'
+    crush.max_buckets = 4
+    crush.max_devices = 9
+    crush.rules[0] = Rule(0, RULE_TYPE_REPLICATED, 1, 10, [
+        (RULE_TAKE, -1, 0), (RULE_CHOOSELEAF_FIRSTN, 0, 1),
+        (RULE_EMIT, 0, 0)])
+    crush.rule_names[0] = 'replicated_ruleset'
+    crush.max_rules = 1
+    return crush
+
+
+def assert_same(decoded, crush):
+    assert (decoded.max_buckets, decoded.max_rules, decoded.max_devices) \
+        == (crush.max_buckets, crush.max_rules, crush.max_devices)
+    assert sorted(decoded.buckets) == sorted(crush.buckets)
+    for bucket_id, bucket in crush.buckets.items():
+        got = decoded.buckets[bucket_id]
+        assert (got.type, got.alg, got.hash, got.items, got.weights,
+                got.weight) == (bucket.type, bucket.alg, bucket.hash,
+                                bucket.items, bucket.weights, bucket.weight)
+    assert [(rule.ruleset, rule.type, rule.min_size, rule.max_size,
+             [tuple(step) for step in rule.steps])
+            for rule in decoded.rules.values()] == \
+        [(rule.ruleset, rule.type, rule.min_size, rule.max_size, rule.steps)
+         for rule in crush.rules.values()]
+    assert (decoded.types, decoded.names, decoded.rule_names,
+            decoded.tunables) == (crush.types, crush.names,
+                                  crush.rule_names, crush.tunables)
+
+
+@pytest.mark.parametrize('alg', sorted(BUCKET_ALGS))
+def test_round_trip(alg):
+    crush = crush_map(BUCKET_ALGS[alg])
+    encoded = crush.encode()
+    decoded = CrushMap.decode(encoded)
+    assert_same(decoded, crush)
+    assert decoded.encode() == encoded
+
+
+@pytest.mark.parametrize('count', range(len(TUNABLES) + 1))
+def test_tunables_truncated_at_each_legacy_position(count):
+    crush = crush_map(BUCKET_ALGS['straw2'], tunables=count)
+    decoded = CrushMap.decode(crush.encode())
+    assert sorted(decoded.tunables) == \
+        sorted(name for name, fmt, legacy in TUNABLES[:count])
+    for index, (name, fmt, legacy) in enumerate(TUNABLES):
+        expected = legacy + 1 if index < count else legacy
+        assert decoded.tunable(name) == expected
+    assert decoded.encode() == crush.encode()
+
+
+def test_newer_fields_are_kept():
+    encoded = crush_map(BUCKET_ALGS['straw2']).encode()
+    # eg: the device classes a luminous monitor appends
+    tail = b'\x02\x00\x00\x00\x00\x00\x00\x00'
+    decoded = CrushMap.decode(encoded + tail)
+    assert decoded.encode() == encoded + tail
+
+
+def test_bad_maps():
+    encoded = crush_map(BUCKET_ALGS['straw']).encode()
+    with pytest.raises(ValueError):
+        CrushMap.decode(b'\xff' + encoded[1:])
+    with pytest.raises(ValueError):
+        CrushMap.decode(encoded[:40])
+    with pytest.raises(KeyError):
+        CrushMap().tunable('no_such_tunable')
@@ -0,0 +1,182 @@
+import errno
+import json
+import os
+
+import pytest
+
+from ceph_api import discovery, schema
+from ceph_api.discovery import CACHE_FORMAT, _read_cache, _write_cache, \
+    discover_classes, load_commands, parse_command_descriptions
+
+from test_cluster import descriptions
+
+__author__ = 'Chris Holcombe <chris.holcombe@canonical.com>'
+
+FSID = '8ae0d1c4-93a6-4a3e-9ed6-2d4a13a8b6f1'
+
+
+def _prefix(*words):
+    return [{'type': 'CephPrefix', 'name': 'prefix', 'n': 1, 'req': 'true',
+             'prefix': word} for word in words]
+
+
+def _described(**commands):
+    return json.dumps(dict(
+        (key, dict(description, perm='rw', avail='cli,rest'))
+        for key, description in commands.items())).encode()
+
+
+def monitors(release='jewel', version='10.2.11'):
+    def handler(target, cmd, inbuf):
+        if cmd['prefix'] == 'fsid':
+            return 0, json.dumps({'fsid': FSID}).encode(), ''
+        if cmd['prefix'] == 'version':
+            if version is None:
+                return -errno.EINVAL, b'', 'unrecognized command'
+            return 0, json.dumps({'version': 'ceph version {} '
+                                  '(abc)'.format(version)}).encode(), ''
+        if cmd['prefix'] == 'get_command_descriptions':
+            return 0, descriptions(release), ''
+        raise AssertionError(cmd)
+    return handler
+
+
+def prefixes(rados):
+    return [cmd['prefix'] for _, cmd in rados.Rados.sent]
+
+
+@pytest.mark.parametrize('release', schema.RELEASES)
+def test_parse_matches_the_bundled_tables(release):
+    assert parse_command_descriptions(descriptions(release)) == \
+        schema.release_commands(release)
+
+
+def test_overloads_are_numbered_in_the_monitors_order():
+    # cmd1000 sorts before cmd200 as a string
+    outbuf = _described(
+        cmd200={'sig': _prefix('osd', 'crush', 'set'),
+                'help': 'set crush map from input file'},
+        cmd1000={'sig': _prefix('osd', 'crush', 'set') + [
+            {'name': 'id', 'type': 'CephOsdName', 'n': 1, 'req': 'true'}],
+            'help': 'update crushmap position'},
+        cmd9={'sig': _prefix('osd', 'crush', 'set') + [
+            {'name': 'weight', 'type': 'CephFloat', 'range': '0', 'n': 1,
+             'req': 'true'}],
+            'help': 'first of all'})
+    table = parse_command_descriptions(outbuf)
+    assert [(method, help) for method, prefix, help, args
+            in table['OsdCommand']] == [
+        ('osd_crush_set', 'first of all'),
+        ('osd_crush_set_2', 'set crush map from input file'),
+        ('osd_crush_set_3', 'update crushmap position')]
+
+
+def test_parse_arguments_and_flags():
+    outbuf = _described(
+        cmd1={'sig': _prefix('osd', 'pool', 'get') + [
+            {'name': 'pool', 'type': 'CephPoolname', 'n': 1,
+             'req': 'true'},
+            {'name': 'detail', 'type': 'CephChoices', 'strings': 'detail',
+             'n': 1, 'req': 'false'},
+            {'name': 'var', 'type': 'CephChoices', 'strings': 'size|pg_num',
+             'n': 1, 'req': 'true'}],
+            'help': 'get pool parameter <var>'},
+        cmd2={'sig': ['config-key', 'put', {
+            'name': 'key', 'type': 'CephString', 'n': 'N',
+            'req': 'true', 'goodchars': ''}], 'help': 'put'},
+        cmd3={'sig': _prefix('osd', 'thrash'), 'help': 'thrash',
+              'flags': 32},
+        cmd4={'sig': _prefix('mon', 'compact'), 'help': 'obsolete',
+              'flags': '2'},
+        cmd5={'sig': _prefix('fs', 'ls'), 'help': 'list filesystems'},
+        cmd6={'sig': _prefix('quorum_status'), 'help': 'quorum'})
+    table = parse_command_descriptions(outbuf)
+    # Required arguments first, n kept only when repeated
+    assert table['OsdCommand'] == [(
+        'osd_pool_get', 'osd pool get', 'get pool parameter <var>', (
+            (('name', 'pool'), ('type', 'CephPoolname')),
+            (('name', 'var'), ('type', 'CephChoices'),
+             ('strings', 'size|pg_num')),
+            (('name', 'detail'), ('type', 'CephChoices'),
+             ('strings', 'detail'), ('req', False))))]
+    assert table['ConfigKeyCommand'] == [(
+        'config_key_put', 'config-key put', 'put',
+        ((('name', 'key'), ('type', 'CephString'), ('goodchars', ''),
+          ('n', 'N')),))]
+    assert table['MdsCommand'][0][0] == 'fs_ls'
+    assert table['MonitorCommand'] == [
+        ('quorum_status', 'quorum_status', 'quorum', ())]
+    assert table['AuthCommand'] == table['PlacementGroupCommand'] == []
+
+
+def test_cache_round_trip(tmpdir):
+    table = schema.release_commands('jewel')
+    path = str(tmpdir.join('cache', 'fsid-10.2.11.json'))
+    _write_cache(path, table)
+    assert _read_cache(path) == table
+    assert os.listdir(os.path.dirname(path)) == ['fsid-10.2.11.json']
+    # Rewriting replaces the file
+    _write_cache(path, {'OsdCommand': table['OsdCommand'][:1]})
+    assert _read_cache(path) == {'OsdCommand': table['OsdCommand'][:1]}
+
+
+def test_unreadable_caches_are_ignored(tmpdir):
+    assert _read_cache(str(tmpdir.join('missing.json'))) is None
+    path = tmpdir.join('broken.json')
+    path.write('{"format": 1, "comm')
+    assert _read_cache(str(path)) is None
+    path.write(json.dumps({'format': CACHE_FORMAT + 1, 'commands': {}}))
+    assert _read_cache(str(path)) is None
+
+
+def test_load_commands_caches_by_fsid_and_version(rados, tmpdir):
+    rados.Rados.handler = staticmethod(monitors())
+    cache_dir = str(tmpdir)
+    table = load_commands('/etc/ceph/ceph.conf', cache_dir=cache_dir)
+    assert table == schema.release_commands('jewel')
+    assert prefixes(rados) == ['version', 'fsid', 'get_command_descriptions']
+    assert os.listdir(cache_dir) == ['{}-10.2.11.json'.format(FSID)]
+    rados.Rados.sent[:] = []
+    assert load_commands('/etc/ceph/ceph.conf', cache_dir=cache_dir) == table
+    assert prefixes(rados) == ['version', 'fsid']
+    rados.Rados.sent[:] = []
+    load_commands('/etc/ceph/ceph.conf', cache_dir=cache_dir, refresh=True)
+    assert prefixes(rados) == ['version', 'fsid', 'get_command_descriptions']
+    # An upgrade changes the version and so the cache file
+    rados.Rados.handler = staticmethod(monitors('jewel', '10.2.12'))
+    rados.Rados.sent[:] = []
+    load_commands('/etc/ceph/ceph.conf', cache_dir=cache_dir)
+    assert prefixes(rados)[-1] == 'get_command_descriptions'
+    assert len(os.listdir(cache_dir)) == 2
+
+
+def test_load_commands_without_a_cache(rados, tmpdir):
+    rados.Rados.handler = staticmethod(monitors('firefly', None))
+    load_commands('/etc/ceph/ceph.conf', cache_dir=str(tmpdir))
+    # Nothing is cached without a version to key it on
+    assert os.listdir(str(tmpdir)) == []
+    rados.Rados.sent[:] = []
+    load_commands('/etc/ceph/ceph.conf', cache_dir=None)
+    assert prefixes(rados) == ['get_command_descriptions']
+
+
+def test_load_commands_when_the_cache_cant_be_written(rados, monkeypatch,
+                                                      tmpdir):
+    def unwritable(path, table):
+        raise IOError(errno.EACCES, 'Permission denied')
+
+    rados.Rados.handler = staticmethod(monitors())
+    monkeypatch.setattr(discovery, '_write_cache', unwritable)
+    assert load_commands('/etc/ceph/ceph.conf', cache_dir=str(tmpdir)) == \
+        schema.release_commands('jewel')
+
+
+def test_discover_classes(rados, tmpdir):
+    rados.Rados.handler = staticmethod(monitors('hammer', '0.94.10'))
+    classes = discover_classes('/etc/ceph/ceph.conf', cache_dir=str(tmpdir))
+    assert sorted(classes) == sorted(schema.COMMAND_CLASSES)
+    osd = classes['OsdCommand']
+    assert osd.__module__ == 'ceph_api.discovery'
+    assert hasattr(osd, 'osd_crush_reweight_all')
+    # Only what hammer's monitors described, not jewel's additions
+    assert not hasattr(osd, 'osd_blacklist_clear')
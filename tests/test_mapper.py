@@ -0,0 +1,379 @@
+import pytest
+
+pytest.importorskip('numpy')
+
+from ceph_api.crushmap import BUCKET_ALGS, BUCKET_TREE, \
+    RULE_CHOOSELEAF_FIRSTN, RULE_CHOOSELEAF_INDEP, RULE_EMIT, \
+    RULE_SET_CHOOSE_TRIES, RULE_SET_CHOOSELEAF_TRIES, RULE_TAKE, \
+    RULE_TYPE_ERASURE, RULE_TYPE_REPLICATED, WEIGHT_ONE, Bucket, CrushMap, \
+    Rule  # noqa: E402
+from ceph_api.mapper import CRUSH_ITEM_NONE, CrushMapper  # noqa: E402
+
+__author__ = 'Chris Holcombe <chris.holcombe@canonical.com>'
+
+# (choose_local_tries, choose_local_fallback_tries, choose_total_tries,
+#  chooseleaf_descend_once, chooseleaf_vary_r, straw_calc_version,
+#  chooseleaf_stable) of each tunables profile
+PROFILES = {
+    'argonaut': (2, 5, 19, 0, 0, 0, 0),
+    'bobtail': (0, 0, 50, 1, 0, 0, 0),
+    'firefly': (0, 0, 50, 1, 1, 0, 0),
+    'hammer': (0, 0, 50, 1, 1, 1, 0),
+    'jewel': (0, 0, 50, 1, 1, 1, 1),
+}
+TUNABLE_NAMES = ('choose_local_tries', 'choose_local_fallback_tries',
+                 'choose_total_tries', 'chooseleaf_descend_once',
+                 'chooseleaf_vary_r', 'straw_calc_version',
+                 'chooseleaf_stable')
+
+HOSTS = 4
+PER_HOST = 3
+# osd.4 is out and osd.7 half out
+REWEIGHTS = [WEIGHT_ONE] * (HOSTS * PER_HOST)
+REWEIGHTS[4] = 0
+REWEIGHTS[7] = WEIGHT_ONE // 2
+
+# (mode, rule id, result_max).  There are only four hosts, so indep
+# leaves a hole.
+MODES = (('firstn', 0, 3), ('indep', 1, 5))
+
+
+def build(alg, profile):
+    """A root of HOSTS hosts of PER_HOST OSDs, every bucket using alg,
+    with a chooseleaf firstn rule 0 and a chooseleaf indep rule 1."""
+    crush = CrushMap()
+    crush.types = {0: 'osd', 1: 'host', 2: 'root'}
+    crush.tunables = dict(zip(TUNABLE_NAMES, PROFILES[profile]))
+    crush.tunables['allowed_bucket_algs'] = 0x3e
+    root = Bucket(-1, 2, BUCKET_ALGS[alg])
+    for h in range(HOSTS):
+        host = Bucket(-2 - h, 1, BUCKET_ALGS[alg])
+        for o in range(PER_HOST):
+            osd_id = h * PER_HOST + o
+            if alg == 'uniform':
+                weight = WEIGHT_ONE
+            else:
+                weight = WEIGHT_ONE * (2 + osd_id % 3) // 2
+            host.add_item(osd_id, weight)
+        root.add_item(host.id, host.weight)
+        crush.buckets[host.id] = host
+    crush.buckets[root.id] = root
+    crush.max_buckets = 1 + HOSTS
+    crush.max_devices = HOSTS * PER_HOST
+    crush.rules[0] = Rule(0, RULE_TYPE_REPLICATED, 1, 10, [
+        (RULE_TAKE, -1, 0), (RULE_CHOOSELEAF_FIRSTN, 0, 1),
+        (RULE_EMIT, 0, 0)])
+    crush.rules[1] = Rule(1, RULE_TYPE_ERASURE, 3, 20, [
+        (RULE_SET_CHOOSELEAF_TRIES, 5, 0), (RULE_SET_CHOOSE_TRIES, 100, 0),
+        (RULE_TAKE, -1, 0), (RULE_CHOOSELEAF_INDEP, 0, 1),
+        (RULE_EMIT, 0, 0)])
+    crush.max_rules = 2
+    return crush
+
+
+def both_paths(crush, rule_id, xs, result_max, weights):
+    # The lockstep arrays where the rule allows them, and the per input
+    # steps every rule can run through
+    mapper = CrushMapper(crush)
+    return (mapper.do_rule(rule_id, xs, result_max, weights),
+            mapper._rule_rounds(crush.rules[rule_id], list(xs), result_max,
+                                weights))
+
+
+@pytest.mark.parametrize('profile', ['argonaut', 'jewel'])
+@pytest.mark.parametrize('mode,rule_id,result_max', MODES)
+@pytest.mark.parametrize('size', [3, 5, 6])
+def test_zero_weight_tree_bucket_is_rejected(profile, mode, rule_id,
+                                             result_max, size):
+    # Every draw from a tree bucket whose items weigh 0 walks right, off
+    # the end of the items unless the size is a power of two
+    crush = build('straw2', profile)
+    host = Bucket(-6, 1, BUCKET_TREE)
+    for osd_id in range(12, 12 + size):
+        host.add_item(osd_id, 0)
+    crush.buckets[host.id] = host
+    crush.buckets[-1].add_item(host.id, WEIGHT_ONE)
+    crush.max_buckets = 6
+    crush.max_devices = 12 + size
+    weights = REWEIGHTS + [WEIGHT_ONE] * size
+    lockstep, rounds = both_paths(crush, rule_id, range(200), result_max,
+                                  weights)
+    assert lockstep == rounds
+    for osd_ids in lockstep:
+        assert len(osd_ids) == result_max
+        osd_ids = [osd_id for osd_id in osd_ids if osd_id != CRUSH_ITEM_NONE]
+        assert len(set(osd_ids)) == len(osd_ids)
+        assert all(0 <= osd_id < 12 + size for osd_id in osd_ids)
+        if profile != 'argonaut':
+            # Without the local fallback's permutation, which ignores
+            # weights, nothing in the host can be chosen
+            assert not set(osd_ids) & set(host.items)
+
+
+NONE = CRUSH_ITEM_NONE
+XS = [0, 1, 2, 3, 17, 100, 1000, 4242, 65535, 999999, 123456789, 0x7fffffff]
+
+# crush_do_rule() of XS on build(alg, profile) with REWEIGHTS, recorded
+# from libcrush's mapper.c as shipped in python-crush 1.0.35
+GOLDEN = {
+    ('uniform', 'argonaut', 'firstn'): [
+        (9, 2, 3), (6, 5, 11), (1, 3, 7), (3, 2, 9), (6, 9, 5), (0, 11, 5),
+        (9, 2, 8), (0, 6, 3), (0, 11, 7), (6, 11, 1), (0, 5, 8), (9, 6, 1),
+    ],
+    ('uniform', 'argonaut', 'indep'): [
+        (9, 1, 5, 8, NONE), (6, 5, 10, 1, NONE), (1, 3, 8, 10, NONE),
+        (3, 0, 10, 8, NONE), (6, 11, 3, 1, NONE), (0, 10, 3, 7, NONE),
+        (9, 0, 6, 3, NONE), (0, 8, 5, 9, NONE), (0, 10, 6, 3, NONE),
+        (6, 9, 2, 5, NONE), (0, 5, 6, 9, NONE), (9, 8, 0, 5, NONE),
+    ],
+    ('uniform', 'bobtail', 'firstn'): [
+        (9, 2, 8), (6, 5, 11), (1, 8, 11), (3, 2, 9), (6, 9, 5), (0, 11, 5),
+        (9, 2, 8), (0, 6, 3), (0, 11, 7), (6, 11, 1), (0, 11, 8), (9, 6, 1),
+    ],
+    ('uniform', 'bobtail', 'indep'): [
+        (9, 1, 5, 8, NONE), (6, 5, 10, 1, NONE), (1, 3, 8, 10, NONE),
+        (3, 0, 10, 8, NONE), (6, 11, 3, 1, NONE), (0, 10, 3, 7, NONE),
+        (9, 0, 6, 3, NONE), (0, 8, 5, 9, NONE), (0, 10, 6, 3, NONE),
+        (6, 9, 2, 5, NONE), (0, 5, 6, 9, NONE), (9, 8, 0, 5, NONE),
+    ],
+    ('uniform', 'firefly', 'firstn'): [
+        (9, 1, 5), (6, 9, 2), (1, 3, 8), (3, 0, 10), (6, 11, 2), (0, 10, 3),
+        (9, 0, 5), (0, 8, 5), (0, 10, 6), (6, 9, 2), (0, 5, 10), (9, 8, 0),
+    ],
+    ('uniform', 'firefly', 'indep'): [
+        (9, 1, 5, 8, NONE), (6, 5, 10, 1, NONE), (1, 3, 8, 10, NONE),
+        (3, 0, 10, 8, NONE), (6, 11, 3, 1, NONE), (0, 10, 3, 7, NONE),
+        (9, 0, 6, 3, NONE), (0, 8, 5, 9, NONE), (0, 10, 6, 3, NONE),
+        (6, 9, 2, 5, NONE), (0, 5, 6, 9, NONE), (9, 8, 0, 5, NONE),
+    ],
+    ('uniform', 'hammer', 'firstn'): [
+        (9, 1, 5), (6, 9, 2), (1, 3, 8), (3, 0, 10), (6, 11, 2), (0, 10, 3),
+        (9, 0, 5), (0, 8, 5), (0, 10, 6), (6, 9, 2), (0, 5, 10), (9, 8, 0),
+    ],
+    ('uniform', 'hammer', 'indep'): [
+        (9, 1, 5, 8, NONE), (6, 5, 10, 1, NONE), (1, 3, 8, 10, NONE),
+        (3, 0, 10, 8, NONE), (6, 11, 3, 1, NONE), (0, 10, 3, 7, NONE),
+        (9, 0, 6, 3, NONE), (0, 8, 5, 9, NONE), (0, 10, 6, 3, NONE),
+        (6, 9, 2, 5, NONE), (0, 5, 6, 9, NONE), (9, 8, 0, 5, NONE),
+    ],
+    ('uniform', 'jewel', 'firstn'): [
+        (9, 2, 3), (6, 5, 11), (1, 7, 10), (3, 2, 9), (6, 9, 5), (0, 11, 5),
+        (9, 2, 8), (0, 6, 3), (0, 11, 7), (6, 11, 1), (0, 8, 9), (9, 6, 1),
+    ],
+    ('uniform', 'jewel', 'indep'): [
+        (9, 1, 5, 8, NONE), (6, 5, 10, 1, NONE), (1, 3, 8, 10, NONE),
+        (3, 0, 10, 8, NONE), (6, 11, 3, 1, NONE), (0, 10, 3, 7, NONE),
+        (9, 0, 6, 3, NONE), (0, 8, 5, 9, NONE), (0, 10, 6, 3, NONE),
+        (6, 9, 2, 5, NONE), (0, 5, 6, 9, NONE), (9, 8, 0, 5, NONE),
+    ],
+    ('list', 'argonaut', 'firstn'): [
+        (6, 3, 2), (6, 10, 5), (6, 9, 3), (5, 2, 6), (9, 3, 2), (7, 11, 5),
+        (0, 3, 6), (5, 8, 1), (8, 5, 2), (10, 2, 8), (0, 11, 5), (5, 7, 11),
+    ],
+    ('list', 'argonaut', 'indep'): [
+        (6, 3, NONE, 11, 2), (6, 10, 0, NONE, 5), (6, 10, 0, 3, NONE),
+        (5, 2, 6, NONE, 11), (9, 6, 5, 2, NONE), (7, 10, 3, 1, NONE),
+        (0, 3, NONE, 8, 11), (5, 7, 1, NONE, 11), (8, 5, 2, NONE, 11),
+        (10, 2, 7, 5, NONE), (0, 11, 5, 6, NONE), (5, 7, 1, NONE, 11),
+    ],
+    ('list', 'bobtail', 'firstn'): [
+        (6, 3, 2), (6, 10, 5), (6, 9, 3), (5, 2, 11), (9, 3, 2), (7, 11, 5),
+        (0, 3, 10), (5, 8, 1), (8, 5, 2), (10, 2, 8), (0, 11, 5), (5, 7, 11),
+    ],
+    ('list', 'bobtail', 'indep'): [
+        (6, 3, NONE, 11, 2), (6, 10, 0, NONE, 5), (6, 10, 0, 3, NONE),
+        (5, 2, 6, NONE, 11), (9, 6, 5, 2, NONE), (7, 10, 3, 1, NONE),
+        (0, 3, NONE, 8, 11), (5, 7, 1, NONE, 11), (8, 5, 2, NONE, 11),
+        (10, 2, 7, 5, NONE), (0, 11, 5, 6, NONE), (5, 7, 1, NONE, 11),
+    ],
+    ('list', 'firefly', 'firstn'): [
+        (6, 3, 0), (6, 10, 3), (6, 10, 2), (5, 2, 6), (9, 1, 5), (7, 10, 3),
+        (0, 3, 11), (5, 7, 1), (8, 1, 5), (10, 2, 7), (0, 11, 5), (5, 7, 11),
+    ],
+    ('list', 'firefly', 'indep'): [
+        (6, 3, NONE, 11, 2), (6, 10, 0, NONE, 5), (6, 10, 0, 3, NONE),
+        (5, 2, 6, NONE, 11), (9, 6, 5, 2, NONE), (7, 10, 3, 1, NONE),
+        (0, 3, NONE, 8, 11), (5, 7, 1, NONE, 11), (8, 5, 2, NONE, 11),
+        (10, 2, 7, 5, NONE), (0, 11, 5, 6, NONE), (5, 7, 1, NONE, 11),
+    ],
+    ('list', 'hammer', 'firstn'): [
+        (6, 3, 0), (6, 10, 3), (6, 10, 2), (5, 2, 6), (9, 1, 5), (7, 10, 3),
+        (0, 3, 11), (5, 7, 1), (8, 1, 5), (10, 2, 7), (0, 11, 5), (5, 7, 11),
+    ],
+    ('list', 'hammer', 'indep'): [
+        (6, 3, NONE, 11, 2), (6, 10, 0, NONE, 5), (6, 10, 0, 3, NONE),
+        (5, 2, 6, NONE, 11), (9, 6, 5, 2, NONE), (7, 10, 3, 1, NONE),
+        (0, 3, NONE, 8, 11), (5, 7, 1, NONE, 11), (8, 5, 2, NONE, 11),
+        (10, 2, 7, 5, NONE), (0, 11, 5, 6, NONE), (5, 7, 1, NONE, 11),
+    ],
+    ('list', 'jewel', 'firstn'): [
+        (6, 3, 2), (6, 10, 2), (6, 9, 1), (5, 2, 8), (9, 5, 2), (7, 11, 5),
+        (0, 3, 9), (5, 8, 1), (8, 5, 2), (10, 2, 8), (0, 11, 5), (5, 7, 9),
+    ],
+    ('list', 'jewel', 'indep'): [
+        (6, 3, NONE, 11, 2), (6, 10, 0, NONE, 5), (6, 10, 0, 3, NONE),
+        (5, 2, 6, NONE, 11), (9, 6, 5, 2, NONE), (7, 10, 3, 1, NONE),
+        (0, 3, NONE, 8, 11), (5, 7, 1, NONE, 11), (8, 5, 2, NONE, 11),
+        (10, 2, 7, 5, NONE), (0, 11, 5, 6, NONE), (5, 7, 1, NONE, 11),
+    ],
+    ('tree', 'argonaut', 'firstn'): [
+        (10, 0, 5), (0, 5, 11), (8, 5, 10), (10, 5, 8), (5, 8, 0), (11, 5, 8),
+        (5, 6, 11), (3, 0, 7), (5, 9, 7), (8, 0, 3), (2, 6, 5), (6, 9, 2),
+    ],
+    ('tree', 'argonaut', 'indep'): [
+        (10, 2, 6, NONE, 5), (0, 3, NONE, 10, 8), (8, 5, 11, NONE, 0),
+        (10, 5, 8, 2, NONE), (5, 7, 11, 2, NONE), (11, 5, 7, 1, NONE),
+        (5, 6, 0, 10, NONE), (3, 2, 7, NONE, 10), (5, 0, 10, 8, NONE),
+        (8, 11, NONE, 1, 5), (2, 6, 3, 11, NONE), (6, 10, 5, 1, NONE),
+    ],
+    ('tree', 'bobtail', 'firstn'): [
+        (10, 0, 6), (0, 5, 11), (8, 5, 10), (10, 8, 2), (5, 8, 0), (11, 5, 8),
+        (5, 10, 0), (3, 0, 7), (9, 8, 5), (8, 0, 3), (2, 6, 11), (6, 9, 2),
+    ],
+    ('tree', 'bobtail', 'indep'): [
+        (10, 2, 6, NONE, 5), (0, 3, NONE, 10, 8), (8, 5, 11, NONE, 0),
+        (10, 5, 8, 2, NONE), (5, 7, 11, 2, NONE), (11, 5, 7, 1, NONE),
+        (5, 6, 0, 10, NONE), (3, 2, 7, NONE, 10), (5, 0, 10, 8, NONE),
+        (8, 11, NONE, 1, 5), (2, 6, 3, 11, NONE), (6, 10, 5, 1, NONE),
+    ],
+    ('tree', 'firefly', 'firstn'): [
+        (10, 2, 5), (0, 3, 11), (8, 5, 9), (10, 5, 1), (5, 7, 2), (11, 5, 7),
+        (5, 6, 10), (3, 2, 7), (10, 5, 6), (8, 0, 11), (2, 6, 3), (6, 10, 2),
+    ],
+    ('tree', 'firefly', 'indep'): [
+        (10, 2, 6, NONE, 5), (0, 3, NONE, 10, 8), (8, 5, 11, NONE, 0),
+        (10, 5, 8, 2, NONE), (5, 7, 11, 2, NONE), (11, 5, 7, 1, NONE),
+        (5, 6, 0, 10, NONE), (3, 2, 7, NONE, 10), (5, 0, 10, 8, NONE),
+        (8, 11, NONE, 1, 5), (2, 6, 3, 11, NONE), (6, 10, 5, 1, NONE),
+    ],
+    ('tree', 'hammer', 'firstn'): [
+        (10, 2, 5), (0, 3, 11), (8, 5, 9), (10, 5, 1), (5, 7, 2), (11, 5, 7),
+        (5, 6, 10), (3, 2, 7), (10, 5, 6), (8, 0, 11), (2, 6, 3), (6, 10, 2),
+    ],
+    ('tree', 'hammer', 'indep'): [
+        (10, 2, 6, NONE, 5), (0, 3, NONE, 10, 8), (8, 5, 11, NONE, 0),
+        (10, 5, 8, 2, NONE), (5, 7, 11, 2, NONE), (11, 5, 7, 1, NONE),
+        (5, 6, 0, 10, NONE), (3, 2, 7, NONE, 10), (5, 0, 10, 8, NONE),
+        (8, 11, NONE, 1, 5), (2, 6, 3, 11, NONE), (6, 10, 5, 1, NONE),
+    ],
+    ('tree', 'jewel', 'firstn'): [
+        (10, 0, 5), (0, 5, 9), (8, 5, 11), (10, 8, 2), (5, 8, 2), (11, 5, 8),
+        (5, 11, 1), (3, 0, 7), (10, 7, 5), (8, 0, 3), (2, 6, 5), (6, 9, 2),
+    ],
+    ('tree', 'jewel', 'indep'): [
+        (10, 2, 6, NONE, 5), (0, 3, NONE, 10, 8), (8, 5, 11, NONE, 0),
+        (10, 5, 8, 2, NONE), (5, 7, 11, 2, NONE), (11, 5, 7, 1, NONE),
+        (5, 6, 0, 10, NONE), (3, 2, 7, NONE, 10), (5, 0, 10, 8, NONE),
+        (8, 11, NONE, 1, 5), (2, 6, 3, 11, NONE), (6, 10, 5, 1, NONE),
+    ],
+    ('straw', 'argonaut', 'firstn'): [
+        (11, 6, 0), (9, 5, 2), (8, 9, 5), (8, 11, 5), (10, 1, 6), (10, 5, 8),
+        (5, 0, 9), (7, 10, 1), (8, 5, 0), (3, 6, 10), (2, 5, 6), (5, 7, 1),
+    ],
+    ('straw', 'argonaut', 'indep'): [
+        (11, 8, 5, 2, NONE), (9, 5, 1, NONE, 8), (8, 1, 9, 5, NONE),
+        (8, 9, 5, NONE, 0), (10, 0, 8, 5, NONE), (10, 5, 2, 8, NONE),
+        (5, 0, 9, NONE, 6), (7, 11, 2, NONE, 5), (8, 5, 2, NONE, 11),
+        (3, 8, NONE, 9, 2), (2, 5, NONE, 11, 6), (5, 7, 2, 11, NONE),
+    ],
+    ('straw', 'bobtail', 'firstn'): [
+        (11, 6, 0), (9, 5, 2), (8, 9, 5), (8, 11, 0), (10, 1, 6), (10, 7, 2),
+        (5, 0, 9), (7, 10, 1), (8, 1, 5), (3, 6, 10), (2, 8, 10), (8, 0, 11),
+    ],
+    ('straw', 'bobtail', 'indep'): [
+        (11, 8, 5, 2, NONE), (9, 5, 1, NONE, 8), (8, 1, 9, 5, NONE),
+        (8, 9, 5, NONE, 0), (10, 0, 8, 5, NONE), (10, 5, 2, 8, NONE),
+        (5, 0, 9, NONE, 6), (7, 11, 2, NONE, 5), (8, 5, 2, NONE, 11),
+        (3, 8, NONE, 9, 2), (2, 5, NONE, 11, 6), (5, 7, 2, 11, NONE),
+    ],
+    ('straw', 'firefly', 'firstn'): [
+        (11, 8, 1), (9, 5, 1), (8, 11, 5), (8, 9, 5), (10, 0, 8), (10, 7, 1),
+        (5, 0, 9), (7, 11, 2), (8, 5, 2), (3, 8, 11), (2, 5, 10), (7, 2, 10),
+    ],
+    ('straw', 'firefly', 'indep'): [
+        (11, 8, 5, 2, NONE), (9, 5, 1, NONE, 8), (8, 1, 9, 5, NONE),
+        (8, 9, 5, NONE, 0), (10, 0, 8, 5, NONE), (10, 5, 2, 8, NONE),
+        (5, 0, 9, NONE, 6), (7, 11, 2, NONE, 5), (8, 5, 2, NONE, 11),
+        (3, 8, NONE, 9, 2), (2, 5, NONE, 11, 6), (5, 7, 2, 11, NONE),
+    ],
+    ('straw', 'hammer', 'firstn'): [
+        (11, 8, 1), (9, 5, 1), (8, 11, 5), (8, 9, 5), (10, 0, 8), (10, 7, 1),
+        (5, 0, 9), (7, 11, 2), (8, 5, 2), (3, 8, 11), (2, 5, 10), (7, 2, 10),
+    ],
+    ('straw', 'hammer', 'indep'): [
+        (11, 8, 5, 2, NONE), (9, 5, 1, NONE, 8), (8, 1, 9, 5, NONE),
+        (8, 9, 5, NONE, 0), (10, 0, 8, 5, NONE), (10, 5, 2, 8, NONE),
+        (5, 0, 9, NONE, 6), (7, 11, 2, NONE, 5), (8, 5, 2, NONE, 11),
+        (3, 8, NONE, 9, 2), (2, 5, NONE, 11, 6), (5, 7, 2, 11, NONE),
+    ],
+    ('straw', 'jewel', 'firstn'): [
+        (11, 6, 2), (9, 5, 2), (8, 11, 0), (8, 11, 1), (10, 1, 6), (10, 6, 1),
+        (5, 0, 9), (7, 10, 0), (8, 0, 5), (3, 6, 11), (2, 5, 6), (7, 1, 9),
+    ],
+    ('straw', 'jewel', 'indep'): [
+        (11, 8, 5, 2, NONE), (9, 5, 1, NONE, 8), (8, 1, 9, 5, NONE),
+        (8, 9, 5, NONE, 0), (10, 0, 8, 5, NONE), (10, 5, 2, 8, NONE),
+        (5, 0, 9, NONE, 6), (7, 11, 2, NONE, 5), (8, 5, 2, NONE, 11),
+        (3, 8, NONE, 9, 2), (2, 5, NONE, 11, 6), (5, 7, 2, 11, NONE),
+    ],
+    ('straw2', 'argonaut', 'firstn'): [
+        (11, 6, 0), (9, 5, 2), (8, 9, 5), (8, 11, 5), (10, 1, 6), (10, 5, 8),
+        (5, 0, 9), (7, 10, 1), (6, 5, 0), (3, 6, 10), (2, 5, 6), (5, 7, 1),
+    ],
+    ('straw2', 'argonaut', 'indep'): [
+        (11, 8, 5, 2, NONE), (9, 5, 1, NONE, 8), (8, 1, 9, 5, NONE),
+        (8, 9, 5, NONE, 0), (10, 0, 8, 3, NONE), (10, 5, 2, 8, NONE),
+        (5, 0, 9, NONE, 6), (7, 11, 0, NONE, 5), (6, 5, 2, NONE, 10),
+        (3, 8, NONE, 9, 2), (2, 5, NONE, 11, 6), (5, 7, 2, 11, NONE),
+    ],
+    ('straw2', 'bobtail', 'firstn'): [
+        (11, 6, 0), (9, 5, 2), (8, 9, 5), (8, 11, 0), (10, 1, 6), (10, 8, 2),
+        (5, 0, 9), (7, 10, 1), (6, 1, 5), (3, 6, 10), (2, 8, 10), (8, 0, 10),
+    ],
+    ('straw2', 'bobtail', 'indep'): [
+        (11, 8, 5, 2, NONE), (9, 5, 1, NONE, 8), (8, 1, 9, 5, NONE),
+        (8, 9, 5, NONE, 0), (10, 0, 8, 3, NONE), (10, 5, 2, 8, NONE),
+        (5, 0, 9, NONE, 6), (7, 11, 0, NONE, 5), (6, 5, 2, NONE, 10),
+        (3, 8, NONE, 9, 2), (2, 5, NONE, 11, 6), (5, 7, 2, 11, NONE),
+    ],
+    ('straw2', 'firefly', 'firstn'): [
+        (11, 8, 1), (9, 5, 1), (8, 11, 5), (8, 9, 5), (10, 0, 8), (10, 7, 1),
+        (5, 0, 9), (7, 11, 0), (6, 5, 2), (3, 8, 11), (2, 5, 10), (7, 2, 10),
+    ],
+    ('straw2', 'firefly', 'indep'): [
+        (11, 8, 5, 2, NONE), (9, 5, 1, NONE, 8), (8, 1, 9, 5, NONE),
+        (8, 9, 5, NONE, 0), (10, 0, 8, 3, NONE), (10, 5, 2, 8, NONE),
+        (5, 0, 9, NONE, 6), (7, 11, 0, NONE, 5), (6, 5, 2, NONE, 10),
+        (3, 8, NONE, 9, 2), (2, 5, NONE, 11, 6), (5, 7, 2, 11, NONE),
+    ],
+    ('straw2', 'hammer', 'firstn'): [
+        (11, 8, 1), (9, 5, 1), (8, 11, 5), (8, 9, 5), (10, 0, 8), (10, 7, 1),
+        (5, 0, 9), (7, 11, 0), (6, 5, 2), (3, 8, 11), (2, 5, 10), (7, 2, 10),
+    ],
+    ('straw2', 'hammer', 'indep'): [
+        (11, 8, 5, 2, NONE), (9, 5, 1, NONE, 8), (8, 1, 9, 5, NONE),
+        (8, 9, 5, NONE, 0), (10, 0, 8, 3, NONE), (10, 5, 2, 8, NONE),
+        (5, 0, 9, NONE, 6), (7, 11, 0, NONE, 5), (6, 5, 2, NONE, 10),
+        (3, 8, NONE, 9, 2), (2, 5, NONE, 11, 6), (5, 7, 2, 11, NONE),
+    ],
+    ('straw2', 'jewel', 'firstn'): [
+        (11, 6, 2), (9, 5, 2), (8, 11, 0), (8, 11, 1), (10, 1, 6), (10, 6, 1),
+        (5, 0, 9), (7, 10, 0), (6, 0, 5), (3, 6, 11), (2, 5, 6), (7, 1, 9),
+    ],
+    ('straw2', 'jewel', 'indep'): [
+        (11, 8, 5, 2, NONE), (9, 5, 1, NONE, 8), (8, 1, 9, 5, NONE),
+        (8, 9, 5, NONE, 0), (10, 0, 8, 3, NONE), (10, 5, 2, 8, NONE),
+        (5, 0, 9, NONE, 6), (7, 11, 0, NONE, 5), (6, 5, 2, NONE, 10),
+        (3, 8, NONE, 9, 2), (2, 5, NONE, 11, 6), (5, 7, 2, 11, NONE),
+    ],
+}
+
+
+@pytest.mark.parametrize('alg,profile,mode', sorted(GOLDEN))
+def test_matches_libcrush(alg, profile, mode):
+    rule_id, result_max = dict((m[0], m[1:]) for m in MODES)[mode]
+    lockstep, rounds = both_paths(build(alg, profile), rule_id, XS,
+                                  result_max, REWEIGHTS)
+    expected = [list(row) for row in GOLDEN[(alg, profile, mode)]]
+    assert lockstep == expected
+    assert rounds == expected
@@ -0,0 +1,164 @@
+import copy
+import errno
+import json
+
+import pytest
+
+from ceph_api.jewel.ceph_command import OsdCommand
+from ceph_api.osdmap import OSDMapEvent, OSDMapTracker, diff_osdmaps
+from ceph_api.output import OUTPUT_JSON, OUTPUT_JSON_RAW, OUTPUT_PLAIN
+
+__author__ = 'Chris Holcombe <chris.holcombe@canonical.com>'
+
+
+def osdmap(epoch):
+    return {'epoch': epoch, 'flags': 'sortbitwise',
+            'osds': [{'osd': osd_id, 'up': 1, 'in': 1, 'weight': 1.0,
+                      'primary_affinity': 1.0} for osd_id in range(3)],
+            'pools': [{'pool': 1, 'pool_name': 'rbd', 'size': 3,
+                       'pg_num': 64, 'last_change': '10'}],
+            'pg_temp': [], 'primary_temp': []}
+
+
+class Monitors(object):
+    """Keeps every epoch of an osdmap, the oldest ones trimmed."""
+
+    def __init__(self):
+        self.maps = {1: osdmap(1)}
+        self.first = 1
+
+    @property
+    def epoch(self):
+        return max(self.maps)
+
+    def change(self, edit):
+        new = copy.deepcopy(self.maps[self.epoch])
+        new['epoch'] += 1
+        edit(new)
+        self.maps[new['epoch']] = new
+
+    def __call__(self, target, cmd, inbuf):
+        if cmd['prefix'] == 'osd stat':
+            return 0, json.dumps({'epoch': self.epoch,
+                                  'num_osds': 3}).encode(), ''
+        if cmd['prefix'] == 'osd dump':
+            epoch = cmd.get('epoch', self.epoch)
+            if epoch < self.first:
+                return -errno.ENOENT, b'', 'there is no map for epoch'
+            return 0, json.dumps(self.maps[epoch]).encode(), ''
+        raise AssertionError(cmd)
+
+
+@pytest.fixture
+def monitors(rados):
+    monitors = Monitors()
+    rados.Rados.handler = staticmethod(monitors)
+    return monitors
+
+
+def dumps(rados):
+    # The epoch each osd dump asked for, None for the current map
+    return [cmd.get('epoch') for _, cmd in rados.Rados.sent
+            if cmd['prefix'] == 'osd dump']
+
+
+def osd(output_format=OUTPUT_JSON_RAW):
+    return OsdCommand('/etc/ceph/ceph.conf', output_format=output_format)
+
+
+def mark_down(osd_id):
+    def edit(osdmap):
+        osdmap['osds'][osd_id]['up'] = 0
+    return edit
+
+
+def resize(osdmap):
+    osdmap['pools'][0]['size'] = 2
+    osdmap['pools'][0]['last_change'] = str(osdmap['epoch'])
+
+
+def test_one_full_dump_per_poll(rados, monitors):
+    tracker = OSDMapTracker(osd())
+    assert tracker.poll() == []
+    assert tracker.epoch == 1
+    # Nothing new costs only the osd stat
+    assert tracker.poll() == []
+    for edit in (mark_down(0), resize, mark_down(2)):
+        monitors.change(edit)
+    seen = []
+    tracker.subscribe(seen.append)
+    events = tracker.poll()
+    assert events == [
+        OSDMapEvent(4, 'osd_down', 0, None, None),
+        OSDMapEvent(4, 'osd_down', 2, None, None),
+        OSDMapEvent(4, 'pool_changed', 1, {'size': 3}, {'size': 2}),
+    ]
+    assert seen == events
+    assert tracker.epoch == 4
+    assert dumps(rados) == [None, None]
+    assert (tracker.full_fetches, tracker.epoch_fetches) == (2, 0)
+
+
+def test_max_gap_reads_each_epoch(rados, monitors):
+    tracker = OSDMapTracker(osd(OUTPUT_JSON), max_gap=3)
+    tracker.poll()
+    for edit in (mark_down(0), resize, mark_down(2)):
+        monitors.change(edit)
+    assert [(event.epoch, event.kind) for event in tracker.poll()] == \
+        [(2, 'osd_down'), (3, 'pool_changed'), (4, 'osd_down')]
+    assert dumps(rados) == [None, 2, 3, 4]
+    # Past max_gap it jumps to the current map
+    for _ in range(4):
+        monitors.change(mark_down(1))
+    events = tracker.poll()
+    assert [(event.epoch, event.kind) for event in events] == \
+        [(8, 'osd_down')]
+    assert dumps(rados)[4:] == [None]
+
+
+def test_trimmed_epochs_jump_to_the_current_map(rados, monitors):
+    tracker = OSDMapTracker(osd(), max_gap=10)
+    tracker.poll()
+    for edit in (mark_down(0), resize):
+        monitors.change(edit)
+    monitors.first = 3
+    events = tracker.poll()
+    assert [(event.epoch, event.kind) for event in events] == \
+        [(3, 'osd_down'), (3, 'pool_changed')]
+    assert dumps(rados) == [None, 2, None]
+
+
+def test_needs_json():
+    with pytest.raises(ValueError):
+        OSDMapTracker(osd(OUTPUT_PLAIN))
+
+
+def test_diff_osdmaps():
+    old = osdmap(1)
+    new = osdmap(2)
+    new['flags'] = 'noout,sortbitwise'
+    new['osds'].append({'osd': 3, 'up': 1, 'in': 1, 'weight': 1.0,
+                        'primary_affinity': 1.0})
+    del new['osds'][1]
+    new['osds'][0].update({'in': 0, 'weight': 0.0, 'primary_affinity': 0.5})
+    new['pools'] = [dict(new['pools'][0], pool=2, pool_name='ec')]
+    new['pg_temp'] = [{'pgid': '1.2', 'osds': [2, 0]}]
+    old['primary_temp'] = [{'pgid': '1.3', 'osd': 2}]
+    events = [(event.kind, event.target, event.old, event.new)
+              for event in diff_osdmaps(old, new)]
+    assert all(event.epoch == 2 for event in diff_osdmaps(old, new))
+    assert events == [
+        ('flags', None, 'sortbitwise', 'noout,sortbitwise'),
+        ('osd_out', 0, None, None),
+        ('osd_weight', 0, 1.0, 0.0),
+        ('osd_primary_affinity', 0, 1.0, 0.5),
+        ('osd_removed', 1, old['osds'][1], None),
+        ('osd_added', 3, None, new['osds'][2]),
+        ('osd_up', 3, None, None),
+        ('osd_in', 3, None, None),
+        ('osd_weight', 3, 0.0, 1.0),
+        ('pool_deleted', 1, old['pools'][0], None),
+        ('pool_created', 2, None, new['pools'][0]),
+        ('pg_temp', '1.2', None, [2, 0]),
+        ('primary_temp', '1.3', 2, None),
+    ]
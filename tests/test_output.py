@@ -0,0 +1,237 @@
+import io
+import json
+import mmap
+
+import pytest
+
+from ceph_api import output
+from ceph_api.base import CommandBase
+from ceph_api.output import BINARY_COMMANDS, JSON_COMMANDS, \
+    OUTPUT_JSON, OUTPUT_JSON_RAW, OUTPUT_PLAIN, READ_COMMANDS, \
+    UNFORMATTED_COMMANDS
+from ceph_api.jewel.ceph_command import AuthCommand, OsdCommand
+
+__author__ = 'Chris Holcombe <chris.holcombe@canonical.com>'
+
+DUMP = {'epoch': 40, 'pools': [{'pool': 1, 'pool_name': 'rbd'}]}
+
+
+@pytest.mark.parametrize('outbuf', [json.dumps(DUMP).encode(),
+                                    json.dumps(DUMP)])
+def test_loads_takes_bytes_and_strings(outbuf):
+    assert output.loads(outbuf) == DUMP
+
+
+@pytest.mark.parametrize('outbuf', [b'', '', None])
+def test_loads_empty_outbuf(outbuf):
+    assert output.loads(outbuf) is None
+
+
+def test_loads_with_the_standard_library(monkeypatch):
+    monkeypatch.setattr(output, 'JSON_DECODER', 'json')
+    monkeypatch.setattr(output, '_json', json)
+    assert output.loads(u'{"fsid": "\\u00e9"}'.encode('utf-8')) == \
+        {'fsid': u'é'}
+
+
+def test_command_sets():
+    assert BINARY_COMMANDS <= READ_COMMANDS
+    assert UNFORMATTED_COMMANDS <= READ_COMMANDS
+    assert not JSON_COMMANDS & (BINARY_COMMANDS | UNFORMATTED_COMMANDS)
+    assert JSON_COMMANDS | BINARY_COMMANDS | UNFORMATTED_COMMANDS == \
+        READ_COMMANDS
+    # Nothing that changes the cluster is decoded or cached
+    assert not READ_COMMANDS & set(['osd set', 'osd pool set', 'pg repair',
+                                    'osd setcrushmap', 'auth add'])
+
+
+def _answer(outbuf):
+    def handler(target, cmd, inbuf):
+        return 0, outbuf, ''
+    return handler
+
+
+@pytest.mark.parametrize('output_format,expected', [
+    (OUTPUT_PLAIN, json.dumps(DUMP).encode()),
+    (OUTPUT_JSON, DUMP),
+    (OUTPUT_JSON_RAW, json.dumps(DUMP).encode()),
+])
+def test_read_commands(rados, output_format, expected):
+    rados.Rados.handler = staticmethod(_answer(json.dumps(DUMP).encode()))
+    command = CommandBase('/etc/ceph/ceph.conf', output_format=output_format)
+    assert command._run({'prefix': 'osd dump'}, '') == (expected, '')
+    sent = rados.Rados.sent[0][1]
+    if output_format == OUTPUT_PLAIN:
+        assert 'format' not in sent
+    else:
+        assert sent['format'] == 'json'
+
+
+@pytest.mark.parametrize('output_format', [OUTPUT_JSON, OUTPUT_JSON_RAW])
+def test_empty_json_outbuf(rados, output_format):
+    rados.Rados.handler = staticmethod(_answer(b''))
+    command = CommandBase('/etc/ceph/ceph.conf', output_format=output_format)
+    outbuf, outs = command._run({'prefix': 'osd blacklist ls'}, '')
+    assert outbuf == (None if output_format == OUTPUT_JSON else b'')
+
+
+@pytest.mark.parametrize('prefix', sorted(BINARY_COMMANDS |
+                                          UNFORMATTED_COMMANDS))
+def test_binary_and_unformatted_commands_are_never_decoded(rados, prefix):
+    encoded = b'\x00\x01{"not": "json"}\xff'
+    rados.Rados.handler = staticmethod(_answer(encoded))
+    command = CommandBase('/etc/ceph/ceph.conf', output_format=OUTPUT_JSON)
+    assert command._run({'prefix': prefix}, '') == (encoded, '')
+    assert 'format' not in rados.Rados.sent[0][1]
+
+
+def test_write_commands_are_not_decoded(rados):
+    rados.Rados.handler = staticmethod(_answer(b'set noout'))
+    command = CommandBase('/etc/ceph/ceph.conf', output_format=OUTPUT_JSON)
+    assert command._run({'prefix': 'osd set', 'key': 'noout'}, '') == \
+        (b'set noout', '')
+    assert rados.Rados.sent == [('mon', {'prefix': 'osd set',
+                                         'key': 'noout'})]
+
+
+def test_unknown_output_format():
+    with pytest.raises(ValueError):
+        CommandBase('/etc/ceph/ceph.conf', output_format='xml')
+
+
+MAP = b'\x00\x01encoded osdmap\xff' * 64
+
+
+def _getmap(target, cmd, inbuf):
+    assert cmd['prefix'] in ('osd getmap', 'osd getcrushmap')
+    return 0, MAP, 'got osdmap epoch 40'
+
+
+def test_write_outbuf_to_a_path(tmpdir):
+    path = str(tmpdir.join('osdmap'))
+    assert output.write_outbuf(MAP, path) == len(MAP)
+    with open(path, 'rb') as f:
+        assert f.read() == MAP
+
+
+def test_write_outbuf_to_a_file_like_object():
+    f = io.BytesIO()
+    assert output.write_outbuf(MAP, f) == len(MAP)
+    assert f.getvalue() == MAP
+
+
+def test_write_outbuf_to_a_buffer():
+    buf = bytearray(len(MAP) + 10)
+    assert output.write_outbuf(MAP, buf) == len(MAP)
+    assert bytes(buf[:len(MAP)]) == MAP
+    assert buf[len(MAP):] == bytearray(10)
+    mapped = mmap.mmap(-1, len(MAP))
+    assert output.write_outbuf(MAP, mapped) == len(MAP)
+    assert mapped[:] == MAP
+    with pytest.raises(ValueError):
+        output.write_outbuf(MAP, bytearray(len(MAP) - 1))
+
+
+def test_getmap_outfile(rados, tmpdir):
+    rados.Rados.handler = staticmethod(_getmap)
+    osd = OsdCommand('/etc/ceph/ceph.conf')
+    path = str(tmpdir.join('osdmap.40'))
+    # The byte count comes back in place of the outbuf
+    assert osd.osd_getmap(40, outfile=path) == \
+        (len(MAP), 'got osdmap epoch 40')
+    with open(path, 'rb') as f:
+        assert f.read() == MAP
+    f = io.BytesIO()
+    assert osd.osd_getcrushmap(outfile=f) == \
+        (len(MAP), 'got osdmap epoch 40')
+    assert f.getvalue() == MAP
+    # Without an outfile the map is returned as is, even in JSON mode
+    osd = OsdCommand('/etc/ceph/ceph.conf', output_format=OUTPUT_JSON)
+    assert osd.osd_getmap(40) == (MAP, 'got osdmap epoch 40')
+    assert [cmd for _, cmd in rados.Rados.sent] == [
+        {'prefix': 'osd getmap', 'epoch': 40},
+        {'prefix': 'osd getcrushmap'},
+        {'prefix': 'osd getmap', 'epoch': 40}]
+
+
+def test_only_getmap_commands_take_an_outfile():
+    osd = OsdCommand('/etc/ceph/ceph.conf')
+    with pytest.raises(TypeError):
+        osd.osd_dump(outfile='/tmp/dump')
+    assert 'outfile=None' in OsdCommand.osd_getmap.__doc__.split('\n')[0]
+
+
+KEYRING = b'[client.rgw]\n\tkey = AQBkYQBY2Ns1NhAAVuBvdrAOFLKRmUkLHgTmJQ==\n'
+
+
+def _uploads(received):
+    def handler(target, cmd, inbuf):
+        received.append((cmd['prefix'], inbuf))
+        return 0, b'', 'done'
+    return handler
+
+
+@pytest.mark.parametrize('inbuf', [
+    KEYRING, bytearray(KEYRING), memoryview(KEYRING)])
+def test_read_inbuf_buffers(inbuf):
+    assert output.read_inbuf(inbuf) == KEYRING
+    assert type(output.read_inbuf(inbuf)) is bytes
+
+
+def test_read_inbuf_files(tmpdir):
+    path = tmpdir.join('keyring')
+    path.write_binary(KEYRING)
+    assert output.read_inbuf(infile=str(path)) == KEYRING
+    assert output.read_inbuf('ignored', infile=io.BytesIO(KEYRING)) == \
+        KEYRING
+    mapped = mmap.mmap(-1, len(KEYRING))
+    mapped.write(KEYRING)
+    assert output.read_inbuf(mapped) == KEYRING
+    assert output.read_inbuf(None) == ''
+    assert output.read_inbuf() == ''
+
+
+@pytest.mark.parametrize('command_class,method', [
+    (OsdCommand, 'osd_setcrushmap'),
+    (OsdCommand, 'osd_crush_set'),
+    (AuthCommand, 'auth_import'),
+])
+def test_inbuf_and_infile(rados, tmpdir, command_class, method):
+    received = []
+    rados.Rados.handler = staticmethod(_uploads(received))
+    send = getattr(command_class('/etc/ceph/ceph.conf'), method)
+    path = tmpdir.join('input')
+    path.write_binary(KEYRING)
+    send(inbuf=KEYRING)
+    send(inbuf=bytearray(KEYRING))
+    send(infile=str(path))
+    send(infile=io.BytesIO(KEYRING))
+    send()
+    prefix = rados.Rados.sent[0][1]['prefix']
+    assert received == [(prefix, KEYRING)] * 4 + [(prefix, '')]
+
+
+def test_auth_add_takes_an_input_file(rados, tmpdir):
+    signature = AuthCommand.auth_add.__doc__.split('\n')[0]
+    assert signature == \
+        'auth_add(entity, caps=None, inbuf=None, infile=None)'
+    pytest.importorskip('ceph_argparse')
+    received = []
+    rados.Rados.handler = staticmethod(_uploads(received))
+    auth = AuthCommand('/etc/ceph/ceph.conf')
+    path = tmpdir.join('keyring')
+    path.write_binary(KEYRING)
+    auth.auth_add('client.rgw', inbuf=KEYRING)
+    auth.auth_add('client.rgw', infile=str(path))
+    assert received == [('auth add', KEYRING)] * 2
+
+
+def test_only_input_commands_take_an_inbuf():
+    # The osd crush set overload that places an item reads no file
+    assert 'inbuf' not in OsdCommand.osd_crush_set_2.__doc__.split('\n')[0]
+    assert 'inbuf=None' in OsdCommand.osd_crush_set.__doc__.split('\n')[0]
+    with pytest.raises(TypeError):
+        OsdCommand('/etc/ceph/ceph.conf').osd_crush_set_2(
+            'osd.1', 1.0, ['host=node1'], inbuf=KEYRING)
+    with pytest.raises(TypeError):
+        OsdCommand('/etc/ceph/ceph.conf').osd_dump(infile='/tmp/dump')
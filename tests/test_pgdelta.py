@@ -0,0 +1,85 @@
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from ceph_api.pgdelta import DELTA_COLUMNS, PGMapDelta, PGMapTracker, \
+    diff_tables  # noqa: E402
+from ceph_api.pgmap import pg_state_mask  # noqa: E402
+from ceph_api.pgtable import PGStatsTable  # noqa: E402
+
+__author__ = 'Chris Holcombe <chris.holcombe@canonical.com>'
+
+
+def stat(pgid, state='active+clean', **stat_sum):
+    return {'pgid': pgid, 'state': state, 'up': [0, 1], 'acting': [0, 1],
+            'stat_sum': dict({'num_bytes': 1000, 'num_objects': 10},
+                             **stat_sum)}
+
+
+def table(*stats):
+    return PGStatsTable.from_pg_stats(list(stats))
+
+
+def test_unchanged():
+    old = table(stat('1.0'), stat('1.1'))
+    delta = diff_tables(old, table(stat('1.0'), stat('1.1')))
+    assert isinstance(delta, PGMapDelta)
+    assert delta.pgid.tolist() == []
+    assert (delta.pools, delta.transitions) == ({}, {})
+    assert delta.added.tolist() == delta.removed.tolist() == []
+    assert sorted(delta.deltas) == sorted(DELTA_COLUMNS)
+
+
+def test_counters_and_states():
+    old = table(stat('1.0'), stat('1.1'), stat('2.0'), stat('2.1'))
+    new = table(stat('1.0', num_bytes=1500, num_write=3),
+                stat('1.1'),
+                stat('2.0', 'active+degraded', num_objects_degraded=4),
+                stat('2.1', 'active+degraded', num_write=2))
+    delta = diff_tables(old, new)
+    assert delta.pgid.tolist() == ['1.0', '2.0', '2.1']
+    assert delta.pool.tolist() == [1, 2, 2]
+    assert delta.deltas['num_bytes'].tolist() == [500, 0, 0]
+    assert delta.deltas['num_objects_degraded'].tolist() == [0, 4, 0]
+    assert delta.pools[1]['num_write'] == 3
+    assert delta.pools[1]['pgs'] == 1
+    assert delta.pools[2]['num_write'] == 2
+    assert delta.pools[2]['num_objects_degraded'] == 4
+    assert delta.pools[2]['pgs'] == 2
+    clean = pg_state_mask('active+clean')
+    degraded = pg_state_mask('active+degraded')
+    assert delta.transitions == {(clean, degraded): 2}
+    assert delta.old_state.tolist() == [clean, clean, clean]
+    assert delta.new_state.tolist() == [clean, degraded, degraded]
+
+
+def test_added_removed_and_reordered_pgs():
+    old = table(stat('1.0'), stat('1.1'), stat('1.2'), stat('1.3'))
+    # 1.1 went away, 1.4 and 1.5 appeared, and the rest came back in
+    # another order with 1.2 having written
+    new = table(stat('1.5'), stat('1.3'), stat('1.2', num_write=7),
+                stat('1.4'), stat('1.0'))
+    delta = diff_tables(old, new)
+    assert sorted(delta.added.tolist()) == ['1.4', '1.5']
+    assert delta.removed.tolist() == ['1.1']
+    assert delta.pgid.tolist() == ['1.2']
+    assert delta.deltas['num_write'].tolist() == [7]
+    assert delta.pools == {1: dict(
+        dict((name, 0) for name in DELTA_COLUMNS), num_write=7, pgs=1)}
+    # Only reordered is no change at all
+    delta = diff_tables(old, table(stat('1.3'), stat('1.1'), stat('1.0'),
+                                   stat('1.2')))
+    assert delta.pgid.tolist() == []
+    assert delta.added.tolist() == delta.removed.tolist() == []
+
+
+def test_tracker_update():
+    tracker = PGMapTracker()
+    assert tracker.update(table(stat('1.0')), version=10, stamp=100.0) \
+        is None
+    delta = tracker.update(table(stat('1.0', num_write_kb=40)), version=12,
+                           stamp=104.0)
+    assert (delta.version, delta.previous_version, delta.seconds) == \
+        (12, 10, 4.0)
+    assert delta.pools[1]['num_write_kb'] / delta.seconds == 10
+    assert tracker.version == 12
@@ -0,0 +1,131 @@
+import random
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from ceph_api import pgindex  # noqa: E402
+from ceph_api.pgindex import PGIndex  # noqa: E402
+from ceph_api.pgtable import PGStatsTable  # noqa: E402
+
+__author__ = 'Chris Holcombe <chris.holcombe@canonical.com>'
+
+OSDS = 12
+STATES = ('active+clean', 'active+degraded', 'active+remapped+backfilling',
+          'peering', 'active+clean+scrubbing+deep')
+
+
+def pg_stat(pool, ps, rng):
+    up = rng.sample(range(OSDS), 3)
+    acting = up if rng.random() < 0.8 else rng.sample(range(OSDS), 3)
+    return {'pgid': '{}.{:x}'.format(pool, ps), 'state': rng.choice(STATES),
+            'up': up, 'acting': acting, 'up_primary': up[0],
+            'acting_primary': acting[0]}
+
+
+def pg_stats(rng):
+    return [pg_stat(pool, ps, rng) for pool in (1, 2, 3)
+            for ps in range(40)]
+
+
+def change(stats, rng, count):
+    # A later dump: count PGs with new state or sets, in another order
+    stats = [dict(stat) for stat in stats]
+    for stat in rng.sample(stats, count):
+        new = pg_stat(0, 0, rng)
+        for field in rng.sample(['state', 'up', 'acting'], 2):
+            stat[field] = new[field]
+        stat['up_primary'] = stat['up'][0]
+        stat['acting_primary'] = stat['acting'][0]
+    rng.shuffle(stats)
+    return stats
+
+
+def queries():
+    yield {}
+    for pool in (1, 2, 3, 4):
+        yield {'pool': pool}
+    for osd in range(OSDS):
+        yield {'osd': osd}
+        yield {'osd': osd, 'acting': False}
+        yield {'primary': osd}
+        yield {'primary': osd, 'acting': False, 'pool': 2}
+        yield {'osd': osd, 'states': ['degraded', 'backfilling']}
+    yield {'states': ['clean']}
+    yield {'states': ['peering'], 'pool': 3}
+
+
+def in_order(table, pgids):
+    # table's rows rearranged into the order of pgids
+    rows = dict((pgid, row) for row, pgid in enumerate(table.pgid.tolist()))
+    return table[np.array([rows[pgid] for pgid in pgids], dtype=np.int64)]
+
+
+def assert_same_answers(index, rebuilt):
+    for query in queries():
+        assert index.pgs[index.rows(**query)].pgid.tolist() == \
+            rebuilt.pgs[rebuilt.rows(**query)].pgid.tolist(), query
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_refresh_matches_a_rebuild(seed):
+    rng = random.Random(seed)
+    stats = first = pg_stats(rng)
+    index = PGIndex(PGStatsTable.from_pg_stats(stats), version=1)
+    for version in (2, 3, 4):
+        stats = change(stats, rng, 10)
+        table = PGStatsTable.from_pg_stats(stats)
+        assert 0 < index.refresh(table, version) <= 10
+        assert index.version == version
+        # The rows stay in the order the PGs were first indexed
+        assert index.pgs.pgid.tolist() == [stat['pgid'] for stat in first]
+        rebuilt = PGIndex(in_order(table, index.pgs.pgid.tolist()))
+        assert_same_answers(index, rebuilt)
+        for name in ('_states', '_up', '_acting', '_up_primary',
+                     '_acting_primary', '_pools'):
+            ours = getattr(index, name)
+            theirs = getattr(rebuilt, name)
+            assert sorted(ours) == sorted(theirs)
+            assert all(ours[key].tolist() == theirs[key].tolist()
+                       for key in ours)
+
+
+def test_refresh_rebuilds_past_the_threshold():
+    rng = random.Random(7)
+    stats = pg_stats(rng)
+    index = PGIndex(PGStatsTable.from_pg_stats(stats), version=1)
+    # Same version, nothing to do
+    assert index.refresh(PGStatsTable.from_pg_stats(change(stats, rng, 5)),
+                         1) == 0
+    assert index.pgs.pgid.tolist() == [stat['pgid'] for stat in stats]
+    count = int(pgindex.REBUILD_FRACTION * 120) + 10
+    stats = change(stats, rng, count)
+    table = PGStatsTable.from_pg_stats(stats)
+    assert pgindex.REBUILD_FRACTION * 120 < index.refresh(table, 2) <= count
+    assert_same_answers(index, PGIndex(in_order(
+        table, index.pgs.pgid.tolist())))
+    # Different PGs, eg: after a split, rebuild from the new dump
+    stats = stats + [pg_stat(3, 40, rng)]
+    table = PGStatsTable.from_pg_stats(stats)
+    assert index.refresh(table, 3) == len(stats)
+    assert index.pgs.pgid.tolist() == table.pgid.tolist()
+    assert_same_answers(index, PGIndex(table))
+
+
+def test_queries():
+    stats = pg_stats(random.Random(3))
+    index = PGIndex(PGStatsTable.from_pg_stats(stats),
+                    pool_names={'rbd': 2})
+    assert len(index) == 120
+    assert index.pg_ls_by_pool('rbd').pgid.tolist() == \
+        [stat['pgid'] for stat in stats if stat['pgid'].startswith('2.')]
+    assert index.pg_ls_by_osd('osd.4', pool=1).pgid.tolist() == \
+        [stat['pgid'] for stat in stats
+         if 4 in stat['acting'] and stat['pgid'].startswith('1.')]
+    assert index.pg_ls_by_primary(5, states=['clean']).pgid.tolist() == \
+        [stat['pgid'] for stat in stats if stat['acting_primary'] == 5 and
+         'clean' in stat['state']]
+    with pytest.raises(KeyError):
+        index.pg_ls_by_pool('nope')
+    with pytest.raises(ValueError):
+        index.pg_ls(states=['nonsense'])
@@ -0,0 +1,136 @@
+import io
+import json
+
+import pytest
+
+from ceph_api.pgmap import PG_STATE_BITS, iter_json_array, iter_pg_stats, \
+    pg_map_version, pg_state_mask, pg_state_string, state_names_mask
+
+__author__ = 'Chris Holcombe <chris.holcombe@canonical.com>'
+
+
+def pg_stat(ps):
+    return {
+        'pgid': '1.{:x}'.format(ps),
+        'version': '1200\'{}'.format(90000 + ps),
+        'state': 'active+clean' if ps % 3 else 'active+clean+scrubbing+deep',
+        'last_scrub_stamp': '2016-10-13 02:11:45.118920',
+        # Escapes, non-ASCII and awkward numbers for the chunk
+        # boundaries to land in
+        'comment': u'tab\there "quoted" \\ café ☃ \U0001f600',
+        'stat_sum': {'num_bytes': 4194304 * ps, 'num_objects': -ps,
+                     'ratio': ps / 7.0, 'big': 1.5e-300 * ps,
+                     'exp': 12345e10},
+        'stats_invalid': ps % 2 == 0,
+        'blocked_by': [],
+        'parent': None,
+        'up': [ps, ps + 1, ps + 2],
+        'acting': [ps, ps + 1, ps + 2],
+    }
+
+
+PG_STATS = [pg_stat(ps) for ps in range(6)]
+
+DUMP = {
+    'version': 1234567,
+    'stamp': '2016-10-14 06:12:32.0',
+    'last_osdmap_epoch': 1250,
+    'pool_stats': [{'poolid': 1, 'stat_sum': {'num_bytes': 10}}],
+    'pg_stats': PG_STATS,
+    'osd_stats': [{'osd': 0, 'kb': 1000}],
+}
+
+# Jewel's pg dump_json wraps the map in pg_map, with the version inside
+NESTED = {'pg_ready': True, 'pg_map': DUMP}
+
+
+def dumps(document, indent=None):
+    return json.dumps(document, indent=indent, ensure_ascii=False).encode(
+        'utf-8')
+
+
+@pytest.mark.parametrize('document', [DUMP, NESTED, PG_STATS])
+@pytest.mark.parametrize('indent', [None, 2])
+def test_every_chunk_boundary(document, indent):
+    outbuf = dumps(document, indent)
+    expected = json.loads(outbuf.decode('utf-8'))
+    if isinstance(expected, dict):
+        expected = expected.get('pg_map', expected)['pg_stats']
+    # Every boundary lands inside a string, an escape, a multibyte
+    # character and a number somewhere in the sizes up to 17
+    for chunk_size in list(range(1, 18)) + [64, 1000, len(outbuf)]:
+        assert list(iter_pg_stats(outbuf, chunk_size=chunk_size)) == \
+            expected, chunk_size
+
+
+@pytest.mark.parametrize('chunk_size', [1, 2, 3, 5, 8, 13])
+def test_numbers_split_across_chunks(chunk_size):
+    numbers = [0, -1, 12, 1.5, -0.25, 1e-7, 6.02e23, 1E+2, 12345678901234,
+               -9.87654321e-300, 3.0]
+    outbuf = '[{}]'.format(', '.join(repr(n) for n in numbers))
+    for offset in range(chunk_size):
+        padded = ' ' * offset + outbuf
+        assert list(iter_json_array(padded, None, chunk_size=chunk_size)) \
+            == numbers
+
+
+@pytest.mark.parametrize('wrap', [
+    bytes, bytearray, memoryview, lambda outbuf: outbuf.decode('utf-8'),
+    io.BytesIO])
+def test_sources(wrap):
+    outbuf = dumps(DUMP)
+    assert list(iter_pg_stats(wrap(outbuf), chunk_size=7)) == \
+        json.loads(outbuf.decode('utf-8'))['pg_stats']
+
+
+def test_text_file():
+    outbuf = dumps(DUMP).decode('utf-8')
+    assert list(iter_pg_stats(io.StringIO(outbuf), chunk_size=5)) == \
+        json.loads(outbuf)['pg_stats']
+
+
+@pytest.mark.parametrize('document', [
+    {'version': 1, 'pg_stats': []},
+    [],
+    {},
+    {'pg_map': {}},
+])
+def test_empty(document):
+    assert list(iter_pg_stats(dumps(document), chunk_size=3)) == []
+
+
+@pytest.mark.parametrize('outbuf', [
+    b'',
+    b'"pg_stats"',
+    b'{"pg_stats": [{"pgid": "1.0"}',
+    b'{"pg_stats": [{"pgid": "1.0"} {"pgid": "1.1"}]}',
+    b'{"pg_stats": [{"pgid": "1.0}]}',
+    b'{"version": 1, "pg_stats" [] }',
+])
+def test_malformed(outbuf):
+    for chunk_size in (1, 4, 1000):
+        with pytest.raises(ValueError):
+            list(iter_pg_stats(outbuf, chunk_size=chunk_size))
+
+
+def test_pg_map_version():
+    for chunk_size in (1, 3, 1000):
+        assert pg_map_version(dumps(DUMP), chunk_size) == 1234567
+        assert pg_map_version(dumps(NESTED), chunk_size) == 1234567
+        assert pg_map_version(dumps(PG_STATS), chunk_size) is None
+        assert pg_map_version(dumps({'pg_stats': []}), chunk_size) is None
+    # pg stat's version comes first, so nothing past it is decoded
+    assert pg_map_version(b'{"version": 88, "pg_stats": [{"broken', 16) == 88
+    assert pg_map_version(io.BytesIO(dumps(DUMP))) == 1234567
+
+
+def test_states():
+    mask = pg_state_mask('active+clean+scrubbing+deep')
+    assert mask == PG_STATE_BITS['active'] | PG_STATE_BITS['clean'] | \
+        PG_STATE_BITS['scrubbing'] | PG_STATE_BITS['deep_scrub']
+    assert pg_state_string(mask) == 'active+clean+scrubbing+deep_scrub'
+    assert pg_state_mask('active+backfilling+wait_backfill+unheardof') == \
+        state_names_mask(['active', 'backfill', 'backfill_wait'])
+    assert state_names_mask(['deep']) == PG_STATE_BITS['deep_scrub']
+    with pytest.raises(ValueError):
+        state_names_mask(['unheardof'])
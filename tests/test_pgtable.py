@@ -0,0 +1,142 @@
+import pytest
+
+pytest.importorskip('numpy')
+
+from ceph_api.pgtable import NO_OSD, PGStatsTable  # noqa: E402
+
+__author__ = 'Chris Holcombe <chris.holcombe@canonical.com>'
+
+
+def _table():
+    pg_stats = []
+    for pool, ps, state, nbytes in ((1, 0, 'active+clean', 100),
+                                    (1, 1, 'active+degraded', 300),
+                                    (2, 0, 'active+clean', 50),
+                                    (2, 1, 'active+clean', 70),
+                                    (2, 2, 'peering', 10)):
+        pg_stats.append({'pgid': '{}.{:x}'.format(pool, ps), 'state': state,
+                         'up': [ps, ps + 1], 'acting': [ps, ps + 1],
+                         'stat_sum': {'num_bytes': nbytes}})
+    return PGStatsTable.from_pg_stats(pg_stats)
+
+
+@pytest.mark.parametrize('how,expected', [
+    ('sum', [400, 130]),
+    ('mean', [200, 130 / 3.0]),
+    ('min', [100, 10]),
+    ('max', [300, 70]),
+])
+def test_group_by(how, expected):
+    keys, values = _table().group_by('pool', 'num_bytes', how=how)
+    assert keys.tolist() == [1, 2]
+    assert values.tolist() == pytest.approx(expected)
+
+
+def test_group_by_count_needs_no_column():
+    keys, counts = _table().group_by('up_primary', how='count')
+    assert keys.tolist() == [0, 1, 2]
+    assert counts.tolist() == [2, 2, 1]
+
+
+@pytest.mark.parametrize('key,column,how', [
+    # The defaults, sum with no column
+    ('pool', None, 'sum'),
+    ('pool', None, 'mean'),
+    ('pool', 'num_bytes', 'median'),
+    ('pool', None, 'median'),
+    ('pool', 'up', 'sum'),
+    ('pool', 'no_such_column', 'max'),
+    ('num_bytes', 'num_bytes', 'sum'),
+])
+def test_group_by_rejects_bad_arguments(key, column, how):
+    with pytest.raises(ValueError):
+        _table().group_by(key, column, how=how)
+
+
+def _placed():
+    # Sets of different widths, a remapped PG whose acting set differs
+    # from up, and an erasure coded PG with a hole
+    return PGStatsTable.from_pg_stats([
+        {'pgid': '1.0', 'state': 'active+clean', 'up': [0, 1, 2],
+         'acting': [0, 1, 2]},
+        {'pgid': '1.1', 'state': 'active+remapped+backfill_wait',
+         'up': [3, 4, 5], 'acting': [3, 4, 6], 'up_primary': 3,
+         'acting_primary': 6},
+        {'pgid': '2.0', 'state': 'active+undersized+degraded',
+         'up': [7, 2147483647, 1, 8], 'acting': [7, 2147483647, 1, 8]},
+        {'pgid': '2.1', 'state': 'peering', 'up': [5], 'acting': [5]},
+        {'pgid': '2.2', 'state': 'stale+active+clean', 'up': [],
+         'acting': []},
+    ])
+
+
+def test_sets_are_padded():
+    table = _placed()
+    assert table.up.tolist() == [[0, 1, 2, NO_OSD], [3, 4, 5, NO_OSD],
+                                 [7, NO_OSD, 1, 8],
+                                 [5, NO_OSD, NO_OSD, NO_OSD],
+                                 [NO_OSD] * 4]
+    assert table.acting[1].tolist() == [3, 4, 6, NO_OSD]
+    assert table.acting_primary.tolist() == [0, 6, 7, 5, NO_OSD]
+    assert table.up_primary.tolist() == [0, 3, 7, 5, NO_OSD]
+
+
+def test_in_states():
+    table = _placed()
+    assert table.in_states(['degraded', 'peering']).tolist() == \
+        [False, False, True, True, False]
+    assert table.in_states(['active']).tolist() == \
+        [True, True, True, False, True]
+    # Aliases the monitors print are accepted too
+    assert table.in_states(['wait_backfill']).tolist() == \
+        [False, True, False, False, False]
+    assert table.in_all_states(['active', 'clean']).tolist() == \
+        [True, False, False, False, True]
+    assert table.in_all_states(['active', 'clean', 'stale']).tolist() == \
+        [False, False, False, False, True]
+    with pytest.raises(ValueError):
+        table.in_states(['unheardof'])
+
+
+def test_on_osds():
+    table = _placed()
+    assert table.on_osds([6]).tolist() == [False, True, False, False, False]
+    assert table.on_osds([6], acting=False).tolist() == [False] * 5
+    assert table.on_osds([5], acting=False).tolist() == \
+        [False, True, False, True, False]
+    assert table.on_osds([1, 8]).tolist() == \
+        [True, False, True, False, False]
+    # Padding and holes aren't an OSD
+    assert table.on_osds([NO_OSD, 2147483647]).tolist() == [False] * 5
+    assert table.on_osds([]).tolist() == [False] * 5
+
+
+def test_filter():
+    table = _placed()
+    assert table.filter().pgid.tolist() == table.pgid.tolist()
+    assert table.filter(pool=2).pgid.tolist() == ['2.0', '2.1', '2.2']
+    assert table.filter(pool=[1, 3]).pgid.tolist() == ['1.0', '1.1']
+    assert table.filter(pool=2, states=['active']).pgid.tolist() == \
+        ['2.0', '2.2']
+    assert table.filter(primary=[6]).pgid.tolist() == ['1.1']
+    assert table.filter(primary=[3], acting=False).pgid.tolist() == ['1.1']
+    assert table.filter(primary=[3]).pgid.tolist() == []
+    assert table.filter(osds=[5], acting=False, states=['peering']) \
+        .pgid.tolist() == ['2.1']
+    # Every column is selected together
+    selected = table.filter(pool=1, osds=[6])
+    assert len(selected) == 1
+    assert selected.acting.tolist() == [[3, 4, 6, NO_OSD]]
+    assert selected.pool.tolist() == [1]
+
+
+def test_count_by_osd():
+    table = _placed()
+    osds, counts = table.count_by_osd()
+    assert dict(zip(osds.tolist(), counts.tolist())) == \
+        {0: 1, 1: 2, 2: 1, 3: 1, 4: 1, 5: 1, 6: 1, 7: 1, 8: 1}
+    osds, counts = table.count_by_osd(acting=False)
+    assert dict(zip(osds.tolist(), counts.tolist())) == \
+        {0: 1, 1: 2, 2: 1, 3: 1, 4: 1, 5: 2, 7: 1, 8: 1}
+    osds, counts = table[table.pool == 3].count_by_osd()
+    assert osds.tolist() == counts.tolist() == []
@@ -0,0 +1,245 @@
+import json
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from ceph_api.crushmap import BUCKET_STRAW2, RULE_CHOOSELEAF_FIRSTN, \
+    RULE_CHOOSELEAF_INDEP, RULE_EMIT, RULE_TAKE, RULE_TYPE_ERASURE, \
+    RULE_TYPE_REPLICATED, WEIGHT_ONE, Bucket, CrushMap, \
+    Rule  # noqa: E402
+from ceph_api.jewel.ceph_command import OsdCommand  # noqa: E402
+from ceph_api.mapper import CrushMapper  # noqa: E402
+from ceph_api.output import OUTPUT_JSON_RAW  # noqa: E402
+from ceph_api.pgtable import NO_OSD  # noqa: E402
+from ceph_api.placement import FLAG_HASHPSPOOL, OBJECT_HASH_LINUX, \
+    Placement, stable_mod, str_hash  # noqa: E402
+
+__author__ = 'Chris Holcombe <chris.holcombe@canonical.com>'
+
+HOSTS = 4
+PER_HOST = 2
+OSDS = HOSTS * PER_HOST
+
+# (name, ceph_str_hash_rjenkins, ceph_str_hash_linux), from the C
+HASHES = (
+    (b'', 0xbd49d10d, 0x00000000),
+    (b'a', 0x29eec818, 0x000042f2),
+    (b'foo', 0x7fc1f406, 0x0024db2a),
+    (b'abcdefghijkl', 0x0b1b3ea5, 0xf281eff0),
+    (b'abcdefghijklm', 0x3122b031, 0x6b959a82),
+    (b'rbd_header.5e3a6b8b4567', 0xab79569e, 0xc0be39b5),
+    (b'rbd_data.1234abcd.0000000000000001', 0x99445a74, 0xa214f047),
+)
+
+
+def crush_map():
+    """HOSTS straw2 hosts of PER_HOST OSDs under one root, with a
+    replicated rule 0 and an erasure coded rule 1 across hosts."""
+    crush = CrushMap()
+    crush.types = {0: 'osd', 1: 'host', 2: 'root'}
+    crush.tunables = {'choose_local_tries': 0,
+                      'choose_local_fallback_tries': 0,
+                      'choose_total_tries': 50,
+                      'chooseleaf_descend_once': 1,
+                      'chooseleaf_vary_r': 1,
+                      'straw_calc_version': 1,
+                      'allowed_bucket_algs': 54,
+                      'chooseleaf_stable': 1}
+    root = Bucket(-1, 2, BUCKET_STRAW2)
+    for h in range(HOSTS):
+        host = Bucket(-2 - h, 1, BUCKET_STRAW2)
+        for osd_id in range(h * PER_HOST, (h + 1) * PER_HOST):
+            host.add_item(osd_id, WEIGHT_ONE)
+            crush.names[osd_id] = 'osd.{}'.format(osd_id)
+        root.add_item(host.id, host.weight)
+        crush.buckets[host.id] = host
+        crush.names[host.id] = 'host{}'.format(h)
+    crush.buckets[root.id] = root
+    crush.names[root.id] = 'default'
+    crush.max_buckets = 1 + HOSTS
+    crush.max_devices = OSDS
+    crush.rules[0] = Rule(0, RULE_TYPE_REPLICATED, 1, 10, [
+        (RULE_TAKE, -1, 0), (RULE_CHOOSELEAF_FIRSTN, 0, 1),
+        (RULE_EMIT, 0, 0)])
+    crush.rules[1] = Rule(1, RULE_TYPE_ERASURE, 3, 20, [
+        (RULE_TAKE, -1, 0), (RULE_CHOOSELEAF_INDEP, 0, 1),
+        (RULE_EMIT, 0, 0)])
+    crush.max_rules = 2
+    return crush
+
+
+def osd_dump(**changes):
+    """The osd dump of a cluster with a replicated pool 2, rbd, and an
+    erasure coded pool 1, ec, all OSDs up and in."""
+    osdmap = {
+        'epoch': 40,
+        'max_osd': OSDS,
+        'pools': [
+            {'pool': 1, 'pool_name': 'ec', 'type': 3, 'size': 3,
+             'crush_ruleset': 1, 'pg_num': 8, 'pg_placement_num': 8,
+             'flags': FLAG_HASHPSPOOL, 'object_hash': 2},
+            {'pool': 2, 'pool_name': 'rbd', 'type': 1, 'size': 3,
+             'crush_ruleset': 0, 'pg_num': 32, 'pg_placement_num': 32,
+             'flags': FLAG_HASHPSPOOL, 'object_hash': 2},
+        ],
+        'osds': [{'osd': osd_id, 'up': 1, 'in': 1, 'weight': 1.0,
+                  'primary_affinity': 1.0} for osd_id in range(OSDS)],
+        'pg_temp': [],
+        'primary_temp': [],
+    }
+    osdmap.update(changes)
+    return osdmap
+
+
+def crush_sets(placement, pool_id):
+    spec = placement.pools[pool_id]
+    seeds = placement.pool_seeds(pool_id)
+    rule = placement.mapper.find_rule(spec['crush_ruleset'], spec['type'],
+                                      spec['size'])
+    return CrushMapper(placement.crush).do_rule(rule, seeds, spec['size'],
+                                                placement.weights)
+
+
+def test_str_hash_matches_ceph():
+    names = [name for name, _, _ in HASHES]
+    assert str_hash(names).tolist() == \
+        [rjenkins for _, rjenkins, _ in HASHES]
+    assert str_hash(names, OBJECT_HASH_LINUX).tolist() == \
+        [linux for _, _, linux in HASHES]
+    assert int(str_hash([b'foo'])[0]) == 0x7fc1f406
+
+
+def test_str_hash_rejects_unknown_hashes():
+    with pytest.raises(ValueError):
+        str_hash([b'foo'], object_hash=9)
+
+
+def test_stable_mod():
+    # 12 bins inside a mask of 16: 12 to 15 fold onto 4 to 7
+    assert [stable_mod(x, 12, 15) for x in range(16)] == \
+        list(range(12)) + [4, 5, 6, 7]
+    xs = np.arange(256, dtype=np.uint32)
+    assert stable_mod(xs, 12, 15).tolist() == \
+        [stable_mod(x, 12, 15) for x in range(256)]
+    # Growing to 13 bins only moves what lands in the new bin
+    moved = [x for x in range(256)
+             if stable_mod(x, 12, 15) != stable_mod(x, 13, 15)]
+    assert all(stable_mod(x, 13, 15) == 12 for x in moved)
+
+
+def test_hashpspool_seeds():
+    placement = Placement(osd_dump(), crush_map())
+    # crush_hash32_2(ps, 2) from the C
+    assert placement.pool_seeds('rbd')[[0, 1, 7, 31]].tolist() == \
+        [0xf9360702, 0xb78dee9c, 0x5207628a, 0xd835cc2e]
+    osdmap = osd_dump()
+    osdmap['pools'][1]['flags'] = 0
+    osdmap['pools'][1]['pg_placement_num'] = 24
+    placement = Placement(osdmap, crush_map())
+    # Without hashpspool the pool id is added, and PGs past pgp_num
+    # share the seed they fold onto
+    assert placement.pool_seeds('rbd').tolist() == \
+        [stable_mod(ps, 24, 31) + 2 for ps in range(32)]
+
+
+def test_up_sets_follow_crush():
+    placement = Placement(osd_dump(), crush_map())
+    for pool_id in (1, 2):
+        up, up_primary = placement.pg_up(pool_id)
+        expected = crush_sets(placement, pool_id)
+        assert up.tolist() == expected
+        assert up_primary.tolist() == [osds[0] for osds in expected]
+        acting, acting_primary = placement.pg_acting(pool_id)
+        assert acting.tolist() == expected
+
+
+def test_down_osds_shift_replicas_and_leave_erasure_coded_holes():
+    osdmap = osd_dump()
+    osdmap['osds'][3]['up'] = 0
+    placement = Placement(osdmap, crush_map())
+    up, up_primary = placement.pg_up('rbd')
+    for row, osds in zip(up.tolist(), crush_sets(placement, 2)):
+        alive = [osd_id for osd_id in osds if osd_id != 3]
+        assert row == alive + [NO_OSD] * (3 - len(alive))
+    up, up_primary = placement.pg_up('ec')
+    for row, primary, osds in zip(up.tolist(), up_primary.tolist(),
+                                  crush_sets(placement, 1)):
+        shards = [NO_OSD if osd_id == 3 else osd_id for osd_id in osds]
+        assert row == shards
+        assert primary == [osd_id for osd_id in shards
+                           if osd_id != NO_OSD][0]
+
+
+def test_primary_affinity():
+    osdmap = osd_dump()
+    osdmap['osds'][0]['primary_affinity'] = 0.0
+    placement = Placement(osdmap, crush_map())
+    up, up_primary = placement.pg_up('rbd')
+    expected = crush_sets(placement, 2)
+    assert 0 in [osds[0] for osds in expected]
+    for row, primary, osds in zip(up.tolist(), up_primary.tolist(),
+                                  expected):
+        assert sorted(row) == sorted(osds)
+        assert primary != 0
+        # Replicated pools move the new primary to the front
+        assert row[0] == primary
+    up, up_primary = placement.pg_up('ec')
+    for row, primary, osds in zip(up.tolist(), up_primary.tolist(),
+                                  crush_sets(placement, 1)):
+        # Shards keep their positions
+        assert row == osds
+        assert primary != 0
+
+
+def test_pg_temp_and_primary_temp():
+    osdmap = osd_dump(pg_temp=[{'pgid': '2.3', 'osds': [7, 5, 1, 3]}],
+                      primary_temp=[{'pgid': '2.4', 'osd': 6}])
+    osdmap['osds'][5]['up'] = 0
+    placement = Placement(osdmap, crush_map())
+    up, up_primary = placement.pg_up('rbd')
+    acting, acting_primary = placement.pg_acting('rbd')
+    # Wide enough for the longest temp, and the down OSD drops out of it
+    assert acting.shape == (32, 4)
+    assert acting[3].tolist() == [7, 1, 3, NO_OSD]
+    assert acting_primary[3] == 7
+    assert acting[4].tolist() == up[4].tolist() + [NO_OSD]
+    assert acting_primary[4] == 6
+    assert up_primary[4] != 6
+    assert acting[:3].tolist() == [row + [NO_OSD]
+                                   for row in up[:3].tolist()]
+
+
+def test_compare_osd_map():
+    placement = Placement(osd_dump(), crush_map())
+    local = placement.map_object('rbd', 'foo')
+    assert local['raw_pgid'] == '2.7fc1f406'
+    assert local['pgid'] == '2.6'
+    recorded = dict(local, epoch=40, pool='rbd', objname='foo')
+    assert placement.compare_osd_map(json.dumps(recorded)) == []
+    recorded['up'] = list(reversed(recorded['up']))
+    recorded['acting_primary'] = 99
+    assert placement.compare_osd_map(json.dumps(recorded)) == \
+        ['acting_primary', 'up']
+    local = placement.map_object('rbd', 'foo', namespace='ns')
+    recorded = dict(local, objname='ns/foo', nspace='ns')
+    assert placement.compare_osd_map(json.dumps(recorded)) == []
+
+
+def test_from_outbufs_over_rados(rados):
+    crush = crush_map()
+
+    def handler(target, cmd, inbuf):
+        if cmd['prefix'] == 'osd dump':
+            return 0, json.dumps(osd_dump()).encode(), ''
+        if cmd['prefix'] == 'osd getcrushmap':
+            return 0, crush.encode(), ''
+        raise AssertionError(cmd)
+
+    rados.Rados.handler = staticmethod(handler)
+    osd = OsdCommand('/etc/ceph/ceph.conf', output_format=OUTPUT_JSON_RAW)
+    placement = Placement.from_outbufs(osd.osd_dump()[0],
+                                       osd.osd_getcrushmap()[0])
+    pgs, up, up_primary = placement.map_objects('rbd', [b'foo'] * 2)
+    assert pgs.tolist() == [6, 6]
+    assert up.tolist() == [crush_sets(placement, 2)[6]] * 2
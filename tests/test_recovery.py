@@ -0,0 +1,148 @@
+import json
+import math
+
+import pytest
+
+from ceph_api.jewel.ceph_command import PlacementGroupCommand
+from ceph_api.output import OUTPUT_JSON_RAW, OUTPUT_PLAIN
+from ceph_api.recovery import RecoverySample, RecoveryTracker, _Rate
+
+__author__ = 'Chris Holcombe <chris.holcombe@canonical.com>'
+
+
+class Monitors(object):
+    """Answers pg stat, pg dump pools and pg dump_stuck from what the
+    test sets."""
+
+    def __init__(self):
+        self.degraded = 0
+        self.misplaced = 0
+        self.pools = {}
+        self.stuck = []
+
+    def __call__(self, target, cmd, inbuf):
+        if cmd['prefix'] == 'pg stat':
+            document = {'num_pgs': 64, 'degraded_objects': self.degraded,
+                        'misplaced_objects': self.misplaced}
+        elif cmd['prefix'] == 'pg dump':
+            assert cmd['dumpcontents'] == ['pools']
+            document = [{'poolid': pool_id, 'stat_sum': {
+                'num_objects_degraded': degraded,
+                'num_objects_misplaced': misplaced}}
+                for pool_id, (degraded, misplaced) in self.pools.items()]
+        elif cmd['prefix'] == 'pg dump_stuck':
+            document = self.stuck
+        else:
+            raise AssertionError(cmd)
+        return 0, json.dumps(document).encode(), ''
+
+
+@pytest.fixture
+def monitors(rados):
+    monitors = Monitors()
+    rados.Rados.handler = staticmethod(monitors)
+    return monitors
+
+
+def tracker(**kwargs):
+    pg = PlacementGroupCommand('/etc/ceph/ceph.conf',
+                               output_format=OUTPUT_JSON_RAW)
+    return RecoveryTracker(pg, **kwargs)
+
+
+def test_rate_smoothing():
+    rate = _Rate(halflife=30.0)
+    rate.update(100, 80, 0)
+    assert rate.rate is None
+    rate.update(100, 80, 10)
+    assert rate.rate == 2.0
+    # A new rate of 3 carries 1 - 0.5 ** (10 / 30) of the weight
+    rate.update(80, 50, 10)
+    assert rate.rate == pytest.approx(2.0 + 1.0 - math.pow(0.5, 1 / 3.0))
+    # After a halflife the old rate has half its say
+    rate = _Rate(halflife=30.0)
+    rate.update(100, 100, 30)
+    rate.update(100, 40, 30)
+    assert rate.rate == pytest.approx(1.0)
+
+
+def test_eta(rados, monitors):
+    tracker_ = tracker(stuck_interval=None)
+    assert tracker_.eta() is None
+    monitors.degraded, monitors.misplaced = 600, 400
+    monitors.pools = {1: (600, 0), 2: (0, 400)}
+    sample = tracker_.sample(now=1000.0)
+    assert sample == RecoverySample(1000.0, 600, 400, 0,
+                                    {1: (600, 0, 0), 2: (0, 400, 0)})
+    # One sample has no rate yet
+    assert tracker_.rate() is None
+    assert tracker_.eta() is None
+    assert tracker_.pool_etas() == {1: None, 2: None}
+    monitors.degraded, monitors.misplaced = 500, 300
+    monitors.pools = {1: (500, 0), 2: (0, 300)}
+    tracker_.sample(now=1010.0)
+    assert tracker_.rate() == 20.0
+    assert tracker_.eta() == 40.0
+    assert tracker_.pool_rates() == {1: 10.0, 2: 10.0}
+    assert tracker_.pool_etas() == {1: 50.0, 2: 30.0}
+    # Pool 1 stood still for a third of a halflife, and pool 2 went away
+    monitors.degraded, monitors.misplaced = 500, 0
+    monitors.pools = {1: (500, 0)}
+    tracker_.sample(now=1020.0)
+    slowed = 10.0 * math.pow(0.5, 1 / 3.0)
+    assert tracker_.pool_rates() == {1: pytest.approx(slowed)}
+    assert tracker_.pool_etas() == {1: pytest.approx(500 / slowed)}
+    monitors.degraded = 0
+    monitors.pools = {1: (0, 0)}
+    tracker_.sample(now=1030.0)
+    assert tracker_.eta() == 0.0
+    assert tracker_.pool_etas() == {1: 0.0}
+
+
+def test_rising_counts_have_no_eta(rados, monitors):
+    tracker_ = tracker(stuck_interval=None)
+    monitors.degraded = 100
+    tracker_.sample(now=0.0)
+    monitors.degraded = 200
+    tracker_.sample(now=5.0)
+    assert tracker_.rate() == -20.0
+    assert tracker_.eta() is None
+
+
+def stuck(pgid, state='active+recovering+degraded', recovered=0):
+    return {'pgid': pgid, 'state': state,
+            'stat_sum': {'num_objects_recovered': recovered,
+                         'num_objects_degraded': 10}}
+
+
+def test_stalled_pgs(rados, monitors):
+    tracker_ = tracker(stuck_interval=60.0, stall_seconds=300.0)
+    monitors.stuck = [stuck('1.0'), stuck('1.1')]
+    tracker_.sample(now=0.0)
+    assert tracker_.stalled == {}
+    # Checked only every stuck_interval
+    tracker_.sample(now=30.0)
+    checks = [cmd for _, cmd in rados.Rados.sent
+              if cmd['prefix'] == 'pg dump_stuck']
+    assert len(checks) == 1
+    assert checks[0]['stuckops'] == ['unclean', 'degraded']
+    tracker_.sample(now=240.0)
+    assert tracker_.stalled == {}
+    # 1.1 recovered some objects, 1.0 hasn't moved in 300 seconds
+    monitors.stuck = [stuck('1.0'), stuck('1.1', recovered=5)]
+    tracker_.sample(now=300.0)
+    assert tracker_.stalled == {'1.0': 0.0}
+    # A new state counts as movement, and PGs no longer stuck are dropped
+    monitors.stuck = [stuck('1.0', 'active+recovery_wait+degraded'),
+                      stuck('1.1', recovered=5)]
+    assert tracker_.check_stuck(now=610.0) == {'1.1': 300.0}
+    monitors.stuck = [stuck('1.1', recovered=5)]
+    tracker_.check_stuck(now=620.0)
+    assert list(tracker_._progress) == ['1.1']
+
+
+def test_needs_json():
+    pg = PlacementGroupCommand('/etc/ceph/ceph.conf',
+                               output_format=OUTPUT_PLAIN)
+    with pytest.raises(ValueError):
+        RecoveryTracker(pg)
@@ -0,0 +1,115 @@
+import pytest
+
+pytest.importorskip('numpy')
+
+from ceph_api.pgtable import PGStatsTable  # noqa: E402
+from ceph_api.repair import RepairQueue  # noqa: E402
+from ceph_api.throttle import OsdThrottle  # noqa: E402
+
+__author__ = 'Chris Holcombe <chris.holcombe@canonical.com>'
+
+DAY1 = '2016-10-13 02:11:45.118920'
+DAY2 = '2016-10-14 02:11:45.118920'
+
+
+class PGs(object):
+    """Stands in for a PlacementGroupCommand, recording the repairs it
+    was asked for."""
+
+    def __init__(self):
+        self.repairs = []
+
+    def pg_repair(self, pgid):
+        self.repairs.append(pgid)
+        return b'', 'instructing pg {} to repair'.format(pgid)
+
+
+def table(*pgs):
+    return PGStatsTable.from_pg_stats([
+        {'pgid': pgid, 'state': state, 'acting': acting, 'up': acting,
+         'last_deep_scrub_stamp': stamp}
+        for pgid, state, acting, stamp in pgs])
+
+
+def started_queue(timeout=3600.0):
+    # 1.0 and 1.1 repairing, 1.2 queued behind 1.0 on osd.0
+    pgs = PGs()
+    queue = RepairQueue(pgs, max_per_osd=1, timeout=timeout)
+    before = table(('1.0', 'active+clean+inconsistent', [0, 1], DAY1),
+                   ('1.1', 'active+clean+inconsistent', [2, 3], DAY1),
+                   ('1.2', 'active+clean+inconsistent', [0, 4], DAY1))
+    assert queue.discover(before) == ['1.0', '1.1', '1.2']
+    assert queue.discover(before) == []
+    assert queue.step(before, now=1000.0) == ['1.0', '1.1']
+    assert pgs.repairs == ['1.0', '1.1']
+    assert list(queue.pending) == ['1.2']
+    return queue
+
+
+def test_repaired():
+    queue = started_queue()
+    after = table(('1.0', 'active+clean', [0, 1], DAY2),
+                  ('1.1', 'active+clean+scrubbing+deep+inconsistent+repair',
+                   [2, 3], DAY1),
+                  ('1.2', 'active+clean+inconsistent', [0, 4], DAY1))
+    # 1.0's slot on osd.0 frees up for 1.2
+    assert queue.step(after, now=1600.0) == ['1.2']
+    assert queue.repaired == ['1.0']
+    assert sorted(queue.running) == ['1.1', '1.2']
+    assert queue.failed == {}
+    assert queue.throttle.load(1) == 0
+
+
+def test_still_inconsistent():
+    queue = started_queue()
+    # The deep scrub the repair ran finished and found errors again
+    after = table(('1.0', 'active+clean+inconsistent', [0, 1], DAY2),
+                  ('1.1', 'active+clean+inconsistent', [2, 3], DAY1),
+                  ('1.2', 'active+clean+inconsistent', [0, 4], DAY1))
+    queue.step(after, now=1600.0)
+    assert queue.failed == {'1.0': 'still inconsistent'}
+    # 1.1 hasn't deep scrubbed yet, so it's still waiting
+    assert sorted(queue.running) == ['1.1', '1.2']
+    assert queue.repaired == []
+
+
+@pytest.mark.parametrize('state', [
+    'active+clean+scrubbing+deep+inconsistent+repair',
+    'active+clean+inconsistent',
+])
+def test_timed_out(state):
+    queue = started_queue(timeout=3600.0)
+    after = table(('1.0', state, [0, 1], DAY1),
+                  ('1.1', 'active+clean', [2, 3], DAY2),
+                  ('1.2', 'active+clean+inconsistent', [0, 4], DAY1))
+    assert queue.step(after, now=4599.0) == []
+    assert sorted(queue.running) == ['1.0']
+    assert queue.step(after, now=4600.0) == ['1.2']
+    assert queue.failed == {'1.0': 'timed out'}
+    assert queue.repaired == ['1.1']
+
+
+def test_queued_pgs_that_heal_are_dropped():
+    queue = started_queue()
+    after = table(('1.0', 'active+clean+inconsistent+repair', [0, 1], DAY1),
+                  ('1.1', 'active+clean+inconsistent+repair', [2, 3], DAY1),
+                  ('1.2', 'active+clean', [0, 4], DAY2))
+    assert queue.step(after, now=1600.0) == []
+    assert not queue.pending
+    after = table(('1.0', 'active+clean', [0, 1], DAY2),
+                  ('1.1', 'active+clean', [2, 3], DAY2))
+    queue.step(after, now=1700.0)
+    assert queue.done()
+    assert sorted(queue.repaired) == ['1.0', '1.1']
+
+
+def test_shared_throttle():
+    throttle = OsdThrottle(max_per_osd=1)
+    throttle.acquire('scrub 2.0', [1, 9])
+    queue = RepairQueue(PGs(), throttle=throttle)
+    pgs = table(('1.0', 'active+clean+inconsistent', [0, 1], DAY1),
+                ('1.1', 'active+clean+inconsistent', [2, 3], DAY1))
+    queue.discover(pgs)
+    assert queue.step(pgs, now=0.0, exclude_osds=[3]) == []
+    throttle.release('scrub 2.0')
+    assert queue.step(pgs, now=1.0) == ['1.0', '1.1']
@@ -0,0 +1,143 @@
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from ceph_api.crushmap import WEIGHT_ONE  # noqa: E402
+from ceph_api.reweight import ReweightPlanner, ReweightStep, \
+    reweight_round  # noqa: E402
+
+__author__ = 'Chris Holcombe <chris.holcombe@canonical.com>'
+
+# 0.05 in 16.16
+STEP = 3276
+
+
+def round_of(util, weights=None, average=0.5, **kwargs):
+    util = np.array(util, dtype=np.float64)
+    if weights is None:
+        weights = [WEIGHT_ONE] * len(util)
+    return reweight_round(util, np.array(weights, dtype=np.int64), average,
+                          **kwargs)
+
+
+def test_overloaded_osds_lose_at_most_max_change():
+    # Overload is 0.6.  osd.0 would drop to 0.5 / 0.9 * 65536 = 36408
+    # and osd.3 to 54613, and both are held to 65536 - 3276.  osd.2 is
+    # under the average but already at full weight.
+    assert round_of([0.9, 0.5, 0.3, 0.6]) == \
+        {0: WEIGHT_ONE - STEP, 3: WEIGHT_ONE - STEP}
+
+
+def test_larger_max_change():
+    assert round_of([0.9, 0.5, 0.3, 0.6], max_change=1.0) == \
+        {0: 36408, 3: 54613}
+
+
+def test_low_weights_drop_straight_to_the_target():
+    # At or under max_change the monitors take the scaled weight as is
+    assert round_of([0.9, 0.5], weights=[3000, WEIGHT_ONE]) == \
+        {0: int(0.5 / 0.9 * 3000)}
+
+
+def test_underloaded_osds_gain_at_most_max_change():
+    weights = [WEIGHT_ONE, WEIGHT_ONE, 52428, WEIGHT_ONE]
+    # osd.2 would go to 0.5 / 0.3 * 52428 = 87380, held to 52428 + 3276
+    assert round_of([0.9, 0.5, 0.3, 0.55], weights) == \
+        {0: WEIGHT_ONE - STEP, 2: 52428 + STEP}
+    assert round_of([0.9, 0.5, 0.3, 0.55], weights,
+                    no_increasing=True) == {0: WEIGHT_ONE - STEP}
+    # Never above 1
+    assert round_of([0.5, 0.45], [WEIGHT_ONE, 64000], max_change=1.0) == \
+        {1: WEIGHT_ONE}
+
+
+def test_max_osds_takes_the_furthest_from_the_average():
+    util = [0.62, 0.9, 0.7, 0.3, 0.5]
+    weights = [WEIGHT_ONE] * 3 + [40000, WEIGHT_ONE]
+    assert sorted(round_of(util, weights, max_osds=1)) == [1]
+    # Next furthest is osd.3 at 0.2 under, then osd.2 at 0.2 over, in
+    # the order they're given
+    assert sorted(round_of(util, weights, max_osds=2)) == [1, 3]
+    assert sorted(round_of(util, weights, max_osds=3)) == [1, 2, 3]
+    assert sorted(round_of(util, weights, max_osds=10)) == [0, 1, 2, 3]
+
+
+def test_oload_sets_the_overload():
+    util = [0.58, 0.5, 0.42]
+    assert round_of(util) == {}
+    assert round_of(util, oload=115) == {0: WEIGHT_ONE - STEP}
+
+
+def osd_df(used_kb):
+    return {'nodes': [{'id': osd_id, 'type': 'osd', 'kb': 1000000,
+                       'kb_used': kb, 'crush_weight': 1.0, 'reweight': 1.0,
+                       'pgs': 50}
+                      for osd_id, kb in enumerate(used_kb)]}
+
+
+def test_plan_and_commands():
+    planner = ReweightPlanner(osd_df([900000, 500000, 500000, 500000]))
+    plan = planner.plan(oload=110, steps=3)
+    assert all(isinstance(step, ReweightStep) for step in plan)
+    assert plan[0].weights == {0: float(WEIGHT_ONE - STEP) / WEIGHT_ONE}
+    assert plan[0].average_util == pytest.approx(0.6)
+    assert plan[0].overload_util == pytest.approx(0.66)
+    # Each round starts from the one before
+    assert len(plan) == 3
+    assert plan[1].weights[0] < plan[0].weights[0]
+    assert plan[2].utilization[0] < plan[0].utilization[0]
+    with pytest.raises(ValueError):
+        planner.plan(oload=100)
+    with pytest.raises(ValueError):
+        ReweightPlanner(osd_df([1000, 1000])).plan()
+
+
+def test_too_little_data_per_osd():
+    # mon_reweight_min_bytes_per_osd is 100MB, of space and of use
+    small = osd_df([60000, 60000, 60000, 60000])
+    for node in small['nodes']:
+        node['kb'] = 90000
+    with pytest.raises(ValueError):
+        ReweightPlanner(small).plan()
+    with pytest.raises(ValueError):
+        ReweightPlanner(osd_df([90000, 90000, 90000, 90000])).plan()
+    assert ReweightPlanner(osd_df([150000, 110000, 110000, 110000])).plan(
+        oload=105)
+
+
+def by_pg(pgs, crush_weights, reweights=None):
+    df = osd_df([500000] * len(pgs))
+    for node, count, weight in zip(df['nodes'], pgs, crush_weights):
+        node['pgs'] = count
+        node['crush_weight'] = weight
+    for node, reweight in zip(df['nodes'], reweights or []):
+        node['reweight'] = reweight
+    return ReweightPlanner(df)
+
+
+def test_by_pg_leaves_out_osds_without_crush_weight():
+    # osd.3's copies don't count towards the average, nor is it changed
+    planner = by_pg([60, 40, 40, 500], [1.0, 1.0, 1.0, 0.0])
+    plan = planner.plan(oload=110, by_pg=True)
+    assert plan[0].average_util == pytest.approx(140 / 3.0)
+    assert list(plan[0].weights) == [0]
+    assert np.isnan(plan[0].utilization[3])
+
+
+def test_by_pg_raises_empty_osds():
+    # An OSD holding nothing is as underloaded as can be, though it adds
+    # no weight to the average
+    planner = by_pg([40, 40, 40, 0], [1.0, 1.0, 1.0, 1.0],
+                    [1.0, 1.0, 1.0, 0.8])
+    plan = planner.plan(by_pg=True)
+    assert plan[0].average_util == pytest.approx(40.0)
+    assert plan[0].weights == {
+        3: float(int(round(0.8 * WEIGHT_ONE)) + STEP) / WEIGHT_ONE}
+
+
+def test_by_pg_too_few_pgs():
+    # 9 copies an OSD, with the weightless OSD's left out
+    with pytest.raises(ValueError):
+        by_pg([9, 9, 9, 300], [1.0, 1.0, 1.0, 0.0]).plan(by_pg=True)
+    assert by_pg([14, 10, 10, 0], [1.0, 1.0, 1.0, 0.0]).plan(
+        oload=110, by_pg=True)
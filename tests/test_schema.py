@@ -0,0 +1,108 @@
+import importlib
+import json
+import os
+
+import pytest
+
+from ceph_api import schema
+from ceph_api.base import CommandBase
+
+__author__ = 'Chris Holcombe <chris.holcombe@canonical.com>'
+
+# For every release, class and method of the generated modules the
+# command table replaced: [prefix, argument names, how many are required,
+# the validation each call made, in order].  A validation is
+# [argument, ceph_argparse type, its strings, range or goodchars], or
+# [argument, 'str'] for the isinstance check on pool and object names.
+# Recorded from ceph_api/<release>/ceph_command.py of the baseline commit
+# with the ast module.
+with open(os.path.join(os.path.dirname(__file__),
+                       'baseline_commands.json')) as f:
+    BASELINE = json.load(f)
+
+
+def _validation(arg):
+    # An argument schema in the baseline's terms
+    kind = arg['type']
+    if kind in ('CephPoolname', 'CephObjectname'):
+        return [arg['name'], 'str']
+    for field in ('strings', 'range', 'goodchars'):
+        if field in arg:
+            return [arg['name'], kind, arg[field]]
+    return [arg['name'], kind]
+
+
+class Recorder(object):
+    """Collects what a generated method validates and sends."""
+
+    def __init__(self):
+        self.validated = []
+        self.sent = []
+
+    def validate_arg(self, arg, value):
+        self.validated.append(_validation(arg))
+
+    def _run(self, cmd, inbuf, outfile=None, infile=None):
+        self.sent.append(cmd)
+        return b'', ''
+
+
+def test_baseline_covers_every_release():
+    assert sorted(BASELINE) == sorted(schema.RELEASES)
+    for classes in BASELINE.values():
+        assert sorted(classes) == sorted(schema.COMMAND_CLASSES)
+
+
+@pytest.mark.parametrize('release', schema.RELEASES)
+def test_release_modules_match_the_baseline(release, monkeypatch):
+    module = importlib.import_module('ceph_api.{}.ceph_command'.format(
+        release))
+    recorder = Recorder()
+    monkeypatch.setattr(schema, 'validate_arg', recorder.validate_arg)
+    for class_name, methods in sorted(BASELINE[release].items()):
+        cls = getattr(module, class_name)
+        assert sorted(name for name in vars(cls)
+                      if not name.startswith('_')) == sorted(methods)
+        command = cls('/etc/ceph/ceph.conf')
+        monkeypatch.setattr(command, '_run', recorder._run)
+        for method, (prefix, names, required, validations) in \
+                sorted(methods.items()):
+            signature = getattr(cls, method).__doc__.split('\n')[0]
+            expected = names[:required] + \
+                ['{}=None'.format(name) for name in names[required:]]
+            assert signature.startswith('{}({}'.format(
+                method, ', '.join(expected))), signature
+            # Every argument given, positionally
+            values = ['value{}'.format(i) for i in range(len(names))]
+            recorder.validated, recorder.sent = [], []
+            getattr(command, method)(*values)
+            assert recorder.validated == validations, method
+            assert recorder.sent == [dict([('prefix', prefix)] +
+                                          list(zip(names, values)))]
+            # Optional arguments left out aren't checked or sent
+            recorder.validated, recorder.sent = [], []
+            getattr(command, method)(**dict(zip(names[:required],
+                                                values)))
+            assert recorder.validated == validations[:required], method
+            assert sorted(recorder.sent[0]) == \
+                sorted(['prefix'] + names[:required])
+            with pytest.raises(TypeError):
+                getattr(command, method)(*values + ['extra'])
+            if required:
+                with pytest.raises(TypeError):
+                    getattr(command, method)(*values[:required - 1])
+
+
+def test_methods_are_built_once():
+    cls = schema.command_class('OsdCommand',
+                               schema.release_commands('jewel')['OsdCommand'])
+    assert isinstance(vars(cls)['osd_dump'], schema._LazyMethod)
+    method = cls.osd_dump
+    assert not isinstance(vars(cls)['osd_dump'], schema._LazyMethod)
+    assert cls.osd_dump is method
+    assert issubclass(cls, CommandBase)
+
+
+def test_unknown_release():
+    with pytest.raises(ValueError):
+        schema.release_commands('kraken')
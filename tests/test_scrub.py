@@ -0,0 +1,156 @@
+import time
+
+import pytest
+
+pytest.importorskip('numpy')
+
+from ceph_api.pgtable import PGStatsTable  # noqa: E402
+from ceph_api.scrub import ScrubScheduler, in_windows, \
+    overdue  # noqa: E402
+
+__author__ = 'Chris Holcombe <chris.holcombe@canonical.com>'
+
+DAY = 24 * 3600.0
+NOW = 1476403200.0  # 2016-10-14 00:00:00 UTC
+
+
+class PGs(object):
+    """Stands in for a PlacementGroupCommand, recording the scrubs it was
+    asked for."""
+
+    def __init__(self, fail=None):
+        self.scrubs = []
+        self.fail = fail
+
+    def _scrub(self, pgid, deep):
+        if pgid == self.fail:
+            raise RuntimeError("no primary for {}".format(pgid))
+        self.scrubs.append((pgid, deep))
+        return b'', 'instructing pg {} to scrub'.format(pgid)
+
+    def pg_scrub(self, pgid):
+        return self._scrub(pgid, False)
+
+    def pg_deep_scrub(self, pgid):
+        return self._scrub(pgid, True)
+
+
+def stamp(seconds):
+    return time.strftime('%Y-%m-%d %H:%M:%SZ', time.gmtime(seconds))
+
+
+def table(*pgs):
+    """pgs of (pgid, state, acting, days since scrub, days since deep
+    scrub)."""
+    return PGStatsTable.from_pg_stats([
+        {'pgid': pgid, 'state': state, 'acting': acting, 'up': acting,
+         'last_scrub_stamp': stamp(NOW - scrubbed * DAY),
+         'last_deep_scrub_stamp': stamp(NOW - deep * DAY)}
+        for pgid, state, acting, scrubbed, deep in pgs])
+
+
+def local(hour):
+    return time.mktime((2016, 10, 14, hour, 30, 0, 0, 0, -1))
+
+
+def test_overdue_puts_deep_scrubs_first_then_the_most_overdue():
+    pgs = table(('1.0', 'active+clean', [0, 1], 8, 1),
+                ('1.1', 'active+clean', [2, 3], 10, 9),
+                ('1.2', 'active+clean', [4, 5], 12, 2),
+                ('1.3', 'active+clean', [6, 7], 1, 8),
+                ('1.4', 'active+clean', [8, 9], 1, 1))
+    rows, deep = overdue(pgs, NOW, scrub_interval=7 * DAY,
+                         deep_interval=7 * DAY)
+    assert pgs.pgid[rows].tolist() == ['1.1', '1.3', '1.2', '1.0']
+    assert deep.tolist() == [True, True, False, False]
+
+
+@pytest.mark.parametrize('state', [
+    'active+clean+scrubbing',
+    'active+clean+scrubbing+deep',
+    'active+clean+scrubbing+deep+repair',
+    'active+degraded',
+    'peering',
+])
+def test_overdue_skips_busy_and_unclean_pgs(state):
+    pgs = table(('1.0', state, [0, 1], 30, 30),
+                ('1.1', 'active+clean+inconsistent', [2, 3], 30, 1))
+    rows, deep = overdue(pgs, NOW)
+    assert pgs.pgid[rows].tolist() == ['1.1']
+    assert deep.tolist() == [False]
+
+
+@pytest.mark.parametrize('windows,open_hours', [
+    (None, range(24)),
+    ([(22, 6)], [0, 1, 2, 3, 4, 5, 22, 23]),
+    ([(1, 4)], [1, 2, 3]),
+    ([(5, 5)], range(24)),
+    ([(1, 2), (20, 0)], [1, 20, 21, 22, 23]),
+    ([], []),
+])
+def test_in_windows(windows, open_hours):
+    assert [hour for hour in range(24)
+            if in_windows(windows, local(hour))] == list(open_hours)
+
+
+def test_step_starts_what_the_throttle_allows():
+    pgs = PGs()
+    scheduler = ScrubScheduler(pgs, max_per_osd=1)
+    before = table(('1.0', 'active+clean', [0, 1], 8, 8),
+                   ('1.1', 'active+clean', [1, 2], 9, 1),
+                   ('1.2', 'active+clean', [3, 4], 8, 1))
+    assert scheduler.step(before, now=NOW) == [('1.0', True), ('1.2', False)]
+    assert pgs.scrubs == [('1.0', True), ('1.2', False)]
+    assert sorted(scheduler.running) == ['1.0', '1.2']
+    # Nothing finished, so 1.1 still waits for osd.1
+    assert scheduler.step(before, now=NOW + 60) == []
+
+
+def test_finish_frees_slots_when_the_stamp_moves():
+    pgs = PGs()
+    scheduler = ScrubScheduler(pgs, max_per_osd=1)
+    before = table(('1.0', 'active+clean', [0, 1], 8, 8),
+                   ('1.1', 'active+clean', [1, 2], 9, 1))
+    assert scheduler.step(before, now=NOW) == [('1.0', True)]
+    # A plain scrub stamp moving doesn't finish a deep scrub
+    scrubbed = table(('1.0', 'active+clean', [0, 1], 0, 8),
+                     ('1.1', 'active+clean', [1, 2], 9, 1))
+    assert scheduler.step(scrubbed, now=NOW + 60) == []
+    deep_scrubbed = table(('1.0', 'active+clean', [0, 1], 0, 0),
+                          ('1.1', 'active+clean', [1, 2], 9, 1))
+    assert scheduler.step(deep_scrubbed, now=NOW + 120) == [('1.1', False)]
+    assert list(scheduler.running) == ['1.1']
+    assert scheduler.throttle.load(0) == 0
+
+
+def test_finish_gives_up_after_the_timeout():
+    pgs = PGs()
+    scheduler = ScrubScheduler(pgs, max_per_osd=1, timeout=3600.0)
+    before = table(('1.0', 'active+clean', [0, 1], 8, 1),
+                   ('1.1', 'active+clean', [1, 2], 7.5, 1))
+    assert scheduler.step(before, now=NOW) == [('1.0', False)]
+    assert scheduler.step(before, now=NOW + 3599) == []
+    # 1.0's slots are freed, and being the most overdue it starts again
+    assert scheduler.step(before, now=NOW + 3600) == [('1.0', False)]
+    assert pgs.scrubs == [('1.0', False)] * 2
+
+
+def test_step_releases_the_slot_when_a_scrub_fails():
+    pgs = PGs(fail='1.0')
+    scheduler = ScrubScheduler(pgs, max_per_osd=1)
+    before = table(('1.0', 'active+clean', [0, 1], 8, 1))
+    with pytest.raises(RuntimeError):
+        scheduler.step(before, now=NOW)
+    assert scheduler.running == {}
+    assert scheduler.throttle.load(0) == scheduler.throttle.load(1) == 0
+    pgs.fail = None
+    assert scheduler.step(before, now=NOW + 1) == [('1.0', False)]
+
+
+def test_step_waits_for_a_window_and_skips_excluded_osds():
+    scheduler = ScrubScheduler(PGs(), windows=[(22, 6)])
+    pgs = table(('1.0', 'active+clean', [0, 1], 8, 1),
+                ('1.1', 'active+clean', [2, 3], 8, 1))
+    assert scheduler.step(pgs, now=local(12)) == []
+    assert scheduler.step(pgs, now=local(23), exclude_osds=[1]) == \
+        [('1.1', False)]
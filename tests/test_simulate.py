@@ -0,0 +1,130 @@
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from ceph_api import simulate  # noqa: E402
+from ceph_api.pgtable import PGStatsTable  # noqa: E402
+from ceph_api.placement import Placement, stable_mod, \
+    _mask  # noqa: E402
+from ceph_api.simulate import Movement, Simulation, \
+    hash_share  # noqa: E402
+
+from test_placement import crush_map, osd_dump  # noqa: E402
+
+__author__ = 'Chris Holcombe <chris.holcombe@canonical.com>'
+
+MB = 1 << 20
+
+
+def pg_bytes(pool_id, ps):
+    return (pool_id * 100 + ps + 1) * MB
+
+
+def simulation():
+    placement = Placement(osd_dump(), crush_map())
+    pg_stats = []
+    for pool_id, spec in sorted(placement.pools.items()):
+        for ps in range(spec['pg_num']):
+            pg_stats.append({'pgid': '{}.{:x}'.format(pool_id, ps),
+                             'state': 'active+clean',
+                             'stat_sum': {'num_bytes': pg_bytes(pool_id,
+                                                                ps)}})
+    return Simulation(placement, PGStatsTable.from_pg_stats(pg_stats))
+
+
+def test_nothing_changed():
+    movement = simulation().run()
+    assert isinstance(movement, Movement)
+    assert (movement.pgs, movement.pgs_moved, movement.bytes_moved) == \
+        (40, 0, 0)
+    assert movement.bytes_after.tolist() == movement.bytes_before.tolist()
+
+
+def test_osd_out_moves_exactly_its_pgs():
+    sim = simulation()
+    before = dict((pool_id, sim.placement.pg_up(pool_id)[0].tolist())
+                  for pool_id in (1, 2))
+    sim.osd_out([3])
+    movement = sim.run()
+    for pool_id, shards in ((1, 3), (2, 1)):
+        after = sim.proposed.pg_up(pool_id)[0].tolist()
+        on_osd = [ps for ps, row in enumerate(before[pool_id]) if 3 in row]
+        assert on_osd
+        # Each copy or shard that lands on a new OSD carries its part of
+        # the PG, replicas wherever they are and shards by position
+        landed = {}
+        for ps, (old, new) in enumerate(zip(before[pool_id], after)):
+            if shards == 1:
+                count = len(set(new) - set(old))
+            else:
+                count = sum(1 for a, b in zip(old, new) if a != b)
+            if count:
+                landed[ps] = count
+        assert sorted(landed) == on_osd
+        assert movement.pools[pool_id][0] == len(on_osd)
+        assert movement.pools[pool_id][1] == pytest.approx(sum(
+            count * pg_bytes(pool_id, ps) / float(shards)
+            for ps, count in landed.items()))
+    assert movement.pgs_moved == sum(moved for moved, _ in
+                                     movement.pools.values())
+    assert movement.pgs_after[3] == 0
+    assert movement.bytes_after[3] == 0
+    assert movement.bytes_after.sum() == \
+        pytest.approx(movement.bytes_before.sum())
+
+
+@pytest.mark.parametrize('old_num,new_num', [
+    (8, 12), (8, 16), (12, 13), (12, 24), (13, 32), (32, 100)])
+def test_split_children_share_their_parent(old_num, new_num):
+    ps = np.arange(new_num)
+    parent = stable_mod(ps, old_num, _mask(old_num))
+    ratio = hash_share(ps, new_num) / hash_share(parent, old_num)
+    sums = np.bincount(parent, weights=ratio, minlength=old_num)
+    assert sums.tolist() == pytest.approx([1.0] * old_num)
+    assert hash_share(np.arange(old_num), old_num).sum() == \
+        pytest.approx(1.0)
+
+
+def test_pg_num_split_keeps_the_byte_totals():
+    sim = simulation()
+    sim.osd_pool_set('rbd', 'pg_num', 48)
+    movement = sim.run()
+    assert movement.pgs == 8 + 48
+    assert movement.pgs_after.sum() == movement.pgs_before.sum() + 16 * 3
+    assert movement.bytes_after.sum() == \
+        pytest.approx(movement.bytes_before.sum())
+    # pgp_num is unchanged, so the children stay with their parents
+    assert movement.pgs_moved == 0
+    sim.osd_pool_set('rbd', 'pgp_num', 48)
+    assert sim.run().pools[2][0] > 0
+
+
+def test_pool_set_checks():
+    sim = simulation()
+    with pytest.raises(ValueError):
+        sim.osd_pool_set('rbd', 'pg_num', 16)
+    with pytest.raises(ValueError):
+        sim.osd_pool_set('rbd', 'pgp_num', 64)
+    with pytest.raises(ValueError):
+        sim.osd_pool_set('rbd', 'min_size', 1)
+    with pytest.raises(KeyError):
+        sim.osd_pool_set('nope', 'size', 2)
+
+
+class Reversed(Placement):
+    """Places every PG on the same OSDs in the opposite order."""
+
+    def _pool_sets(self, pool_id):
+        sets = Placement._pool_sets(self, pool_id)
+        return (sets[0][:, ::-1].copy(),) + tuple(sets[1:])
+
+
+def test_erasure_coded_shards_are_compared_by_position(monkeypatch):
+    monkeypatch.setattr(simulate, 'Placement', Reversed)
+    movement = simulation().run()
+    # A replica that only changes places hasn't moved, a shard has
+    assert movement.pools[2] == (0, 0.0)
+    ec_bytes = sum(pg_bytes(1, ps) for ps in range(8))
+    # Reversing three shards moves the first and last
+    assert movement.pools[1][0] == 8
+    assert movement.pools[1][1] == pytest.approx(ec_bytes * 2 / 3.0)
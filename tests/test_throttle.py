@@ -0,0 +1,80 @@
+import random
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from ceph_api.pgtable import NO_OSD  # noqa: E402
+from ceph_api.throttle import OsdThrottle  # noqa: E402
+
+__author__ = 'Chris Holcombe <chris.holcombe@canonical.com>'
+
+
+def acting_sets(count, osds, seed):
+    rng = random.Random(seed)
+    sets = np.full((count, 4), NO_OSD, dtype=np.int64)
+    for row in range(count):
+        width = rng.choice((2, 3, 3, 4))
+        sets[row, :width] = rng.sample(range(osds), width)
+    return sets
+
+
+@pytest.mark.parametrize('max_per_osd,seed', [(1, 0), (2, 1), (3, 2)])
+def test_admit_never_exceeds_max_per_osd(max_per_osd, seed):
+    # More candidates than admit() walks in one chunk
+    sets = acting_sets(1000, 60, seed)
+    keys = ['1.{:x}'.format(ps) for ps in range(len(sets))]
+    throttle = OsdThrottle(max_per_osd=max_per_osd)
+    throttle.acquire('held', [0, 1], now=0.0)
+    admitted = throttle.admit(keys, sets, now=0.0, exclude_osds=[5])
+    assert admitted == sorted(admitted)
+    load = {0: 1, 1: 1}
+    for position in admitted:
+        for osd in sets[position][sets[position] != NO_OSD].tolist():
+            load[osd] = load.get(osd, 0) + 1
+    assert max(load.values()) <= max_per_osd
+    assert 5 not in load
+    assert all(throttle.load(osd) == count for osd, count in load.items())
+    # Greedy in order: everything left out touches a full or excluded OSD
+    full = set(throttle.busy_osds()) | set([5])
+    for position in set(range(len(keys))) - set(admitted):
+        assert full & set(sets[position].tolist())
+    # Admitting again starts nothing new until slots are released
+    assert throttle.admit(keys, sets, now=1.0, exclude_osds=[5]) == []
+    throttle.release(keys[admitted[0]])
+    assert throttle.admit(keys, sets, now=1.0, exclude_osds=[5])
+
+
+def test_token_bucket():
+    throttle = OsdThrottle(max_per_osd=10, rate=0.5, burst=4)
+    assert throttle.tokens(now=100.0) == 4.0
+    for n in range(4):
+        assert throttle.acquire(n, [n], now=100.0)
+    assert not throttle.acquire(4, [4], now=100.0)
+    # Half a start a second
+    assert throttle.tokens(now=101.0) == pytest.approx(0.5)
+    assert not throttle.acquire(4, [4], now=101.0)
+    assert throttle.acquire(4, [4], now=102.0)
+    # Refilling stops at the burst
+    assert throttle.tokens(now=1000.0) == 4.0
+    sets = np.arange(10, 20).reshape(10, 1)
+    assert throttle.admit(list(range(10, 20)), sets, now=1000.0) == \
+        [0, 1, 2, 3]
+    assert throttle.admit(list(range(10, 20)), sets, now=1004.0) == [4, 5]
+
+
+def test_acquire_and_release():
+    throttle = OsdThrottle(max_per_osd=1)
+    assert throttle.tokens() == float('inf')
+    assert throttle.acquire('1.0', [1, 2])
+    with pytest.raises(ValueError):
+        throttle.acquire('1.0', [3])
+    assert not throttle.acquire('1.1', [2, 3])
+    assert sorted(throttle.busy_osds()) == [1, 2]
+    throttle.release('1.0')
+    throttle.release('unknown')
+    assert throttle.busy_osds() == []
+    assert throttle.active == {}
+    assert throttle.acquire('1.1', [2, 3])
+    with pytest.raises(ValueError):
+        OsdThrottle(max_per_osd=0)
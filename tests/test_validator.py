@@ -0,0 +1,121 @@
+import pytest
+
+from ceph_api import schema, validator
+from ceph_api.jewel.ceph_command import OsdCommand
+from ceph_api.validator import ChoicesValidator, RangeValidator
+
+__author__ = 'Chris Holcombe <chris.holcombe@canonical.com>'
+
+try:
+    from ceph_argparse import ArgumentValid
+except ImportError:
+    ArgumentValid = ValueError
+
+
+def test_choices():
+    choices = ChoicesValidator('full|pause|noup|nodown|noout')
+    for s in ('full', 'noout', 'nodown'):
+        choices.valid(s)
+    for s in ('', 'no', 'nooutx', 'full|pause', 'FULL'):
+        with pytest.raises(ArgumentValid):
+            choices.valid(s)
+
+
+@pytest.mark.parametrize('convert,range,accepted,rejected', [
+    (int, '', [-5, 0, 2 ** 40, '12'], ['1.5', 'x']),
+    (int, '0', [0, 1, 2 ** 40], [-1]),
+    # Both bounds are inclusive
+    (int, '0|1', [0, 1, '1'], [-1, 2]),
+    (float, '0|1', [0, 0.0, 0.5, 1, '1.0'], [-0.01, 1.01, 'x']),
+    (float, '0', [0.0, 100.5], [-1e-9]),
+])
+def test_ranges(convert, range, accepted, rejected):
+    check = RangeValidator(convert, range)
+    for value in accepted:
+        check.valid(value)
+    for value in rejected:
+        with pytest.raises(ArgumentValid):
+            check.valid(value)
+
+
+def test_range_bounds_are_parsed_once():
+    check = RangeValidator(int, '1|10')
+    assert check.range == [1, 10]
+    assert RangeValidator(float, '0').range == [0.0]
+    assert RangeValidator(int, '').range == []
+
+
+def test_validators_are_shared():
+    assert validator.choices('a|b') is validator.choices('a|b')
+    assert validator.choices('a|b') is not validator.choices('a|b|c')
+    assert validator.integer('0|1') is validator.integer('0|1')
+    assert validator.integer('0|1') is not validator.floating('0|1')
+    assert validator.floating() is validator.floating('')
+
+
+def test_validators_are_built_once(monkeypatch):
+    monkeypatch.setattr(validator, '_validators', {})
+    built = []
+
+    def build():
+        built.append(1)
+        return object()
+
+    first = validator._memoize(('CephString', 'a-z'), build)
+    assert validator._memoize(('CephString', 'a-z'), build) is first
+    assert built == [1]
+
+
+def test_ceph_argparse_types_are_shared():
+    pytest.importorskip('ceph_argparse')
+    assert validator.string('A-Za-z0-9-_.') is \
+        validator.string('A-Za-z0-9-_.')
+    assert validator.argtype('CephPgid') is validator.argtype('CephPgid')
+    validator.argtype('CephPgid').valid('2.1f')
+
+
+@pytest.mark.parametrize('arg,value', [
+    ({'name': 'var', 'type': 'CephChoices', 'strings': 'size|pg_num'},
+     ['pg_num']),
+    ({'name': 'var', 'type': 'CephChoices', 'strings': 'size|pg_num'},
+     ['size', 'pg_num']),
+    ({'name': 'id', 'type': 'CephInt', 'range': '0'}, 12),
+    ({'name': 'weight', 'type': 'CephFloat', 'range': '0|1'}, 1.0),
+    ({'name': 'pool', 'type': 'CephPoolname'}, 'rbd'),
+    ({'name': 'pool', 'type': 'CephPoolname'}, u'rbd'),
+])
+def test_validate_arg_accepts(arg, value):
+    schema.validate_arg(arg, value)
+
+
+@pytest.mark.parametrize('arg,value,error', [
+    ({'name': 'var', 'type': 'CephChoices', 'strings': 'size|pg_num'},
+     ['size', 'pgp'], ArgumentValid),
+    ({'name': 'id', 'type': 'CephInt', 'range': '0'}, -1, ArgumentValid),
+    ({'name': 'weight', 'type': 'CephFloat', 'range': '0|1'}, 1.5,
+     ArgumentValid),
+    ({'name': 'pool', 'type': 'CephPoolname'}, 12, TypeError),
+])
+def test_validate_arg_rejects(arg, value, error):
+    with pytest.raises(error):
+        schema.validate_arg(arg, value)
+
+
+def test_generated_methods_reuse_their_validators(rados, monkeypatch):
+    rados.Rados.handler = staticmethod(lambda target, cmd, inbuf:
+                                       (0, b'', ''))
+    monkeypatch.setattr(validator, '_validators', {})
+    osd = OsdCommand('/etc/ceph/ceph.conf')
+    # Choices are passed as a list, as the docstrings say
+    osd.osd_set(['noout'])
+    shared = dict(validator._validators)
+    assert len(shared) == 1
+    osd.osd_set(['noscrub'])
+    OsdCommand('/etc/ceph/ceph.conf').osd_unset(['noout'])
+    assert len(validator._validators) == 1
+    assert all(validator._validators[key] is check
+               for key, check in shared.items())
+    with pytest.raises(ArgumentValid):
+        osd.osd_set(['nosuchflag'])
+    assert [cmd['key'] for _, cmd in rados.Rados.sent] == \
+        [['noout'], ['noscrub'], ['noout']]